@@ -12,6 +12,7 @@ setup(
     keywords=['bigquery'],
     packages=['tinyquery'],
     install_requires=['arrow==0.12.1', 'ply==3.10', 'six==1.11.0'],
+    extras_require={'parquet': ['pyarrow']},
     classifiers=[
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python :: 2',
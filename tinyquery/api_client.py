@@ -6,11 +6,27 @@ This can be used in place of the value returned by apiclient.discovery.build().
 """
 from __future__ import absolute_import
 
+import base64
+import binascii
+import collections
+import datetime
 import functools
 import json
+import math
+import threading
 
 import six
 
+from tinyquery import profiling
+from tinyquery import query_limits
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+# Like in BigQuery, getQueryResults waits up to 10 seconds by default for the
+# job to finish.
+DEFAULT_QUERY_TIMEOUT_MS = 10000
+
 
 class TinyQueryApiClient(object):
     def __init__(self, tq_service):
@@ -69,7 +85,7 @@ class TableServiceApiClient(object):
 
     @http_request_provider
     def insert(self, projectId, datasetId, body):
-        """Create an empty table or a view."""
+        """Create an empty table, a view or a materialized view."""
         table_reference = body['tableReference']
         table_name = (table_reference['datasetId'] + '.' +
                       table_reference['tableId'])
@@ -78,10 +94,16 @@ class TableServiceApiClient(object):
             table_reference = body['tableReference']
             view = self.tq_service.make_view(table_name, body['view']['query'])
             self.tq_service.load_table_or_view(view)
+        elif 'materializedView' in body:
+            view = self.tq_service.make_materialized_view(
+                table_name, body['materializedView']['query'])
+            self.tq_service.load_table_or_view(view)
         else:
             #The new table is a regular table.
             raw_schema = body['schema']
-            table = self.tq_service.make_empty_table(table_name, raw_schema)
+            table = self.tq_service.make_empty_table(
+                table_name, raw_schema,
+                partitioned='timePartitioning' in body)
             self.tq_service.load_table_or_view(table)
 
     @http_request_provider
@@ -142,9 +164,27 @@ class JobServiceApiClient(object):
             create_disposition = config.get('createDisposition',
                                             'CREATE_IF_NEEDED')
             write_disposition = config.get('writeDisposition', 'WRITE_EMPTY')
-            return self.tq_service.run_query_job(
-                projectId, query, dest_dataset, dest_table, create_disposition,
-                write_disposition)
+            job_timeout_ms = body['configuration'].get('jobTimeoutMs')
+            try:
+                return self.tq_service.run_query_job(
+                    projectId, query, dest_dataset, dest_table,
+                    create_disposition, write_disposition,
+                    timeout=(None if job_timeout_ms is None
+                             else int(job_timeout_ms) / 1000.0),
+                    maximum_bytes_billed=config.get('maximumBytesBilled'),
+                    job_id=body.get('jobReference', {}).get('jobId'),
+                    use_query_cache=config.get('useQueryCache', True),
+                    dry_run=body['configuration'].get('dryRun', False))
+            except query_limits.QueryAbortedError as e:
+                # Synchronous jobs that were stopped fail like BigQuery's.
+                error_result = {'reason': e.reason, 'message': str(e)}
+                raise FakeHttpError(None, json.dumps({
+                    'error': {
+                        'code': 400,
+                        'message': error_result['message'],
+                        'errors': [error_result],
+                    }
+                }))
         elif 'copy' in body['configuration']:
             config = body['configuration']['copy']
             src_dataset, src_table = self._get_config_table(
@@ -175,16 +215,64 @@ class JobServiceApiClient(object):
         return self.tq_service.get_job_info(jobId)
 
     @http_request_provider
-    def getQueryResults(self, projectId, jobId):
-        result_table = self.tq_service.get_query_result_table(jobId)
-        result_rows = rows_from_table(result_table)
-        result_schema = schema_from_table(result_table)
+    def cancel(self, projectId, jobId):
+        """Request that a job be cancelled.
 
-        # TODO: Also add the schema.
-        return {
-            'rows': result_rows,
-            'schema': result_schema
-        }
+        Like in BigQuery, this returns right away, and the job is DONE once
+        it has stopped.
+        """
+        try:
+            job_info = self.tq_service.cancel_job(jobId)
+        except KeyError:
+            raise FakeHttpError(None, json.dumps({
+                'error': {
+                    'code': 404,
+                    'message': 'Not found: Job %s:%s' % (projectId, jobId)
+                }
+            }))
+        return {'kind': 'bigquery#jobCancelResponse', 'job': job_info}
+
+    @http_request_provider
+    def getQueryResults(self, projectId, jobId, pageToken=None,
+                        maxResults=None, startIndex=None,
+                        timeoutMs=DEFAULT_QUERY_TIMEOUT_MS):
+        """Get a page of the results of a query job.
+
+        Like BigQuery, this waits up to timeoutMs for the job to finish, and
+        returns jobComplete=False (and no rows) if it still hasn't.
+        """
+        if not self.tq_service.wait_for_job(jobId, int(timeoutMs) / 1000.0):
+            return {
+                'kind': 'bigquery#getQueryResultsResponse',
+                'jobReference': {'projectId': projectId, 'jobId': jobId},
+                'jobComplete': False,
+            }
+        error_result = self.tq_service.get_job_info(jobId)['status'].get(
+            'errorResult')
+        if error_result is not None:
+            raise FakeHttpError(None, json.dumps({
+                'error': {
+                    'code': 400,
+                    'message': error_result['message'],
+                    'errors': [error_result],
+                }
+            }))
+        result_table = self.tq_service.get_query_result_table(jobId)
+        result = profiling.run(
+            self.tq_service.make_profiler(), profiling.SERIALIZE,
+            result_table.name, _num_page_rows, page_of_rows, result_table,
+            pageToken, maxResults, startIndex, False)
+        job_statistics = self.tq_service.get_job_info(jobId)['statistics']
+        result.update({
+            'kind': 'bigquery#getQueryResultsResponse',
+            'jobReference': {'projectId': projectId, 'jobId': jobId},
+            'jobComplete': True,
+            'cacheHit': job_statistics['query']['cacheHit'],
+            'totalBytesProcessed': job_statistics['query'][
+                'totalBytesProcessed'],
+            'schema': schema_from_table(result_table, nest_records=False),
+        })
+        return result
 
     @http_request_provider
     def query(self, projectId, body):
@@ -193,12 +281,27 @@ class JobServiceApiClient(object):
         job_insert_result = self.insert(projectId=projectId, body={
             'projectId': projectId,
             'configuration': {
-                'query': body
+                'query': body,
+                'dryRun': body.get('dryRun', False),
             }
         }).execute()
+        if body.get('dryRun'):
+            query_statistics = job_insert_result['statistics']['query']
+            return {
+                'kind': 'bigquery#queryResponse',
+                'jobReference': job_insert_result['jobReference'],
+                'jobComplete': True,
+                'cacheHit': False,
+                'totalBytesProcessed': query_statistics[
+                    'totalBytesProcessed'],
+                'schema': query_statistics['schema'],
+            }
         return self.getQueryResults(
             projectId=projectId,
-            jobId=job_insert_result['jobReference']['jobId']).execute()
+            jobId=job_insert_result['jobReference']['jobId'],
+            maxResults=body.get('maxResults'),
+            timeoutMs=body.get('timeoutMs',
+                               DEFAULT_QUERY_TIMEOUT_MS)).execute()
 
 
 class TabledataServiceApiClient(object):
@@ -211,13 +314,9 @@ class TabledataServiceApiClient(object):
 
     @http_request_provider
     def list(self, projectId, datasetId, tableId, pageToken=None,
-             maxResults=None):
-        # TODO(alan): Support paging.
+             maxResults=None, startIndex=None):
         try:
             table = self.tq_service.get_table(datasetId, tableId)
-            return {
-                'rows': rows_from_table(table)
-            }
         except KeyError:
             raise FakeHttpError(None, json.dumps({
                 'error': {
@@ -225,23 +324,318 @@ class TabledataServiceApiClient(object):
                     'message': 'Table not found: %s.%s' % (datasetId, tableId)
                 }
             }))
+        # Pages are read from a snapshot, so concurrent writes can't change
+        # the table partway through.
+        result = profiling.run(
+            self.tq_service.make_profiler(), profiling.SERIALIZE, table.name,
+            _num_page_rows, page_of_rows, table.snapshot(), pageToken,
+            maxResults, startIndex)
+        result['kind'] = 'bigquery#tableDataList'
+        return result
+
+    @http_request_provider
+    def insertAll(self, projectId, datasetId, tableId, body):
+        """Stream rows into a table.
+
+        Rows are de-duplicated by insertId, and queries see them right away;
+        see TinyQuery.insert_all.
+        """
+        try:
+            insert_errors = self.tq_service.insert_all(
+                datasetId, tableId, body.get('rows', []),
+                skip_invalid_rows=body.get('skipInvalidRows', False),
+                ignore_unknown_values=body.get('ignoreUnknownValues', False))
+        except KeyError:
+            raise FakeHttpError(None, json.dumps({
+                'error': {
+                    'code': 404,
+                    'message': 'Table not found: %s.%s' % (datasetId, tableId)
+                }
+            }))
+        result = {'kind': 'bigquery#tableDataInsertAllResponse'}
+        if insert_errors:
+            result['insertErrors'] = insert_errors
+        return result
 
 
-def schema_from_table(table):
-    """Given a tinyquery.Table, build an API-compatible schema."""
-    return {'fields': [
-        {'name': name, 'type': col.type}
-        for name, col in table.columns.items()
-    ]}
+def schema_from_table(table, nest_records=True):
+    """Given a tinyquery.Table, build an API-compatible schema.
 
+    If nest_records is true, columns with .-separated names are grouped into
+    RECORD fields; see RowEncoder.
+    """
+    return {'fields': row_encoder_for_schema(
+        table.schema, nest_records).schema_fields}
 
-def rows_from_table(table):
-    """Given a tinyquery.Table, build an API-compatible rows object."""
-    result_rows = []
-    for i in six.moves.xrange(table.num_rows):
-        field_values = [{'v': str(col.values[i])}
-                        for col in table.columns.values()]
-        result_rows.append({
-            'f': field_values
-        })
-    return result_rows
+
+def rows_from_table(table, start_index=0, end_index=None, nest_records=True):
+    """Given a tinyquery.Table, build an API-compatible rows object.
+
+    Only the rows in [start_index, end_index) are serialized.
+    """
+    if end_index is None:
+        end_index = table.num_rows
+    return row_encoder_for_schema(table.schema, nest_records).encode_rows(
+        table.columns, start_index, end_index)
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _format_float(value):
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return 'Infinity' if value > 0 else '-Infinity'
+    return repr(float(value))
+
+
+def _format_timestamp(value):
+    delta = value - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 10 ** 6 + (
+        delta.microseconds)
+    return repr(micros / 1e6)
+
+
+# Functions to format a (non-null) value of each type like the API does.
+_FORMATTERS = {
+    tq_types.INT: lambda value: str(int(value)),
+    tq_types.FLOAT: _format_float,
+    tq_types.BOOL: lambda value: 'true' if value else 'false',
+    tq_types.STRING: lambda value: value,
+    tq_types.TIMESTAMP: _format_timestamp,
+}
+
+
+class RowEncoder(object):
+    """Encodes table rows in the API's format, compiled for one schema.
+
+    The schema is compiled into a tree of fields up front, with a formatter
+    function for each column, so encoding rows is just a matter of applying
+    each column's formatter to its values, a whole column at a time.
+
+    Tables only store flattened columns, so records are worked out from the
+    .-separated column names, and are always encoded as NULLABLE records
+    whose leaves keep their own modes. Flattening a repeated record merges
+    its elements (and drops null leaves within them), so the elements can't
+    be rebuilt; instead, each leaf of a repeated record is encoded as a
+    REPEATED field holding all of its values.
+    """
+    def __init__(self, schema, nest_records=True):
+        """Compile an encoder.
+
+        Arguments:
+            schema: An OrderedDict mapping column name to Column.
+            nest_records: Whether to group columns into records by name.
+                Legacy SQL query results are flattened, and the . in their
+                column names is part of an alias, so they aren't nested.
+        """
+        self.column_names = list(schema)
+        self.fields = self._compile_fields(
+            [(name.split('.') if nest_records else [name], name, column)
+             for name, column in schema.items()])
+        self.schema_fields = self._schema_fields(self.fields)
+
+    def _compile_fields(self, named_columns):
+        """Build the _CompiledFields for a list of columns.
+
+        Arguments:
+            named_columns: A list of (name_parts, full_name, column) tuples,
+                where name_parts is what's left of the column's name (split
+                on .) within the record being compiled.
+        """
+        # Maps each field name to its column, or to a list of named_columns
+        # tuples for records.
+        fields = collections.OrderedDict()
+        for parts, full_name, column in named_columns:
+            if len(parts) == 1:
+                fields[parts[0]] = (full_name, column)
+            else:
+                fields.setdefault(parts[0], []).append(
+                    (parts[1:], full_name, column))
+
+        result = []
+        for name, field in fields.items():
+            if isinstance(field, tuple):
+                full_name, column = field
+                result.append(_CompiledField(
+                    name, column.type, column.mode, full_name, (),
+                    _FORMATTERS.get(column.type, str)))
+            else:
+                result.append(_CompiledField(
+                    name, 'RECORD', tq_modes.NULLABLE, None,
+                    tuple(self._compile_fields(field)), None))
+        return result
+
+    @classmethod
+    def _schema_fields(cls, fields):
+        result = []
+        for field in fields:
+            schema_field = {'name': field.name, 'type': field.type,
+                            'mode': field.mode}
+            if field.children:
+                schema_field['fields'] = cls._schema_fields(field.children)
+            result.append(schema_field)
+        return result
+
+    def encode_rows(self, columns, start_index, end_index):
+        """Encode the rows in [start_index, end_index) of some columns.
+
+        Arguments:
+            columns: A dict mapping column name to Column, with a column for
+                each column in the schema.
+        """
+        values_by_column = {
+            name: columns[name].values[start_index:end_index]
+            for name in self.column_names}
+        return [{'f': fields}
+                for fields in self._encode_record(
+                    self.fields, values_by_column,
+                    max(end_index - start_index, 0))]
+
+    def _encode_record(self, fields, values_by_column, num_items):
+        """Get the list of field cells of a record for each item.
+
+        Arguments:
+            fields: The record's _CompiledFields.
+            values_by_column: A dict mapping column name to a list of the
+                column's value for each row.
+            num_items: The number of rows.
+        """
+        cells_by_field = [self._encode_field(field, values_by_column,
+                                             num_items)
+                          for field in fields]
+        return [[{'v': value} for value in item_values]
+                for item_values in zip(*cells_by_field)] if fields else [
+                    [] for _ in six.moves.xrange(num_items)]
+
+    def _encode_field(self, field, values_by_column, num_items):
+        """Get the 'v' value of a field for each item."""
+        if field.formatter is not None:
+            formatter = field.formatter
+            values = values_by_column[field.column_name]
+            if field.mode == tq_modes.REPEATED:
+                return [[{'v': None if value is None else formatter(value)}
+                         for value in row_values] if row_values else []
+                        for row_values in values]
+            return [None if value is None else formatter(value)
+                    for value in values]
+
+        return [{'f': cells} for cells in self._encode_record(
+            field.children, values_by_column, num_items)]
+
+
+class _CompiledField(collections.namedtuple(
+        '_CompiledField',
+        ['name', 'type', 'mode', 'column_name', 'children', 'formatter'])):
+    """A field of a RowEncoder's schema.
+
+    Fields:
+        name: The field name, without any record prefix.
+        type: The field type, or 'RECORD'.
+        mode: The field mode in the API's schema.
+        column_name: For leaf fields, the full name of the table column.
+        children: For records, a tuple of _CompiledFields.
+        formatter: For leaf fields, the function to format each non-null
+            value as a string. None for records.
+    """
+
+
+# Encoders are cached by schema, since result tables are often paged through
+# and most queries have the same few schemas.
+_ENCODER_CACHE_SIZE = 256
+_encoders_by_schema = collections.OrderedDict()
+_encoders_lock = threading.Lock()
+
+
+def row_encoder_for_schema(schema, nest_records=True):
+    """Get a (possibly cached) RowEncoder for a table schema."""
+    key = (nest_records,) + tuple((name, column.type, column.mode)
+                                  for name, column in schema.items())
+    with _encoders_lock:
+        encoder = _encoders_by_schema.pop(key, None)
+        if encoder is None:
+            encoder = RowEncoder(schema, nest_records)
+            if len(_encoders_by_schema) >= _ENCODER_CACHE_SIZE:
+                _encoders_by_schema.popitem(last=False)
+        _encoders_by_schema[key] = encoder
+    return encoder
+
+
+def encode_page_token(start_index):
+    """Make an opaque page token for the page starting at the given row."""
+    token = base64.urlsafe_b64encode(
+        json.dumps({'startIndex': start_index}).encode('utf-8'))
+    return token.decode('ascii')
+
+
+def decode_page_token(page_token):
+    """Get the row index that a page token from encode_page_token is for."""
+    try:
+        start_index = json.loads(base64.urlsafe_b64decode(
+            page_token.encode('ascii')).decode('utf-8'))['startIndex']
+    except (ValueError, TypeError, KeyError, UnicodeError,
+            binascii.Error):
+        start_index = None
+    if not isinstance(start_index, six.integer_types) or start_index < 0:
+        raise FakeHttpError(None, json.dumps({
+            'error': {
+                'code': 400,
+                'message': 'Invalid page token: %s' % page_token
+            }
+        }))
+    return start_index
+
+
+def _parse_paging_param(value, name):
+    """Parse a startIndex or maxResults parameter, which may be a string."""
+    try:
+        result = int(value)
+    except (ValueError, TypeError):
+        result = None
+    if result is None or result < 0:
+        raise FakeHttpError(None, json.dumps({
+            'error': {
+                'code': 400,
+                'message': 'Invalid %s: %s' % (name, value)
+            }
+        }))
+    return result
+
+
+def page_of_rows(table, page_token=None, max_results=None,
+                 start_index=None, nest_records=True):
+    """Serialize one page of a table's rows for a paged API response.
+
+    The page starts at the row given by the page token if there is one, and
+    otherwise at start_index (or the first row). Only the rows in the page
+    are serialized.
+
+    Returns: A dict with the rows, totalRows and, if there are more rows
+        after this page, the pageToken for the next page. An empty page
+        (like for maxResults=0) has no pageToken, since the next page would
+        start at the same row, and a client following tokens would never
+        stop.
+    """
+    num_rows = table.num_rows
+    if page_token is not None:
+        start = decode_page_token(page_token)
+    else:
+        start = _parse_paging_param(start_index or 0, 'startIndex')
+    start = min(start, num_rows)
+    if max_results is None:
+        end = num_rows
+    else:
+        end = min(start + _parse_paging_param(max_results, 'maxResults'),
+                  num_rows)
+    result = {
+        'rows': rows_from_table(table, start, end, nest_records),
+        'totalRows': str(num_rows),
+    }
+    if start < end < num_rows:
+        result['pageToken'] = encode_page_token(end)
+    return result
+
+
+def _num_page_rows(page):
+    return len(page['rows'])
@@ -1,8 +1,17 @@
 from __future__ import absolute_import
 
+import collections
+import datetime
+import json
+import threading
+import time
 import unittest
 
+import mock
+
 from tinyquery import api_client
+from tinyquery import context
+from tinyquery import tq_modes
 from tinyquery import tq_types
 from tinyquery import tinyquery
 
@@ -118,7 +127,7 @@ class ApiClientTest(unittest.TestCase):
         ).execute()
         self.assertEqual('7', query_result['rows'][0]['f'][0]['v'])
         self.assertEqual(
-            {'name': 'foo', 'type': tq_types.INT},
+            {'name': 'foo', 'type': tq_types.INT, 'mode': 'NULLABLE'},
             query_result['schema']['fields'][0])
 
     def test_sync_query(self):
@@ -205,6 +214,17 @@ class ApiClientTest(unittest.TestCase):
                                       'FROM test_dataset.test_view')
         self.assertEqual('0', query_result['rows'][0]['f'][0]['v'])
 
+        table_info = self.tq_service.tables().get(
+            projectId='test_project', datasetId='test_dataset',
+            tableId='test_view').execute()
+        self.assertEqual(
+            {'fields': [{'name': 'num_rows', 'type': 'INTEGER',
+                         'mode': 'NULLABLE'}]},
+            table_info['schema'])
+        self.assertEqual(
+            'SELECT COUNT(*) AS num_rows FROM test_dataset.test_table',
+            table_info['view']['query'])
+
     def test_list_tables(self):
         self.insert_simple_table()
         self.tq_service.jobs().insert(
@@ -247,3 +267,524 @@ class ApiClientTest(unittest.TestCase):
         self.assertEqual('hello', list_response['rows'][0]['f'][1]['v'])
         self.assertEqual('7', list_response['rows'][1]['f'][0]['v'])
         self.assertEqual('goodbye', list_response['rows'][1]['f'][1]['v'])
+
+    def test_partitioned_table(self):
+        self.tq_service.tables().insert(
+            projectId='test_project',
+            datasetId='test_dataset',
+            body={
+                'tableReference': self.table_ref('events'),
+                'schema': {
+                    'fields': [
+                        {'name': 'foo', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+                    ]
+                },
+                'timePartitioning': {'type': 'DAY'},
+            }).execute()
+        table_info = self.tq_service.tables().get(
+            projectId='test_project', datasetId='test_dataset',
+            tableId='events').execute()
+        self.assertEqual({'type': 'DAY'}, table_info['timePartitioning'])
+
+        self.query_to_table('SELECT 7 AS foo', 'test_dataset',
+                            'events$20160101')
+        self.query_to_table('SELECT 8 AS foo', 'test_dataset',
+                            'events$20160102')
+        query_result = self.run_query(
+            'SELECT foo FROM [test_dataset.events$20160102]')
+        self.assertEqual([{'f': [{'v': '8'}]}], query_result['rows'])
+        list_response = self.tq_service.tabledata().list(
+            projectId='test_project', datasetId='test_dataset',
+            tableId='events').execute()
+        self.assertEqual(2, len(list_response['rows']))
+
+    def insert_all(self, rows, **options):
+        body = dict(options, rows=rows)
+        return self.tq_service.tabledata().insertAll(
+            projectId='test_project', datasetId='test_dataset',
+            tableId='test_table', body=body).execute()
+
+    def test_insert_all(self):
+        self.insert_simple_table()
+        response = self.insert_all([
+            {'insertId': 'a', 'json': {'foo': 1, 'bar': True}},
+            {'insertId': 'b', 'json': {'foo': 2}},
+        ])
+        self.assertEqual(
+            {'kind': 'bigquery#tableDataInsertAllResponse'}, response)
+        # A retried insert doesn't add the rows again.
+        self.insert_all([
+            {'insertId': 'b', 'json': {'foo': 2}},
+            {'insertId': 'c', 'json': {'foo': 3}},
+            {'json': {'foo': 4}},
+        ])
+        query_result = self.run_query(
+            'SELECT foo FROM test_dataset.test_table')
+        self.assertEqual([{'f': [{'v': str(i)}]} for i in [1, 2, 3, 4]],
+                         query_result['rows'])
+
+    def test_insert_all_errors(self):
+        self.insert_simple_table()
+        rows = [
+            {'json': {'foo': 1}},
+            {'json': {'foo': 'not a number'}},
+            {'json': {'foo': 3, 'baz': 4}},
+        ]
+        response = self.insert_all(rows)
+        self.assertEqual(
+            [0, 1, 2],
+            [error['index'] for error in response['insertErrors']])
+        self.assertEqual(
+            ['stopped', 'invalid', 'invalid'],
+            [error['errors'][0]['reason']
+             for error in response['insertErrors']])
+
+        response = self.insert_all(rows, skipInvalidRows=True,
+                                   ignoreUnknownValues=True)
+        self.assertEqual(
+            [1], [error['index'] for error in response['insertErrors']])
+        query_result = self.run_query(
+            'SELECT foo FROM test_dataset.test_table')
+        self.assertEqual([{'f': [{'v': '1'}]}, {'f': [{'v': '3'}]}],
+                         query_result['rows'])
+
+        with self.assertRaises(api_client.FakeHttpError):
+            self.tq_service.tabledata().insertAll(
+                projectId='test_project', datasetId='test_dataset',
+                tableId='missing', body={'rows': rows}).execute()
+
+    def test_sync_job_timeout(self):
+        self.tinyquery.load_table_or_view(tinyquery.Table(
+            'test_dataset.big', 3000, collections.OrderedDict([
+                ('i', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=list(range(3000))))])))
+        start_time = time.time()
+        with self.assertRaises(api_client.FakeHttpError) as cm:
+            self.tq_service.jobs().insert(
+                projectId='test_project',
+                body={'configuration': {
+                    'jobTimeoutMs': '100',
+                    'query': {'query': 'SELECT COUNT(*) FROM '
+                                       'test_dataset.big a CROSS JOIN '
+                                       'test_dataset.big b'}}}
+            ).execute()
+        self.assertLess(time.time() - start_time, 10)
+        self.assertEqual(
+            'timeout',
+            json.loads(cm.exception.content)['error']['errors'][0]['reason'])
+
+    def test_maximum_bytes_billed(self):
+        self.insert_simple_table()
+        self.tq_service.tabledata().insertAll(
+            projectId='test_project', datasetId='test_dataset',
+            tableId='test_table',
+            body={'rows': [{'json': {'foo': 1, 'bar': True}},
+                           {'json': {'foo': 2}}]}).execute()
+
+        def run_query(maximum_bytes_billed):
+            return self.tq_service.jobs().insert(
+                projectId='test_project',
+                body={'configuration': {'query': {
+                    'query': 'SELECT foo FROM test_dataset.test_table',
+                    'maximumBytesBilled': maximum_bytes_billed,
+                    # Cached results don't bill any bytes.
+                    'useQueryCache': False}}}
+            ).execute()
+
+        # Two INTEGER values are 16 bytes.
+        job_info = run_query('16')
+        self.assertEqual('DONE', job_info['status']['state'])
+        self.assertEqual(
+            '16', job_info['statistics']['query']['totalBytesProcessed'])
+        with self.assertRaises(api_client.FakeHttpError) as cm:
+            run_query('15')
+        self.assertEqual(
+            'bytesBilledLimitExceeded',
+            json.loads(cm.exception.content)['error']['errors'][0]['reason'])
+
+    def test_dry_run(self):
+        self.insert_simple_table()
+        self.tq_service.tabledata().insertAll(
+            projectId='test_project', datasetId='test_dataset',
+            tableId='test_table',
+            body={'rows': [{'json': {'foo': 1, 'bar': True}},
+                           {'json': {'foo': 2}}]}).execute()
+        query = 'SELECT foo, bar, foo + 1 AS baz FROM test_dataset.test_table'
+        expected_schema = {'fields': [
+            {'name': 'foo', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+            {'name': 'bar', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
+            {'name': 'baz', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+        ]}
+
+        with mock.patch.object(self.tinyquery, 'evaluate_query') as evaluate:
+            job_info = self.tq_service.jobs().insert(
+                projectId='test_project',
+                body={'configuration': {'query': {'query': query},
+                                        'dryRun': True}}).execute()
+            query_result = self.tq_service.jobs().query(
+                projectId='test_project',
+                body={'query': query, 'dryRun': True}).execute()
+        self.assertFalse(evaluate.called)
+
+        self.assertEqual('DONE', job_info['status']['state'])
+        # Two INTEGER values and a BOOLEAN value.
+        self.assertEqual(
+            '17', job_info['statistics']['query']['totalBytesProcessed'])
+        self.assertEqual(expected_schema,
+                         job_info['statistics']['query']['schema'])
+        self.assertEqual('17', query_result['totalBytesProcessed'])
+        self.assertEqual(expected_schema, query_result['schema'])
+
+    def test_query_cache(self):
+        self.insert_simple_table()
+
+        def insert_row():
+            self.tq_service.tabledata().insertAll(
+                projectId='test_project', datasetId='test_dataset',
+                tableId='test_table',
+                body={'rows': [{'json': {'foo': 1}}]}).execute()
+
+        def run_query(use_query_cache=True):
+            job_info = self.tq_service.jobs().insert(
+                projectId='test_project',
+                body={'configuration': {'query': {
+                    'query': 'SELECT COUNT(*) FROM test_dataset.test_table',
+                    'useQueryCache': use_query_cache}}}
+            ).execute()
+            result = self.tq_service.jobs().getQueryResults(
+                projectId='test_project',
+                jobId=job_info['jobReference']['jobId']).execute()
+            self.assertEqual(result['cacheHit'],
+                             job_info['statistics']['query']['cacheHit'])
+            # Cached results weren't computed by a plan.
+            self.assertEqual(not result['cacheHit'],
+                             'queryPlan' in job_info['statistics']['query'])
+            return result['rows'][0]['f'][0]['v'], result['cacheHit']
+
+        insert_row()
+        self.assertEqual(('1', False), run_query())
+        self.assertEqual(('1', True), run_query())
+        self.assertEqual(('1', False), run_query(use_query_cache=False))
+        # Changing the table invalidates the cached results.
+        insert_row()
+        self.assertEqual(('2', False), run_query())
+        self.assertEqual(('2', True), run_query())
+
+    def test_paging(self):
+        self.query_to_table(
+            'SELECT * FROM (SELECT 0 AS foo), (SELECT 1 AS foo), '
+            '(SELECT 2 AS foo), (SELECT 3 AS foo), (SELECT 4 AS foo)',
+            'test_dataset', 'test_table_2')
+
+        def list_rows(**kwargs):
+            return self.tq_service.tabledata().list(
+                projectId='test_project', datasetId='test_dataset',
+                tableId='test_table_2', **kwargs).execute()
+
+        values = []
+        page = list_rows(maxResults=2)
+        while True:
+            self.assertEqual('5', page['totalRows'])
+            self.assertLessEqual(len(page['rows']), 2)
+            values.extend(row['f'][0]['v'] for row in page['rows'])
+            if 'pageToken' not in page:
+                break
+            page = list_rows(maxResults=2, pageToken=page['pageToken'])
+        self.assertEqual(['0', '1', '2', '3', '4'], values)
+
+        page = list_rows(startIndex=3)
+        self.assertEqual(['3', '4'],
+                         [row['f'][0]['v'] for row in page['rows']])
+        self.assertNotIn('pageToken', page)
+        self.assertEqual([], list_rows(startIndex=10)['rows'])
+        page = list_rows(maxResults=0)
+        self.assertEqual(([], '5'), (page['rows'], page['totalRows']))
+        self.assertNotIn('pageToken', page)
+        with self.assertRaises(api_client.FakeHttpError):
+            list_rows(pageToken='bogus')
+        for bad_params in [{'startIndex': -1}, {'maxResults': -1},
+                           {'maxResults': 'lots'}]:
+            with self.assertRaises(api_client.FakeHttpError) as cm:
+                list_rows(**bad_params)
+            self.assertEqual(
+                400, json.loads(cm.exception.content)['error']['code'])
+
+    def test_query_results_paging(self):
+        query_job_info = self.tq_service.jobs().insert(
+            projectId='test_project',
+            body={'configuration': {'query': {
+                'query': 'SELECT * FROM (SELECT 0 AS foo), '
+                         '(SELECT 1 AS foo), (SELECT 2 AS foo)'}}}
+        ).execute()
+        job_id = query_job_info['jobReference']['jobId']
+        first_page = self.tq_service.jobs().getQueryResults(
+            projectId='test_project', jobId=job_id, maxResults=2).execute()
+        self.assertEqual('3', first_page['totalRows'])
+        self.assertTrue(first_page['jobComplete'])
+        self.assertEqual([{'f': [{'v': '0'}]}, {'f': [{'v': '1'}]}],
+                         first_page['rows'])
+        second_page = self.tq_service.jobs().getQueryResults(
+            projectId='test_project', jobId=job_id, maxResults=2,
+            pageToken=first_page['pageToken']).execute()
+        self.assertEqual([{'f': [{'v': '2'}]}], second_page['rows'])
+        self.assertNotIn('pageToken', second_page)
+
+
+class RowEncoderTest(unittest.TestCase):
+    def make_table(self, *columns):
+        return tinyquery.Table(
+            'test_dataset.test_table', len(columns[0][3]),
+            collections.OrderedDict(
+                (name, context.Column(type=col_type, mode=mode,
+                                      values=values))
+                for name, col_type, mode, values in columns))
+
+    def test_value_formats(self):
+        table = self.make_table(
+            ('i', tq_types.INT, tq_modes.NULLABLE, [1, None]),
+            ('f', tq_types.FLOAT, tq_modes.NULLABLE,
+             [1.5, float('inf')]),
+            ('b', tq_types.BOOL, tq_modes.NULLABLE, [True, False]),
+            ('s', tq_types.STRING, tq_modes.NULLABLE, ['a', None]),
+            ('t', tq_types.TIMESTAMP, tq_modes.NULLABLE,
+             [datetime.datetime(2016, 4, 5, 10, 37, 0, 500000), None]),
+            ('r', tq_types.INT, tq_modes.REPEATED, [[1, 2], []]))
+        self.assertEqual(
+            [{'f': [{'v': '1'}, {'v': '1.5'}, {'v': 'true'}, {'v': 'a'},
+                    {'v': '1459852620.5'},
+                    {'v': [{'v': '1'}, {'v': '2'}]}]},
+             {'f': [{'v': None}, {'v': 'Infinity'}, {'v': 'false'},
+                    {'v': None}, {'v': None}, {'v': []}]}],
+            api_client.rows_from_table(table))
+
+    def test_records(self):
+        table = self.make_table(
+            ('i', tq_types.INT, tq_modes.REQUIRED, [1, 2]),
+            ('rec.s', tq_types.STRING, tq_modes.NULLABLE, ['a', None]),
+            ('rec.inner.x', tq_types.INT, tq_modes.NULLABLE, [3, 4]),
+            ('reps.x', tq_types.INT, tq_modes.REPEATED, [[5, 6], []]),
+            ('reps.y', tq_types.STRING, tq_modes.REPEATED, [['b'], []]))
+        self.assertEqual({'fields': [
+            {'name': 'i', 'type': tq_types.INT, 'mode': tq_modes.REQUIRED},
+            {'name': 'rec', 'type': 'RECORD', 'mode': tq_modes.NULLABLE,
+             'fields': [
+                 {'name': 's', 'type': tq_types.STRING,
+                  'mode': tq_modes.NULLABLE},
+                 {'name': 'inner', 'type': 'RECORD',
+                  'mode': tq_modes.NULLABLE,
+                  'fields': [{'name': 'x', 'type': tq_types.INT,
+                              'mode': tq_modes.NULLABLE}]}]},
+            {'name': 'reps', 'type': 'RECORD', 'mode': tq_modes.NULLABLE,
+             'fields': [
+                 {'name': 'x', 'type': tq_types.INT,
+                  'mode': tq_modes.REPEATED},
+                 {'name': 'y', 'type': tq_types.STRING,
+                  'mode': tq_modes.REPEATED}]},
+        ]}, api_client.schema_from_table(table))
+        self.assertEqual(
+            [{'f': [{'v': '1'},
+                    {'v': {'f': [{'v': 'a'}, {'v': {'f': [{'v': '3'}]}}]}},
+                    {'v': {'f': [{'v': [{'v': '5'}, {'v': '6'}]},
+                                 {'v': [{'v': 'b'}]}]}}]},
+             {'f': [{'v': '2'},
+                    {'v': {'f': [{'v': None}, {'v': {'f': [{'v': '4'}]}}]}},
+                    {'v': {'f': [{'v': []}, {'v': []}]}}]}],
+            api_client.rows_from_table(table))
+        # Query results are flat, so their column names aren't split.
+        self.assertEqual(
+            ['i', 'rec.s', 'rec.inner.x', 'reps.x', 'reps.y'],
+            [field['name'] for field in api_client.schema_from_table(
+                table, nest_records=False)['fields']])
+
+    def test_row_encoder(self):
+        table = self.make_table(
+            ('i', tq_types.INT, tq_modes.NULLABLE, list(range(5))))
+        encoder = api_client.row_encoder_for_schema(table.schema)
+        self.assertIs(encoder,
+                      api_client.row_encoder_for_schema(table.schema))
+        self.assertEqual(
+            [['2'], ['3']],
+            [[cell['v'] for cell in row['f']]
+             for row in encoder.encode_rows(table.columns, 2, 4)])
+
+
+class AsyncJobTest(unittest.TestCase):
+    def setUp(self):
+        self.tinyquery = tinyquery.TinyQuery(job_workers=2)
+        self.addCleanup(self.tinyquery.shutdown)
+        self.tq_service = api_client.TinyQueryApiClient(self.tinyquery)
+
+    def insert_query_job(self, query):
+        return self.tq_service.jobs().insert(
+            projectId='test_project',
+            body={'configuration': {'query': {'query': query}}}).execute()
+
+    def get_query_results(self, job_info, **kwargs):
+        return self.tq_service.jobs().getQueryResults(
+            projectId='test_project',
+            jobId=job_info['jobReference']['jobId'], **kwargs).execute()
+
+    def test_job_states(self):
+        unblock = threading.Event()
+        evaluate_query = self.tinyquery.evaluate_query
+
+        def blocked_evaluate_query(query, *args):
+            unblock.wait()
+            return evaluate_query(query, *args)
+
+        with mock.patch.object(self.tinyquery, 'evaluate_query',
+                               blocked_evaluate_query):
+            job_info = self.insert_query_job('SELECT 7 AS foo')
+            self.assertIn(job_info['status']['state'], ('PENDING', 'RUNNING'))
+            self.assertIn('creationTime', job_info['statistics'])
+            self.assertEqual(
+                {'kind': 'bigquery#getQueryResultsResponse',
+                 'jobReference': job_info['jobReference'],
+                 'jobComplete': False},
+                self.get_query_results(job_info, timeoutMs=0))
+            unblock.set()
+            query_results = self.get_query_results(job_info)
+
+        self.assertTrue(query_results['jobComplete'])
+        self.assertEqual('7', query_results['rows'][0]['f'][0]['v'])
+        job_info = self.tq_service.jobs().get(
+            projectId='test_project',
+            jobId=job_info['jobReference']['jobId']).execute()
+        self.assertEqual({'state': 'DONE'}, job_info['status'])
+        self.assertLessEqual(int(job_info['statistics']['startTime']),
+                             int(job_info['statistics']['endTime']))
+
+    def test_jobs_run_in_parallel(self):
+        queries = ['SELECT 0 AS foo', 'SELECT 1 AS foo']
+        started = {query: threading.Event() for query in queries}
+        saw_other_job_running = []
+        evaluate_query = self.tinyquery.evaluate_query
+
+        def rendezvous_evaluate_query(query, *args):
+            started[query].set()
+            saw_other_job_running.append(
+                all(event.wait(10) for event in started.values()))
+            return evaluate_query(query, *args)
+
+        with mock.patch.object(self.tinyquery, 'evaluate_query',
+                               rendezvous_evaluate_query):
+            job_infos = [self.insert_query_job(query) for query in queries]
+            self.assertEqual(
+                ['0', '1'],
+                [self.get_query_results(job_info)['rows'][0]['f'][0]['v']
+                 for job_info in job_infos])
+        self.assertEqual([True, True], saw_other_job_running)
+
+    def load_big_table(self):
+        # Cross joining this with itself takes far longer than the tests.
+        self.tinyquery.load_table_or_view(tinyquery.Table(
+            'test_dataset.big', 3000, collections.OrderedDict([
+                ('i', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=list(range(3000))))])))
+
+    def test_cancel_running_job(self):
+        self.load_big_table()
+        job_info = self.insert_query_job(
+            'SELECT COUNT(*) FROM test_dataset.big a CROSS JOIN '
+            'test_dataset.big b')
+        job_id = job_info['jobReference']['jobId']
+        while self.tinyquery.get_job_info(
+                job_id)['status']['state'] == 'PENDING':
+            time.sleep(0.01)
+        cancel_response = self.tq_service.jobs().cancel(
+            projectId='test_project', jobId=job_id).execute()
+        self.assertEqual('bigquery#jobCancelResponse',
+                         cancel_response['kind'])
+        self.assertTrue(self.tinyquery.wait_for_job(job_id, 10))
+        self.assertEqual(
+            'stopped',
+            self.tinyquery.get_job_info(
+                job_id)['status']['errorResult']['reason'])
+
+    def test_running_job_progress(self):
+        self.load_big_table()
+        job_id = self.insert_query_job(
+            'SELECT COUNT(*) FROM test_dataset.big a CROSS JOIN '
+            'test_dataset.big b')['jobReference']['jobId']
+        self.addCleanup(self.tinyquery.cancel_job, job_id)
+        # Wait for both tables to be read, while they're cross joined.
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            job_info = self.tq_service.jobs().get(
+                projectId='test_project', jobId=job_id).execute()
+            timeline = job_info['statistics'].get(
+                'query', {}).get('timeline')
+            if timeline and timeline[0]['completedUnits'] == '2':
+                break
+            time.sleep(0.01)
+        self.assertEqual('RUNNING', job_info['status']['state'])
+        self.assertEqual(
+            ['COMPLETE', 'COMPLETE', 'RUNNING', 'PENDING'],
+            [stage['status']
+             for stage in job_info['statistics']['query']['queryPlan']])
+        self.assertEqual('3000', job_info['statistics']['query'][
+            'queryPlan'][0]['recordsWritten'])
+        self.assertEqual({'completedUnits': '2', 'activeUnits': '1',
+                          'pendingUnits': '1'},
+                         {key: value for key, value in timeline[0].items()
+                          if key != 'elapsedMs'})
+
+    def test_cancel_queued_job(self):
+        unblock = threading.Event()
+        self.addCleanup(unblock.set)
+        evaluate_query = self.tinyquery.evaluate_query
+
+        def blocked_evaluate_query(query, *args):
+            unblock.wait()
+            return evaluate_query(query, *args)
+
+        with mock.patch.object(self.tinyquery, 'evaluate_query',
+                               blocked_evaluate_query):
+            # Fill up both workers, so the third job stays queued.
+            for _ in range(2):
+                self.insert_query_job('SELECT 1')
+            job_id = self.insert_query_job(
+                'SELECT 1')['jobReference']['jobId']
+            self.assertEqual(
+                'PENDING',
+                self.tinyquery.get_job_info(job_id)['status']['state'])
+            job_info = self.tq_service.jobs().cancel(
+                projectId='test_project', jobId=job_id).execute()['job']
+            self.assertEqual('DONE', job_info['status']['state'])
+            self.assertEqual('stopped',
+                             job_info['status']['errorResult']['reason'])
+
+    def test_job_timeout(self):
+        self.load_big_table()
+        job_info = self.tq_service.jobs().insert(
+            projectId='test_project',
+            body={'configuration': {
+                'jobTimeoutMs': '100',
+                'query': {'query': 'SELECT COUNT(*) FROM test_dataset.big a '
+                                   'CROSS JOIN test_dataset.big b'}}}
+        ).execute()
+        job_id = job_info['jobReference']['jobId']
+        self.assertTrue(self.tinyquery.wait_for_job(job_id, 10))
+        self.assertEqual(
+            'timeout',
+            self.tinyquery.get_job_info(
+                job_id)['status']['errorResult']['reason'])
+
+    def test_failed_jobs(self):
+        for query, reason in [
+                ('SELECT bar FROM (SELECT 1 AS foo)', 'invalidQuery'),
+                ('SELECT foo FROM no_such.table', 'notFound')]:
+            job_info = self.insert_query_job(query)
+            self.tinyquery.wait_for_job(job_info['jobReference']['jobId'])
+            job_info = self.tq_service.jobs().get(
+                projectId='test_project',
+                jobId=job_info['jobReference']['jobId']).execute()
+            self.assertEqual('DONE', job_info['status']['state'])
+            self.assertEqual(reason,
+                             job_info['status']['errorResult']['reason'])
+            with self.assertRaises(api_client.FakeHttpError) as cm:
+                self.get_query_results(job_info)
+            self.assertEqual(
+                400, json.loads(cm.exception.content)['error']['code'])
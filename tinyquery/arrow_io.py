@@ -0,0 +1,272 @@
+"""Conversion between tinyquery data and Apache Arrow, Arrow IPC and Parquet.
+
+This needs pyarrow, which is an optional dependency; everything else in
+tinyquery works without it.
+
+Nested Arrow data is mapped the same way as nested JSON data: struct fields
+become RECORD fields, list fields become REPEATED fields, and the leaves of
+records become columns with .-separated names. Exported data is flat, with
+one Arrow column (of list type, if repeated) per tinyquery column.
+"""
+from __future__ import absolute_import
+
+import struct
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from tinyquery import loaders
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError(
+            'pyarrow is required for Arrow and Parquet support. Install it '
+            'with `pip install pyarrow`.')
+
+
+def _arrow_type(column_type):
+    return {
+        tq_types.INT: pyarrow.int64(),
+        tq_types.FLOAT: pyarrow.float64(),
+        tq_types.BOOL: pyarrow.bool_(),
+        tq_types.STRING: pyarrow.string(),
+        tq_types.TIMESTAMP: pyarrow.timestamp('us'),
+    }[column_type]
+
+
+def _tq_type(arrow_type):
+    types = pyarrow.types
+    if types.is_dictionary(arrow_type):
+        return _tq_type(arrow_type.value_type)
+    if types.is_boolean(arrow_type):
+        return tq_types.BOOL
+    if types.is_integer(arrow_type):
+        return tq_types.INT
+    if types.is_floating(arrow_type):
+        return tq_types.FLOAT
+    if types.is_string(arrow_type) or types.is_large_string(arrow_type):
+        return tq_types.STRING
+    if types.is_timestamp(arrow_type) or types.is_date(arrow_type):
+        return tq_types.TIMESTAMP
+    raise ValueError('Unsupported Arrow type: {}'.format(arrow_type))
+
+
+def _is_list(arrow_type):
+    return (pyarrow.types.is_list(arrow_type) or
+            pyarrow.types.is_large_list(arrow_type))
+
+
+def _raw_field(field):
+    arrow_type = field.type
+    mode = tq_modes.NULLABLE if field.nullable else tq_modes.REQUIRED
+    if _is_list(arrow_type):
+        mode = tq_modes.REPEATED
+        arrow_type = arrow_type.value_type
+        if _is_list(arrow_type):
+            raise ValueError(
+                'Lists of lists are not supported: {}'.format(field))
+    if pyarrow.types.is_struct(arrow_type):
+        return {'name': field.name, 'type': 'RECORD', 'mode': mode,
+                'fields': [_raw_field(arrow_type[i])
+                           for i in range(arrow_type.num_fields)]}
+    return {'name': field.name, 'type': _tq_type(arrow_type), 'mode': mode}
+
+
+def raw_schema_from_arrow_schema(arrow_schema):
+    """Get the BigQuery-style schema for an Arrow schema."""
+    _require_pyarrow()
+    return {'fields': [_raw_field(field) for field in arrow_schema]}
+
+
+def _python_values(arrow_array):
+    """Convert a primitive Arrow array to a list of tinyquery values."""
+    arrow_type = arrow_array.type
+    if pyarrow.types.is_dictionary(arrow_type):
+        arrow_array = arrow_array.dictionary_decode()
+        arrow_type = arrow_array.type
+    if pyarrow.types.is_timestamp(arrow_type) or pyarrow.types.is_date(
+            arrow_type):
+        # Timestamps with time zones are stored as UTC, so dropping the time
+        # zone gives naive UTC datetimes, as tinyquery uses.
+        arrow_array = pyarrow.compute.cast(
+            arrow_array, pyarrow.timestamp('us'), safe=False)
+    return arrow_array.to_pylist()
+
+
+class _FieldReader(object):
+    """Reads the tinyquery columns for one top-level field of Arrow data."""
+    def __init__(self, raw_field):
+        self.raw_field = raw_field
+        self.flattener = loaders.SchemaFlattener({'fields': [raw_field]})
+        self.is_primitive = (raw_field['type'] != 'RECORD' and
+                             raw_field['mode'] != tq_modes.REPEATED)
+
+    def read(self, arrow_array):
+        """Get a list of values for each of the field's columns."""
+        if self.is_primitive:
+            column, = self.flattener.columns
+            values = _python_values(arrow_array)
+            if column.mode == tq_modes.REQUIRED and None in values:
+                raise ValueError('Null value in REQUIRED field {}'.format(
+                    column.name))
+            return [values]
+        name = self.raw_field['name']
+        flatten_row = self.flattener.flatten_row
+        rows = [flatten_row({name: value})
+                for value in arrow_array.to_pylist()]
+        if not rows:
+            return [[] for _ in self.flattener.columns]
+        return [loaders.cast_flattened_values(column, raw_values)
+                for column, raw_values in zip(self.flattener.columns,
+                                              zip(*rows))]
+
+
+def read_arrow_batches(arrow_schema, record_batches):
+    """Convert Arrow record batches into batches of tinyquery column values.
+
+    Arguments:
+        arrow_schema: The schema of the record batches.
+        record_batches: An iterable of pyarrow.RecordBatch.
+
+    Yields: A pair (num_rows, column_values) for each record batch, where
+        column_values has a list of values for each column of the table made
+        from raw_schema_from_arrow_schema(arrow_schema), in order.
+    """
+    raw_schema = raw_schema_from_arrow_schema(arrow_schema)
+    field_readers = [_FieldReader(raw_field)
+                     for raw_field in raw_schema['fields']]
+    for record_batch in record_batches:
+        column_values = []
+        for field_reader, arrow_array in zip(field_readers,
+                                             record_batch.columns):
+            column_values.extend(field_reader.read(arrow_array))
+        yield record_batch.num_rows, column_values
+
+
+def open_parquet(filename):
+    """Get the schema and an iterator of record batches of a Parquet file."""
+    _require_pyarrow()
+    parquet_file = pyarrow.parquet.ParquetFile(filename)
+    return parquet_file.schema_arrow, parquet_file.iter_batches()
+
+
+def open_arrow_file(filename):
+    """Get the schema and an iterator of record batches of an IPC file."""
+    _require_pyarrow()
+    reader = pyarrow.ipc.open_file(filename)
+    return reader.schema, (reader.get_batch(i)
+                           for i in range(reader.num_record_batches))
+
+
+def _snapshot_array(table_file, col_name):
+    """Make an Arrow array directly from the buffers of a snapshot file.
+
+    The values and validity bitmap are shared with the memory-mapped file
+    rather than copied, since the snapshot format stores them the same way
+    Arrow does. Returns None for columns whose buffers can't be shared.
+    """
+    entry = table_file.column_entry(col_name)
+    if entry['mode'] == tq_modes.REPEATED or entry['type'] == tq_types.BOOL:
+        return None
+    values_entry = entry['values']
+    num_values = values_entry['num_values']
+    validity = None
+    if values_entry['null_count']:
+        validity = pyarrow.py_buffer(
+            table_file.buffer(values_entry, 'validity'))
+    data = pyarrow.py_buffer(table_file.buffer(values_entry, 'data'))
+    if entry['type'] != tq_types.STRING:
+        return pyarrow.Array.from_buffers(
+            _arrow_type(entry['type']), num_values, [validity, data],
+            null_count=values_entry['null_count'])
+
+    # Arrow offsets also include the start of the first string, so only the
+    # (small) dictionary offsets need to be copied.
+    dictionary_offsets = table_file.buffer(values_entry,
+                                           'dictionary_offsets')
+    dictionary = pyarrow.Array.from_buffers(
+        pyarrow.large_string(), len(dictionary_offsets) // 8,
+        [None,
+         pyarrow.py_buffer(struct.pack('<q', 0) +
+                           dictionary_offsets.tobytes()),
+         pyarrow.py_buffer(table_file.buffer(values_entry,
+                                             'dictionary_data'))])
+    codes = pyarrow.Array.from_buffers(
+        pyarrow.int32(), num_values, [validity, data],
+        null_count=values_entry['null_count'])
+    return pyarrow.DictionaryArray.from_arrays(
+        codes, dictionary).dictionary_decode().cast(pyarrow.string())
+
+
+def _arrow_array(column):
+    arrow_type = _arrow_type(column.type)
+    if column.mode == tq_modes.REPEATED:
+        arrow_type = pyarrow.list_(arrow_type)
+    return pyarrow.array(column.values, type=arrow_type)
+
+
+def _arrow_field(name, column):
+    arrow_type = _arrow_type(column.type)
+    if column.mode == tq_modes.REPEATED:
+        arrow_type = pyarrow.list_(arrow_type)
+    return pyarrow.field(name, arrow_type,
+                         nullable=column.mode != tq_modes.REQUIRED)
+
+
+def to_arrow_table(table_or_context):
+    """Convert a Table or a query result Context to a pyarrow.Table.
+
+    Context columns are named by their alias, qualified with their table name
+    if they have one. Rows still in a table's streaming buffer aren't part of
+    the Table object yet; use TinyQuery.export_table_to_parquet (or get the
+    table with TinyQuery.get_table, which flushes the buffer) to include
+    them.
+    """
+    from tinyquery import tinyquery  # TODO(colin): fix circular import
+    _require_pyarrow()
+    if isinstance(table_or_context, tinyquery.Table):
+        table = table_or_context
+        table_file = getattr(table, 'table_file', None)
+        named_columns = list(table.schema.items())
+        if table_file is not None:
+            # Share the buffers of snapshot tables where possible, and decode
+            # only the columns that can't be shared, rather than the table.
+            arrays = [_snapshot_array(table_file, name)
+                      for name, _ in named_columns]
+            arrays = [
+                _arrow_array(table_file.read_column(name))
+                if array is None else array
+                for array, (name, _) in zip(arrays, named_columns)]
+        else:
+            arrays = [_arrow_array(table.columns[name])
+                      for name, _ in named_columns]
+    else:
+        named_columns = [
+            (col_name if table_name is None
+             else '{}.{}'.format(table_name, col_name), column)
+            for (table_name, col_name), column
+            in table_or_context.columns.items()]
+        arrays = [_arrow_array(column) for _, column in named_columns]
+    schema = pyarrow.schema([_arrow_field(name, column)
+                             for name, column in named_columns])
+    return pyarrow.Table.from_arrays(arrays, schema=schema)
+
+
+def write_parquet(table_or_context, filename):
+    """Write a Table or query result Context to a Parquet file."""
+    pyarrow.parquet.write_table(to_arrow_table(table_or_context), filename)
+
+
+def write_arrow_file(table_or_context, filename):
+    """Write a Table or query result Context to an Arrow IPC file."""
+    arrow_table = to_arrow_table(table_or_context)
+    with pyarrow.ipc.new_file(filename, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
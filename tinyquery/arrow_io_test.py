@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import collections
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from tinyquery import arrow_io
+from tinyquery import context
+from tinyquery import snapshot
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+if arrow_io.pyarrow is not None:
+    import pyarrow
+    import pyarrow.parquet
+
+
+@unittest.skipIf(arrow_io.pyarrow is None, 'pyarrow is not installed')
+class ArrowIoTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.tq = tinyquery.TinyQuery()
+
+    def make_columns(self):
+        return collections.OrderedDict([
+            ('i', context.Column(type=tq_types.INT, mode=tq_modes.NULLABLE,
+                                 values=[1, None, 3])),
+            ('f', context.Column(type=tq_types.FLOAT, mode=tq_modes.REQUIRED,
+                                 values=[1.5, 0.0, -2.25])),
+            ('b', context.Column(type=tq_types.BOOL, mode=tq_modes.NULLABLE,
+                                 values=[True, None, False])),
+            ('s', context.Column(type=tq_types.STRING,
+                                 mode=tq_modes.NULLABLE,
+                                 values=[u'héllo', None, u'héllo'])),
+            ('t', context.Column(
+                type=tq_types.TIMESTAMP, mode=tq_modes.NULLABLE,
+                values=[datetime.datetime(2016, 1, 2, 3, 4, 5, 6), None,
+                        datetime.datetime(1969, 12, 31, 23, 59, 59)])),
+            ('r', context.Column(type=tq_types.STRING,
+                                 mode=tq_modes.REPEATED,
+                                 values=[['a', 'b'], [], ['c']])),
+        ])
+
+    def test_nested_fields(self):
+        arrow_table = pyarrow.table({
+            'id': pyarrow.array([1, 2], type=pyarrow.int32()),
+            'rec': pyarrow.array(
+                [{'a': 'x', 'b': {'c': 1.5}}, None],
+                type=pyarrow.struct([
+                    ('a', pyarrow.string()),
+                    ('b', pyarrow.struct([('c', pyarrow.float64())]))])),
+            'reps': pyarrow.array(
+                [[{'d': 1}, {'d': 2}], []],
+                type=pyarrow.list_(pyarrow.struct([('d', pyarrow.int64())]))),
+            'day': pyarrow.array([datetime.date(2016, 1, 2), None]),
+        })
+        self.tq.load_table_from_arrow('dataset.nested', arrow_table)
+        table = self.tq.tables_by_name['dataset.nested']
+        self.assertEqual(
+            [('id', tq_types.INT, tq_modes.NULLABLE, [1, 2]),
+             ('rec.a', tq_types.STRING, tq_modes.NULLABLE, ['x', None]),
+             ('rec.b.c', tq_types.FLOAT, tq_modes.NULLABLE, [1.5, None]),
+             ('reps.d', tq_types.INT, tq_modes.REPEATED, [[1, 2], []]),
+             ('day', tq_types.TIMESTAMP, tq_modes.NULLABLE,
+              [datetime.datetime(2016, 1, 2), None])],
+            [(name, column.type, column.mode, column.values)
+             for name, column in table.columns.items()])
+        self.assertEqual(2, table.num_rows)
+
+    def test_unsupported_type(self):
+        arrow_table = pyarrow.table({'b': pyarrow.array([b'x'])})
+        with self.assertRaises(ValueError):
+            self.tq.load_table_from_arrow('dataset.bad', arrow_table)
+
+    def test_parquet_round_trip(self):
+        table = tinyquery.Table('dataset.test', 3, self.make_columns())
+        filename = os.path.join(self.path, 'test.parquet')
+        arrow_io.write_parquet(table, filename)
+        self.tq.load_table_from_parquet('dataset.loaded', filename)
+        loaded = self.tq.tables_by_name['dataset.loaded']
+        self.assertEqual(table.columns, loaded.columns)
+        self.assertEqual(3, loaded.num_rows)
+
+    def test_arrow_file_round_trip(self):
+        table = tinyquery.Table('dataset.test', 3, self.make_columns())
+        filename = os.path.join(self.path, 'test.arrow')
+        arrow_io.write_arrow_file(table, filename)
+        self.tq.load_table_from_arrow_file('dataset.loaded', filename)
+        self.assertEqual(table.columns,
+                         self.tq.tables_by_name['dataset.loaded'].columns)
+
+    def test_export_includes_buffered_rows(self):
+        self.tq.load_table_or_view(
+            tinyquery.Table('dataset.test', 3, self.make_columns()))
+        self.tq.insert_all('dataset', 'test', [
+            {'json': {'i': 4, 'f': 1.0, 'r': ['d']}}])
+        filename = os.path.join(self.path, 'test.parquet')
+        self.tq.export_table_to_parquet('dataset.test', filename)
+        self.assertEqual(
+            [1, None, 3, 4],
+            pyarrow.parquet.read_table(filename).column('i').to_pylist())
+
+    def test_context(self):
+        self.tq.load_table_or_view(
+            tinyquery.Table('dataset.test', 3, self.make_columns()))
+        result = self.tq.evaluate_query(
+            'SELECT i, s AS str FROM dataset.test WHERE f >= 0')
+        arrow_table = arrow_io.to_arrow_table(result)
+        self.assertEqual(['i', 'str'], arrow_table.column_names)
+        self.assertEqual({'i': [1, None], 'str': [u'héllo', None]},
+                         arrow_table.to_pydict())
+
+    def test_snapshot_export_is_zero_copy(self):
+        table = tinyquery.Table('dataset.test', 3, self.make_columns())
+        filename = os.path.join(self.path, 'test.tqsnap')
+        snapshot.write_table_file(filename, table)
+        snapshot_table = tinyquery.SnapshotTable(
+            snapshot.TableFile(filename))
+
+        arrow_table = arrow_io.to_arrow_table(snapshot_table)
+        self.assertEqual(
+            {name: column.values for name, column in table.columns.items()},
+            arrow_table.to_pydict())
+        # Exporting doesn't decode the table, and the int column's data is
+        # the file's buffer rather than a copy.
+        self.assertIsNotNone(snapshot_table.table_file)
+        table_file = snapshot_table.table_file
+        file_data = pyarrow.py_buffer(table_file.buffer(
+            table_file.column_entry('i')['values'], 'data'))
+        self.assertEqual(
+            file_data.address,
+            arrow_table.column('i').chunk(0).buffers()[1].address)
+
+    def test_export_snapshot_table(self):
+        table = tinyquery.Table('dataset.test', 3, self.make_columns())
+        filename = os.path.join(self.path, 'test.tqsnap')
+        snapshot.write_table_file(filename, table)
+        snapshot_table = tinyquery.SnapshotTable(
+            snapshot.TableFile(filename))
+        self.tq.load_table_or_view(snapshot_table)
+
+        arrow_filename = os.path.join(self.path, 'test.arrow')
+        self.tq.export_table_to_arrow_file('dataset.test', arrow_filename)
+        self.assertEqual(
+            {name: column.values for name, column in table.columns.items()},
+            pyarrow.ipc.open_file(arrow_filename).read_all().to_pydict())
+        # Exporting goes through the file rather than decoding the table.
+        self.assertIsNotNone(snapshot_table.table_file)
+
+        # Snapshots share the values once they're decoded.
+        pinned = snapshot_table.snapshot()
+        self.assertIs(pinned.columns['i'].values,
+                      snapshot_table.columns['i'].values)
@@ -0,0 +1,384 @@
+"""Benchmarks of common queries over synthetic data.
+
+This runs offline, with no BigQuery access: tables of a configurable size
+are generated from a random seed, and each workload (scanning, grouping,
+joining, sorting, unions of shards, JSON and regex functions, and the
+NDJSON and CSV loaders) is timed several times. The results are written as
+JSON, so that they can be compared across versions to track regressions.
+
+Usage:
+    python -m tinyquery.benchmark --rows 100000 --output results.json
+
+Run with --help for the other options.
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import collections
+import csv
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from tinyquery import tinyquery
+
+
+class DataConfig(collections.namedtuple(
+        'DataConfig', ['num_rows', 'cardinality', 'null_fraction',
+                       'nesting_depth', 'num_shards', 'seed'])):
+    """The shape of the synthetic data.
+
+    Fields:
+        num_rows: The number of rows in the main table. The shards of the
+            sharded table have this many rows between them.
+        cardinality: The number of distinct values of the grouping and join
+            key.
+        null_fraction: The fraction of the values of NULLABLE fields that
+            are null.
+        nesting_depth: How many levels of REPEATED records each row has.
+            At 0, the table is flat.
+        num_shards: The number of shards of the table used by the union
+            workload.
+        seed: The random seed the data is generated from.
+    """
+
+
+DEFAULT_CONFIG = DataConfig(num_rows=10000, cardinality=100,
+                            null_fraction=0.1, nesting_depth=2,
+                            num_shards=4, seed=0)
+
+# The number of elements in each REPEATED field or record.
+_REPEATED_SIZE = 3
+
+_FIRST_SHARD_DATE = datetime.date(2016, 1, 1)
+
+
+def make_schema(nesting_depth):
+    """Get the raw schema of a generated table, in the API format."""
+    fields = [
+        {'name': 'id', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'key', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'value', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'flag', 'type': 'BOOLEAN', 'mode': 'NULLABLE'},
+        {'name': 'ts', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
+        {'name': 'payload', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'tags', 'type': 'STRING', 'mode': 'REPEATED'},
+    ]
+    if nesting_depth > 0:
+        fields.append(_make_record_field(nesting_depth))
+    return {'fields': fields}
+
+
+def _make_record_field(depth):
+    fields = [{'name': 'n', 'type': 'INTEGER', 'mode': 'NULLABLE'}]
+    if depth > 1:
+        fields.append(_make_record_field(depth - 1))
+    return {'name': 'rec', 'type': 'RECORD', 'mode': 'REPEATED',
+            'fields': fields}
+
+
+def generate_rows(config, rng, num_rows, first_id=0):
+    """Generate rows of a table with the schema from make_schema.
+
+    Arguments:
+        config: The DataConfig.
+        rng: The random.Random to generate values with.
+        num_rows: The number of rows to generate.
+        first_id: The id of the first row; each row's id is one more than
+            the last.
+
+    Returns: A list of rows, as dicts in the format of NDJSON load files.
+    """
+    def maybe_null(value):
+        if rng.random() < config.null_fraction:
+            return None
+        return value
+
+    def make_records(depth):
+        records = []
+        for _ in range(_REPEATED_SIZE):
+            record = {'n': maybe_null(rng.randint(0, 1000))}
+            if depth > 1:
+                record['rec'] = make_records(depth - 1)
+            records.append(record)
+        return records
+
+    rows = []
+    for row_id in range(first_id, first_id + num_rows):
+        key = 'key%d' % rng.randrange(config.cardinality)
+        row = {
+            'id': row_id,
+            'key': maybe_null(key),
+            'value': maybe_null(rng.random()),
+            'flag': maybe_null(rng.random() < 0.5),
+            'ts': maybe_null('2016-01-01T00:00:%02d' % rng.randrange(60)),
+            'payload': maybe_null(json.dumps(
+                {'key': key, 'score': rng.randrange(100),
+                 'nested': {'ok': rng.random() < 0.5}})),
+            'tags': ['tag%d' % rng.randrange(10)
+                     for _ in range(rng.randrange(_REPEATED_SIZE + 1))],
+        }
+        if config.nesting_depth > 0:
+            row['rec'] = make_records(config.nesting_depth)
+        rows.append(row)
+    return rows
+
+
+def load_rows(tq, table_name, schema, rows):
+    """Load generated rows into a table with the NDJSON loader."""
+    tq.load_table_from_newline_delimited_json(
+        table_name, json.dumps(schema['fields']),
+        (json.dumps(row) for row in rows))
+
+
+def make_benchmark_tables(config):
+    """Make a TinyQuery with the tables the workloads query.
+
+    The tables are:
+        bench.events: num_rows generated rows.
+        bench.keys: One row for each key, with a label.
+        bench.shard_YYYYMMDD: num_shards tables splitting up num_rows rows,
+            for TABLE_DATE_RANGE.
+    """
+    rng = random.Random(config.seed)
+    schema = make_schema(config.nesting_depth)
+    tq = tinyquery.TinyQuery()
+    load_rows(tq, 'bench.events', schema,
+              generate_rows(config, rng, config.num_rows))
+    tq.load_table_from_newline_delimited_json(
+        'bench.keys', json.dumps([
+            {'name': 'key', 'type': 'STRING', 'mode': 'NULLABLE'},
+            {'name': 'label', 'type': 'STRING', 'mode': 'NULLABLE'}]),
+        (json.dumps({'key': 'key%d' % i, 'label': 'label%d' % (i % 7)})
+         for i in range(config.cardinality)))
+    shard_rows = config.num_rows // config.num_shards
+    for shard in range(config.num_shards):
+        shard_date = _FIRST_SHARD_DATE + datetime.timedelta(days=shard)
+        load_rows(tq, 'bench.shard_' + shard_date.strftime('%Y%m%d'), schema,
+                  generate_rows(config, rng, shard_rows,
+                                first_id=shard * shard_rows))
+    return tq
+
+
+# Maps the name of each query workload to its query.
+QUERY_WORKLOADS = collections.OrderedDict([
+    ('scan_filter',
+     'SELECT id, value FROM bench.events WHERE value > 0.5 AND flag'),
+    ('group_by',
+     'SELECT key, COUNT(*) AS n, SUM(value) AS total, MAX(ts) AS latest '
+     'FROM bench.events GROUP BY key'),
+    ('join',
+     'SELECT e.id, k.label FROM bench.events e '
+     'JOIN bench.keys k ON e.key = k.key'),
+    ('order_by_limit',
+     'SELECT id, value FROM bench.events ORDER BY value DESC LIMIT 10'),
+    ('union_shards',
+     'SELECT key, COUNT(*) AS n FROM TABLE_DATE_RANGE(bench.shard_, '
+     'TIMESTAMP("2016-01-01"), TIMESTAMP("2099-01-01")) GROUP BY key'),
+    ('json_extract',
+     'SELECT JSON_EXTRACT_SCALAR(payload, "$.key") AS key, '
+     'JSON_EXTRACT(payload, "$.nested") AS nested FROM bench.events'),
+    ('regex',
+     'SELECT REGEXP_EXTRACT(payload, "score.: ([0-9]+)") AS score '
+     'FROM bench.events WHERE REGEXP_MATCH(key, "^key[0-9]*7$")'),
+    ('repeated',
+     'SELECT id, COUNT(tags) WITHIN RECORD AS num_tags FROM bench.events'),
+])
+
+
+def time_function(func, repeat):
+    """Time a function.
+
+    Returns: A pair of the list of the number of seconds each call took and
+        the result of the last call.
+    """
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        start_time = time.time()
+        result = func()
+        seconds.append(time.time() - start_time)
+    return seconds, result
+
+
+def _summarize(name, seconds, num_rows):
+    sorted_seconds = sorted(seconds)
+    return collections.OrderedDict([
+        ('name', name),
+        ('num_rows', num_rows),
+        ('min_seconds', sorted_seconds[0]),
+        ('median_seconds', sorted_seconds[len(sorted_seconds) // 2]),
+        ('mean_seconds', sum(seconds) / len(seconds)),
+        ('seconds', seconds),
+    ])
+
+
+def run_query_workloads(tq, names, repeat):
+    """Time the query workloads.
+
+    Returns: A result dict for each workload; see run_benchmarks.
+    """
+    results = []
+    for name in names:
+        query = QUERY_WORKLOADS[name]
+        seconds, result = time_function(
+            lambda: tq.evaluate_query(query), repeat)
+        results.append(_summarize(name, seconds, result.num_rows))
+    return results
+
+
+def run_loader_workloads(config, repeat, names):
+    """Time loading generated data from NDJSON and CSV files.
+
+    The CSV file only has the flat columns of the table, since CSV can't
+    represent REPEATED fields.
+
+    Returns: A result dict for each workload; see run_benchmarks.
+    """
+    rng = random.Random(config.seed)
+    schema = make_schema(config.nesting_depth)
+    rows = generate_rows(config, rng, config.num_rows)
+    csv_fields = [field for field in schema['fields']
+                  if field['mode'] != 'REPEATED']
+    path = tempfile.mkdtemp()
+    try:
+        schema_filename = os.path.join(path, 'schema.json')
+        with open(schema_filename, 'w') as f:
+            json.dump(schema['fields'], f)
+        ndjson_filename = os.path.join(path, 'rows.json')
+        with open(ndjson_filename, 'w') as f:
+            for row in rows:
+                f.write(json.dumps(row) + '\n')
+        csv_filename = os.path.join(path, 'rows.csv')
+        with open(csv_filename, 'w') as f:
+            writer = csv.writer(f)
+            for row in rows:
+                writer.writerow(['' if row[field['name']] is None
+                                 else row[field['name']]
+                                 for field in csv_fields])
+
+        def load_ndjson():
+            tq = tinyquery.TinyQuery()
+            tq.load_table_from_newline_delimited_json_files(
+                'bench.events', schema_filename, ndjson_filename,
+                num_workers=1)
+            return tq.tables_by_name['bench.events']
+
+        def load_csv():
+            tq = tinyquery.TinyQuery()
+            tq.load_table_from_csv('bench.events', {'fields': csv_fields},
+                                   csv_filename)
+            return tq.tables_by_name['bench.events']
+
+        loaders = collections.OrderedDict([
+            ('load_ndjson', load_ndjson), ('load_csv', load_csv)])
+        results = []
+        for name in names:
+            seconds, table = time_function(loaders[name], repeat)
+            results.append(_summarize(name, seconds, table.num_rows))
+        return results
+    finally:
+        shutil.rmtree(path)
+
+
+LOADER_WORKLOADS = ['load_ndjson', 'load_csv']
+ALL_WORKLOADS = list(QUERY_WORKLOADS) + LOADER_WORKLOADS
+
+
+def run_benchmarks(config=DEFAULT_CONFIG, workloads=None, repeat=3):
+    """Run the benchmarks.
+
+    Arguments:
+        config: The DataConfig for the generated data.
+        workloads: The names of the workloads to run, or None for all of
+            them; see ALL_WORKLOADS.
+        repeat: How many times to time each workload.
+
+    Returns: A JSON-serializable dict with the config, some information
+        about the environment, and a list of results. Each result has the
+        workload's name, the number of rows it output (or loaded), and the
+        min, median and mean of the number of seconds it took, along with
+        the time of each run.
+    """
+    if workloads is None:
+        workloads = ALL_WORKLOADS
+    unknown_workloads = set(workloads) - set(ALL_WORKLOADS)
+    if unknown_workloads:
+        raise ValueError('Unknown workloads: {}'.format(
+            ', '.join(sorted(unknown_workloads))))
+    query_workloads = [name for name in workloads
+                       if name in QUERY_WORKLOADS]
+    loader_workloads = [name for name in workloads
+                        if name in LOADER_WORKLOADS]
+
+    results = []
+    if query_workloads:
+        setup_seconds, tq = time_function(
+            lambda: make_benchmark_tables(config), 1)
+        results.append(_summarize('setup', setup_seconds,
+                                  tq.tables_by_name['bench.events'].num_rows))
+        results.extend(run_query_workloads(tq, query_workloads, repeat))
+    if loader_workloads:
+        results.extend(run_loader_workloads(config, repeat,
+                                            loader_workloads))
+    return collections.OrderedDict([
+        ('config', config._asdict()),
+        ('repeat', repeat),
+        ('python_version', platform.python_version()),
+        ('platform', platform.platform()),
+        ('timestamp', time.time()),
+        ('results', results),
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark tinyquery on synthetic data.')
+    parser.add_argument('--rows', type=int, default=DEFAULT_CONFIG.num_rows,
+                        help='the number of rows in the main table')
+    parser.add_argument('--cardinality', type=int,
+                        default=DEFAULT_CONFIG.cardinality,
+                        help='the number of distinct keys')
+    parser.add_argument('--null-fraction', type=float,
+                        default=DEFAULT_CONFIG.null_fraction,
+                        help='the fraction of NULLABLE values that are null')
+    parser.add_argument('--nesting-depth', type=int,
+                        default=DEFAULT_CONFIG.nesting_depth,
+                        help='the number of levels of REPEATED records')
+    parser.add_argument('--shards', type=int,
+                        default=DEFAULT_CONFIG.num_shards,
+                        help='the number of shards for the union workload')
+    parser.add_argument('--seed', type=int, default=DEFAULT_CONFIG.seed,
+                        help='the random seed for the data')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='how many times to time each workload')
+    parser.add_argument('--workload', action='append',
+                        choices=ALL_WORKLOADS,
+                        help='a workload to run (by default, all of them); '
+                        'can be given more than once')
+    parser.add_argument('--output', help='the file to write the JSON '
+                        'results to (by default, stdout)')
+    args = parser.parse_args(argv)
+
+    config = DataConfig(num_rows=args.rows, cardinality=args.cardinality,
+                        null_fraction=args.null_fraction,
+                        nesting_depth=args.nesting_depth,
+                        num_shards=args.shards, seed=args.seed)
+    results = run_benchmarks(config, args.workload, args.repeat)
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
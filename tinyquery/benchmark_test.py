@@ -0,0 +1,61 @@
+from __future__ import absolute_import
+
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from tinyquery import benchmark
+
+
+SMALL_CONFIG = benchmark.DataConfig(num_rows=40, cardinality=5,
+                                    null_fraction=0.2, nesting_depth=3,
+                                    num_shards=2, seed=1)
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_generated_data(self):
+        rows = benchmark.generate_rows(SMALL_CONFIG, random.Random(0), 40)
+        self.assertEqual(list(range(40)), [row['id'] for row in rows])
+        self.assertLessEqual(len(set(row['key'] for row in rows)), 5 + 1)
+        self.assertIn(None, [row['value'] for row in rows])
+        self.assertEqual(3, len(rows[0]['rec'][0]['rec'][0]['rec']))
+        self.assertNotIn('rec', rows[0]['rec'][0]['rec'][0]['rec'][0])
+        # The same seed always gives the same data.
+        self.assertEqual(rows, benchmark.generate_rows(
+            SMALL_CONFIG, random.Random(0), 40))
+
+        tq = benchmark.make_benchmark_tables(SMALL_CONFIG)
+        self.assertEqual(40, tq.tables_by_name['bench.events'].num_rows)
+        self.assertIn('rec.rec.rec.n',
+                      tq.tables_by_name['bench.events'].columns)
+        self.assertEqual(
+            20, tq.tables_by_name['bench.shard_20160102'].num_rows)
+
+    def test_run_all_workloads(self):
+        results = benchmark.run_benchmarks(SMALL_CONFIG, repeat=2)
+        self.assertEqual(['setup'] + benchmark.ALL_WORKLOADS,
+                         [result['name'] for result in results['results']])
+        for result in results['results']:
+            self.assertLessEqual(result['min_seconds'],
+                                 result['median_seconds'])
+        self.assertEqual(40, results['results'][-1]['num_rows'])
+        self.assertEqual(SMALL_CONFIG._asdict(), results['config'])
+
+        with self.assertRaises(ValueError):
+            benchmark.run_benchmarks(SMALL_CONFIG, ['nope'])
+
+    def test_main(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        output = os.path.join(path, 'results.json')
+        benchmark.main(['--rows', '10', '--nesting-depth', '0', '--repeat',
+                        '1', '--workload', 'group_by', '--workload',
+                        'load_csv', '--output', output])
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual(['setup', 'group_by', 'load_csv'],
+                         [result['name'] for result in results['results']])
+        self.assertEqual(0, results['config']['nesting_depth'])
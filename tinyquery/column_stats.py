@@ -0,0 +1,306 @@
+"""Per-chunk column statistics ("zone maps") for stored tables.
+
+The rows of a table are divided into fixed-size chunks, and for each chunk we
+keep a small summary of every column: its min and max value and how many
+nulls it has. These summaries are cheap to keep up to date when rows are
+appended (only the last chunk ever changes), and they let the evaluator skip
+chunks that can't possibly match a WHERE clause, and joins whose key ranges
+don't overlap, without looking at any of their rows.
+"""
+from __future__ import absolute_import
+
+import collections
+
+import arrow
+import six
+
+from tinyquery import context
+from tinyquery import runtime
+from tinyquery import tq_modes
+from tinyquery import tq_types
+from tinyquery import typed_ast
+
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+class ColumnStats(collections.namedtuple(
+        'ColumnStats', ['min_value', 'max_value', 'null_count',
+                        'num_values'])):
+    """Summary of the values of a column within a chunk (or a whole table).
+
+    Fields:
+        min_value: The smallest non-null value, or None if there are no
+            non-null values or the values aren't comparable.
+        max_value: The largest non-null value, or None under the same
+            conditions as min_value.
+        null_count: The number of null values.
+        num_values: The total number of values, including nulls. For repeated
+            columns, this counts the individual values within each row.
+    """
+    @property
+    def has_range(self):
+        return self.min_value is not None
+
+
+class TableChunk(collections.namedtuple(
+        'TableChunk', ['start', 'end', 'column_stats'])):
+    """A contiguous range of rows in a table and the stats for its columns.
+
+    Fields:
+        start: The index of the first row in the chunk.
+        end: One past the index of the last row in the chunk.
+        column_stats: A dict mapping column name to ColumnStats.
+    """
+    @property
+    def num_rows(self):
+        return self.end - self.start
+
+
+def compute_column_stats(values, mode):
+    """Summarize a list of raw column values."""
+    if mode == tq_modes.REPEATED:
+        values = [v for row in values if row is not None for v in row]
+    non_null = [v for v in values if v is not None]
+    try:
+        min_value = min(non_null) if non_null else None
+        max_value = max(non_null) if non_null else None
+    except TypeError:
+        min_value = max_value = None
+    return ColumnStats(
+        min_value=min_value,
+        max_value=max_value,
+        null_count=len(values) - len(non_null),
+        num_values=len(values))
+
+
+def merge_column_stats(stats_list):
+    """Combine the stats of several chunks into stats for all of them."""
+    stats_list = list(stats_list)
+    ranged = [stats for stats in stats_list if stats.has_range]
+    try:
+        min_value = min(s.min_value for s in ranged) if ranged else None
+        max_value = max(s.max_value for s in ranged) if ranged else None
+    except TypeError:
+        min_value = max_value = None
+    return ColumnStats(
+        min_value=min_value,
+        max_value=max_value,
+        null_count=sum(s.null_count for s in stats_list),
+        num_values=sum(s.num_values for s in stats_list))
+
+
+def build_chunks(columns, start, end, chunk_size):
+    """Compute the chunks covering rows [start, end) of the given columns.
+
+    Arguments:
+        columns: An OrderedDict mapping column name to Column.
+        start: The first row to summarize; must be at a chunk boundary.
+        end: One past the last row to summarize.
+        chunk_size: The number of rows in a full chunk.
+
+    Returns: A list of TableChunk.
+    """
+    assert start % chunk_size == 0
+    result = []
+    for chunk_start in six.moves.xrange(start, end, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, end)
+        result.append(TableChunk(chunk_start, chunk_end, {
+            name: compute_column_stats(
+                column.values[chunk_start:chunk_end], column.mode)
+            for name, column in columns.items()
+        }))
+    return result
+
+
+_COMPARISON_OPS = collections.OrderedDict([
+    ('=', runtime.get_binary_op('=')),
+    ('==', runtime.get_binary_op('==')),
+    ('!=', runtime.get_binary_op('!=')),
+    ('<', runtime.get_binary_op('<')),
+    ('<=', runtime.get_binary_op('<=')),
+    ('>', runtime.get_binary_op('>')),
+    ('>=', runtime.get_binary_op('>=')),
+])
+
+# The operator to use if the column and literal are swapped, e.g. 3 < x is
+# the same as x > 3.
+_FLIPPED_OPS = {
+    '=': '=', '==': '==', '!=': '!=',
+    '<': '>', '<=': '>=', '>': '<', '>=': '<=',
+}
+
+_AND_OP = runtime.get_binary_op('and')
+_OR_OP = runtime.get_binary_op('or')
+_IS_NULL_OP = runtime.get_unary_op('is_null')
+_IS_NOT_NULL_OP = runtime.get_unary_op('is_not_null')
+_IN_FUNC = runtime.get_func('in')
+
+
+def _op_name(func):
+    for name, op in _COMPARISON_OPS.items():
+        if func is op:
+            return name
+    return None
+
+
+# Returned by _constant_value for expressions that depend on the row.
+_NOT_CONSTANT = object()
+
+
+def _constant_value(expr):
+    """Evaluate an expression that doesn't reference any columns.
+
+    Returns: The value of the expression, or _NOT_CONSTANT if the expression
+        depends on the row being evaluated.
+    """
+    if isinstance(expr, typed_ast.Literal):
+        return expr.value
+    if (not isinstance(expr, typed_ast.FunctionCall) or not expr.args or
+            isinstance(expr.func, (runtime.RandFunction,
+                                   runtime.NoArgFunction))):
+        return _NOT_CONSTANT
+    arg_values = [_constant_value(arg) for arg in expr.args]
+    if any(value is _NOT_CONSTANT for value in arg_values):
+        return _NOT_CONSTANT
+    try:
+        result = expr.func.evaluate(1, *(
+            context.Column(type=arg.type, mode=tq_modes.NULLABLE,
+                           values=[value])
+            for arg, value in zip(expr.args, arg_values)))
+    except Exception:
+        return _NOT_CONSTANT
+    return result.values[0]
+
+
+def _coerce_constant(column_type, constant_type, value):
+    """Convert a constant to something comparable with a column's values.
+
+    This follows the implicit conversions done by comparison operators.
+
+    Returns: The converted value, or _NOT_CONSTANT if we can't compare them.
+    """
+    if value is None:
+        return _NOT_CONSTANT
+    if column_type == constant_type:
+        return value
+    if column_type == tq_types.TIMESTAMP:
+        try:
+            if constant_type == tq_types.STRING:
+                return arrow.get(value).to('UTC').naive
+            elif constant_type in tq_types.NUMERIC_TYPE_SET:
+                return arrow.get(float(value) / 1E6).to('UTC').naive
+        except Exception:
+            pass
+        return _NOT_CONSTANT
+    numeric_types = tq_types.NUMERIC_TYPE_SET - set([tq_types.TIMESTAMP])
+    if set([column_type, constant_type]) <= numeric_types:
+        return value
+    return _NOT_CONSTANT
+
+
+def _range_may_contain(stats, op, value):
+    """Return False if no value in the range can satisfy `col <op> value`."""
+    lo, hi = stats.min_value, stats.max_value
+    try:
+        if op in ('=', '=='):
+            return lo <= value <= hi
+        elif op == '!=':
+            return not (lo == hi == value)
+        elif op == '<':
+            return lo < value
+        elif op == '<=':
+            return lo <= value
+        elif op == '>':
+            return hi > value
+        elif op == '>=':
+            return hi >= value
+    except TypeError:
+        pass
+    return True
+
+
+class ChunkPruner(object):
+    """Decides which chunks of a table might satisfy a filter expression.
+
+    The pruner only ever gives a conservative answer: a chunk is skipped only
+    if its stats prove that the filter is false (or null) for every row.
+    """
+    def __init__(self, filter_expr, stats_key_by_column):
+        """Create a pruner.
+
+        Arguments:
+            filter_expr: A typed_ast expression that will be used as a filter.
+            stats_key_by_column: A dict mapping the (table, column) pair used
+                by ColumnRefs in the filter to the column name used in the
+                chunk stats, for the columns that have stats.
+        """
+        self.filter_expr = filter_expr
+        self.stats_key_by_column = stats_key_by_column
+
+    def chunk_may_match(self, chunk):
+        return self._may_match(self.filter_expr, chunk)
+
+    def _column_stats(self, expr, chunk):
+        """If the expression is a non-repeated column with stats, get them."""
+        if not isinstance(expr, typed_ast.ColumnRef):
+            return None
+        if expr.mode == tq_modes.REPEATED:
+            return None
+        stats_key = self.stats_key_by_column.get((expr.table, expr.column))
+        if stats_key is None:
+            return None
+        return chunk.column_stats.get(stats_key)
+
+    def _may_match(self, expr, chunk):
+        constant = _constant_value(expr)
+        if constant is not _NOT_CONSTANT:
+            return constant is not False and constant is not None
+        if not isinstance(expr, typed_ast.FunctionCall):
+            return True
+        if expr.func is _AND_OP:
+            return all(self._may_match(arg, chunk) for arg in expr.args)
+        if expr.func is _OR_OP:
+            return any(self._may_match(arg, chunk) for arg in expr.args)
+        if expr.func is _IS_NULL_OP or expr.func is _IS_NOT_NULL_OP:
+            stats = self._column_stats(expr.args[0], chunk)
+            if stats is None:
+                return True
+            if expr.func is _IS_NULL_OP:
+                return stats.null_count > 0
+            return stats.null_count < stats.num_values
+        if expr.func is _IN_FUNC:
+            stats = self._column_stats(expr.args[0], chunk)
+            if stats is None:
+                return True
+            values = [
+                _coerce_constant(expr.args[0].type, arg.type,
+                                 _constant_value(arg))
+                for arg in expr.args[1:]]
+            if any(value is _NOT_CONSTANT for value in values):
+                return True
+            if not stats.has_range:
+                return stats.null_count < stats.num_values
+            return any(_range_may_contain(stats, '=', value)
+                       for value in values)
+
+        op = _op_name(expr.func)
+        if op is None:
+            return True
+        left, right = expr.args
+        if not isinstance(left, typed_ast.ColumnRef):
+            left, right = right, left
+            op = _FLIPPED_OPS[op]
+        stats = self._column_stats(left, chunk)
+        if stats is None:
+            return True
+        value = _coerce_constant(left.type, right.type,
+                                 _constant_value(right))
+        if value is _NOT_CONSTANT:
+            return True
+        if stats.null_count == stats.num_values:
+            # Comparisons against null are never true.
+            return False
+        if not stats.has_range:
+            return True
+        return _range_may_contain(stats, op, value)
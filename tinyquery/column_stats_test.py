@@ -0,0 +1,145 @@
+from __future__ import absolute_import
+
+import collections
+import unittest
+
+import mock
+
+from tinyquery import column_stats
+from tinyquery import compiler
+from tinyquery import context
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+class ColumnStatsTest(unittest.TestCase):
+    def test_compute_column_stats(self):
+        stats = column_stats.compute_column_stats(
+            [3, None, 1, 7, 3], tq_modes.NULLABLE)
+        self.assertEqual(1, stats.min_value)
+        self.assertEqual(7, stats.max_value)
+        self.assertEqual(1, stats.null_count)
+        self.assertEqual(5, stats.num_values)
+
+    def test_repeated_column_stats(self):
+        stats = column_stats.compute_column_stats(
+            [[3, 4], [], None, [1]], tq_modes.REPEATED)
+        self.assertEqual(1, stats.min_value)
+        self.assertEqual(4, stats.max_value)
+        self.assertEqual(3, stats.num_values)
+
+    def test_all_null_column_stats(self):
+        stats = column_stats.compute_column_stats(
+            [None, None], tq_modes.NULLABLE)
+        self.assertFalse(stats.has_range)
+        self.assertEqual(2, stats.null_count)
+
+    def test_merge_column_stats(self):
+        stats = column_stats.merge_column_stats([
+            column_stats.compute_column_stats([5, 6], tq_modes.NULLABLE),
+            column_stats.compute_column_stats([None], tq_modes.NULLABLE),
+            column_stats.compute_column_stats([2, 6], tq_modes.NULLABLE),
+        ])
+        self.assertEqual(2, stats.min_value)
+        self.assertEqual(6, stats.max_value)
+        self.assertEqual(1, stats.null_count)
+        self.assertEqual(5, stats.num_values)
+
+
+class TableChunkTest(unittest.TestCase):
+    def make_table(self, values, chunk_size):
+        return tinyquery.Table(
+            'test_table', len(values),
+            collections.OrderedDict([
+                ('val', context.Column(type=tq_types.INT,
+                                       mode=tq_modes.NULLABLE,
+                                       values=list(values))),
+            ]),
+            chunk_size=chunk_size)
+
+    def test_chunks(self):
+        table = self.make_table(range(10), chunk_size=4)
+        self.assertEqual([(0, 4), (4, 8), (8, 10)],
+                         [(c.start, c.end) for c in table.chunks])
+        self.assertEqual(8, table.chunks[2].column_stats['val'].min_value)
+
+    def test_append_only_touches_last_chunk(self):
+        table = self.make_table(range(10), chunk_size=4)
+        first_chunks = table.chunks[:2]
+        tinyquery.TinyQuery.append_to_table(
+            self.make_table([100, 101, 102], chunk_size=4), table)
+        self.assertEqual([(0, 4), (4, 8), (8, 12), (12, 13)],
+                         [(c.start, c.end) for c in table.chunks])
+        self.assertIs(first_chunks[0], table.chunks[0])
+        self.assertIs(first_chunks[1], table.chunks[1])
+        self.assertEqual(101, table.chunks[2].column_stats['val'].max_value)
+
+    def test_stats_are_lazy(self):
+        table = self.make_table(range(10), chunk_size=4)
+        with mock.patch.object(column_stats, 'build_chunks') as build_chunks:
+            tinyquery.TinyQuery.table_from_context(
+                'query_results', context.Context(
+                    2, collections.OrderedDict([
+                        ((None, 'val'), context.Column(
+                            type=tq_types.INT, mode=tq_modes.NULLABLE,
+                            values=[1, 2]))]), None))
+            tinyquery.TinyQuery.append_to_table(
+                self.make_table([100], chunk_size=4), table)
+        self.assertFalse(build_chunks.called)
+        self.assertEqual([(0, 4), (4, 8), (8, 11)],
+                         [(c.start, c.end) for c in table.chunks])
+
+    def test_clear_table(self):
+        table = self.make_table(range(10), chunk_size=4)
+        tinyquery.TinyQuery.clear_table(table)
+        self.assertEqual([], table.chunks)
+
+
+class ChunkPrunerTest(unittest.TestCase):
+    def setUp(self):
+        self.table = tinyquery.Table(
+            'test_table', 4,
+            collections.OrderedDict([
+                ('val', context.Column(type=tq_types.INT,
+                                       mode=tq_modes.NULLABLE,
+                                       values=[1, 2, 10, None])),
+                ('str', context.Column(type=tq_types.STRING,
+                                       mode=tq_modes.NULLABLE,
+                                       values=['a', 'b', 'c', 'd'])),
+            ]),
+            chunk_size=2)
+        self.tables_by_name = {'test_table': self.table}
+
+    def kept_chunks(self, where_clause):
+        select = compiler.compile_text(
+            'SELECT val FROM test_table WHERE ' + where_clause,
+            self.tables_by_name)
+        pruner = column_stats.ChunkPruner(select.where_expr, dict(
+            zip(select.table.type_ctx.columns, self.table.columns)))
+        return [(chunk.start, chunk.end) for chunk in self.table.chunks
+                if pruner.chunk_may_match(chunk)]
+
+    def test_comparisons(self):
+        self.assertEqual([(0, 2)], self.kept_chunks('val < 3'))
+        self.assertEqual([(0, 2)], self.kept_chunks('3 > val'))
+        self.assertEqual([(2, 4)], self.kept_chunks('val >= 3'))
+        self.assertEqual([(2, 4)], self.kept_chunks('val = 10'))
+        self.assertEqual([], self.kept_chunks('val = 5'))
+        self.assertEqual([(0, 2), (2, 4)], self.kept_chunks('val != 5'))
+        self.assertEqual([(0, 2)], self.kept_chunks('str <= "b"'))
+
+    def test_null_checks(self):
+        self.assertEqual([(2, 4)], self.kept_chunks('val IS NULL'))
+        self.assertEqual([(0, 2), (2, 4)],
+                         self.kept_chunks('val IS NOT NULL'))
+
+    def test_boolean_combinations(self):
+        self.assertEqual([], self.kept_chunks('val < 3 AND str = "d"'))
+        self.assertEqual([(0, 2), (2, 4)],
+                         self.kept_chunks('val < 3 OR str = "d"'))
+        self.assertEqual([(2, 4)], self.kept_chunks('val IN (7, 10)'))
+
+    def test_unprunable_expressions(self):
+        self.assertEqual([(0, 2), (2, 4)], self.kept_chunks('val + 1 = 2'))
+        self.assertEqual([(0, 2), (2, 4)], self.kept_chunks('NOT (val < 3)'))
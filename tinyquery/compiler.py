@@ -7,25 +7,44 @@ This step has a number of responsibilities:
 from __future__ import absolute_import
 
 import collections
+import datetime
 import itertools
+import re
 
+from tinyquery import context
+from tinyquery import evaluator
 from tinyquery import exceptions
 from tinyquery import parser
+from tinyquery import partitioning
+from tinyquery import profiling
 from tinyquery import runtime
+from tinyquery import table_catalog
 from tinyquery import tq_ast
+from tinyquery import tq_modes
 from tinyquery import typed_ast
 from tinyquery import type_context
 from tinyquery import tq_types
 
 
-def compile_text(text, tables_by_name):
-    ast = parser.parse_text(text)
-    return Compiler(tables_by_name).compile_select(ast)
+# The suffix of a table shard used by TABLE_DATE_RANGE.
+_SHARD_DATE_RE = re.compile(r'^\d{8}$')
+
+
+def compile_text(text, tables_by_name, profiler=None):
+    ast = parser.parse_text(text, profiler)
+    return profiling.run(profiler, profiling.COMPILE, None, None,
+                         Compiler(tables_by_name).compile_select, ast)
 
 
 class Compiler(object):
     def __init__(self, tables_by_name):
         self.tables_by_name = tables_by_name
+        # Map from a tuple of (column name, type) pairs to the type context
+        # shared by all shards with that schema.
+        self.shard_type_contexts = {}
+        # The names of the views being compiled, outermost first, for
+        # finding circular views.
+        self.view_stack = []
 
     def compile_select(self, select):
         assert isinstance(select, tq_ast.Select)
@@ -213,52 +232,306 @@ class Compiler(object):
 
     def compile_table_expr_TableId(self, table_expr):
         from tinyquery import tinyquery  # TODO(colin): fix circular import
-        table = self.tables_by_name[table_expr.name]
-        if isinstance(table, tinyquery.Table):
+        table_name, partition_id = self.split_table_decorator(
+            table_expr.name)
+        table = self.tables_by_name[table_name]
+        if partition_id is not None and not isinstance(
+                table, tinyquery.PartitionedTable):
+            raise exceptions.CompileError(
+                'Partition decorators can only be used with partitioned '
+                'tables: {}'.format(table_expr.name))
+        if isinstance(table, (tinyquery.Table, tinyquery.MaterializedView)):
+            # Materialized views are read like stored tables.
             return self.compile_table_ref(table_expr, table)
         elif isinstance(table, tinyquery.View):
             return self.compile_view_ref(table_expr, table)
         else:
             raise NotImplementedError('Unknown table type %s.' % type(table))
 
+    @staticmethod
+    def split_table_decorator(table_name):
+        try:
+            return partitioning.split_table_decorator(table_name)
+        except ValueError as e:
+            raise exceptions.CompileError(str(e))
+
     def compile_table_ref(self, table_expr, table):
-        alias = table_expr.alias or table_expr.name
+        from tinyquery import tinyquery  # TODO(colin): fix circular import
+        table_name, partition_id = self.split_table_decorator(
+            table_expr.name)
+        alias = table_expr.alias or table_name
         columns = collections.OrderedDict([
-            (name, column.type) for name, column in table.columns.items()
+            (name, column.type) for name, column in table.schema.items()
         ])
+        implicit_column_context = None
+        partition_ids = None
+        if isinstance(table, tinyquery.PartitionedTable):
+            # The partition time is a pseudo-column: it can be referenced,
+            # but isn't included in SELECT *.
+            implicit_column_context = (
+                type_context.TypeContext.from_table_and_columns(
+                    alias, collections.OrderedDict([
+                        (partitioning.PARTITION_TIME_COLUMN,
+                         tq_types.TIMESTAMP)])))
+            if partition_id is not None:
+                partition_ids = [partition_id]
         type_ctx = type_context.TypeContext.from_table_and_columns(
-            alias, columns, None)
-        return typed_ast.Table(table_expr.name, type_ctx)
+            alias, columns, implicit_column_context)
+        return typed_ast.Table(table_name, type_ctx, partition_ids)
 
     def compile_view_ref(self, table_expr, view):
         # TODO(alan): This code allows fields from the view's implicit column
         # context to be selected, which probably isn't allowed in regular
         # BigQuery.
 
-        # TODO(alan): We should check for cycles when evaluating views.
-        # Otherwise, circular views will cause an infinite loop.
-
-        # The view keeps its query as regular text, so we need to lex and parse
-        # it, then include it as if it was a subquery. It's almost correct to
+        # The view is included as if it was a subquery. It's almost correct to
         # re-use the subquery compiling code, except that subquery aliases have
         # special semantics that we don't want to use; an alias on a view
         # should count for all returned fields.
         alias = table_expr.alias or table_expr.name
-        uncompiled_view_ast = parser.parse_text(view.query)
-        compiled_view_select = self.compile_select(uncompiled_view_ast)
+        compiled_view_select = self.compile_view(view)
         # We always want to apply either the alias or the full table name to
         # the returned type context.
         new_type_context = (
             compiled_view_select.type_ctx.context_with_full_alias(alias))
         return compiled_view_select.with_type_ctx(new_type_context)
 
+    def compile_view(self, view):
+        """Compile the query of a view, or get it from the view's cache.
+
+        A view's query compiles the same way no matter where the view is
+        used, so the compiled query is kept on the View until any table or
+        view is added, replaced or removed (which is the only way the tables
+        it reads can change schema). Views are only cached when compiling
+        against a TableCatalog, since that's what tracks those changes.
+
+        Raises: CompileError if the view reads itself, directly or through
+            other views.
+        """
+        catalog_version = getattr(self.tables_by_name, 'version', None)
+        cached = view.compiled_select
+        if (catalog_version is not None and cached is not None and
+                cached[0] is self.tables_by_name and
+                cached[1] == catalog_version):
+            return cached[2]
+
+        if view.name in self.view_stack:
+            raise exceptions.CompileError(
+                'Circular view reference: {}'.format(' -> '.join(
+                    self.view_stack[self.view_stack.index(view.name):] +
+                    [view.name])))
+        self.view_stack.append(view.name)
+        try:
+            compiled_view_select = self.compile_select(view.parsed_query)
+        finally:
+            self.view_stack.pop()
+        if catalog_version is not None:
+            view.compiled_select = (self.tables_by_name, catalog_version,
+                                    compiled_view_select)
+        return compiled_view_select
+
     def compile_table_expr_TableUnion(self, table_expr):
-        compiled_tables = [
-            self.compile_table_expr(table) for table in table_expr.tables]
+        return self.compile_union(
+            [self.compile_table_expr(table) for table in table_expr.tables])
+
+    def compile_union(self, compiled_tables):
+        # Many members may share a type context, so only look at each one
+        # once when computing the type of the union.
+        distinct_type_contexts = collections.OrderedDict(
+            (id(table.type_ctx), table.type_ctx)
+            for table in compiled_tables)
         type_ctx = type_context.TypeContext.union_contexts(
-            table.type_ctx for table in compiled_tables)
+            distinct_type_contexts.values())
         return typed_ast.TableUnion(compiled_tables, type_ctx)
 
+    def compile_shard(self, table_name):
+        """Compile one of the tables matched by a table wildcard function.
+
+        A union only ever refers to its members' columns by their short names,
+        so there's no need to give each shard its own type context. Instead,
+        all stored tables with the same schema share one, since a wildcard
+        can easily match hundreds of shards of the same table.
+        """
+        from tinyquery import tinyquery  # TODO(colin): fix circular import
+        table = self.tables_by_name[table_name]
+        if type(table) is not tinyquery.Table:
+            return self.compile_table_expr(tq_ast.TableId(table_name, None))
+        columns = tuple(
+            (name, column.type) for name, column in table.schema.items())
+        type_ctx = self.shard_type_contexts.get(columns)
+        if type_ctx is None:
+            type_ctx = type_context.TypeContext.from_table_and_columns(
+                None, collections.OrderedDict(columns))
+            self.shard_type_contexts[columns] = type_ctx
+        return typed_ast.Table(table_name, type_ctx)
+
+    def compile_table_expr_TableFunction(self, table_expr):
+        """Compile a table wildcard function, like TABLE_DATE_RANGE.
+
+        Each table function picks out a list of table names, which are then
+        treated like a union of those tables.
+        """
+        try:
+            method = getattr(self, 'table_names_for_' + table_expr.name)
+        except AttributeError:
+            raise exceptions.CompileError(
+                'Unknown table function: {}'.format(table_expr.name.upper()))
+        table_names = method(table_expr)
+        if not table_names:
+            raise exceptions.CompileError(
+                'FROM clause with table wildcards matches no table: '
+                '{}'.format(table_expr))
+        result = self.compile_union([
+            self.compile_shard(name) for name in table_names])
+        if table_expr.alias is not None:
+            result = result.with_type_ctx(
+                result.type_ctx.context_with_full_alias(table_expr.alias))
+        return result
+
+    def table_names_for_table_date_range(self, table_expr):
+        """Find the daily shards of a table in a range of dates.
+
+        TABLE_DATE_RANGE(prefix, start, end) selects every table named
+        prefix + YYYYMMDD where the date is between the start and end
+        timestamps (inclusive). Missing days are skipped.
+        """
+        return self.date_range_shard_names(table_expr, strict=False)
+
+    def table_names_for_table_date_range_strict(self, table_expr):
+        """Like TABLE_DATE_RANGE, but every day in the range must exist."""
+        return self.date_range_shard_names(table_expr, strict=True)
+
+    def date_range_shard_names(self, table_expr, strict):
+        prefix, start, end = self.table_function_args(
+            table_expr, (tq_ast.ColumnId, None),
+            (None, tq_types.TIMESTAMP), (None, tq_types.TIMESTAMP))
+        if start is None or end is None:
+            raise exceptions.CompileError(
+                '{} requires non-null timestamps.'.format(
+                    table_expr.name.upper()))
+        # Since the date suffixes all have the same length, the shards in the
+        # range are exactly the names in the range, as long as they have a
+        # date suffix.
+        table_names = [
+            name for name in table_catalog.names_in_range(
+                self.tables_by_name,
+                prefix + start.strftime('%Y%m%d'),
+                prefix + end.strftime('%Y%m%d'))
+            if _SHARD_DATE_RE.match(name[len(prefix):])]
+        if strict:
+            found_names = set(table_names)
+            for day in range((end.date() - start.date()).days + 1):
+                name = prefix + (
+                    start + datetime.timedelta(days=day)).strftime('%Y%m%d')
+                if name not in found_names:
+                    raise exceptions.CompileError(
+                        'Table not found: {}'.format(name))
+        return table_names
+
+    def table_names_for_table_query(self, table_expr):
+        """Find the tables in a dataset matching a filter expression.
+
+        TABLE_QUERY(dataset, expr) evaluates the expression (given as a
+        string) against each table in the dataset, using metadata columns
+        like table_id, and selects the tables for which it is true.
+        """
+        from tinyquery import tinyquery  # TODO(colin): fix circular import
+        dataset, expr_text = self.table_function_args(
+            table_expr, (tq_ast.ColumnId, None),
+            (tq_ast.Literal, tq_types.STRING))
+        prefix = dataset + '.'
+        table_names = [
+            name for name in table_catalog.names_with_prefix(
+                self.tables_by_name, prefix)
+            if '.' not in name[len(prefix):]]
+
+        metadata_columns = collections.OrderedDict([
+            ('dataset_id', context.Column(
+                type=tq_types.STRING, mode=tq_modes.NULLABLE,
+                values=[dataset] * len(table_names))),
+            ('table_id', context.Column(
+                type=tq_types.STRING, mode=tq_modes.NULLABLE,
+                values=[name[len(prefix):] for name in table_names])),
+            ('row_count', context.Column(
+                type=tq_types.INT, mode=tq_modes.NULLABLE,
+                values=[getattr(self.tables_by_name[name], 'num_rows', None)
+                        for name in table_names])),
+            # 1 for tables and 2 for views, as in the __TABLES__ meta-table.
+            ('type', context.Column(
+                type=tq_types.INT, mode=tq_modes.NULLABLE,
+                values=[
+                    2 if isinstance(self.tables_by_name[name], tinyquery.View)
+                    else 1
+                    for name in table_names])),
+        ])
+        metadata_type_ctx = type_context.TypeContext.from_table_and_columns(
+            None, collections.OrderedDict(
+                (name, column.type)
+                for name, column in metadata_columns.items()))
+        try:
+            filter_ast = parser.parse_text('SELECT ' + expr_text)
+        except SyntaxError as e:
+            raise exceptions.CompileError(
+                'Invalid TABLE_QUERY expression {!r}: {}'.format(expr_text, e))
+        filter_expr = self.compile_filter_expr(
+            filter_ast.select_fields[0].expr, metadata_type_ctx)
+        metadata_context = context.Context(
+            len(table_names),
+            collections.OrderedDict(
+                ((None, name), column)
+                for name, column in metadata_columns.items()),
+            None)
+        mask = self.evaluator().evaluate_expr(filter_expr, metadata_context)
+        return [name for name, keep in zip(table_names, mask.values) if keep]
+
+    def table_function_args(self, table_expr, *arg_specs):
+        """Check the arguments of a table function and get their values.
+
+        Arguments:
+            table_expr: The tq_ast.TableFunction being compiled.
+            arg_specs: For each argument, a pair of the AST class that it must
+                be (or None for any constant expression), and the type that it
+                must have. ColumnId arguments are used for dataset and table
+                names, so they have no type, and their value is the name.
+
+        Returns: A list of argument values.
+        """
+        function_name = table_expr.name.upper()
+        if len(table_expr.args) != len(arg_specs):
+            raise exceptions.CompileError(
+                '{} expects {} arguments, but got {}.'.format(
+                    function_name, len(arg_specs), len(table_expr.args)))
+        result = []
+        for arg, (arg_class, arg_type) in zip(table_expr.args, arg_specs):
+            if arg_class is tq_ast.ColumnId:
+                if not isinstance(arg, tq_ast.ColumnId):
+                    raise exceptions.CompileError(
+                        'Expected a table name in {}, but got {}.'.format(
+                            function_name, arg))
+                result.append(arg.name)
+                continue
+            if arg_class is not None and not isinstance(arg, arg_class):
+                raise exceptions.CompileError(
+                    'Invalid argument to {}: {}'.format(function_name, arg))
+            empty_type_ctx = type_context.TypeContext.from_full_columns(
+                collections.OrderedDict())
+            compiled_arg = self.compile_expr(arg, empty_type_ctx)
+            if (arg_type == tq_types.TIMESTAMP and
+                    compiled_arg.type == tq_types.STRING):
+                compiled_arg = self.compile_expr(
+                    tq_ast.FunctionCall('timestamp', [arg]), empty_type_ctx)
+            if compiled_arg.type != arg_type:
+                raise exceptions.CompileError(
+                    'Expected a {} argument to {}, but got {}.'.format(
+                        arg_type, function_name, arg))
+            result.append(self.evaluator().evaluate_expr(
+                compiled_arg,
+                context.Context(1, collections.OrderedDict(), None)).values[0])
+        return result
+
+    def evaluator(self):
+        return evaluator.Evaluator(self.tables_by_name)
+
     def compile_table_expr_Join(self, table_expr):
         table_expressions = itertools.chain(
             [table_expr.base],
@@ -294,7 +567,7 @@ class Compiler(object):
         if table_expr.alias is not None:
             alias = table_expr.alias
         elif isinstance(table_expr, tq_ast.TableId):
-            alias = table_expr.name
+            alias, _ = self.split_table_decorator(table_expr.name)
         else:
             raise exceptions.CompileError(
                 'Table expression must have an alias name.')
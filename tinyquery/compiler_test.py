@@ -10,6 +10,7 @@ from tinyquery import exceptions
 from tinyquery import compiler
 from tinyquery import context
 from tinyquery import runtime
+from tinyquery import table_catalog
 from tinyquery import tinyquery
 from tinyquery import tq_ast
 from tinyquery import tq_modes
@@ -1011,3 +1012,34 @@ class CompilerTest(unittest.TestCase):
                 self.tables_by_name)
             self.assertTrue('WITHIN clause syntax error' in
                             str(context.exception))
+
+    def test_compiled_views_are_cached(self):
+        tables_by_name = table_catalog.TableCatalog(self.tables_by_name)
+        view = tinyquery.View('view', 'SELECT value FROM table1')
+        tables_by_name['view'] = view
+
+        def compile_view_select():
+            return compiler.compile_text(
+                'SELECT value FROM view v', tables_by_name).table
+
+        view_select = compile_view_select()
+        self.assertIs(view_select.select_fields,
+                      compile_view_select().select_fields)
+        # Any change to the tables means compiling the view again.
+        tables_by_name['table1'] = self.rainbow_table
+        with self.assertRaises(exceptions.CompileError):
+            compile_view_select()
+        tables_by_name['table1'] = self.table1
+        self.assertEqual(view_select, compile_view_select())
+        self.assertIsNot(view_select.select_fields,
+                         compile_view_select().select_fields)
+
+    def test_circular_views(self):
+        tables_by_name = table_catalog.TableCatalog(self.tables_by_name)
+        tables_by_name['view1'] = tinyquery.View(
+            'view1', 'SELECT value FROM view2')
+        tables_by_name['view2'] = tinyquery.View(
+            'view2', 'SELECT value FROM view1, table1')
+        with self.assertRaises(exceptions.CompileError) as cm:
+            compiler.compile_text('SELECT value FROM view1', tables_by_name)
+        self.assertIn('view1 -> view2 -> view1', str(cm.exception))
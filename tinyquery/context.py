@@ -66,19 +66,35 @@ class Column(collections.namedtuple('Column', ['type', 'mode', 'values'])):
     """
 
 
-def context_from_table(table, type_context):
+def context_from_table(table, type_context, row_ranges=None):
     """Given a table and a type context, build a context with those values.
 
     The order of the columns in the type context must match the order of the
     columns in the table.
+
+    If row_ranges is given, it's a list of (start, end) pairs, and only the
+    rows in those ranges are included. Otherwise, all rows are included and
+    the table's column values are used directly.
     """
-    any_column = table.columns[next(iter(table.columns))]
-    new_columns = collections.OrderedDict([
-        (column_name, column)
-        for (column_name, column) in zip(type_context.columns,
-                                         table.columns.values())
-    ])
-    return Context(len(any_column.values), new_columns, None)
+    if row_ranges is None:
+        any_column = table.columns[next(iter(table.columns))]
+        new_columns = collections.OrderedDict([
+            (column_name, column)
+            for (column_name, column) in zip(type_context.columns,
+                                             table.columns.values())
+        ])
+        return Context(len(any_column.values), new_columns, None)
+
+    new_columns = collections.OrderedDict()
+    for column_name, column in zip(type_context.columns,
+                                   table.columns.values()):
+        values = []
+        for start, end in row_ranges:
+            values.extend(column.values[start:end])
+        new_columns[column_name] = Column(type=column.type, mode=column.mode,
+                                          values=values)
+    num_rows = sum(end - start for start, end in row_ranges)
+    return Context(num_rows, new_columns, None)
 
 
 def context_with_overlayed_type_context(context, type_context):
@@ -253,6 +269,33 @@ def append_partial_context_to_context(src_context, dest_context):
             dest_column.values.extend(src_column_values)
 
 
+def union_member_context(src_context, type_context):
+    """Give the result of one table in a union the union's columns.
+
+    Columns are matched up by their short names, and any columns that the
+    table doesn't have are filled with nulls. The column values are shared
+    with src_context rather than copied.
+
+    Arguments:
+        src_context: The Context for one of the tables in the union.
+        type_context: The TypeContext of the whole union.
+    """
+    short_named_src_columns = {
+        col_name: column
+        for (_, col_name), column in src_context.columns.items()}
+    result_columns = collections.OrderedDict()
+    for column_key, col_type in type_context.columns.items():
+        src_column = short_named_src_columns.get(column_key[1])
+        if src_column is None:
+            values = [None] * src_context.num_rows
+        else:
+            values = src_column.values
+        # TODO(Samantha): Fix this. Mode is not always nullable
+        result_columns[column_key] = Column(
+            type=col_type, mode=tq_modes.NULLABLE, values=values)
+    return Context(src_context.num_rows, result_columns, None)
+
+
 def append_context_to_context(src_context, dest_context):
     """Adds all rows in src_context to dest_context.
 
@@ -279,7 +322,12 @@ def row_context_from_context(src_context, index):
     return Context(1, columns, None)
 
 
-def cross_join_contexts(context1, context2):
+def cross_join_contexts(context1, context2, checkpoint=None):
+    """Join every row of context1 with every row of context2.
+
+    If given, checkpoint is called before each row of context1 is joined, so
+    that it can stop a join that's taking too long by raising an exception.
+    """
     assert context1.aggregate_context is None
     assert context2.aggregate_context is None
     result_columns = collections.OrderedDict(
@@ -289,6 +337,8 @@ def cross_join_contexts(context1, context2):
          for col_name, col in context2.columns.items()])
 
     for index1 in six.moves.xrange(context1.num_rows):
+        if checkpoint is not None:
+            checkpoint()
         for index2 in six.moves.xrange(context2.num_rows):
             for col_name, column in context1.columns.items():
                 result_columns[col_name].values.append(column.values[index1])
@@ -3,64 +3,202 @@
 from __future__ import absolute_import
 
 import collections
+import functools
+import heapq
 
 import six
 
+from tinyquery import column_stats
 from tinyquery import context
+from tinyquery import memory
+from tinyquery import partitioning
+from tinyquery import profiling
+from tinyquery import query_plan
+from tinyquery import runtime
+from tinyquery import spill
 from tinyquery import tq_ast
 from tinyquery import tq_modes
 from tinyquery import typed_ast
 from tinyquery import tq_types
 
 
+# How many rows loops over rows process between cancellation checkpoints.
+CHECKPOINT_INTERVAL_ROWS = 1024
+
+
 class Evaluator(object):
-    def __init__(self, tables_by_name):
+    def __init__(self, tables_by_name, cancellation=None,
+                 plan_recorder=None, profiler=None, memory_tracker=None):
+        """Make an evaluator for queries over some tables.
+
+        Arguments:
+            tables_by_name: A dict-like object mapping table name to Table.
+            cancellation: An optional query_limits.CancellationToken. It's
+                checked at checkpoints in loops over rows, so that the query
+                can be stopped.
+            plan_recorder: An optional query_plan.PlanRecorder that has been
+                started on the query, to record the stats of each operator.
+            profiler: An optional profiling.Profiler to report the
+                evaluation of each table expression and function call to.
+            memory_tracker: An optional memory.MemoryTracker to count the
+                memory of the contexts made by each operator, and to enforce
+                its budget.
+        """
         self.tables_by_name = tables_by_name
+        self.cancellation = cancellation
+        self.plan_recorder = plan_recorder
+        self.profiler = profiler
+        self.memory_tracker = memory_tracker
+
+    def checkpoint(self):
+        """Raise a QueryAbortedError if the query has been stopped."""
+        if self.cancellation is not None:
+            self.cancellation.check()
+
+    def check_memory(self, num_bytes, description):
+        """Make sure there's room in the memory budget before using it."""
+        if self.memory_tracker is not None:
+            self.memory_tracker.check(num_bytes, description)
+
+    def spill_partition_count(self, num_bytes):
+        """Get how many partitions to split a hash table into, so that each
+        fits in the memory budget; see spill.partition_count.
+        """
+        if self.memory_tracker is None:
+            return 1
+        return spill.partition_count(num_bytes,
+                                     self.memory_tracker.available_bytes())
+
+    def run_operator(self, node, operator, func, *args):
+        """Run one of the operators of a query plan; see query_plan."""
+        if self.memory_tracker is not None:
+            func = functools.partial(self.memory_tracker.run,
+                                     query_plan.OPERATORS[operator][1], func)
+        if self.plan_recorder is None:
+            return func(*args)
+        return self.plan_recorder.run(node, operator, func, *args)
+
+    def run_table_expr(self, table_expr, method, *args):
+        """Evaluate a table expression with one of the eval_table_ methods.
+
+        The evaluation is recorded in the query plan and the profile, if
+        there are any.
+        """
+        if self.profiler is not None:
+            method = functools.partial(
+                self.profiler.run, profiling.TABLE_EXPR,
+                getattr(table_expr, 'name', table_expr.__class__.__name__),
+                _context_num_rows, method)
+        operator = query_plan.TABLE_EXPR_OPERATORS.get(
+            table_expr.__class__.__name__)
+        if operator is None:
+            return method(*args)
+        return self.run_operator(table_expr, operator, method, *args)
 
     def evaluate_select(self, select_ast):
         """Given a select statement, return a Context with the results."""
         assert isinstance(select_ast, typed_ast.Select)
+        if self.memory_tracker is not None:
+            # The intermediate results of the select are kept until it's
+            # done.
+            return self.memory_tracker.run('SELECT', self.evaluate_select_ops,
+                                           select_ast)
+        return self.evaluate_select_ops(select_ast)
 
-        table_context = self.evaluate_table_expr(select_ast.table)
-        mask_column = self.evaluate_expr(select_ast.where_expr, table_context)
-        select_context = context.mask_context(table_context, mask_column)
+    def evaluate_select_ops(self, select_ast):
+        """Run each of the operators of a select."""
+
+        select_context = self.evaluate_filtered_table_expr(
+            select_ast.table, select_ast.where_expr)
 
         if select_ast.group_set is not None:
-            num_scoped_agg = sum(
-                select_field.within_clause is not None
-                for select_field in select_ast.select_fields)
-            if num_scoped_agg == 1:
-                for select_field in select_ast.select_fields:
-                    if select_field.within_clause is not None:
-                        # TODO: Extend the functionality of scoped aggregation
-                        # for multiple fields
-                        result = self.evaluate_within(
-                            select_ast.select_fields, select_ast.group_set,
-                            select_context, select_field.within_clause)
-                        break
-            elif num_scoped_agg > 1:
-                raise NotImplementedError('Multiple fields having "WITHIN" '
-                                          'clause is not supported as yet.')
-            else:
-                result = self.evaluate_groups(
-                        select_ast.select_fields, select_ast.group_set,
-                        select_context)
+            result = self.run_operator(
+                select_ast, 'aggregate', self.evaluate_select_groups,
+                select_ast, select_context)
         else:
-            result = self.evaluate_select_fields(
+            result = self.run_operator(
+                select_ast, 'compute', self.evaluate_select_fields,
                 select_ast.select_fields, select_context)
 
-        having_mask = self.evaluate_expr(select_ast.having_expr, result)
-        result = context.mask_context(result, having_mask)
+        result = self.run_operator(select_ast, 'having', self.filter_context,
+                                   select_ast.having_expr, result)
 
         if select_ast.orderings is not None:
-            result = self.evaluate_orderings(select_context, result,
-                                             select_ast.orderings,
-                                             select_ast.select_fields)
+            self.checkpoint()
+            result = self.run_operator(
+                select_ast, 'sort', self.evaluate_orderings, select_context,
+                result, select_ast.orderings, select_ast.select_fields)
 
         if select_ast.limit is not None:
-            context.truncate_context(result, select_ast.limit)
+            result = self.run_operator(select_ast, 'limit',
+                                       self.truncate_context, result,
+                                       select_ast.limit)
         return result
 
+    def evaluate_select_groups(self, select_ast, select_context):
+        """Evaluate the fields of a select with a GROUP BY."""
+        num_scoped_agg = sum(
+            select_field.within_clause is not None
+            for select_field in select_ast.select_fields)
+        if num_scoped_agg == 1:
+            for select_field in select_ast.select_fields:
+                if select_field.within_clause is not None:
+                    # TODO: Extend the functionality of scoped aggregation
+                    # for multiple fields
+                    result = self.evaluate_within(
+                        select_ast.select_fields, select_ast.group_set,
+                        select_context, select_field.within_clause)
+                    break
+        elif num_scoped_agg > 1:
+            raise NotImplementedError('Multiple fields having "WITHIN" '
+                                      'clause is not supported as yet.')
+        else:
+            result = self.evaluate_groups(
+                    select_ast.select_fields, select_ast.group_set,
+                    select_context)
+        return result
+
+    def filter_context(self, filter_expr, ctx):
+        """Get a Context with only the rows matching a filter."""
+        mask_column = self.evaluate_expr(filter_expr, ctx)
+        self.checkpoint()
+        return context.mask_context(ctx, mask_column)
+
+    @staticmethod
+    def truncate_context(ctx, limit):
+        context.truncate_context(ctx, limit)
+        return ctx
+
+    def evaluate_filtered_table_expr(self, table_expr, filter_expr):
+        """Evaluate a table expression, keeping only rows matching a filter.
+
+        Scans of stored tables use the filter to skip chunks of rows that
+        can't match. Unions are filtered one member at a time, so only the
+        matching rows of each member are ever copied into the result.
+        """
+        if isinstance(table_expr, typed_ast.TableUnion):
+            return self.run_operator(table_expr, 'union',
+                                     self.eval_filtered_union, table_expr,
+                                     filter_expr)
+
+        if isinstance(table_expr, typed_ast.Table):
+            table_context = self.run_table_expr(
+                table_expr, self.eval_table_Table, table_expr, filter_expr)
+        else:
+            table_context = self.evaluate_table_expr(table_expr)
+        return self.run_operator(filter_expr, 'where', self.filter_context,
+                                 filter_expr, table_context)
+
+    def eval_filtered_union(self, table_expr, filter_expr):
+        result_context = context.empty_context_from_type_context(
+            table_expr.type_ctx)
+        for member_context in self.iter_union_member_contexts(
+                table_expr, filter_expr):
+            context.append_context_to_context(
+                self.filter_context(filter_expr, member_context),
+                result_context)
+        return result_context
+
     def evaluate_groups(self, select_fields, group_set, select_context):
         """Evaluate a list of select fields, grouping by some of the values.
 
@@ -87,10 +225,14 @@ class Evaluator(object):
         alias_group_result_context = self.evaluate_select_fields(
             group_key_select_fields, select_context)
 
-        # Dictionary mapping (singleton) group key context to the context of
-        # values for that key.
-        from collections import OrderedDict
-        group_contexts = OrderedDict()
+        # The columns with the values of the group keys. Each group key is a
+        # tuple of the values in a row of these columns.
+        key_columns = self.get_group_key_columns(
+            field_groups, alias_group_list, select_context,
+            alias_group_result_context)
+
+        # Dictionary mapping group key to the context of values for that key.
+        group_contexts = collections.OrderedDict()
 
         # As a special case, we check if we are grouping by nothing (in other
         # words, if the query had an aggregate without any explicit GROUP BY).
@@ -104,27 +246,104 @@ class Evaluator(object):
         # In the long run, it might be cleaner to view TRIVIAL_GROUP_SET as a
         # completely separate case, but this approach should work.
         if group_set == typed_ast.TRIVIAL_GROUP_SET:
-            trivial_ctx = context.Context(1, collections.OrderedDict(), None)
-            group_contexts[trivial_ctx] = (
+            group_contexts[()] = (
                 context.empty_context_from_template(select_context))
 
-        # TODO: Seems pretty ugly and wasteful to use a whole context as a
-        # group key.
-        for i in six.moves.xrange(select_context.num_rows):
-            key = self.get_group_key(
-                field_groups, alias_group_list, select_context,
-                alias_group_result_context, i)
+        def keyed_rows():
+            for i in six.moves.xrange(select_context.num_rows):
+                yield (tuple(column.values[i]
+                             for column in key_columns.values()), i)
+
+        result_context = self.empty_context_from_select_fields(select_fields)
+        result_col_names = [field.alias for field in select_fields]
+
+        # Each row is copied into the context of its group. If that wouldn't
+        # fit in the memory budget, the rows are split into partitions by
+        # the hash of their group keys, and each partition is grouped on its
+        # own. All the rows of the trivial group set are in one group, so
+        # there's no splitting them.
+        group_bytes = memory.context_num_bytes(select_context)
+        num_partitions = 1
+        if group_set != typed_ast.TRIVIAL_GROUP_SET:
+            num_partitions = self.spill_partition_count(group_bytes)
+        if num_partitions == 1:
+            self.check_memory(group_bytes, 'GROUP BY')
+            self.group_rows(keyed_rows(), select_context, group_contexts)
+            self.evaluate_group_contexts(
+                aggregate_select_fields, result_col_names, key_columns,
+                group_contexts, result_context)
+            return result_context
+
+        # The result rows of each partition are written to a SpillFile as a
+        # run of (first row index, row values) pairs, and the runs are merged
+        # in the order of the first rows of their groups, like they would be
+        # without partitioning. That way, only one partition's results are
+        # in memory at once, on top of the final result.
+        with spill.SpillFile() as spill_file:
+            run_offsets = []
+            for partition in spill.iter_partitions(keyed_rows(),
+                                                   num_partitions):
+                partition_group_contexts = collections.OrderedDict()
+                first_row_indexes = self.group_rows(
+                    partition, select_context, partition_group_contexts)
+                del partition
+                partition_result_context = (
+                    self.empty_context_from_select_fields(select_fields))
+                self.evaluate_group_contexts(
+                    aggregate_select_fields, result_col_names, key_columns,
+                    partition_group_contexts, partition_result_context)
+                del partition_group_contexts
+                result_columns = list(
+                    partition_result_context.columns.values())
+                run_offsets.append(spill_file.write_run(
+                    (first_row_index,
+                     tuple(column.values[j] for column in result_columns))
+                    for j, first_row_index in enumerate(first_row_indexes)))
+            result_columns = list(result_context.columns.values())
+            for _, row in heapq.merge(*[spill_file.read_run(offsets)
+                                        for offsets in run_offsets]):
+                result_context.num_rows += 1
+                for column, value in zip(result_columns, row):
+                    column.values.append(value)
+        return result_context
+
+    def group_rows(self, keyed_rows, select_context, group_contexts):
+        """Copy rows into the contexts of their groups.
+
+        Arguments:
+            keyed_rows: An iterable of (group key, row index) pairs for the
+                rows of select_context to group.
+            select_context: The context with the rows.
+            group_contexts: An OrderedDict mapping group key to the context of
+                the group's rows, which new groups are added to.
+
+        Returns: The index of the first row of each new group, in order.
+        """
+        first_row_indexes = []
+        for count, (key, i) in enumerate(keyed_rows):
+            if count % CHECKPOINT_INTERVAL_ROWS == 0:
+                self.checkpoint()
             if key not in group_contexts:
                 new_group_context = context.empty_context_from_template(
                     select_context)
                 group_contexts[key] = new_group_context
+                first_row_indexes.append(i)
             group_context = group_contexts[key]
             context.append_row_to_context(src_context=select_context, index=i,
                                           dest_context=group_context)
+        return first_row_indexes
 
-        result_context = self.empty_context_from_select_fields(select_fields)
-        result_col_names = [field.alias for field in select_fields]
-        for context_key, group_context in group_contexts.items():
+    def evaluate_group_contexts(self, aggregate_select_fields,
+                                result_col_names, key_columns, group_contexts,
+                                result_context):
+        """Evaluate the aggregates of each group, adding a row for each group
+        to result_context.
+        """
+        for group_num, (key, group_context) in enumerate(
+                group_contexts.items()):
+            if group_num % CHECKPOINT_INTERVAL_ROWS == 0:
+                self.checkpoint()
+            context_key = self.get_group_key_context(key_columns, key)
             group_eval_context = context.Context(
                 1, context_key.columns, group_context)
             group_aggregate_result_context = self.evaluate_select_fields(
@@ -133,7 +352,6 @@ class Evaluator(object):
                 result_col_names, group_aggregate_result_context, context_key)
             context.append_row_to_context(full_result_row_context, 0,
                                           result_context)
-        return result_context
 
     def evaluate_orderings(self, overall_context, select_context,
                            ordering_col, select_fields):
@@ -192,23 +410,28 @@ class Evaluator(object):
                 ):
                     sort_by_indexes[count] = order_by_column.is_ascending
                     break
-        reversed_sort_by_indexes = collections.OrderedDict(
-            reversed(list(sort_by_indexes.items())))
-
-        t_all_values = [list(z) for z in zip(*all_values)]
-        for index, is_ascending in reversed_sort_by_indexes.items():
-            t_all_values.sort(key=lambda x: (x[index]),
-                              reverse=not is_ascending)
-        ordered_values = [list(z) for z in zip(*t_all_values)]
-        # If we started evaluating an ordering over 0 rows,
-        # all_values was originally [[], [], [], ...], i.e. the empty list for
-        # each column, but now ordered_values is just the empty list, since
-        # when going to a list of rows, we lost any notion of how many columns
-        # there were.  In that case, we just set back to all_values, since
-        # there isn't any data to order by anyway.
-        # TODO(colin): can we exit early if there's no data to order?
-        if len(t_all_values) == 0:
-            ordered_values = all_values
+        key_columns = [(all_values[index], is_ascending)
+                       for index, is_ascending in sort_by_indexes.items()]
+
+        # The rows are sorted by index, and then the values are copied into
+        # columns in the new order. If the sort wouldn't fit in the memory
+        # budget, it's done in runs that are merged from disk.
+        num_rows = overall_context.num_rows
+        output_bytes = memory.context_num_bytes(overall_context)
+        self.check_memory(output_bytes, 'ORDER BY')
+        entry_bytes = spill.sort_entry_num_bytes(len(key_columns))
+        max_run_rows = None
+        if (self.memory_tracker is not None and
+                not self.memory_tracker.fits(output_bytes +
+                                             num_rows * entry_bytes)):
+            max_run_rows = max(
+                (self.memory_tracker.available_bytes() - output_bytes) //
+                entry_bytes,
+                spill.MIN_RUN_NUM_ROWS)
+        row_indexes = spill.sorted_row_indexes(
+            key_columns, num_rows, max_run_rows, self.checkpoint)
+        ordered_values = [[values[index] for index in row_indexes]
+                          for values in all_values]
 
         for key in select_context.columns:
             for count, overall_column_identifier_pair in (
@@ -251,12 +474,12 @@ class Evaluator(object):
             for col_key in col_keys
         ), None)
 
-    def get_group_key(self, field_groups, alias_groups, select_context,
-                      alias_group_result_context, index):
-        """Computes a singleton context with the values for a group key.
+    def get_group_key_columns(self, field_groups, alias_groups,
+                              select_context, alias_group_result_context):
+        """Get the columns holding the values of the group keys.
 
         The evaluation has already been done; this method just selects the
-        values out of the right contexts.
+        columns out of the right contexts.
 
         Arguments:
             field_groups: A list of ColumnRefs for the field groups to use.
@@ -265,23 +488,35 @@ class Evaluator(object):
                 being selected from.
             alias_group_result_context: A context with the data for the
                 grouped-by select fields.
-            index: The row index to use from each context.
+
+        Returns: An OrderedDict mapping the column key of each group key
+            column to the Column it's selected from.
         """
-        result_columns = collections.OrderedDict()
+        key_columns = collections.OrderedDict()
         for field_group in field_groups:
             column_key = (field_group.table, field_group.column)
-            source_column = select_context.columns[column_key]
-            result_columns[column_key] = context.Column(
-                # TODO(Samantha): This shouldn't just be nullable.
-                type=source_column.type, mode=tq_modes.NULLABLE,
-                values=[source_column.values[index]])
+            key_columns[column_key] = select_context.columns[column_key]
         for alias_group in alias_groups:
             column_key = (None, alias_group)
-            source_column = alias_group_result_context.columns[column_key]
+            key_columns[column_key] = (
+                alias_group_result_context.columns[column_key])
+        return key_columns
+
+    def get_group_key_context(self, key_columns, key):
+        """Computes a singleton context with the values for a group key.
+
+        Arguments:
+            key_columns: The columns of the group keys, as from
+                get_group_key_columns.
+            key: A tuple of the values of a group key.
+        """
+        result_columns = collections.OrderedDict()
+        for (column_key, source_column), value in zip(key_columns.items(),
+                                                      key):
             result_columns[column_key] = context.Column(
                 # TODO(Samantha): This shouldn't just be nullable.
                 type=source_column.type, mode=tq_modes.NULLABLE,
-                values=[source_column.values[index]])
+                values=[value])
         return context.Context(1, result_columns, None)
 
     def empty_context_from_select_fields(self, select_fields):
@@ -375,82 +610,358 @@ class Evaluator(object):
             raise NotImplementedError(
                 'Missing handler for table type {}'.format(
                     table_expr.__class__.__name__))
-        return method(table_expr)
+        return self.run_table_expr(table_expr, method, table_expr)
 
     def eval_table_NoTable(self, table_expr):
         # If the user isn't selecting from any tables, just specify that there
         # is one column to return and no table accessible.
         return context.Context(1, collections.OrderedDict(), None)
 
-    def eval_table_Table(self, table_expr):
+    def eval_table_Table(self, table_expr, filter_expr=None,
+                         filter_columns=None):
         """Get the values from the table.
 
         The type context in the table expression determines the actual column
         names to output, since that accounts for any alias on the table.
+
+        If a filter expression is given, chunks of the table whose column
+        stats show that the filter can't be true are left out. The filter
+        still needs to be applied to the result.
+
+        filter_columns optionally maps the (table, column) keys used by the
+        filter to column names in the table, for filters written against
+        some other type context (like the type context of a union). By
+        default, the filter is expected to use the table expression's keys.
         """
+        from tinyquery import tinyquery  # TODO(colin): fix circular import
         table = self.tables_by_name[table_expr.name]
-        return context.context_from_table(table, table_expr.type_ctx)
+        if isinstance(table, tinyquery.PartitionedTable):
+            return self.eval_partitioned_table(table, table_expr,
+                                               filter_expr, filter_columns)
+        # Check the row count first, so that stats are only computed for
+        # tables that could actually be pruned.
+        if filter_expr is None or table.num_rows <= table.chunk_size:
+            return context.context_from_table(table, table_expr.type_ctx)
+        chunks = table.chunks
+
+        if filter_columns is None:
+            filter_columns = dict(
+                zip(table_expr.type_ctx.columns, table.columns))
+        pruner = column_stats.ChunkPruner(filter_expr, filter_columns)
+        row_ranges = [(chunk.start, chunk.end) for chunk in chunks
+                      if pruner.chunk_may_match(chunk)]
+        if len(row_ranges) == len(chunks):
+            return context.context_from_table(table, table_expr.type_ctx)
+        return context.context_from_table(table, table_expr.type_ctx,
+                                          row_ranges)
+
+    def eval_partitioned_table(self, table, table_expr, filter_expr,
+                               filter_columns=None):
+        """Read the partitions of a partitioned table.
+
+        Only the partitions selected by a decorator are read (or all of them
+        if there was no decorator), and any chunks of those partitions that
+        can't match the filter are skipped. Filters on the _PARTITIONTIME
+        pseudo-column are handled the same way as filters on any other
+        column, since all rows of a partition have the same partition time.
+        """
+        type_ctx = table_expr.type_ctx
+        partition_time_key = next(
+            key for key in type_ctx.implicit_column_context.columns
+            if key[1] == partitioning.PARTITION_TIME_COLUMN)
+        if filter_columns is not None:
+            stats_key_by_column = filter_columns
+        else:
+            stats_key_by_column = dict(zip(type_ctx.columns, table.schema))
+            stats_key_by_column[partition_time_key] = (
+                partitioning.PARTITION_TIME_COLUMN)
+        pruner = None
+        if filter_expr is not None:
+            pruner = column_stats.ChunkPruner(filter_expr,
+                                              stats_key_by_column)
+
+        result_values = collections.OrderedDict(
+            (column_key, []) for column_key in type_ctx.columns)
+        partition_times = []
+        if table_expr.partition_ids is None:
+            partition_ids = table.partition_ids()
+        else:
+            partition_ids = [partition_id
+                             for partition_id in table_expr.partition_ids
+                             if partition_id in table.partitions]
+        for partition_id in partition_ids:
+            partition = table.partitions[partition_id]
+            partition_time = partitioning.partition_time(partition_id)
+            # Without a filter, there's no need for the partition's stats.
+            chunks = (partition.chunks if pruner is not None else
+                      [column_stats.TableChunk(0, partition.num_rows, {})])
+            for chunk in chunks:
+                if pruner is not None:
+                    chunk_stats = dict(chunk.column_stats)
+                    chunk_stats[partitioning.PARTITION_TIME_COLUMN] = (
+                        column_stats.ColumnStats(
+                            min_value=partition_time,
+                            max_value=partition_time,
+                            null_count=0,
+                            num_values=chunk.num_rows))
+                    if not pruner.chunk_may_match(column_stats.TableChunk(
+                            chunk.start, chunk.end, chunk_stats)):
+                        continue
+                for column_key, column in zip(type_ctx.columns,
+                                              partition.columns.values()):
+                    result_values[column_key].extend(
+                        column.values[chunk.start:chunk.end])
+                partition_times.extend([partition_time] * chunk.num_rows)
+
+        result_columns = collections.OrderedDict(
+            (column_key, context.Column(type=column.type, mode=column.mode,
+                                        values=result_values[column_key]))
+            for column_key, column in zip(type_ctx.columns,
+                                          table.schema.values()))
+        result_columns[partition_time_key] = context.Column(
+            type=tq_types.TIMESTAMP, mode=tq_modes.NULLABLE,
+            values=partition_times)
+        return context.Context(len(partition_times), result_columns, None)
 
     def eval_table_TableUnion(self, table_expr):
         result_context = context.empty_context_from_type_context(
             table_expr.type_ctx)
-        for table in table_expr.tables:
-            table_result = self.evaluate_table_expr(table)
-            context.append_partial_context_to_context(table_result,
-                                                      result_context)
+        for member_context in self.iter_union_member_contexts(table_expr):
+            context.append_context_to_context(member_context, result_context)
         return result_context
 
+    def iter_union_member_contexts(self, table_expr, filter_expr=None):
+        """Evaluate the tables in a union one at a time.
+
+        Each yielded context has the columns of the union's type context (see
+        context.union_member_context), so it can be filtered or appended to
+        the union's result directly. Only one member is evaluated at a time,
+        so the caller can discard each one before moving on to the next.
+
+        If a filter expression written against the union's type context is
+        given, it is used to skip chunks of stored tables, but still needs to
+        be applied to each yielded context.
+        """
+        for table in table_expr.tables:
+            if isinstance(table, typed_ast.Table) and filter_expr is not None:
+                column_names = set(
+                    col_name for _, col_name in table.type_ctx.columns)
+                filter_columns = {
+                    column_key: column_key[1]
+                    for column_key in table_expr.type_ctx.columns
+                    if column_key[1] in column_names}
+                table_result = self.run_table_expr(
+                    table, self.eval_table_Table, table, filter_expr,
+                    filter_columns)
+            else:
+                table_result = self.evaluate_table_expr(table)
+            yield context.union_member_context(table_result,
+                                               table_expr.type_ctx)
+
     def eval_table_Join(self, table_expr):
         base_context = self.evaluate_table_expr(table_expr.base)
         rhs_tables, join_types = zip(*table_expr.tables)
         other_contexts = [self.evaluate_table_expr(x) for x in rhs_tables]
 
         lhs_context = base_context
+        lhs_table = table_expr.base
 
-        for rhs_context, join_type, conditions in zip(other_contexts,
-                                                      join_types,
-                                                      table_expr.conditions):
+        for rhs_table, rhs_context, join_type, conditions in zip(
+                rhs_tables, other_contexts, join_types, table_expr.conditions):
 
             if join_type is tq_ast.JoinType.CROSS:
+                self.check_memory(
+                    lhs_context.num_rows * rhs_context.num_rows *
+                    (memory.row_num_bytes(lhs_context) +
+                     memory.row_num_bytes(rhs_context)), 'CROSS JOIN')
                 lhs_context = context.cross_join_contexts(
-                    lhs_context, rhs_context)
+                    lhs_context, rhs_context, checkpoint=self.checkpoint)
+                lhs_table = None
                 continue
 
             # We reordered the join conditions in the compilation step, so
             # column1 always refers to the lhs of the current join.
             lhs_key_refs = [cond.column1 for cond in conditions]
             rhs_key_refs = [cond.column2 for cond in conditions]
-            rhs_key_contexts = {}
-            for i in six.moves.xrange(rhs_context.num_rows):
-                rhs_key = self.get_join_key(rhs_context, rhs_key_refs, i)
-                if rhs_key not in rhs_key_contexts:
-                    rhs_key_contexts[rhs_key] = (
-                        context.empty_context_from_template(rhs_context))
-                context.append_row_to_context(
-                    src_context=rhs_context, index=i,
-                    dest_context=rhs_key_contexts[rhs_key])
-
-            result_context = context.cross_join_contexts(
-                context.empty_context_from_template(lhs_context),
-                context.empty_context_from_template(rhs_context))
-
-            for i in six.moves.xrange(lhs_context.num_rows):
-                lhs_key = self.get_join_key(lhs_context, lhs_key_refs, i)
-                lhs_row_context = context.row_context_from_context(
-                    lhs_context, i)
-                if lhs_key in rhs_key_contexts:
-                    new_rows = context.cross_join_contexts(
-                        lhs_row_context, rhs_key_contexts[lhs_key])
-                    context.append_context_to_context(new_rows, result_context)
-                elif join_type is tq_ast.JoinType.LEFT_OUTER:
-                    # For a left outer join, we still want to in a row with
-                    # nulls on the right.
-                    context.append_context_to_context(lhs_row_context,
-                                                      result_context)
-            lhs_context = result_context
+
+            if self.join_keys_disjoint(lhs_table, lhs_key_refs,
+                                       rhs_table, rhs_key_refs):
+                # The column stats prove that no keys match, so there's no
+                # need to hash either side.
+                row_pairs = []
+            elif rhs_context.num_rows <= lhs_context.num_rows:
+                row_pairs = self.hash_join_row_pairs(
+                    lhs_context, lhs_key_refs, rhs_context, rhs_key_refs)
+            else:
+                # Build the hash table on the smaller side, then put the
+                # matches back in the order of the lhs.
+                row_pairs = sorted(
+                    (lhs_index, rhs_index)
+                    for rhs_index, lhs_index in self.hash_join_row_pairs(
+                        rhs_context, rhs_key_refs, lhs_context, lhs_key_refs))
+
+            if join_type is tq_ast.JoinType.LEFT_OUTER:
+                row_pairs = self.add_unmatched_lhs_rows(
+                    row_pairs, lhs_context.num_rows)
+
+            self.checkpoint()
+            self.check_memory(
+                len(row_pairs) * (memory.row_num_bytes(lhs_context) +
+                                  memory.row_num_bytes(rhs_context)),
+                str(join_type))
+            lhs_context = self.context_from_join_row_pairs(
+                lhs_context, rhs_context, row_pairs)
+            lhs_table = None
 
         return lhs_context
 
+    def join_keys_disjoint(self, lhs_table, lhs_key_refs, rhs_table,
+                           rhs_key_refs):
+        """Use table stats to check if two sides of a join can't match.
+
+        This is only possible when both sides are stored tables; otherwise we
+        return False.
+        """
+        if not (isinstance(lhs_table, typed_ast.Table) and
+                isinstance(rhs_table, typed_ast.Table)):
+            return False
+        for lhs_ref, rhs_ref in zip(lhs_key_refs, rhs_key_refs):
+            lhs_stats = self.table_column_stats(lhs_table, lhs_ref)
+            rhs_stats = self.table_column_stats(rhs_table, rhs_ref)
+            if lhs_stats is None or rhs_stats is None:
+                continue
+            if lhs_stats.num_values == 0 or rhs_stats.num_values == 0:
+                return True
+            if not (lhs_stats.has_range and rhs_stats.has_range):
+                continue
+            try:
+                if (lhs_stats.max_value < rhs_stats.min_value or
+                        rhs_stats.max_value < lhs_stats.min_value):
+                    return True
+            except TypeError:
+                continue
+        return False
+
+    def table_column_stats(self, table_expr, column_ref):
+        """Get the whole-table ColumnStats for a column of a table expression.
+
+        Returns None if the stats aren't usable for joining, which happens for
+        repeated columns.
+        """
+        table = self.tables_by_name[table_expr.name]
+        col_names = dict(zip(table_expr.type_ctx.columns, table.columns))
+        col_name = col_names.get((column_ref.table, column_ref.column))
+        if (col_name is None or
+                table.columns[col_name].mode == tq_modes.REPEATED):
+            return None
+        return table.column_stats(col_name)
+
+    def hash_join_row_pairs(self, probe_context, probe_key_refs,
+                            build_context, build_key_refs):
+        """Find the pairs of rows that match in an equi-join.
+
+        A hash table is built on build_context (which should be the smaller
+        side), then probed with each row of probe_context.
+
+        If the hash table wouldn't fit in the memory budget, both sides are
+        split into partitions by the hash of their keys (with spill), and
+        each pair of partitions is joined on its own: a grace hash join.
+
+        Returns: A list of (probe row index, build row index) pairs, sorted.
+        """
+        probe_keys = self.get_join_keys(probe_context, probe_key_refs)
+        build_keys = self.get_join_keys(build_context, build_key_refs)
+        num_partitions = self.spill_partition_count(
+            build_context.num_rows *
+            spill.hash_entry_num_bytes(len(build_key_refs)))
+        if num_partitions == 1:
+            return self.match_join_keys(
+                six.moves.zip(probe_keys, six.moves.xrange(len(probe_keys))),
+                six.moves.zip(build_keys, six.moves.xrange(len(build_keys))))
+
+        partition_row_pairs = [
+            self.match_join_keys(probe_partition, build_partition)
+            for probe_partition, build_partition in six.moves.zip(
+                spill.iter_partitions(
+                    ((key, i) for i, key in enumerate(probe_keys)),
+                    num_partitions),
+                spill.iter_partitions(
+                    ((key, i) for i, key in enumerate(build_keys)),
+                    num_partitions))]
+        return list(heapq.merge(*partition_row_pairs))
+
+    def match_join_keys(self, probe_rows, build_rows):
+        """Find the pairs of rows with matching join keys.
+
+        Like in BigQuery, a NULL never equals anything, so keys with a NULL
+        in them never match. This is what makes it safe for
+        join_keys_disjoint to only look at the range of the non-null values.
+
+        Arguments:
+            probe_rows: An iterable of (key, row index) pairs, in row order.
+            build_rows: An iterable of (key, row index) pairs, in row order,
+                which a hash table is built from.
+
+        Returns: A list of (probe row index, build row index) pairs, sorted.
+        """
+        build_rows_by_key = {}
+        for count, (key, i) in enumerate(build_rows):
+            if count % CHECKPOINT_INTERVAL_ROWS == 0:
+                self.checkpoint()
+            if None not in key:
+                build_rows_by_key.setdefault(key, []).append(i)
+
+        row_pairs = []
+        for count, (key, i) in enumerate(probe_rows):
+            if count % CHECKPOINT_INTERVAL_ROWS == 0:
+                self.checkpoint()
+            for j in build_rows_by_key.get(key, ()):
+                row_pairs.append((i, j))
+        return row_pairs
+
+    @staticmethod
+    def add_unmatched_lhs_rows(row_pairs, lhs_num_rows):
+        """Add (index, None) for lhs rows without a match in a LEFT join.
+
+        The row pairs must be sorted, and the result is also sorted.
+        """
+        result = []
+        pair_index = 0
+        for lhs_index in six.moves.xrange(lhs_num_rows):
+            if (pair_index < len(row_pairs) and
+                    row_pairs[pair_index][0] == lhs_index):
+                while (pair_index < len(row_pairs) and
+                       row_pairs[pair_index][0] == lhs_index):
+                    result.append(row_pairs[pair_index])
+                    pair_index += 1
+            else:
+                # For a left outer join, we still want to include a row with
+                # nulls on the right.
+                result.append((lhs_index, None))
+        return result
+
+    @staticmethod
+    def context_from_join_row_pairs(lhs_context, rhs_context, row_pairs):
+        """Build the result of a join from (lhs index, rhs index) pairs.
+
+        An rhs index of None means that the rhs columns should be null.
+        """
+        result_columns = collections.OrderedDict()
+        lhs_indices = [i for i, _ in row_pairs]
+        rhs_indices = [j for _, j in row_pairs]
+        for col_name, col in lhs_context.columns.items():
+            values = col.values
+            result_columns[col_name] = context.Column(
+                type=col.type, mode=col.mode,
+                values=[values[i] for i in lhs_indices])
+        for col_name, col in rhs_context.columns.items():
+            values = col.values
+            result_columns[col_name] = context.Column(
+                type=col.type, mode=col.mode,
+                values=[None if j is None else values[j]
+                        for j in rhs_indices])
+        return context.Context(len(row_pairs), result_columns, None)
+
     def get_join_key(self, table_context, key_column_refs, index):
         """Get the join key for a row in a table that is part of a join.
 
@@ -472,6 +983,14 @@ class Evaluator(object):
             table_context.column_from_ref(col_ref).values[index]
             for col_ref in key_column_refs)
 
+    def get_join_keys(self, table_context, key_column_refs):
+        """Get the join keys for every row in a table, in order."""
+        key_columns = [table_context.column_from_ref(col_ref).values
+                       for col_ref in key_column_refs]
+        if not key_columns:
+            return [()] * table_context.num_rows
+        return list(zip(*key_columns))
+
     def eval_table_Select(self, table_expr):
         """Evaluate a select table expression.
 
@@ -495,6 +1014,12 @@ class Evaluator(object):
     def evaluate_FunctionCall(self, func_call, context):
         arg_results = [self.evaluate_expr(arg, context)
                        for arg in func_call.args]
+        self.checkpoint()
+        if self.profiler is not None:
+            return self.profiler.run(
+                profiling.FUNCTION, _func_name(func_call.func),
+                _column_num_rows, func_call.func.evaluate, context.num_rows,
+                *arg_results)
         return func_call.func.evaluate(context.num_rows, *arg_results)
 
     def evaluate_AggregateFunctionCall(self, func_call, context):
@@ -504,6 +1029,12 @@ class Evaluator(object):
             'Aggregate function called without a valid aggregate context.')
         arg_results = [self.evaluate_expr(arg, context.aggregate_context)
                        for arg in func_call.args]
+        self.checkpoint()
+        if self.profiler is not None:
+            return self.profiler.run(
+                profiling.AGGREGATE_FUNCTION, _func_name(func_call.func),
+                _column_num_rows, func_call.func.evaluate, context.num_rows,
+                *arg_results)
         return func_call.func.evaluate(context.num_rows, *arg_results)
 
     def evaluate_Literal(self, literal, context_object):
@@ -514,3 +1045,15 @@ class Evaluator(object):
 
     def evaluate_ColumnRef(self, column_ref, ctx):
         return ctx.columns[(column_ref.table, column_ref.column)]
+
+
+def _func_name(func):
+    return runtime.get_func_name(func) or func.__class__.__name__
+
+
+def _column_num_rows(column):
+    return len(column.values)
+
+
+def _context_num_rows(ctx):
+    return ctx.num_rows
@@ -534,6 +534,23 @@ class EvaluatorTest(unittest.TestCase):
             self.make_context([('f0_', tq_types.INT, [6, 10, 4])])
         )
 
+    def test_where_skips_chunks(self):
+        self.tq.load_table_or_view(tinyquery.Table(
+            'chunked_table',
+            6,
+            collections.OrderedDict([
+                ('val', context.Column(type=tq_types.INT,
+                                       mode=tq_modes.NULLABLE,
+                                       values=[1, 2, 3, 4, 5, 6])),
+            ]),
+            chunk_size=2))
+        with mock.patch.object(context, 'context_from_table',
+                               wraps=context.context_from_table) as ctx_fn:
+            self.assert_query_result(
+                'SELECT val FROM chunked_table WHERE val > 2 AND val <= 4',
+                self.make_context([('val', tq_types.INT, [3, 4])]))
+        self.assertEqual([(2, 4)], ctx_fn.call_args[0][2])
+
     def test_where_multiple_repeated(self):
         self.assert_query_result(
             'SELECT i_clone '
@@ -584,6 +601,12 @@ class EvaluatorTest(unittest.TestCase):
             self.make_context([
                 ('f0_', tq_types.INT, [1]),
                 ('f1_', tq_types.INT, [3])]))
+        self.assert_query_result(
+            'SELECT MIN(val1), MAX(val1) FROM some_nulls_table '
+            'WHERE val1 IS NULL',
+            self.make_context([
+                ('f0_', tq_types.INT, [None]),
+                ('f1_', tq_types.INT, [None])]))
 
     def test_aggregate_evaluation(self):
         self.assert_query_result(
@@ -654,6 +677,24 @@ class EvaluatorTest(unittest.TestCase):
             ])
         )
 
+    def test_order_by_nulls(self):
+        # NULLs come first in ascending order, and last in descending order.
+        self.assert_query_result(
+            'SELECT val1, val2 FROM test_table, test_table_2 ORDER BY val1',
+            self.make_context([
+                ('val1', tq_types.INT, [None, None, 1, 1, 2, 4, 8]),
+                ('val2', tq_types.INT, [2, 7, 2, 1, 6, 8, 4]),
+            ])
+        )
+        self.assert_query_result(
+            'SELECT val1, val2 FROM test_table, test_table_2 '
+            'ORDER BY val1 DESC',
+            self.make_context([
+                ('val1', tq_types.INT, [8, 4, 2, 1, 1, None, None]),
+                ('val2', tq_types.INT, [4, 8, 6, 2, 1, 2, 7]),
+            ])
+        )
+
     def test_order_no_rows(self):
         self.assert_query_result(
             'SELECT str FROM string_table WHERE str CONTAINS "bye" '
@@ -804,6 +845,86 @@ class EvaluatorTest(unittest.TestCase):
             ],
             sorted(result_rows))
 
+    def test_join_smaller_lhs(self):
+        # The hash table is built on the lhs here, but the results should
+        # still come out in lhs order.
+        self.assert_query_result(
+            'SELECT t2.val3, t1.val2 FROM test_table_2 t2 '
+            'LEFT JOIN test_table t1 ON t2.val3 = t1.val1',
+            self.make_context([
+                ('t2.val3', tq_types.INT, [3, 8]),
+                ('t1.val2', tq_types.INT, [None, 4]),
+            ])
+        )
+
+    def test_join_disjoint_keys(self):
+        self.tq.load_table_or_view(tinyquery.Table(
+            'big_values_table',
+            2,
+            collections.OrderedDict([
+                ('val', context.Column(type=tq_types.INT,
+                                       mode=tq_modes.NULLABLE,
+                                       values=[100, 200])),
+            ])))
+        # The column stats show that no keys can match, so we shouldn't even
+        # build a hash table.
+        with mock.patch('tinyquery.evaluator.Evaluator.'
+                        'hash_join_row_pairs') as hash_join:
+            self.assert_query_result(
+                'SELECT t1.val1, t2.val FROM test_table t1 '
+                'LEFT JOIN big_values_table t2 ON t1.val1 = t2.val',
+                self.make_context([
+                    ('t1.val1', tq_types.INT, [4, 1, 8, 1, 2]),
+                    ('t2.val', tq_types.INT, [None] * 5),
+                ])
+            )
+            self.assert_query_result(
+                'SELECT t1.val1 FROM test_table t1 '
+                'JOIN big_values_table t2 ON t1.val1 = t2.val',
+                self.make_context([('t1.val1', tq_types.INT, [])])
+            )
+        self.assertFalse(hash_join.called)
+
+    def test_join_null_keys(self):
+        # NULL keys never match, whether or not the column stats could rule
+        # out a match.
+        for name, values in [('disjoint_nulls_table', [10, None]),
+                             ('overlapping_nulls_table', [1, None])]:
+            self.tq.load_table_or_view(tinyquery.Table(
+                name, 2, collections.OrderedDict([
+                    ('val', context.Column(type=tq_types.INT,
+                                           mode=tq_modes.NULLABLE,
+                                           values=values))])))
+        self.tq.load_table_or_view(tinyquery.Table(
+            'nulls_table', 2, collections.OrderedDict([
+                ('val', context.Column(type=tq_types.INT,
+                                       mode=tq_modes.NULLABLE,
+                                       values=[1, None]))])))
+        self.assert_query_result(
+            'SELECT t1.val, t2.val FROM nulls_table t1 '
+            'JOIN disjoint_nulls_table t2 ON t1.val = t2.val',
+            self.make_context([
+                ('t1.val', tq_types.INT, []),
+                ('t2.val', tq_types.INT, []),
+            ])
+        )
+        self.assert_query_result(
+            'SELECT t1.val, t2.val FROM nulls_table t1 '
+            'JOIN overlapping_nulls_table t2 ON t1.val = t2.val',
+            self.make_context([
+                ('t1.val', tq_types.INT, [1]),
+                ('t2.val', tq_types.INT, [1]),
+            ])
+        )
+        self.assert_query_result(
+            'SELECT t1.val, t2.val FROM nulls_table t1 '
+            'LEFT JOIN overlapping_nulls_table t2 ON t1.val = t2.val',
+            self.make_context([
+                ('t1.val', tq_types.INT, [1, None]),
+                ('t2.val', tq_types.INT, [1, None]),
+            ])
+        )
+
     def test_repeated_select_from_join(self):
         expected_column = self.tq.tables_by_name['repeated_table'].columns['i']
         self.assert_query_result(
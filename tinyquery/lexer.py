@@ -115,7 +115,7 @@ def t_INTEGER(token):
 
 # Taken from example at http://www.dabeaz.com/ply/ply.html#ply_nn6
 def t_ID(t):
-    r"""[a-zA-Z_][a-zA-Z_0-9]*"""
+    r"""[a-zA-Z_][a-zA-Z_0-9]*(?:\$[0-9]+)?"""
     # Specific tokens should be lower-cased here, but functions can't be
     # lower-cased at lex time since we don't know what IDs are functions vs.
     # columns or tables. We lower-case function names at parse time.
@@ -128,11 +128,11 @@ def t_ID(t):
 
 
 def t_brackets_id(t):
-    r"""\[[a-zA-Z_0-9\.]*\]"""
+    r"""\[[a-zA-Z_0-9\.\$]*\]"""
     # Tokens can be surrounded with square brackets, in which case they're
-    # allowed to start with numbers and contain dots. Tokens specified this way
-    # are NOT allowed to be regular keywords, so we don't do that check like in
-    # t_ID.
+    # allowed to start with numbers and contain dots (and partition
+    # decorators). Tokens specified this way are NOT allowed to be regular
+    # keywords, so we don't do that check like in t_ID.
     t.value = t.value[1:-1]
     t.type = 'ID'
     return t
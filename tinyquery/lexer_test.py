@@ -310,3 +310,14 @@ class LexerTest(unittest.TestCase):
              when, ident('x'), equals, int_(2), then, int_(4), else_, int_(9),
              end]
         )
+
+    def test_partition_decorator(self):
+        self.assert_tokens(
+            'SELECT foo FROM dataset.table$20160101',
+            [select, ident('foo'), from_tok, ident('dataset'), dot,
+             ident('table$20160101')]
+        )
+        self.assert_tokens(
+            'SELECT foo FROM [dataset.table$20160101]',
+            [select, ident('foo'), from_tok, ident('dataset.table$20160101')]
+        )
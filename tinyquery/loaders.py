@@ -0,0 +1,418 @@
+"""Readers for the file formats that tables can be loaded from.
+
+These turn files into batches of column values, so that the values of each
+column can be cast all at once and appended to a table in bulk, rather than
+handling one cell at a time. Large newline-delimited JSON files are parsed in
+parallel by a pool of worker processes.
+"""
+from __future__ import absolute_import
+
+import collections
+import csv
+import io
+import itertools
+import json
+import multiprocessing
+import os
+
+import six
+
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+# The number of CSV rows to parse and cast at a time.
+CSV_BATCH_SIZE = 65536
+
+# CSV doesn't have a null value, so the string 'null' is used as the null
+# value. Empty fields are also null, except in STRING columns, where they're
+# just empty strings.
+_CSV_NULL_TOKENS = frozenset(['null', ''])
+_CSV_STRING_NULL_TOKENS = frozenset(['null'])
+
+_CSV_BOOL_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+
+def _cast_csv_bool(token):
+    try:
+        return _CSV_BOOL_VALUES[token.lower()]
+    except KeyError:
+        raise ValueError('Invalid BOOLEAN value: {!r}'.format(token))
+
+
+def _csv_column_caster(column):
+    """Get a function to cast a batch of CSV tokens for the given column.
+
+    The returned function takes a sequence of string tokens and returns a
+    list of values, and raises ValueError if any token is invalid.
+    """
+    if column.type == tq_types.BOOL:
+        cast_function = _cast_csv_bool
+    else:
+        cast_function = tq_types.CAST_FUNCTION_MAP[column.type]
+    if column.mode != tq_modes.NULLABLE:
+        return lambda tokens: list(map(cast_function, tokens))
+
+    if column.type == tq_types.STRING:
+        null_tokens = _CSV_STRING_NULL_TOKENS
+    else:
+        null_tokens = _CSV_NULL_TOKENS
+
+    def cast_tokens(tokens):
+        if null_tokens.isdisjoint(tokens):
+            return list(map(cast_function, tokens))
+        return [None if token in null_tokens else cast_function(token)
+                for token in tokens]
+    return cast_tokens
+
+
+def open_csv(filename):
+    """Open a CSV file in the way that the csv module expects."""
+    if six.PY3:
+        return io.open(filename, 'r', newline='', encoding='utf-8')
+    return open(filename, 'rb')
+
+
+def read_csv_batches(csv_file, columns, field_delimiter=',', quote='"',
+                     skip_leading_rows=0, max_bad_records=0,
+                     batch_size=CSV_BATCH_SIZE):
+    """Parse a CSV file into batches of column values.
+
+    The file is streamed through the csv module batch_size rows at a time, so
+    only one batch is in memory at once. The options match those of BigQuery
+    CSV load jobs.
+
+    Arguments:
+        csv_file: A file (or other iterable of lines) to read from, which
+            should be opened with open_csv.
+        columns: A list of Columns with the type and mode of each field in the
+            file, in order. Their values aren't used.
+        field_delimiter: The character separating fields.
+        quote: The character used to quote fields, or the empty string (or
+            None) if fields aren't quoted.
+        skip_leading_rows: The number of rows (e.g. headers) to skip at the
+            start of the file.
+        max_bad_records: The number of rows that can have the wrong number of
+            fields or invalid values before loading fails. Bad rows within the
+            limit are left out.
+        batch_size: The maximum number of rows in each batch.
+
+    Yields: A pair (num_rows, column_values) for each batch, where
+        column_values contains a list of cast values for each column.
+
+    Raises: ValueError if there are too many bad records.
+    """
+    if quote:
+        reader = csv.reader(csv_file, delimiter=field_delimiter,
+                            quotechar=quote)
+    else:
+        reader = csv.reader(csv_file, delimiter=field_delimiter,
+                            quoting=csv.QUOTE_NONE)
+    for _ in six.moves.xrange(skip_leading_rows):
+        next(reader, None)
+
+    casters = [_csv_column_caster(column) for column in columns]
+    num_columns = len(columns)
+    num_bad_records = 0
+    first_error = None
+
+    while True:
+        rows = list(itertools.islice(reader, batch_size))
+        if not rows:
+            return
+        good_rows = [row for row in rows if len(row) == num_columns]
+        # Blank lines are ignored.
+        bad_rows = [row for row in rows if len(row) != num_columns and row]
+        if bad_rows:
+            num_bad_records += len(bad_rows)
+            first_error = first_error or (
+                'Expected {} fields, but got {}: {!r}'.format(
+                    num_columns, len(bad_rows[0]), bad_rows[0]))
+        try:
+            column_values = [
+                caster(tokens)
+                for caster, tokens in zip(casters, zip(*good_rows))]
+        except (ValueError, TypeError):
+            # Some value in the batch is bad, so fall back to casting one row
+            # at a time to find out which rows to leave out.
+            column_values = [[] for _ in columns]
+            for row in good_rows:
+                try:
+                    row_values = [caster([token])[0]
+                                  for caster, token in zip(casters, row)]
+                except (ValueError, TypeError) as e:
+                    num_bad_records += 1
+                    first_error = first_error or (
+                        'Invalid value in row {!r}: {}'.format(row, e))
+                    continue
+                for values, value in zip(column_values, row_values):
+                    values.append(value)
+        if num_bad_records > max_bad_records:
+            raise ValueError(
+                'Too many bad records in CSV data: found {}, but the limit '
+                'is {}. First error: {}'.format(
+                    num_bad_records, max_bad_records, first_error))
+        if good_rows:
+            yield len(column_values[0]), column_values
+
+
+# The number of newline-delimited JSON rows to parse and cast at a time when
+# reading from a stream of lines.
+JSON_BATCH_SIZE = 65536
+
+# The approximate number of bytes of a newline-delimited JSON file that each
+# worker process parses at a time.
+JSON_RANGE_SIZE = 64 * 1024 * 1024
+
+
+class FlattenedField(collections.namedtuple(
+        'FlattenedField', ['name', 'kind', 'index', 'children'])):
+    """One step of the plan for flattening a JSON row into columns.
+
+    Fields:
+        name: The key of the field in its (possibly nested) JSON object.
+        kind: One of the _*_FIELD constants below, saying how to handle the
+            field's value.
+        index: For leaf fields, the index of the column that the value goes
+            in. None for records.
+        children: For records, a tuple of FlattenedFields for the fields in
+            the record. Empty for leaf fields.
+    """
+
+
+# A leaf field whose value is a single value in its column.
+_SCALAR_FIELD = 0
+# A repeated leaf field, whose list of values is added to its column's list.
+_REPEATED_FIELD = 1
+# A non-repeated leaf field within a repeated record, whose value (if not
+# null) is added to its column's list.
+_REPEATED_RECORD_LEAF_FIELD = 2
+# A non-repeated record.
+_RECORD_FIELD = 3
+# A repeated record, whose fields are flattened for each element.
+_REPEATED_RECORD_FIELD = 4
+
+
+class FlattenedColumn(collections.namedtuple(
+        'FlattenedColumn', ['name', 'type', 'mode', 'cast_function'])):
+    """A column produced by flattening the rows of a schema.
+
+    Fields:
+        name: The full, .-separated name of the column.
+        type: The column type.
+        mode: The column mode. Leaves within repeated records are repeated.
+        cast_function: The function to convert a raw JSON value to the
+            column type.
+    """
+
+
+class SchemaFlattener(object):
+    """Flattens nested JSON rows into lists of column values.
+
+    Tinyquery treats record fields as a set of toplevel leaf fields with a
+    .-separated prefix, while in the input data, they're nested. The schema is
+    compiled once into a tree of FlattenedFields, with the column for each
+    leaf worked out ahead of time, so flattening a row is just a walk over
+    the tree.
+    """
+    def __init__(self, raw_schema):
+        self.raw_schema = raw_schema
+        self.columns = []
+        self._repeated_column_indexes = []
+        self.fields = self._compile_fields(raw_schema['fields'], '', False)
+
+    def __reduce__(self):
+        # Cast functions can't always be pickled, so worker processes compile
+        # the schema themselves.
+        return SchemaFlattener, (self.raw_schema,)
+
+    def _compile_fields(self, fields, prefix, ever_repeated):
+        result = []
+        for field in fields:
+            full_name = prefix + field['name']
+            field_type = field['type'].upper()
+            is_repeated = field['mode'].upper() == tq_modes.REPEATED
+            if field_type == 'RECORD':
+                result.append(FlattenedField(
+                    field['name'],
+                    (_REPEATED_RECORD_FIELD if is_repeated
+                     else _RECORD_FIELD),
+                    None,
+                    self._compile_fields(
+                        field['fields'], full_name + '.',
+                        ever_repeated or is_repeated)))
+                continue
+
+            index = len(self.columns)
+            if is_repeated:
+                kind = _REPEATED_FIELD
+            elif ever_repeated:
+                kind = _REPEATED_RECORD_LEAF_FIELD
+            else:
+                kind = _SCALAR_FIELD
+            if kind == _SCALAR_FIELD:
+                mode = field['mode'].upper()
+            else:
+                mode = tq_modes.REPEATED
+                self._repeated_column_indexes.append(index)
+            self.columns.append(FlattenedColumn(
+                full_name, field_type, mode,
+                tq_types.CAST_FUNCTION_MAP[field_type]))
+            result.append(FlattenedField(field['name'], kind, index, ()))
+        return tuple(result)
+
+    def flatten_row(self, row):
+        """Get the raw value of each column for a row, in column order.
+
+        Columns within repeated records get a list of all values from all
+        elements of the record.
+        """
+        values = [None] * len(self.columns)
+        for index in self._repeated_column_indexes:
+            values[index] = []
+        self._flatten_fields(self.fields, row, values)
+        return values
+
+    def _flatten_fields(self, fields, row, values):
+        for name, kind, index, children in fields:
+            value = row.get(name)
+            if kind == _SCALAR_FIELD:
+                values[index] = value
+            elif kind == _REPEATED_FIELD:
+                if value is not None:
+                    values[index].extend(value)
+            elif kind == _REPEATED_RECORD_LEAF_FIELD:
+                if value is not None:
+                    values[index].append(value)
+            elif kind == _RECORD_FIELD:
+                self._flatten_fields(children, value or {}, values)
+            else:
+                # We always flatten a repeated record at least once, so that
+                # its columns get an (empty) list even if it has no elements.
+                for element in value or [{}]:
+                    self._flatten_fields(children, element or {}, values)
+
+
+def cast_flattened_values(column, values):
+    """Cast a batch of raw values for a FlattenedColumn, checking its mode."""
+    cast_function = column.cast_function
+    if column.mode == tq_modes.REPEATED:
+        for value in values:
+            if not isinstance(value, list):
+                raise ValueError('Bad token for mode %s, got %s' % (
+                    column.mode, value))
+        return [[cast_function(x) for x in value] for value in values]
+    for value in values:
+        if isinstance(value, list) or (
+                value is None and column.mode != tq_modes.NULLABLE):
+            raise ValueError('Bad token for mode %s, got %s' % (
+                column.mode, value))
+    return [None if value is None else cast_function(value)
+            for value in values]
+
+
+def parse_json_lines(lines, flattener):
+    """Parse newline-delimited JSON rows into a batch of column values.
+
+    Arguments:
+        lines: An iterable of JSON strings, one per row. Blank lines are
+            ignored.
+        flattener: A SchemaFlattener for the schema of the rows.
+
+    Returns: A pair (num_rows, column_values), where column_values contains a
+        list of cast values for each of the flattener's columns, in order.
+    """
+    flatten_row = flattener.flatten_row
+    rows = [flatten_row(json.loads(line)) for line in lines if line.strip()]
+    if not rows:
+        return 0, [[] for _ in flattener.columns]
+    return len(rows), [
+        cast_flattened_values(column, raw_values)
+        for column, raw_values in zip(flattener.columns, zip(*rows))]
+
+
+def read_json_batches(lines, flattener, batch_size=JSON_BATCH_SIZE):
+    """Parse a stream of newline-delimited JSON rows in batches.
+
+    Only one batch of lines is held in memory at once, so lines can come from
+    a file or any other iterator. See parse_json_lines for the arguments.
+
+    Yields: A pair (num_rows, column_values) for each batch.
+    """
+    lines = iter(lines)
+    while True:
+        batch_lines = list(itertools.islice(lines, batch_size))
+        if not batch_lines:
+            return
+        yield parse_json_lines(batch_lines, flattener)
+
+
+def split_file_ranges(filename, range_size):
+    """Split a file into byte ranges of about range_size that end in newlines.
+
+    Returns: A list of (start, end) byte offsets covering the whole file.
+    """
+    file_size = os.path.getsize(filename)
+    ranges = []
+    with open(filename, 'rb') as f:
+        start = 0
+        while start < file_size:
+            f.seek(min(start + range_size, file_size))
+            # Extend the range to the end of the line it stops in.
+            f.readline()
+            end = min(f.tell(), file_size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _parse_json_file_range(args):
+    """Parse one byte range of a newline-delimited JSON file.
+
+    This runs in a worker process, so it takes a single picklable tuple of
+    arguments.
+    """
+    filename, start, end, flattener = args
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # Only split on \n: str.splitlines also splits on characters like U+2028
+    # that JSON strings can contain unescaped.
+    return parse_json_lines(
+        [line.decode('utf-8') for line in data.split(b'\n')], flattener)
+
+
+def read_json_file_batches(filename, flattener, num_workers=None,
+                           range_size=JSON_RANGE_SIZE):
+    """Parse a newline-delimited JSON file, in parallel if it's large.
+
+    The file is split on line boundaries into byte ranges, which are parsed
+    by a pool of worker processes. The batches are yielded in file order as
+    they become available, so the caller can append each one to a table and
+    then discard it.
+
+    Arguments:
+        filename: The file to read.
+        flattener: A SchemaFlattener for the schema of the rows.
+        num_workers: The number of worker processes to use, or None to use
+            one per CPU.
+        range_size: The approximate number of bytes in each range.
+
+    Yields: A pair (num_rows, column_values) for each range of the file, as
+        returned by parse_json_lines.
+    """
+    range_args = [
+        (filename, start, end, flattener)
+        for start, end in split_file_ranges(filename, range_size)]
+    if len(range_args) <= 1 or num_workers == 1:
+        for args in range_args:
+            yield _parse_json_file_range(args)
+        return
+
+    pool = multiprocessing.Pool(num_workers)
+    try:
+        for batch in pool.imap(_parse_json_file_range, range_args):
+            yield batch
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,177 @@
+from __future__ import absolute_import
+
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from tinyquery import context
+from tinyquery import loaders
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+class CsvLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.columns = [
+            context.Column(type=tq_types.INT, mode=tq_modes.NULLABLE,
+                           values=[]),
+            context.Column(type=tq_types.STRING, mode=tq_modes.NULLABLE,
+                           values=[]),
+            context.Column(type=tq_types.BOOL, mode=tq_modes.REQUIRED,
+                           values=[]),
+        ]
+
+    def read_csv(self, text, **kwargs):
+        batches = list(loaders.read_csv_batches(
+            io.StringIO(text), self.columns, **kwargs))
+        return ([num_rows for num_rows, _ in batches],
+                [sum((batch[i] for _, batch in batches), [])
+                 for i in range(len(self.columns))])
+
+    def test_read_csv(self):
+        self.assertEqual(
+            ([3], [[1, None, 3], ['a, b', '', None],
+                   [True, False, True]]),
+            self.read_csv(u'1,"a, b",true\n,,FALSE\n3,null,1\n'))
+
+    def test_batches(self):
+        batch_sizes, values = self.read_csv(
+            u'1,a,true\n2,b,true\n3,c,true\n', batch_size=2)
+        self.assertEqual([2, 1], batch_sizes)
+        self.assertEqual([1, 2, 3], values[0])
+
+    def test_options(self):
+        self.assertEqual(
+            ([2], [[1, 2], ['"a"', 'b'], [True, False]]),
+            self.read_csv(u'i|s|b\n1|"a"|true\n2|b|false\n',
+                          field_delimiter='|', quote='',
+                          skip_leading_rows=1))
+
+    def test_bad_records(self):
+        text = u'1,a,true\nx,b,true\n3,c\n4,d,false\n'
+        with self.assertRaises(ValueError):
+            self.read_csv(text, max_bad_records=1)
+        self.assertEqual(
+            ([2], [[1, 4], ['a', 'd'], [True, False]]),
+            self.read_csv(text, max_bad_records=2))
+
+    def test_timestamps(self):
+        self.columns = [context.Column(type=tq_types.TIMESTAMP,
+                                       mode=tq_modes.NULLABLE, values=[])]
+        self.assertEqual(
+            ([2], [[datetime.datetime(2016, 1, 1, 12), None]]),
+            self.read_csv(u'2016-01-01 12:00:00\n\n"null"\n'))
+
+
+class SchemaFlattenerTest(unittest.TestCase):
+    def test_flatten_row(self):
+        flattener = loaders.SchemaFlattener({'fields': [
+            {'name': 'a', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+            {'name': 'r', 'type': 'RECORD', 'mode': 'REPEATED', 'fields': [
+                {'name': 'b', 'type': 'STRING', 'mode': 'NULLABLE'},
+                {'name': 'c', 'type': 'INTEGER', 'mode': 'REPEATED'},
+                {'name': 'n', 'type': 'RECORD', 'mode': 'NULLABLE',
+                 'fields': [
+                     {'name': 'd', 'type': 'FLOAT', 'mode': 'NULLABLE'}]},
+            ]},
+            {'name': 's', 'type': 'RECORD', 'mode': 'NULLABLE', 'fields': [
+                {'name': 'e', 'type': 'TIMESTAMP', 'mode': 'REQUIRED'}]},
+        ]})
+        self.assertEqual(
+            [('a', tq_types.INT, tq_modes.NULLABLE),
+             ('r.b', tq_types.STRING, tq_modes.REPEATED),
+             ('r.c', tq_types.INT, tq_modes.REPEATED),
+             ('r.n.d', tq_types.FLOAT, tq_modes.REPEATED),
+             ('s.e', tq_types.TIMESTAMP, tq_modes.REQUIRED)],
+            [(column.name, column.type, column.mode)
+             for column in flattener.columns])
+        self.assertEqual(
+            [1, ['x'], [1, 2, 3], [1.5], 'now'],
+            flattener.flatten_row({
+                'a': 1,
+                'r': [{'b': 'x', 'c': [1, 2], 'n': {'d': 1.5}},
+                      {'b': None, 'c': [3]}],
+                's': {'e': 'now'},
+            }))
+        self.assertEqual([None, [], [], [], None],
+                         flattener.flatten_row({'r': None}))
+
+
+class JsonLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.raw_schema = {'fields': [
+            {'name': 'i', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+            {'name': 'r', 'type': 'RECORD', 'mode': 'REPEATED', 'fields': [
+                {'name': 's', 'type': 'STRING', 'mode': 'NULLABLE'}]},
+        ]}
+        self.flattener = loaders.SchemaFlattener(self.raw_schema)
+        self.rows = [{'i': i, 'r': [{'s': str(i)}] * (i % 3)}
+                     for i in range(100)]
+        fd, self.filename = tempfile.mkstemp(suffix='.json')
+        self.addCleanup(os.remove, self.filename)
+        with os.fdopen(fd, 'w') as f:
+            for row in self.rows:
+                f.write(json.dumps(row) + '\n')
+
+    def expected_values(self):
+        return [[row['i'] for row in self.rows],
+                [[r['s'] for r in row['r']] for row in self.rows]]
+
+    def concatenate(self, batches):
+        batches = list(batches)
+        return (sum(num_rows for num_rows, _ in batches),
+                [sum((values[i] for _, values in batches), [])
+                 for i in range(len(self.flattener.columns))])
+
+    def test_split_file_ranges(self):
+        ranges = loaders.split_file_ranges(self.filename, 100)
+        self.assertGreater(len(ranges), 1)
+        self.assertEqual(0, ranges[0][0])
+        self.assertEqual(os.path.getsize(self.filename), ranges[-1][1])
+        with open(self.filename, 'rb') as f:
+            data = f.read()
+        for start, end in ranges:
+            self.assertEqual(b'\n', data[end - 1:end])
+
+    def test_read_file_in_parallel(self):
+        self.assertEqual(
+            (100, self.expected_values()),
+            self.concatenate(loaders.read_json_file_batches(
+                self.filename, self.flattener, num_workers=2,
+                range_size=100)))
+
+    def test_read_file_serially(self):
+        self.assertEqual(
+            (100, self.expected_values()),
+            self.concatenate(loaders.read_json_file_batches(
+                self.filename, self.flattener)))
+
+    def test_unescaped_line_separators(self):
+        # JSON strings may contain U+2028 and U+2029 unescaped, and they
+        # don't end a line.
+        with io.open(self.filename, 'w', encoding='utf-8') as f:
+            for i in range(10):
+                f.write(u'{"i": %d, "r": [{"s": "a\u2028b\u2029c"}]}\n' % i)
+        self.rows = [{'i': i, 'r': [{'s': u'a\u2028b\u2029c'}]}
+                     for i in range(10)]
+        self.assertEqual(
+            (10, self.expected_values()),
+            self.concatenate(loaders.read_json_file_batches(
+                self.filename, self.flattener, num_workers=2,
+                range_size=100)))
+
+    def test_read_stream(self):
+        lines = (json.dumps(row) for row in self.rows)
+        batches = list(loaders.read_json_batches(
+            lines, self.flattener, batch_size=30))
+        self.assertEqual([30, 30, 30, 10],
+                         [num_rows for num_rows, _ in batches])
+        self.assertEqual((100, self.expected_values()),
+                         self.concatenate(batches))
+
+    def test_bad_mode(self):
+        with self.assertRaises(ValueError):
+            loaders.parse_json_lines(['{"i": [1, 2]}'], self.flattener)
@@ -0,0 +1,184 @@
+"""Incremental maintenance of materialized views.
+
+A materialized view that aggregates a single table can be kept up to date
+without rereading the whole table: each group keeps a mergeable state for
+each aggregate (a count, a sum, a minimum or a maximum, or a sum and count
+for AVG), the states for just the newly appended rows are computed by
+running a rewritten version of the view's query over those rows, and the
+new states are merged into the old ones.
+"""
+from __future__ import absolute_import
+
+import collections
+
+from tinyquery import context
+from tinyquery import runtime
+from tinyquery import tq_modes
+from tinyquery import tq_types
+from tinyquery import typed_ast
+
+
+def _merge_sum(value1, value2):
+    if value1 is None:
+        return value2
+    if value2 is None:
+        return value1
+    return value1 + value2
+
+
+def _make_merge_extreme(func):
+    def merge(value1, value2):
+        if value1 is None:
+            return value2
+        if value2 is None:
+            return value1
+        return func(value1, value2)
+    return merge
+
+
+# Maps the name of each aggregate function whose results can be merged to
+# the function that merges two of its results.
+MERGE_FUNCTIONS = {
+    'count': _merge_sum,
+    'sum': _merge_sum,
+    'min': _make_merge_extreme(min),
+    'max': _make_merge_extreme(max),
+}
+
+
+def _finish_avg(sum_value, count_value):
+    if not count_value:
+        return None
+    return float(sum_value) / count_value
+
+
+class IncrementalAggregation(object):
+    """A plan for maintaining the results of an aggregate query.
+
+    Use from_select to make one.
+
+    Fields:
+        select_ast: The compiled query of the view.
+        state_select: A typed_ast.Select computing the group keys and the
+            aggregate states of each group. Running it over some rows gives
+            the states for just those rows.
+        merge_funcs: A function for each aggregate state (in the order of
+            state_select's fields, after the keys) that merges two states.
+    """
+    def __init__(self, select_ast, state_select, key_aliases, merge_funcs,
+                 outputs):
+        self.select_ast = select_ast
+        self.state_select = state_select
+        self.key_aliases = key_aliases
+        self.merge_funcs = merge_funcs
+        # A list with a (kind, index) pair for each select field, where
+        # kind is 'key', 'state' or 'avg', and index is the index of the key
+        # or of the (first) state.
+        self._outputs = outputs
+
+    @classmethod
+    def from_select(cls, select_ast):
+        """Make a plan for a compiled query.
+
+        Returns: The IncrementalAggregation, or None if the query's results
+            can't be maintained incrementally.
+        """
+        if not isinstance(select_ast.table, typed_ast.Table):
+            return None
+        if (select_ast.table.partition_ids is not None or
+                select_ast.group_set is None or
+                select_ast.group_set.field_groups or
+                select_ast.having_expr != typed_ast.Literal(True,
+                                                            tq_types.BOOL) or
+                select_ast.orderings is not None or
+                select_ast.limit is not None):
+            return None
+
+        aggregates = {name: runtime.get_func(name)
+                      for name in list(MERGE_FUNCTIONS) + ['avg']}
+        key_fields = []
+        state_fields = []
+        merge_funcs = []
+        outputs = []
+        for select_field in select_ast.select_fields:
+            if select_field.within_clause is not None:
+                return None
+            if select_field.alias in select_ast.group_set.alias_groups:
+                outputs.append(('key', len(key_fields)))
+                key_fields.append(select_field)
+                continue
+            expr = select_field.expr
+            if not isinstance(expr, typed_ast.AggregateFunctionCall):
+                return None
+            func_names = [name for name, func in aggregates.items()
+                          if func is expr.func]
+            if not func_names:
+                return None
+            func_name, = func_names
+            if func_name == 'avg':
+                # The state of an average is a sum and a count.
+                outputs.append(('avg', len(state_fields)))
+                arg, = expr.args
+                for state_func_name in ('sum', 'count'):
+                    state_func = runtime.get_func(state_func_name)
+                    state_fields.append(typed_ast.SelectField(
+                        typed_ast.AggregateFunctionCall(
+                            state_func, [arg],
+                            state_func.check_types(arg.type)),
+                        '{}.{}'.format(select_field.alias, state_func_name),
+                        None))
+                    merge_funcs.append(MERGE_FUNCTIONS[state_func_name])
+            else:
+                outputs.append(('state', len(state_fields)))
+                state_fields.append(select_field)
+                merge_funcs.append(MERGE_FUNCTIONS[func_name])
+
+        state_select = select_ast._replace(
+            select_fields=key_fields + state_fields)
+        return cls(select_ast, state_select,
+                   [field.alias for field in key_fields], merge_funcs,
+                   outputs)
+
+    def merge_states(self, groups, state_context):
+        """Merge the states from running state_select into some groups.
+
+        Arguments:
+            groups: An OrderedDict mapping each group key (a tuple of key
+                values) to a list of its states. It's updated in place, and
+                new groups are added at the end.
+            state_context: The Context from running state_select.
+        """
+        columns = list(state_context.columns.values())
+        num_keys = len(self.key_aliases)
+        key_columns = columns[:num_keys]
+        state_columns = columns[num_keys:]
+        for i in range(state_context.num_rows):
+            key = tuple(column.values[i] for column in key_columns)
+            states = [column.values[i] for column in state_columns]
+            old_states = groups.get(key)
+            if old_states is None:
+                groups[key] = states
+            else:
+                groups[key] = [
+                    merge(old_state, state) for merge, old_state, state
+                    in zip(self.merge_funcs, old_states, states)]
+
+    def result_columns(self, groups):
+        """Get the view's result columns from the states of its groups.
+
+        Returns: An OrderedDict mapping column name to Column, as in a Table.
+        """
+        columns = collections.OrderedDict()
+        for select_field, (kind, index) in zip(self.select_ast.select_fields,
+                                               self._outputs):
+            if kind == 'key':
+                values = [key[index] for key in groups]
+            elif kind == 'avg':
+                values = [_finish_avg(states[index], states[index + 1])
+                          for states in groups.values()]
+            else:
+                values = [states[index] for states in groups.values()]
+            columns[select_field.alias] = context.Column(
+                type=select_field.expr.type, mode=tq_modes.NULLABLE,
+                values=values)
+        return columns
@@ -0,0 +1,97 @@
+from __future__ import absolute_import
+
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from tinyquery import api_client
+from tinyquery import tinyquery
+
+
+ROLLUP_QUERY = ('SELECT k, COUNT(*) AS c, SUM(a) AS s, MIN(a) AS lo, '
+                'MAX(a) AS hi, AVG(a) AS av FROM dataset.events '
+                'WHERE a > 0 GROUP BY k')
+
+
+class MaterializedViewTest(unittest.TestCase):
+    def setUp(self):
+        self.tq = tinyquery.TinyQuery()
+        self.tq.load_table_or_view(tinyquery.TinyQuery.make_empty_table(
+            'dataset.events',
+            {'fields': [{'name': 'k', 'type': 'STRING', 'mode': 'NULLABLE'},
+                        {'name': 'a', 'type': 'INTEGER',
+                         'mode': 'NULLABLE'}]}))
+        self.events = self.tq.tables_by_name['dataset.events']
+        self.append_events([('x', 1), ('y', 2), ('x', 3), ('y', -1)])
+
+    def append_events(self, rows):
+        self.events.append_rows(len(rows), [[k for k, _ in rows],
+                                            [a for _, a in rows]])
+
+    def make_view(self, query):
+        self.tq.load_table_or_view(
+            self.tq.make_materialized_view('dataset.view', query))
+        return self.tq.tables_by_name['dataset.view']
+
+    def assert_view_matches_query(self, query):
+        self.assertEqual(
+            list(self.tq.evaluate_query(query).columns.values()),
+            list(self.tq.evaluate_query(
+                'SELECT * FROM dataset.view').columns.values()))
+
+    def test_incremental_aggregates(self):
+        view = self.make_view(ROLLUP_QUERY)
+        self.assert_view_matches_query(ROLLUP_QUERY)
+
+        recompute = mock.Mock(wraps=view._recompute)
+        with mock.patch.object(view, '_recompute', recompute):
+            self.append_events([('y', 5), ('z', 4), ('x', None), ('x', 0)])
+            self.assert_view_matches_query(ROLLUP_QUERY)
+            self.append_events([('z', 7)])
+            self.assert_view_matches_query(ROLLUP_QUERY)
+        self.assertEqual(0, recompute.call_count)
+
+    def test_truncating_recomputes(self):
+        self.make_view(ROLLUP_QUERY)
+        self.tq.clear_table(self.events)
+        self.append_events([('w', 10)])
+        self.assert_view_matches_query(ROLLUP_QUERY)
+
+    def test_non_incremental_view(self):
+        query = 'SELECT k, a FROM dataset.events ORDER BY a DESC LIMIT 2'
+        view = self.make_view(query)
+        self.assertEqual(['x', 'y'], view.columns['k'].values)
+        # The results aren't computed again until the table changes.
+        version = view.snapshot().version
+        self.assertEqual(version, view.snapshot().version)
+        self.append_events([('z', 10)])
+        self.assert_view_matches_query(query)
+        self.assertNotEqual(version, view.snapshot().version)
+
+    def test_api_and_snapshots(self):
+        service = api_client.TinyQueryApiClient(self.tq)
+        service.tables().insert(
+            projectId='test_project', datasetId='dataset',
+            body={'tableReference': {'projectId': 'test_project',
+                                     'datasetId': 'dataset',
+                                     'tableId': 'view'},
+                  'materializedView': {'query': ROLLUP_QUERY}}).execute()
+        table_info = service.tables().get(
+            projectId='test_project', datasetId='dataset',
+            tableId='view').execute()
+        self.assertEqual({'query': ROLLUP_QUERY},
+                         table_info['materializedView'])
+        self.assertEqual(['k', 'c', 's', 'lo', 'hi', 'av'],
+                         [field['name']
+                          for field in table_info['schema']['fields']])
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        self.tq.save_snapshot(path)
+        self.tq = tinyquery.TinyQuery()
+        self.tq.load_snapshot(path)
+        self.assertIsInstance(self.tq.tables_by_name['dataset.view'],
+                              tinyquery.MaterializedView)
+        self.assert_view_matches_query(ROLLUP_QUERY)
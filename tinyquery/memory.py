@@ -0,0 +1,147 @@
+"""Approximate accounting of the memory a query uses.
+
+Each Context the evaluator makes is sized approximately: a reference for
+each value, a list for each value of a REPEATED column, and the logical size
+of the values themselves (see query_cost). Values are often shared between
+contexts (filtering a context copies references, not values), so this
+overestimates somewhat, but it grows with the data the way the real memory
+use does, which is what matters for a budget.
+
+A MemoryTracker follows the contexts that are alive while a query runs. The
+output of each operator (see Evaluator.run_operator) is counted from when
+it's made until the operator or select that used it finishes. Operators
+that are about to make a big context (like a cross join) check that it will
+fit first, so that a query that's over its budget fails before it has used
+up the memory.
+"""
+from __future__ import absolute_import
+
+from tinyquery import query_cost
+from tinyquery import query_limits
+from tinyquery import tq_modes
+
+
+# The size of a reference to a value in a list.
+REFERENCE_NUM_BYTES = 8
+# The size of an empty list, for the values of REPEATED columns.
+LIST_NUM_BYTES = 56
+
+
+def column_num_bytes(column):
+    """Get the approximate number of bytes of memory a Column uses."""
+    num_bytes = (REFERENCE_NUM_BYTES * len(column.values) +
+                 query_cost.column_num_bytes(column))
+    if column.mode == tq_modes.REPEATED:
+        num_bytes += sum(
+            LIST_NUM_BYTES + REFERENCE_NUM_BYTES * len(value)
+            for value in column.values if value is not None)
+    return num_bytes
+
+
+def context_num_bytes(ctx):
+    """Get the approximate number of bytes of memory a Context uses.
+
+    The aggregate context isn't counted, since it's always some other
+    context that's counted on its own.
+    """
+    return sum(column_num_bytes(column) for column in ctx.columns.values())
+
+
+def row_num_bytes(ctx):
+    """Get the average number of bytes of memory of a row of a Context."""
+    if ctx.num_rows == 0:
+        return 0
+    return context_num_bytes(ctx) // ctx.num_rows
+
+
+class MemoryTracker(object):
+    """Tracks the approximate memory a query uses, enforcing a budget.
+
+    Fields:
+        max_bytes: The most memory the query may use, or None for no limit.
+        current_bytes: The memory used by the contexts alive now.
+        peak_bytes: The most memory used at any one time.
+    """
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.peak_bytes = 0
+        # A list for each running operator (and one for the query) of the
+        # (context, num_bytes) pairs of the contexts it has been given by
+        # the operators it ran.
+        self._frames = [[]]
+
+    def fits(self, num_bytes):
+        """Check whether there's room in the budget for some more memory."""
+        return (self.max_bytes is None or
+                self.current_bytes + num_bytes <= self.max_bytes)
+
+    def available_bytes(self):
+        """Get how much memory is left in the budget, or None if there's no
+        limit.
+        """
+        if self.max_bytes is None:
+            return None
+        return max(self.max_bytes - self.current_bytes, 0)
+
+    def check(self, num_bytes, description):
+        """Make sure there's room for some more memory, before using it.
+
+        Arguments:
+            num_bytes: The number of bytes about to be used.
+            description: What the memory is for, like 'CROSS JOIN', for the
+                error message.
+
+        Raises:
+            ResourcesExceededError: If the memory wouldn't fit in the budget.
+        """
+        if not self.fits(num_bytes):
+            raise self._exceeded_error(self.current_bytes + num_bytes,
+                                       description)
+
+    def reserve(self, num_bytes, description):
+        """Count some memory as used, failing if it's over the budget."""
+        self.current_bytes += num_bytes
+        self.peak_bytes = max(self.peak_bytes, self.current_bytes)
+        if self.max_bytes is not None and self.current_bytes > self.max_bytes:
+            raise self._exceeded_error(self.current_bytes, description)
+
+    def release(self, num_bytes):
+        """Count some memory as no longer used."""
+        self.current_bytes -= num_bytes
+
+    def run(self, description, func, *args):
+        """Run an operator, counting the memory of the context it outputs.
+
+        The contexts output by any operators that run within this one are
+        its inputs, and are no longer counted once it has finished.
+
+        Arguments:
+            description: What the operator does, for error messages.
+            func: The function running the operator, which returns a Context.
+            args: The arguments to func.
+
+        Returns: The result of func.
+        """
+        self._frames.append([])
+        try:
+            result = func(*args)
+        finally:
+            inputs = self._frames.pop()
+        # Some operators (like LIMIT) change their input and return it, in
+        # which case it's only counted once.
+        reused_bytes = sum(num_bytes for ctx, num_bytes in inputs
+                           if ctx is result)
+        num_bytes = context_num_bytes(result)
+        self.reserve(num_bytes - reused_bytes, description)
+        self.release(sum(num_bytes for _, num_bytes in inputs) -
+                     reused_bytes)
+        self._frames[-1].append((result, num_bytes))
+        return result
+
+    def _exceeded_error(self, num_bytes, description):
+        return query_limits.ResourcesExceededError(
+            'Resources exceeded during query execution: The query could not '
+            'be executed in the allotted memory. Peak usage: {}% of limit. '
+            'Top memory consumer(s): {}'.format(
+                num_bytes * 100 // max(self.max_bytes, 1), description))
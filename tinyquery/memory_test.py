@@ -0,0 +1,108 @@
+from __future__ import absolute_import
+
+import collections
+import unittest
+
+from tinyquery import context
+from tinyquery import memory
+from tinyquery import query_limits
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+def make_context(values):
+    return context.Context(
+        len(values),
+        collections.OrderedDict([
+            ((None, 'a'), context.Column(type=tq_types.INT,
+                                         mode=tq_modes.NULLABLE,
+                                         values=values))]),
+        None)
+
+
+class MemoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tq = tinyquery.TinyQuery(max_query_memory_bytes=2000)
+        self.tq.load_table_or_view(tinyquery.Table(
+            'dataset.nums', 10, collections.OrderedDict([
+                ('n', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=list(range(10))))])))
+
+    def test_column_num_bytes(self):
+        # A reference and 8 bytes for each non-null value.
+        self.assertEqual(56, memory.column_num_bytes(context.Column(
+            type=tq_types.INT, mode=tq_modes.NULLABLE,
+            values=[1, 2, None, 4])))
+        # Plus a list for each repeated value, with a reference per element.
+        self.assertEqual(
+            3 * 8 + 16 + (56 + 16) + 56,
+            memory.column_num_bytes(context.Column(
+                type=tq_types.INT, mode=tq_modes.REPEATED,
+                values=[[1, 2], [], None])))
+
+    def test_tracker(self):
+        tracker = memory.MemoryTracker()
+        small = make_context([1])
+        big = make_context([1, 2, 3])
+
+        def operator():
+            tracker.run('READ', lambda: small)
+            self.assertEqual(16, tracker.current_bytes)
+            return big
+
+        self.assertIs(big, tracker.run('COMPUTE', operator))
+        # The input is released once the operator is done.
+        self.assertEqual(48, tracker.current_bytes)
+        self.assertEqual(64, tracker.peak_bytes)
+
+        # An operator that returns its input counts it once.
+        tracker.run('LIMIT', lambda: tracker.run('READ', lambda: small))
+        self.assertEqual(64, tracker.current_bytes)
+
+    def test_tracker_budget(self):
+        tracker = memory.MemoryTracker(32)
+        self.assertTrue(tracker.fits(32))
+        self.assertFalse(tracker.fits(33))
+        tracker.check(32, 'SORT')
+        with self.assertRaises(query_limits.ResourcesExceededError) as cm:
+            tracker.run('SORT', lambda: make_context([1, 2, 3]))
+        self.assertEqual('resourcesExceeded', cm.exception.reason)
+        self.assertIn('Peak usage: 150% of limit', str(cm.exception))
+        self.assertIn('Top memory consumer(s): SORT', str(cm.exception))
+
+    def test_query_within_budget(self):
+        result = self.tq.evaluate_query(
+            'SELECT n, COUNT(*) AS c FROM dataset.nums GROUP BY n')
+        self.assertEqual(10, result.num_rows)
+
+    def test_query_over_budget(self):
+        # The cross join would be 100 rows of 2 columns, which is checked
+        # before it's made.
+        with self.assertRaises(query_limits.ResourcesExceededError) as cm:
+            self.tq.evaluate_query(
+                'SELECT a.n, b.n FROM dataset.nums a '
+                'CROSS JOIN dataset.nums b')
+        self.assertIn('CROSS JOIN', str(cm.exception))
+
+        # The 10 values read and filtered (by the empty WHERE) fit, but not
+        # with the 10 computed ones.
+        tq = tinyquery.TinyQuery(max_query_memory_bytes=400)
+        tq.load_table_or_view(self.tq.tables_by_name['dataset.nums'])
+        with self.assertRaises(query_limits.ResourcesExceededError) as cm:
+            tq.evaluate_query('SELECT n + 1 FROM dataset.nums')
+        self.assertIn('COMPUTE', str(cm.exception))
+
+    def test_job_peak_memory(self):
+        job_info = self.tq.run_query_job(
+            'project', 'SELECT n * 2 AS m FROM dataset.nums WHERE n > 4',
+            None, None, 'CREATE_IF_NEEDED', 'WRITE_EMPTY')
+        query_statistics = job_info['statistics']['query']
+        # The 10 values read, then 5 values each filtered by the WHERE,
+        # computed, and filtered by the (empty) HAVING.
+        self.assertEqual('400', query_statistics['peakMemoryBytes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ from ply import yacc
 
 from tinyquery import tq_ast
 from tinyquery import lexer
+from tinyquery import profiling
 
 
 tokens = lexer.tokens
@@ -212,6 +213,8 @@ def p_aliased_table_expr(p):
     else:
         if isinstance(p[1], tq_ast.TableId):
             p[0] = tq_ast.TableId(p[1].name, p[len(p) - 1])
+        elif isinstance(p[1], tq_ast.TableFunction):
+            p[0] = tq_ast.TableFunction(p[1].name, p[1].args, p[len(p) - 1])
         elif isinstance(p[1], tq_ast.Select):
             p[0] = tq_ast.Select(p[1].select_fields, p[1].table_expr,
                                  p[1].where_expr, p[1].groups,
@@ -226,6 +229,11 @@ def p_table_id(p):
     p[0] = tq_ast.TableId(p[1], None)
 
 
+def p_table_function(p):
+    """table_expr : ID LPAREN arg_list RPAREN"""
+    p[0] = tq_ast.TableFunction(p[1].lower(), p[3], None)
+
+
 def p_select_table_expression(p):
     """table_expr : select"""
     p[0] = p[1]
@@ -479,7 +487,12 @@ def p_error(p):
     raise SyntaxError('Unexpected token: %s' % p)
 
 
-def parse_text(text):
+def parse_text(text, profiler=None):
+    """Parse a query into a tq_ast.Select.
+
+    If a profiling.Profiler is given, the query is lexed first, so that
+    lexing and parsing can be timed separately.
+    """
     # If you're making changes to the parser, you need to run the the code with
     # SHOULD_REBUILD_PARSER=1 in order to update it.
     should_rebuild_parser = int(os.getenv('SHOULD_REBUILD_PARSER', '0'))
@@ -488,4 +501,16 @@ def parse_text(text):
     else:
         from tinyquery import parsetab
         parser = yacc.yacc(debug=0, write_tables=0, tabmodule=parsetab)
-    return parser.parse(text, lexer=lexer.get_lexer())
+    if profiler is None:
+        return parser.parse(text, lexer=lexer.get_lexer())
+    query_lexer = lexer.get_lexer()
+
+    def lex():
+        query_lexer.input(text)
+        return list(query_lexer)
+
+    tokens = iter(profiler.run(profiling.LEX, None, len, lex))
+    return profiler.run(
+        profiling.PARSE, None, None,
+        lambda: parser.parse(lexer=query_lexer,
+                             tokenfunc=lambda: next(tokens, None)))
@@ -318,6 +318,27 @@ class ParserTest(unittest.TestCase):
             )
         )
 
+    def test_table_function(self):
+        self.assert_parsed_select(
+            'SELECT foo FROM TABLE_DATE_RANGE(dataset.events_, '
+            'TIMESTAMP("2016-01-01"), CURRENT_TIMESTAMP()) t',
+            tq_ast.Select(
+                [tq_ast.SelectField(tq_ast.ColumnId('foo'), None, None)],
+                tq_ast.TableFunction('table_date_range', [
+                    tq_ast.ColumnId('dataset.events_'),
+                    tq_ast.FunctionCall('timestamp',
+                                        [tq_ast.Literal('2016-01-01')]),
+                    tq_ast.FunctionCall('current_timestamp', []),
+                ], 't'),
+                None,
+                None,
+                None,
+                None,
+                None,
+                None
+            )
+        )
+
     def test_subquery(self):
         self.assert_parsed_select(
             'SELECT foo FROM (SELECT val AS foo FROM table)',
@@ -1,139 +1,140 @@
 
 # parsetab.py
 # This file is automatically generated. Do not edit.
-_tabversion = '3.2'
+_tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = '\xbem\xcbp\xf0\xfa\xee-H2k\xac%t\x18\xdf'
+_lr_signature = 'leftANDORleftEQUALSNOT_EQUALGREATER_THANLESS_THANGREATER_THAN_OR_EQUALLESS_THAN_OR_EQUALISleftPLUSMINUSleftSTARDIVIDED_BYMODCONTAINSINPLUS MINUS STAR DIVIDED_BY MOD EQUALS NOT_EQUAL GREATER_THAN LESS_THAN GREATER_THAN_OR_EQUAL LESS_THAN_OR_EQUAL LPAREN RPAREN COMMA DOT INTEGER FLOAT ID STRING SELECT AS FROM WHERE HAVING JOIN ON GROUP BY EACH LEFT OUTER CROSS ORDER ASC DESC LIMIT AND OR NOT IS NULL TRUE FALSE IN COUNT DISTINCT CASE WHEN THEN ELSE END CONTAINS WITHIN RECORDselect : SELECT select_field_list optional_limit\n              | SELECT select_field_list FROM full_table_expr optional_where                     optional_group_by optional_having optional_order_by                     optional_limit\n    optional_where :\n                      | WHERE expression\n    optional_having :\n                       | HAVING expression\n    optional_group_by :\n                         | GROUP BY column_id_list\n                         | GROUP EACH BY column_id_list\n    optional_order_by :\n                         | ORDER BY order_by_listorder_by_list : strict_order_by_list\n                     | strict_order_by_list COMMAstrict_order_by_list : ordering\n                            | strict_order_by_list COMMA orderingordering : column_id\n                | column_id ASCordering : column_id DESCcolumn_id_list : strict_column_id_list\n                      | strict_column_id_list COMMAstrict_column_id_list : column_id\n                             | strict_column_id_list COMMA column_id\n    optional_limit :\n                      | LIMIT INTEGER\n    full_table_expr : aliased_table_expr_listnon_cross_join : LEFT OUTER JOIN\n                      | LEFT OUTER JOIN EACH\n                      | LEFT JOIN\n                      | LEFT JOIN EACH\n                      | JOIN\n                      | JOIN EACH\n    cross_join : CROSS JOIN\n                  | CROSS JOIN EACH\n    partial_join : non_cross_join aliased_table_expr ON expression\n                    | cross_join aliased_table_expr\n    join_tail : partial_join join_tail\n                 | partial_join\n    full_table_expr : aliased_table_expr join_tailaliased_table_expr_list : strict_aliased_table_expr_list\n                               | strict_aliased_table_expr_list COMMAstrict_aliased_table_expr_list : aliased_table_expr\n                                      | strict_aliased_table_expr_list COMMA                                             aliased_table_expr\n    aliased_table_expr : table_expr\n                          | table_expr ID\n                          | table_expr AS IDtable_expr : id_component_listtable_expr : ID LPAREN arg_list RPARENtable_expr : selecttable_expr : LPAREN table_expr RPARENselect_field_list : strict_select_field_list\n                         | strict_select_field_list COMMAstrict_select_field_list : select_field\n                                | strict_select_field_list COMMA select_field\n    select_field : expression\n                    | expression ID\n                    | expression AS ID\n                    | expression WITHIN RECORD AS ID\n                    | expression WITHIN expression AS ID\n    select_field : STARexpression : LPAREN expression RPARENexpression : expression IS NULLexpression : expression IS NOT NULLexpression : MINUS expression\n                  | NOT expression\n    expression : expression PLUS expression\n                  | expression MINUS expression\n                  | expression STAR expression\n                  | expression DIVIDED_BY expression\n                  | expression MOD expression\n                  | expression EQUALS expression\n                  | expression NOT_EQUAL expression\n                  | expression GREATER_THAN expression\n                  | expression LESS_THAN expression\n                  | expression GREATER_THAN_OR_EQUAL expression\n                  | expression LESS_THAN_OR_EQUAL expression\n                  | expression AND expression\n                  | expression OR expression\n                  | expression CONTAINS expression\n    expression : ID LPAREN arg_list RPAREN\n                  | LEFT LPAREN arg_list RPAREN\n    expression : COUNT LPAREN arg_list RPARENexpression : COUNT LPAREN DISTINCT arg_list RPARENexpression : COUNT LPAREN parenthesized_star RPARENparenthesized_star : STAR\n                          | LPAREN parenthesized_star RPARENarg_list :\n                | expression\n                | arg_list COMMA expressionexpression : expression IN LPAREN constant_list RPARENconstant_list : strict_constant_list\n                     | strict_constant_list COMMAstrict_constant_list : constant\n                            | strict_constant_list COMMA constantexpression : constantconstant : INTEGERconstant : FLOATconstant : STRINGconstant : TRUEconstant : FALSEconstant : NULLexpression : column_idcolumn_id : id_component_list\n                 | id_component_list DOT STARid_component_list : ID\n                         | id_component_list DOT IDcase_clause_else : ELSE expressioncase_clause_when : WHEN expression THEN expressioncase_body : case_clause_when\n                 | case_body case_clause_else\n                 | case_clause_when case_bodyexpression : CASE case_body END'
     
-_lr_action_items = {'THEN':([3,5,6,7,8,10,13,17,18,19,25,36,57,58,59,60,80,84,85,88,89,90,91,92,94,95,98,99,100,101,102,103,106,108,125,126,129,134,152,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,-62,-63,-102,-104,104,-110,-59,-66,-74,-72,-65,-70,-67,-64,-60,-69,-71,-75,-73,-77,-76,-68,-82,-80,-78,-79,-61,-81,-88,]),'CONTAINS':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,54,54,54,54,-102,-104,54,-110,54,-59,-66,54,54,54,54,54,-67,54,-60,54,54,54,54,-77,54,-68,54,-82,-80,-78,-79,-61,54,-81,54,54,-88,54,54,]),'GROUP':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,118,123,124,125,126,129,134,137,139,140,141,145,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,-53,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,-3,-103,-41,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,138,-37,-38,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,-10,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'LESS_THAN_OR_EQUAL':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,39,-62,39,39,-102,-104,39,-110,39,-59,-66,-74,39,-72,-65,-70,-67,-64,-60,-69,-71,39,-73,-77,39,-68,39,-82,-80,-78,-79,-61,39,-81,39,39,-88,39,39,]),'WITHIN':([3,5,6,7,8,10,13,17,18,19,23,25,36,57,58,60,80,84,85,88,89,90,91,92,94,95,98,99,100,101,102,103,106,108,125,126,129,134,152,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,40,-62,-63,-102,-104,-110,-59,-66,-74,-72,-65,-70,-67,-64,-60,-69,-71,-75,-73,-77,-76,-68,-82,-80,-78,-79,-61,-81,-88,]),'CROSS':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,118,123,124,125,126,129,134,137,139,140,141,145,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,-53,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,-3,-103,117,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-7,117,-38,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,-10,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'LIMIT':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,118,123,124,125,126,129,134,137,139,140,141,145,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,32,-98,-103,-94,-49,-53,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,-3,-103,-41,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-7,-37,-38,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,-10,32,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'STAR':([2,3,5,6,7,8,10,13,17,18,19,23,24,25,29,33,35,36,57,58,59,60,68,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[4,-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,38,57,38,64,38,4,38,-102,-104,38,-110,64,38,-59,-66,38,38,38,38,38,-67,38,-60,38,38,38,38,-77,38,-68,38,-82,-80,-78,-79,-61,38,-81,38,38,-88,38,38,]),'LESS_THAN':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,41,-62,41,41,-102,-104,41,-110,41,-59,-66,-74,41,-72,-65,-70,-67,-64,-60,-69,-71,41,-73,-77,41,-68,41,-82,-80,-78,-79,-61,41,-81,41,41,-88,41,41,]),'NULL':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,46,47,50,52,53,54,55,56,62,66,68,93,97,104,109,113,153,155,159,],[7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,94,7,7,7,7,7,7,7,7,7,7,129,7,7,7,7,7,7,7,]),'TRUE':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,97,104,109,113,153,155,159,],[8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,]),'MINUS':([2,3,5,6,7,8,9,10,13,16,17,18,19,21,23,25,26,29,33,34,35,36,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,57,58,59,60,62,66,68,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,104,105,106,108,109,113,125,126,129,133,134,135,139,152,155,159,165,170,],[9,-95,-101,-93,-99,-97,9,-96,-100,9,-98,-103,-94,9,42,-62,9,9,42,9,9,42,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,-102,-104,42,-110,9,9,9,42,-59,-66,42,42,42,-65,42,-67,-64,-60,42,42,42,42,-77,42,-68,9,42,-82,-80,9,9,-78,-79,-61,42,-81,42,42,-88,9,9,42,42,]),'SELECT':([0,30,74,116,119,120,124,142,143,146,158,160,161,171,],[2,2,2,-30,2,2,2,-31,-32,-28,-33,-29,-26,-27,]),'CASE':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,104,109,113,155,159,],[11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,]),'NOT_EQUAL':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,43,-62,43,43,-102,-104,43,-110,43,-59,-66,-74,43,-72,-65,-70,-67,-64,-60,-69,-71,43,-73,-77,43,-68,43,-82,-80,-78,-79,-61,43,-81,43,43,-88,43,43,]),'RPAREN':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,29,31,33,34,35,36,37,51,57,58,60,64,65,66,67,69,70,71,72,73,75,76,77,78,79,80,81,82,83,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,107,108,110,112,114,115,118,123,124,125,126,129,130,131,132,134,135,136,137,139,140,141,145,148,149,150,151,152,153,154,162,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,-53,-62,-85,-1,80,-85,-50,-63,-85,-54,-102,-104,-110,-83,106,-85,108,-86,-47,-46,-25,-3,-103,-41,-43,-39,-24,-59,125,-52,126,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,134,-80,136,-7,140,-37,-38,-44,-40,-78,-79,-61,152,-89,-91,-81,-87,-84,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,-90,-10,-92,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'DISTINCT':([29,],[66,]),'WHEN':([3,5,6,7,8,10,11,13,17,18,19,25,28,36,57,58,60,80,84,85,88,89,90,91,92,94,95,98,99,100,101,102,103,106,108,125,126,129,133,134,152,],[-95,-101,-93,-99,-97,-96,26,-100,-98,-103,-94,-62,26,-63,-102,-104,-110,-59,-66,-74,-72,-65,-70,-67,-64,-60,-69,-71,-75,-73,-77,-76,-68,-82,-80,-78,-79,-61,-106,-81,-88,]),'DIVIDED_BY':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,44,44,44,44,-102,-104,44,-110,44,-59,-66,44,44,44,44,44,-67,44,-60,44,44,44,44,-77,44,-68,44,-82,-80,-78,-79,-61,44,-81,44,44,-88,44,44,]),'ORDER':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,118,123,124,125,126,129,134,137,139,140,141,145,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,-53,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,-3,-103,-41,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-7,-37,-38,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,164,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'ASC':([5,57,58,75,179,],[-101,-102,-104,-103,182,]),'RECORD':([40,],[86,]),'PLUS':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,45,-62,45,45,-102,-104,45,-110,45,-59,-66,45,45,45,-65,45,-67,-64,-60,45,45,45,45,-77,45,-68,45,-82,-80,-78,-79,-61,45,-81,45,45,-88,45,45,]),'DOT':([5,18,58,71,75,],[24,-103,-104,111,-103,]),'FROM':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,35,36,51,57,58,60,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,125,126,129,134,150,151,152,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,30,-98,-103,-94,-49,-53,-62,-50,-63,-54,-102,-104,-110,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-78,-79,-61,-81,-56,-57,-88,]),'INTEGER':([2,9,16,21,26,29,32,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,97,104,109,113,153,155,159,],[19,19,19,19,19,19,79,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,]),'BY':([138,157,164,],[156,169,173,]),'LEFT':([2,3,4,5,6,7,8,9,10,12,13,15,16,17,18,19,20,21,23,25,26,29,31,34,35,36,37,38,39,40,41,42,43,44,45,47,50,51,52,53,54,55,56,57,58,60,62,66,68,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,104,106,108,109,112,113,115,118,123,124,125,126,129,134,137,139,140,141,145,148,149,150,151,152,154,155,159,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[22,-95,-58,-101,-93,-99,-97,22,-96,-51,-100,-23,22,-98,-103,-94,-49,22,-53,-62,22,22,-1,22,22,-63,22,22,22,22,22,22,22,22,22,22,22,-54,22,22,22,22,22,-102,-104,-110,22,22,22,-47,-46,-25,-3,-103,121,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,22,-82,-80,22,-7,22,121,-38,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,-10,22,22,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'COUNT':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,104,109,113,155,159,],[14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,]),'END':([3,5,6,7,8,10,13,17,18,19,25,27,28,36,57,58,60,61,63,80,84,85,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,152,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,-62,60,-107,-63,-102,-104,-110,-108,-109,-59,-66,-74,-72,-65,-70,-67,-64,-60,-69,-71,-75,-73,-77,-76,-68,-105,-82,-80,-78,-79,-61,-106,-81,-88,]),'STRING':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,97,104,109,113,153,155,159,],[10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,]),'IS':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,46,-62,46,46,-102,-104,46,-110,46,-59,-66,-74,46,-72,-65,-70,-67,-64,-60,-69,-71,46,-73,-77,46,-68,46,-82,-80,-78,-79,-61,46,-81,46,46,-88,46,46,]),'EQUALS':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,47,-62,47,47,-102,-104,47,-110,47,-59,-66,-74,47,-72,-65,-70,-67,-64,-60,-69,-71,47,-73,-77,47,-68,47,-82,-80,-78,-79,-61,47,-81,47,47,-88,47,47,]),'ELSE':([3,5,6,7,8,10,13,17,18,19,25,27,28,36,57,58,60,61,63,80,84,85,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,152,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,-62,62,-107,-63,-102,-104,-110,-108,62,-59,-66,-74,-72,-65,-70,-67,-64,-60,-69,-71,-75,-73,-77,-76,-68,-105,-82,-80,-78,-79,-61,-106,-81,-88,]),'COMMA':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,29,31,34,35,36,37,51,57,58,60,66,67,69,70,71,72,73,75,76,77,78,79,80,81,82,83,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,107,108,112,115,118,123,124,125,126,129,131,132,134,135,137,139,140,141,145,148,149,150,151,152,154,162,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,35,-53,-62,-85,-1,-85,-50,-63,-85,-54,-102,-104,-110,-85,109,-86,-47,-46,-25,-3,-103,-41,-43,124,-24,-59,109,-52,109,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,109,-80,-7,-37,-38,-44,-40,-78,-79,-61,153,-91,-81,-87,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,-10,-92,-23,-6,-21,174,-8,-34,-2,-20,-9,-11,181,-14,-16,-22,-13,-17,-18,-15,]),'AS':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,86,87,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,118,123,124,125,126,129,134,137,139,140,141,145,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,48,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,-3,-103,-41,122,-39,-24,-59,-52,-66,-74,127,128,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-7,-37,-38,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,-10,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'LPAREN':([2,9,14,16,18,21,22,26,29,30,34,35,37,38,39,40,41,42,43,44,45,47,49,50,52,53,54,55,56,62,66,68,74,104,109,113,116,119,120,124,142,143,146,155,158,159,160,161,171,],[16,16,29,16,34,16,37,16,68,74,16,16,16,16,16,16,16,16,16,16,16,16,97,16,16,16,16,16,16,16,16,68,74,16,16,16,-30,74,74,74,-31,-32,-28,16,-33,16,-29,-26,-27,]),'IN':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,49,49,49,49,-102,-104,49,-110,49,-59,-66,49,49,49,49,49,-67,49,-60,49,49,49,49,-77,49,-68,49,-82,-80,-78,-79,-61,49,-81,49,49,-88,49,49,]),'GREATER_THAN':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,50,-62,50,50,-102,-104,50,-110,50,-59,-66,-74,50,-72,-65,-70,-67,-64,-60,-69,-71,50,-73,-77,50,-68,50,-82,-80,-78,-79,-61,50,-81,50,50,-88,50,50,]),'JOIN':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,117,118,121,123,124,125,126,129,134,137,139,140,141,145,147,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,-53,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,-3,-103,116,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-7,116,143,-38,146,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,-35,161,-45,-42,-56,-57,-88,-10,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'WHERE':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,118,123,124,125,126,129,134,137,139,140,141,145,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,-53,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,113,-103,-41,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-7,-37,-38,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,-10,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'ID':([2,3,4,5,6,7,8,9,10,12,13,15,16,17,18,19,20,21,23,24,25,26,29,30,31,34,35,36,37,38,39,40,41,42,43,44,45,47,48,50,51,52,53,54,55,56,57,58,60,62,66,68,70,71,72,73,74,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,104,106,108,109,111,112,113,115,116,118,119,120,122,123,124,125,126,127,128,129,134,137,139,140,141,142,143,145,146,148,149,150,151,152,154,155,156,158,159,160,161,163,165,166,167,168,169,170,171,172,173,174,175,176,177,178,179,180,181,182,183,184,],[18,-95,-58,-101,-93,-99,-97,18,-96,-51,-100,-23,18,-98,-103,-94,-49,18,51,58,-62,18,18,75,-1,18,18,-63,18,18,18,18,18,18,18,18,18,18,96,18,-54,18,18,18,18,18,-102,-104,-110,18,18,18,-47,-46,-25,-3,75,-103,-41,123,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,18,-82,-80,18,58,-7,18,-37,-30,-38,75,75,148,-44,75,-78,-79,150,151,-61,-81,-5,-4,-48,-36,-31,-32,-35,-28,-45,-42,-56,-57,-88,-10,18,75,-33,18,-29,-26,-23,-6,-21,-19,-8,75,-34,-27,-2,75,75,-9,-11,-12,-14,-16,-22,75,-17,-18,-15,]),'DESC':([5,57,58,75,179,],[-101,-102,-104,-103,183,]),'AND':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,52,-62,52,52,-102,-104,52,-110,52,-59,-66,-74,52,-72,-65,-70,-67,-64,-60,-69,-71,-75,-73,-77,-76,-68,52,-82,-80,-78,-79,-61,52,-81,52,52,-88,52,52,]),'ON':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,118,123,124,125,126,129,134,137,139,140,141,144,145,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,-53,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,-3,-103,-41,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-7,-37,-38,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,159,-35,-45,-42,-56,-57,-88,-10,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'FALSE':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,97,104,109,113,153,155,159,],[17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,]),'GREATER_THAN_OR_EQUAL':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,53,-62,53,53,-102,-104,53,-110,53,-59,-66,-74,53,-72,-65,-70,-67,-64,-60,-69,-71,53,-73,-77,53,-68,53,-82,-80,-78,-79,-61,53,-81,53,53,-88,53,53,]),'FLOAT':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,97,104,109,113,153,155,159,],[3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,]),'OR':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,55,-62,55,55,-102,-104,55,-110,55,-59,-66,-74,55,-72,-65,-70,-67,-64,-60,-69,-71,-75,-73,-77,-76,-68,55,-82,-80,-78,-79,-61,55,-81,55,55,-88,55,55,]),'EACH':([116,138,143,146,161,],[142,157,158,160,171,]),'NOT':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,46,47,50,52,53,54,55,56,62,66,68,104,109,113,155,159,],[21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,93,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,]),'$end':([1,3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,118,123,124,125,126,129,134,137,139,140,141,145,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[0,-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,-53,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,-3,-103,-41,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-7,-37,-38,-44,-40,-78,-79,-61,-81,-5,-4,-48,-36,-35,-45,-42,-56,-57,-88,-10,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'OUTER':([121,],[147,]),'HAVING':([3,4,5,6,7,8,10,12,13,15,17,18,19,20,23,25,31,35,36,51,57,58,60,70,71,72,73,75,76,77,78,79,80,82,84,85,88,89,90,91,92,94,95,96,98,99,100,101,102,103,106,108,112,115,118,123,124,125,126,129,134,137,139,140,141,145,148,149,150,151,152,154,163,165,166,167,168,170,172,174,175,176,177,178,179,180,181,182,183,184,],[-95,-58,-101,-93,-99,-97,-96,-51,-100,-23,-98,-103,-94,-49,-53,-62,-1,-50,-63,-54,-102,-104,-110,-47,-46,-25,-3,-103,-41,-43,-39,-24,-59,-52,-66,-74,-72,-65,-70,-67,-64,-60,-69,-55,-71,-75,-73,-77,-76,-68,-82,-80,-7,-37,-38,-44,-40,-78,-79,-61,-81,155,-4,-48,-36,-35,-45,-42,-56,-57,-88,-10,-23,-6,-21,-19,-8,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'MOD':([3,5,6,7,8,10,13,17,18,19,23,25,33,36,57,58,59,60,69,80,84,85,87,88,89,90,91,92,94,95,98,99,100,101,102,103,105,106,108,125,126,129,133,134,135,139,152,165,170,],[-95,-101,-93,-99,-97,-96,-100,-98,-103,-94,56,56,56,56,-102,-104,56,-110,56,-59,-66,56,56,56,56,56,-67,56,-60,56,56,56,56,-77,56,-68,56,-82,-80,-78,-79,-61,56,-81,56,56,-88,56,56,]),}
+_lr_action_items = {'SELECT':([0,25,64,108,109,111,113,141,142,143,161,162,163,175,],[2,2,2,2,2,-30,2,-28,-31,-32,-26,-29,-33,-27,]),'$end':([1,3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,113,114,121,125,127,129,131,134,136,137,139,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[0,-23,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,-3,-25,-41,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-7,-38,-37,-40,-44,-62,-79,-80,-81,-83,-5,-4,-36,-35,-42,-45,-49,-58,-57,-89,-82,-10,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'STAR':([2,6,7,10,15,16,18,19,20,21,22,23,27,48,49,50,52,56,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,92,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[8,34,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,8,34,34,34,96,102,34,-61,34,34,-67,-68,-69,34,34,34,34,34,34,34,34,-78,34,-60,96,-111,34,-103,-105,-62,-79,-80,-81,-83,34,34,-89,34,-82,34,34,34,]),'LPAREN':([2,7,9,11,12,13,14,25,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,46,47,51,52,55,62,64,92,94,99,105,108,109,111,113,116,126,133,141,142,143,157,160,161,162,163,175,],[9,47,9,9,9,51,52,64,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,87,9,9,92,9,116,64,92,9,9,9,64,64,-30,64,9,9,9,-28,-31,-32,9,9,-26,-29,-33,-27,]),'MINUS':([2,6,7,9,10,11,12,15,16,18,19,20,21,22,23,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,48,49,50,51,52,55,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,92,94,97,99,101,102,103,105,116,121,125,126,127,129,131,132,133,136,150,152,154,155,157,160,168,174,],[12,33,-104,12,-100,12,12,-94,-101,-95,-96,-97,-98,-99,-102,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,33,33,-63,12,12,12,33,-61,-65,-66,-67,-68,-69,33,33,33,33,33,33,33,33,-78,33,-60,12,12,-111,12,33,-103,-105,12,12,-62,-79,12,-80,-81,-83,33,12,33,-89,33,-82,33,12,12,33,33,]),'NOT':([2,9,11,12,27,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,92,94,99,105,116,126,133,157,160,],[11,11,11,11,11,11,72,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,]),'ID':([2,3,4,5,6,7,8,9,10,11,12,15,16,18,19,20,21,22,23,24,25,27,28,29,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,49,50,51,52,55,56,57,58,59,60,61,62,63,64,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,92,94,97,99,102,103,104,105,106,107,108,109,111,113,114,115,116,117,119,120,121,125,126,127,129,131,133,134,136,137,139,141,142,143,144,145,147,148,149,150,154,156,157,158,160,161,162,163,164,166,168,169,170,171,172,173,174,175,176,177,178,179,180,181,182,183,184,185,186,187,188,],[7,-23,-50,-52,28,-104,-59,7,-100,7,7,-94,-101,-95,-96,-97,-98,-99,-102,-1,62,7,-55,68,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,-64,-63,7,7,7,103,-3,-25,-41,-39,114,-104,-46,62,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,7,7,-111,7,-103,-105,-7,7,-38,-37,62,62,-30,62,-44,145,7,103,148,149,-62,-79,7,-80,-81,-83,7,-5,-4,-36,-35,-28,-31,-32,-42,-45,-49,-58,-57,-89,-82,-10,7,172,7,-26,-29,-33,-47,-23,-6,-8,-19,-21,-104,172,-34,-27,-2,172,172,-9,-11,-12,-14,-16,-22,172,-17,-18,-15,]),'LEFT':([2,3,4,5,6,7,8,9,10,11,12,15,16,18,19,20,21,22,23,24,27,28,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,49,50,51,52,55,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,92,94,97,99,102,103,104,105,106,107,113,114,116,121,125,126,127,129,131,133,134,136,137,139,144,145,147,148,149,150,154,156,157,160,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[13,-23,-50,-52,-54,-104,-59,13,-100,13,13,-94,-101,-95,-96,-97,-98,-99,-102,-1,13,-55,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,-64,-63,13,13,13,-3,-25,110,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,13,13,-111,13,-103,-105,-7,13,-38,110,-40,-44,13,-62,-79,13,-80,-81,-83,13,-5,-4,-36,-35,-42,-45,-49,-58,-57,-89,-82,-10,13,13,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'COUNT':([2,9,11,12,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,92,94,99,105,116,126,133,157,160,],[14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,]),'CASE':([2,9,11,12,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,92,94,99,105,116,126,133,157,160,],[17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,]),'INTEGER':([2,9,11,12,26,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,87,92,94,99,105,116,126,133,151,157,160,],[18,18,18,18,66,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,]),'FLOAT':([2,9,11,12,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,87,92,94,99,105,116,126,133,151,157,160,],[19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,]),'STRING':([2,9,11,12,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,87,92,94,99,105,116,126,133,151,157,160,],[20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,]),'TRUE':([2,9,11,12,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,87,92,94,99,105,116,126,133,151,157,160,],[21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,]),'FALSE':([2,9,11,12,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,87,92,94,99,105,116,126,133,151,157,160,],[22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,]),'NULL':([2,9,11,12,27,30,31,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,72,87,92,94,99,105,116,126,133,151,157,160,],[10,10,10,10,10,10,71,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,121,10,10,10,10,10,10,10,10,10,10,10,]),'FROM':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,27,28,49,50,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,121,125,127,129,131,148,149,150,154,],[25,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-51,-55,-64,-63,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-62,-79,-80,-81,-83,-58,-57,-89,-82,]),'AS':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,69,70,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,113,114,121,125,127,129,131,134,136,137,139,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,-50,-52,29,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,-3,-25,-41,-39,115,-104,-46,-48,-24,-53,-56,119,120,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-7,-38,-37,-40,-44,-62,-79,-80,-81,-83,-5,-4,-36,-35,-42,-45,-49,-58,-57,-89,-82,-10,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'JOIN':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,110,112,113,114,121,125,127,129,131,134,136,137,139,140,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,-3,-25,111,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-7,-38,111,141,143,-40,-44,-62,-79,-80,-81,-83,-5,-4,-36,-35,161,-42,-45,-49,-58,-57,-89,-82,-10,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'CROSS':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,113,114,121,125,127,129,131,134,136,137,139,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,-3,-25,112,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-7,-38,112,-40,-44,-62,-79,-80,-81,-83,-5,-4,-36,-35,-42,-45,-49,-58,-57,-89,-82,-10,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'COMMA':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,47,49,50,51,52,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,88,89,90,91,93,94,97,102,103,104,106,107,113,114,116,121,123,124,125,127,129,130,131,134,136,137,139,144,145,146,147,148,149,150,152,154,156,164,165,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,27,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-86,-64,-63,-86,-86,-3,-25,-41,113,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,126,-87,-60,126,126,-86,-111,-103,-105,-7,-38,-37,-40,-44,-86,-62,151,-92,-79,-80,-81,126,-83,-5,-4,-36,-35,-42,-45,126,-49,-58,-57,-89,-88,-82,-10,-47,-93,-23,-6,-8,178,-21,-104,-34,-2,-20,-9,-11,185,-14,-16,-22,-13,-17,-18,-15,]),'WHERE':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,113,114,121,125,127,129,131,134,136,137,139,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,105,-25,-41,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-7,-38,-37,-40,-44,-62,-79,-80,-81,-83,-5,-4,-36,-35,-42,-45,-49,-58,-57,-89,-82,-10,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'GROUP':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,113,114,121,125,127,129,131,134,136,137,139,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,-3,-25,-41,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,135,-38,-37,-40,-44,-62,-79,-80,-81,-83,-5,-4,-36,-35,-42,-45,-49,-58,-57,-89,-82,-10,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'HAVING':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,113,114,121,125,127,129,131,134,136,137,139,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,-3,-25,-41,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-7,-38,-37,-40,-44,-62,-79,-80,-81,-83,157,-4,-36,-35,-42,-45,-49,-58,-57,-89,-82,-10,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'ORDER':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,113,114,121,125,127,129,131,134,136,137,139,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,-3,-25,-41,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-7,-38,-37,-40,-44,-62,-79,-80,-81,-83,-5,-4,-36,-35,-42,-45,-49,-58,-57,-89,-82,167,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'LIMIT':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,113,114,121,125,127,129,131,134,136,137,139,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[26,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,-3,-25,-41,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-7,-38,-37,-40,-44,-62,-79,-80,-81,-83,-5,-4,-36,-35,-42,-45,-49,-58,-57,-89,-82,-10,-47,26,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'RPAREN':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,47,48,49,50,51,52,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,88,89,90,91,93,94,95,96,97,102,103,104,106,107,113,114,116,118,121,122,123,124,125,127,128,129,130,131,134,136,137,139,144,145,146,147,148,149,150,151,152,153,154,156,164,165,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-86,90,-64,-63,-86,-86,-3,-25,-41,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,125,-87,-60,127,129,-86,131,-84,-111,-103,-105,-7,-38,-37,-40,-44,-86,147,-62,150,-90,-92,-79,-80,153,-81,154,-83,-5,-4,-36,-35,-42,-45,164,-49,-58,-57,-89,-91,-88,-85,-82,-10,-47,-93,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'ON':([3,4,5,6,7,8,10,15,16,18,19,20,21,22,23,24,27,28,49,50,57,58,59,60,61,62,63,65,66,67,68,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,104,106,107,113,114,121,125,127,129,131,134,136,137,138,139,144,145,147,148,149,150,154,156,164,166,168,169,170,171,172,174,176,178,179,180,181,182,183,184,185,186,187,188,],[-23,-50,-52,-54,-104,-59,-100,-94,-101,-95,-96,-97,-98,-99,-102,-1,-51,-55,-64,-63,-3,-25,-41,-39,-43,-104,-46,-48,-24,-53,-56,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-7,-38,-37,-40,-44,-62,-79,-80,-81,-83,-5,-4,-36,160,-35,-42,-45,-49,-58,-57,-89,-82,-10,-47,-23,-6,-8,-19,-21,-104,-34,-2,-20,-9,-11,-12,-14,-16,-22,-13,-17,-18,-15,]),'WITHIN':([6,7,10,15,16,18,19,20,21,22,23,49,50,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,121,125,127,129,131,150,154,],[30,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,-64,-63,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-62,-79,-80,-81,-83,-89,-82,]),'IS':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[31,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,31,31,-63,31,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,31,31,-78,31,-60,-111,31,-103,-105,-62,-79,-80,-81,-83,31,31,-89,31,-82,31,31,31,]),'PLUS':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[32,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,32,32,-63,32,-61,-65,-66,-67,-68,-69,32,32,32,32,32,32,32,32,-78,32,-60,-111,32,-103,-105,-62,-79,-80,-81,-83,32,32,-89,32,-82,32,32,32,]),'DIVIDED_BY':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[35,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,35,35,35,35,-61,35,35,-67,-68,-69,35,35,35,35,35,35,35,35,-78,35,-60,-111,35,-103,-105,-62,-79,-80,-81,-83,35,35,-89,35,-82,35,35,35,]),'MOD':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[36,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,36,36,36,36,-61,36,36,-67,-68,-69,36,36,36,36,36,36,36,36,-78,36,-60,-111,36,-103,-105,-62,-79,-80,-81,-83,36,36,-89,36,-82,36,36,36,]),'EQUALS':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[37,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,37,37,-63,37,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,37,37,-78,37,-60,-111,37,-103,-105,-62,-79,-80,-81,-83,37,37,-89,37,-82,37,37,37,]),'NOT_EQUAL':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[38,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,38,38,-63,38,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,38,38,-78,38,-60,-111,38,-103,-105,-62,-79,-80,-81,-83,38,38,-89,38,-82,38,38,38,]),'GREATER_THAN':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[39,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,39,39,-63,39,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,39,39,-78,39,-60,-111,39,-103,-105,-62,-79,-80,-81,-83,39,39,-89,39,-82,39,39,39,]),'LESS_THAN':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[40,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,40,40,-63,40,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,40,40,-78,40,-60,-111,40,-103,-105,-62,-79,-80,-81,-83,40,40,-89,40,-82,40,40,40,]),'GREATER_THAN_OR_EQUAL':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[41,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,41,41,-63,41,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,41,41,-78,41,-60,-111,41,-103,-105,-62,-79,-80,-81,-83,41,41,-89,41,-82,41,41,41,]),'LESS_THAN_OR_EQUAL':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[42,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,42,42,-63,42,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,42,42,-78,42,-60,-111,42,-103,-105,-62,-79,-80,-81,-83,42,42,-89,42,-82,42,42,42,]),'AND':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[43,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,43,43,-63,43,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,43,-60,-111,43,-103,-105,-62,-79,-80,-81,-83,43,43,-89,43,-82,43,43,43,]),'OR':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[44,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,44,44,-63,44,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,44,-60,-111,44,-103,-105,-62,-79,-80,-81,-83,44,44,-89,44,-82,44,44,44,]),'CONTAINS':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[45,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,45,45,45,45,-61,45,45,-67,-68,-69,45,45,45,45,45,45,45,45,-78,45,-60,-111,45,-103,-105,-62,-79,-80,-81,-83,45,45,-89,45,-82,45,45,45,]),'IN':([6,7,10,15,16,18,19,20,21,22,23,48,49,50,69,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,90,97,101,102,103,121,125,127,129,131,132,136,150,152,154,155,168,174,],[46,-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,46,46,46,46,-61,46,46,-67,-68,-69,46,46,46,46,46,46,46,46,-78,46,-60,-111,46,-103,-105,-62,-79,-80,-81,-83,46,46,-89,46,-82,46,46,46,]),'DOT':([7,23,62,63,103,172,],[-104,56,-104,117,-105,-104,]),'THEN':([7,10,15,16,18,19,20,21,22,23,49,50,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,101,102,103,121,125,127,129,131,150,154,],[-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,-64,-63,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,133,-103,-105,-62,-79,-80,-81,-83,-89,-82,]),'END':([7,10,15,16,18,19,20,21,22,23,49,50,53,54,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,98,100,102,103,121,125,127,129,131,132,150,154,155,],[-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,-64,-63,97,-108,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-109,-110,-103,-105,-62,-79,-80,-81,-83,-106,-89,-82,-107,]),'ELSE':([7,10,15,16,18,19,20,21,22,23,49,50,53,54,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,98,100,102,103,121,125,127,129,131,132,150,154,155,],[-104,-100,-94,-101,-95,-96,-97,-98,-99,-102,-64,-63,99,-108,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-109,99,-103,-105,-62,-79,-80,-81,-83,-106,-89,-82,-107,]),'WHEN':([7,10,15,16,17,18,19,20,21,22,23,49,50,54,71,73,74,75,76,77,78,79,80,81,82,83,84,85,86,90,97,102,103,121,125,127,129,131,150,154,155,],[-104,-100,-94,-101,55,-95,-96,-97,-98,-99,-102,-64,-63,55,-61,-65,-66,-67,-68,-69,-70,-71,-72,-73,-74,-75,-76,-77,-78,-60,-111,-103,-105,-62,-79,-80,-81,-83,-89,-82,-107,]),'ASC':([23,102,103,172,183,],[-102,-103,-105,-104,186,]),'DESC':([23,102,103,172,183,],[-102,-103,-105,-104,187,]),'RECORD':([30,],[70,]),'DISTINCT':([52,],[94,]),'OUTER':([110,],[140,]),'EACH':([111,135,141,143,161,],[142,159,162,163,175,]),'BY':([135,159,167,],[158,173,177,]),}
 
-_lr_action = { }
+_lr_action = {}
 for _k, _v in _lr_action_items.items():
    for _x,_y in zip(_v[0],_v[1]):
-      if not _x in _lr_action:  _lr_action[_x] = { }
+      if not _x in _lr_action:  _lr_action[_x] = {}
       _lr_action[_x][_k] = _y
 del _lr_action_items
 
-_lr_goto_items = {'constant':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,97,104,109,113,153,155,159,],[6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,132,6,6,6,162,6,6,]),'parenthesized_star':([29,68,],[65,110,]),'case_body':([11,28,],[27,63,]),'case_clause_when':([11,28,],[28,28,]),'column_id':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,104,109,113,155,156,159,169,173,174,181,],[13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,166,13,166,179,180,179,]),'select':([0,30,74,119,120,124,],[1,70,70,70,70,70,]),'strict_order_by_list':([173,],[177,]),'select_field':([2,35,],[12,82,]),'optional_order_by':([154,],[163,]),'column_id_list':([156,169,],[168,175,]),'partial_join':([76,115,],[115,115,]),'ordering':([173,181,],[178,184,]),'optional_where':([73,],[112,]),'optional_having':([137,],[154,]),'id_component_list':([2,9,16,21,26,29,30,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,74,104,109,113,119,120,124,155,156,159,169,173,174,181,],[5,5,5,5,5,5,71,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,71,5,5,5,71,71,71,5,5,5,5,5,5,5,]),'join_tail':([76,115,],[118,141,]),'strict_constant_list':([97,],[131,]),'strict_column_id_list':([156,169,],[167,167,]),'arg_list':([29,34,37,66,],[67,81,83,107,]),'aliased_table_expr_list':([30,],[72,]),'order_by_list':([173,],[176,]),'optional_group_by':([112,],[137,]),'select_field_list':([2,],[15,]),'full_table_expr':([30,],[73,]),'cross_join':([76,115,],[120,120,]),'constant_list':([97,],[130,]),'optional_limit':([15,163,],[31,172,]),'aliased_table_expr':([30,119,120,124,],[76,144,145,149,]),'expression':([2,9,16,21,26,29,34,35,37,38,39,40,41,42,43,44,45,47,50,52,53,54,55,56,62,66,68,104,109,113,155,159,],[23,25,33,36,59,69,69,23,69,84,85,87,88,89,90,91,92,95,98,99,100,101,102,103,105,69,33,133,135,139,165,170,]),'case_clause_else':([27,63,],[61,61,]),'non_cross_join':([76,115,],[119,119,]),'strict_select_field_list':([2,],[20,]),'table_expr':([30,74,119,120,124,],[77,114,77,77,77,]),'strict_aliased_table_expr_list':([30,],[78,]),}
+_lr_goto_items = {'select':([0,25,64,108,109,113,],[1,65,65,65,65,65,]),'select_field_list':([2,],[3,]),'strict_select_field_list':([2,],[4,]),'select_field':([2,27,],[5,67,]),'expression':([2,9,11,12,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,92,94,99,105,116,126,133,157,160,],[6,48,49,50,6,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,89,89,89,101,48,89,132,136,89,152,155,168,174,]),'constant':([2,9,11,12,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,87,92,94,99,105,116,126,133,151,157,160,],[15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,124,15,15,15,15,15,15,15,165,15,15,]),'column_id':([2,9,11,12,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,92,94,99,105,116,126,133,157,158,160,173,177,178,185,],[16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,171,16,171,183,184,183,]),'id_component_list':([2,9,11,12,25,27,30,32,33,34,35,36,37,38,39,40,41,42,43,44,45,47,51,52,55,64,92,94,99,105,108,109,113,116,126,133,157,158,160,173,177,178,185,],[23,23,23,23,63,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,63,23,23,23,23,63,63,63,23,23,23,23,23,23,23,23,23,23,]),'optional_limit':([3,166,],[24,176,]),'case_body':([17,54,],[53,100,]),'case_clause_when':([17,54,],[54,54,]),'full_table_expr':([25,],[57,]),'aliased_table_expr_list':([25,],[58,]),'aliased_table_expr':([25,108,109,113,],[59,138,139,144,]),'strict_aliased_table_expr_list':([25,],[60,]),'table_expr':([25,64,108,109,113,],[61,118,61,61,61,]),'arg_list':([47,51,52,94,116,],[88,91,93,130,146,]),'parenthesized_star':([52,92,],[95,128,]),'case_clause_else':([53,100,],[98,98,]),'optional_where':([57,],[104,]),'join_tail':([59,107,],[106,137,]),'partial_join':([59,107,],[107,107,]),'non_cross_join':([59,107,],[108,108,]),'cross_join':([59,107,],[109,109,]),'constant_list':([87,],[122,]),'strict_constant_list':([87,],[123,]),'optional_group_by':([104,],[134,]),'optional_having':([134,],[156,]),'optional_order_by':([156,],[166,]),'column_id_list':([158,173,],[169,179,]),'strict_column_id_list':([158,173,],[170,170,]),'order_by_list':([177,],[180,]),'strict_order_by_list':([177,],[181,]),'ordering':([177,185,],[182,188,]),}
 
-_lr_goto = { }
+_lr_goto = {}
 for _k, _v in _lr_goto_items.items():
-   for _x,_y in zip(_v[0],_v[1]):
-       if not _x in _lr_goto: _lr_goto[_x] = { }
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
        _lr_goto[_x][_k] = _y
 del _lr_goto_items
 _lr_productions = [
   ("S' -> select","S'",1,None,None,None),
-  ('select -> SELECT select_field_list optional_limit','select',3,'p_select','parser.py',22),
-  ('select -> SELECT select_field_list FROM full_table_expr optional_where optional_group_by optional_having optional_order_by optional_limit','select',9,'p_select','parser.py',23),
-  ('optional_where -> <empty>','optional_where',0,'p_optional_where','parser.py',36),
-  ('optional_where -> WHERE expression','optional_where',2,'p_optional_where','parser.py',37),
-  ('optional_having -> <empty>','optional_having',0,'p_optional_having','parser.py',46),
-  ('optional_having -> HAVING expression','optional_having',2,'p_optional_having','parser.py',47),
-  ('optional_group_by -> <empty>','optional_group_by',0,'p_optional_group_by','parser.py',56),
-  ('optional_group_by -> GROUP BY column_id_list','optional_group_by',3,'p_optional_group_by','parser.py',57),
-  ('optional_group_by -> GROUP EACH BY column_id_list','optional_group_by',4,'p_optional_group_by','parser.py',58),
-  ('optional_order_by -> <empty>','optional_order_by',0,'p_optional_order_by','parser.py',67),
-  ('optional_order_by -> ORDER BY order_by_list','optional_order_by',3,'p_optional_order_by','parser.py',68),
-  ('order_by_list -> strict_order_by_list','order_by_list',1,'p_order_by_list','parser.py',76),
-  ('order_by_list -> strict_order_by_list COMMA','order_by_list',2,'p_order_by_list','parser.py',77),
-  ('strict_order_by_list -> ordering','strict_order_by_list',1,'p_strict_order_by_list','parser.py',82),
-  ('strict_order_by_list -> strict_order_by_list COMMA ordering','strict_order_by_list',3,'p_strict_order_by_list','parser.py',83),
-  ('ordering -> column_id','ordering',1,'p_ordering_asc','parser.py',92),
-  ('ordering -> column_id ASC','ordering',2,'p_ordering_asc','parser.py',93),
-  ('ordering -> column_id DESC','ordering',2,'p_ordering_desc','parser.py',98),
-  ('column_id_list -> strict_column_id_list','column_id_list',1,'p_column_id_list','parser.py',103),
-  ('column_id_list -> strict_column_id_list COMMA','column_id_list',2,'p_column_id_list','parser.py',104),
-  ('strict_column_id_list -> column_id','strict_column_id_list',1,'p_strict_column_id_list','parser.py',109),
-  ('strict_column_id_list -> strict_column_id_list COMMA column_id','strict_column_id_list',3,'p_strict_column_id_list','parser.py',110),
-  ('optional_limit -> <empty>','optional_limit',0,'p_optional_limit','parser.py',120),
-  ('optional_limit -> LIMIT INTEGER','optional_limit',2,'p_optional_limit','parser.py',121),
-  ('full_table_expr -> aliased_table_expr_list','full_table_expr',1,'p_table_expr_table_or_union','parser.py',130),
-  ('non_cross_join -> LEFT OUTER JOIN','non_cross_join',3,'p_non_cross_join','parser.py',140),
-  ('non_cross_join -> LEFT OUTER JOIN EACH','non_cross_join',4,'p_non_cross_join','parser.py',141),
-  ('non_cross_join -> LEFT JOIN','non_cross_join',2,'p_non_cross_join','parser.py',142),
-  ('non_cross_join -> LEFT JOIN EACH','non_cross_join',3,'p_non_cross_join','parser.py',143),
-  ('non_cross_join -> JOIN','non_cross_join',1,'p_non_cross_join','parser.py',144),
-  ('non_cross_join -> JOIN EACH','non_cross_join',2,'p_non_cross_join','parser.py',145),
-  ('cross_join -> CROSS JOIN','cross_join',2,'p_cross_join','parser.py',154),
-  ('cross_join -> CROSS JOIN EACH','cross_join',3,'p_cross_join','parser.py',155),
-  ('partial_join -> non_cross_join aliased_table_expr ON expression','partial_join',4,'p_partial_join','parser.py',161),
-  ('partial_join -> cross_join aliased_table_expr','partial_join',2,'p_partial_join','parser.py',162),
-  ('join_tail -> partial_join join_tail','join_tail',2,'p_join_tail','parser.py',171),
-  ('join_tail -> partial_join','join_tail',1,'p_join_tail','parser.py',172),
-  ('full_table_expr -> aliased_table_expr join_tail','full_table_expr',2,'p_join','parser.py',182),
-  ('aliased_table_expr_list -> strict_aliased_table_expr_list','aliased_table_expr_list',1,'p_aliased_table_expr_list','parser.py',187),
-  ('aliased_table_expr_list -> strict_aliased_table_expr_list COMMA','aliased_table_expr_list',2,'p_aliased_table_expr_list','parser.py',188),
-  ('strict_aliased_table_expr_list -> aliased_table_expr','strict_aliased_table_expr_list',1,'p_strict_aliased_table_expr_list','parser.py',193),
-  ('strict_aliased_table_expr_list -> strict_aliased_table_expr_list COMMA aliased_table_expr','strict_aliased_table_expr_list',3,'p_strict_aliased_table_expr_list','parser.py',194),
-  ('aliased_table_expr -> table_expr','aliased_table_expr',1,'p_aliased_table_expr','parser.py',205),
-  ('aliased_table_expr -> table_expr ID','aliased_table_expr',2,'p_aliased_table_expr','parser.py',206),
-  ('aliased_table_expr -> table_expr AS ID','aliased_table_expr',3,'p_aliased_table_expr','parser.py',207),
-  ('table_expr -> id_component_list','table_expr',1,'p_table_id','parser.py',223),
-  ('table_expr -> select','table_expr',1,'p_select_table_expression','parser.py',228),
-  ('table_expr -> LPAREN table_expr RPAREN','table_expr',3,'p_table_expression_parens','parser.py',233),
-  ('select_field_list -> strict_select_field_list','select_field_list',1,'p_select_field_list','parser.py',238),
-  ('select_field_list -> strict_select_field_list COMMA','select_field_list',2,'p_select_field_list','parser.py',239),
-  ('strict_select_field_list -> select_field','strict_select_field_list',1,'p_strict_select_field_list','parser.py',244),
-  ('strict_select_field_list -> strict_select_field_list COMMA select_field','strict_select_field_list',3,'p_strict_select_field_list','parser.py',245),
-  ('select_field -> expression','select_field',1,'p_select_field','parser.py',255),
-  ('select_field -> expression ID','select_field',2,'p_select_field','parser.py',256),
-  ('select_field -> expression AS ID','select_field',3,'p_select_field','parser.py',257),
-  ('select_field -> expression WITHIN RECORD AS ID','select_field',5,'p_select_field','parser.py',258),
-  ('select_field -> expression WITHIN expression AS ID','select_field',5,'p_select_field','parser.py',259),
-  ('select_field -> STAR','select_field',1,'p_select_star','parser.py',277),
-  ('expression -> LPAREN expression RPAREN','expression',3,'p_expression_parens','parser.py',282),
-  ('expression -> expression IS NULL','expression',3,'p_expression_is_null','parser.py',287),
-  ('expression -> expression IS NOT NULL','expression',4,'p_expression_is_not_null','parser.py',292),
-  ('expression -> MINUS expression','expression',2,'p_expression_unary','parser.py',297),
-  ('expression -> NOT expression','expression',2,'p_expression_unary','parser.py',298),
-  ('expression -> expression PLUS expression','expression',3,'p_expression_binary','parser.py',304),
-  ('expression -> expression MINUS expression','expression',3,'p_expression_binary','parser.py',305),
-  ('expression -> expression STAR expression','expression',3,'p_expression_binary','parser.py',306),
-  ('expression -> expression DIVIDED_BY expression','expression',3,'p_expression_binary','parser.py',307),
-  ('expression -> expression MOD expression','expression',3,'p_expression_binary','parser.py',308),
-  ('expression -> expression EQUALS expression','expression',3,'p_expression_binary','parser.py',309),
-  ('expression -> expression NOT_EQUAL expression','expression',3,'p_expression_binary','parser.py',310),
-  ('expression -> expression GREATER_THAN expression','expression',3,'p_expression_binary','parser.py',311),
-  ('expression -> expression LESS_THAN expression','expression',3,'p_expression_binary','parser.py',312),
-  ('expression -> expression GREATER_THAN_OR_EQUAL expression','expression',3,'p_expression_binary','parser.py',313),
-  ('expression -> expression LESS_THAN_OR_EQUAL expression','expression',3,'p_expression_binary','parser.py',314),
-  ('expression -> expression AND expression','expression',3,'p_expression_binary','parser.py',315),
-  ('expression -> expression OR expression','expression',3,'p_expression_binary','parser.py',316),
-  ('expression -> expression CONTAINS expression','expression',3,'p_expression_binary','parser.py',317),
-  ('expression -> ID LPAREN arg_list RPAREN','expression',4,'p_expression_func_call','parser.py',323),
-  ('expression -> LEFT LPAREN arg_list RPAREN','expression',4,'p_expression_func_call','parser.py',324),
-  ('expression -> COUNT LPAREN arg_list RPAREN','expression',4,'p_expression_count','parser.py',332),
-  ('expression -> COUNT LPAREN DISTINCT arg_list RPAREN','expression',5,'p_expression_count_distinct','parser.py',337),
-  ('expression -> COUNT LPAREN parenthesized_star RPAREN','expression',4,'p_expression_count_star','parser.py',342),
-  ('parenthesized_star -> STAR','parenthesized_star',1,'p_parenthesized_star','parser.py',348),
-  ('parenthesized_star -> LPAREN parenthesized_star RPAREN','parenthesized_star',3,'p_parenthesized_star','parser.py',349),
-  ('arg_list -> <empty>','arg_list',0,'p_arg_list','parser.py',353),
-  ('arg_list -> expression','arg_list',1,'p_arg_list','parser.py',354),
-  ('arg_list -> arg_list COMMA expression','arg_list',3,'p_arg_list','parser.py',355),
-  ('expression -> expression IN LPAREN constant_list RPAREN','expression',5,'p_expression_in','parser.py',368),
-  ('constant_list -> strict_constant_list','constant_list',1,'p_constant_list','parser.py',373),
-  ('constant_list -> strict_constant_list COMMA','constant_list',2,'p_constant_list','parser.py',374),
-  ('strict_constant_list -> constant','strict_constant_list',1,'p_strict_constant_list','parser.py',379),
-  ('strict_constant_list -> strict_constant_list COMMA constant','strict_constant_list',3,'p_strict_constant_list','parser.py',380),
-  ('expression -> constant','expression',1,'p_expression_constant','parser.py',389),
-  ('constant -> INTEGER','constant',1,'p_int_literal','parser.py',394),
-  ('constant -> FLOAT','constant',1,'p_float_literal','parser.py',399),
-  ('constant -> STRING','constant',1,'p_string_literal','parser.py',404),
-  ('constant -> TRUE','constant',1,'p_true_literal','parser.py',409),
-  ('constant -> FALSE','constant',1,'p_false_literal','parser.py',414),
-  ('constant -> NULL','constant',1,'p_null_literal','parser.py',419),
-  ('expression -> column_id','expression',1,'p_expr_column_id','parser.py',424),
-  ('column_id -> id_component_list','column_id',1,'p_column_id','parser.py',429),
-  ('column_id -> id_component_list DOT STAR','column_id',3,'p_column_id','parser.py',430),
-  ('id_component_list -> ID','id_component_list',1,'p_id_component_list','parser.py',438),
-  ('id_component_list -> id_component_list DOT ID','id_component_list',3,'p_id_component_list','parser.py',439),
-  ('case_clause_else -> ELSE expression','case_clause_else',2,'p_case_clause_else','parser.py',447),
-  ('case_clause_when -> WHEN expression THEN expression','case_clause_when',4,'p_case_clause_when','parser.py',452),
-  ('case_body -> case_clause_when','case_body',1,'p_case_body','parser.py',457),
-  ('case_body -> case_body case_clause_else','case_body',2,'p_case_body','parser.py',458),
-  ('case_body -> case_clause_when case_body','case_body',2,'p_case_body','parser.py',459),
-  ('expression -> CASE case_body END','expression',3,'p_expression_case','parser.py',472),
+  ('select -> SELECT select_field_list optional_limit','select',3,'p_select','parser.py',24),
+  ('select -> SELECT select_field_list FROM full_table_expr optional_where optional_group_by optional_having optional_order_by optional_limit','select',9,'p_select','parser.py',25),
+  ('optional_where -> <empty>','optional_where',0,'p_optional_where','parser.py',38),
+  ('optional_where -> WHERE expression','optional_where',2,'p_optional_where','parser.py',39),
+  ('optional_having -> <empty>','optional_having',0,'p_optional_having','parser.py',48),
+  ('optional_having -> HAVING expression','optional_having',2,'p_optional_having','parser.py',49),
+  ('optional_group_by -> <empty>','optional_group_by',0,'p_optional_group_by','parser.py',58),
+  ('optional_group_by -> GROUP BY column_id_list','optional_group_by',3,'p_optional_group_by','parser.py',59),
+  ('optional_group_by -> GROUP EACH BY column_id_list','optional_group_by',4,'p_optional_group_by','parser.py',60),
+  ('optional_order_by -> <empty>','optional_order_by',0,'p_optional_order_by','parser.py',69),
+  ('optional_order_by -> ORDER BY order_by_list','optional_order_by',3,'p_optional_order_by','parser.py',70),
+  ('order_by_list -> strict_order_by_list','order_by_list',1,'p_order_by_list','parser.py',78),
+  ('order_by_list -> strict_order_by_list COMMA','order_by_list',2,'p_order_by_list','parser.py',79),
+  ('strict_order_by_list -> ordering','strict_order_by_list',1,'p_strict_order_by_list','parser.py',84),
+  ('strict_order_by_list -> strict_order_by_list COMMA ordering','strict_order_by_list',3,'p_strict_order_by_list','parser.py',85),
+  ('ordering -> column_id','ordering',1,'p_ordering_asc','parser.py',94),
+  ('ordering -> column_id ASC','ordering',2,'p_ordering_asc','parser.py',95),
+  ('ordering -> column_id DESC','ordering',2,'p_ordering_desc','parser.py',100),
+  ('column_id_list -> strict_column_id_list','column_id_list',1,'p_column_id_list','parser.py',105),
+  ('column_id_list -> strict_column_id_list COMMA','column_id_list',2,'p_column_id_list','parser.py',106),
+  ('strict_column_id_list -> column_id','strict_column_id_list',1,'p_strict_column_id_list','parser.py',111),
+  ('strict_column_id_list -> strict_column_id_list COMMA column_id','strict_column_id_list',3,'p_strict_column_id_list','parser.py',112),
+  ('optional_limit -> <empty>','optional_limit',0,'p_optional_limit','parser.py',122),
+  ('optional_limit -> LIMIT INTEGER','optional_limit',2,'p_optional_limit','parser.py',123),
+  ('full_table_expr -> aliased_table_expr_list','full_table_expr',1,'p_table_expr_table_or_union','parser.py',132),
+  ('non_cross_join -> LEFT OUTER JOIN','non_cross_join',3,'p_non_cross_join','parser.py',142),
+  ('non_cross_join -> LEFT OUTER JOIN EACH','non_cross_join',4,'p_non_cross_join','parser.py',143),
+  ('non_cross_join -> LEFT JOIN','non_cross_join',2,'p_non_cross_join','parser.py',144),
+  ('non_cross_join -> LEFT JOIN EACH','non_cross_join',3,'p_non_cross_join','parser.py',145),
+  ('non_cross_join -> JOIN','non_cross_join',1,'p_non_cross_join','parser.py',146),
+  ('non_cross_join -> JOIN EACH','non_cross_join',2,'p_non_cross_join','parser.py',147),
+  ('cross_join -> CROSS JOIN','cross_join',2,'p_cross_join','parser.py',156),
+  ('cross_join -> CROSS JOIN EACH','cross_join',3,'p_cross_join','parser.py',157),
+  ('partial_join -> non_cross_join aliased_table_expr ON expression','partial_join',4,'p_partial_join','parser.py',163),
+  ('partial_join -> cross_join aliased_table_expr','partial_join',2,'p_partial_join','parser.py',164),
+  ('join_tail -> partial_join join_tail','join_tail',2,'p_join_tail','parser.py',173),
+  ('join_tail -> partial_join','join_tail',1,'p_join_tail','parser.py',174),
+  ('full_table_expr -> aliased_table_expr join_tail','full_table_expr',2,'p_join','parser.py',184),
+  ('aliased_table_expr_list -> strict_aliased_table_expr_list','aliased_table_expr_list',1,'p_aliased_table_expr_list','parser.py',189),
+  ('aliased_table_expr_list -> strict_aliased_table_expr_list COMMA','aliased_table_expr_list',2,'p_aliased_table_expr_list','parser.py',190),
+  ('strict_aliased_table_expr_list -> aliased_table_expr','strict_aliased_table_expr_list',1,'p_strict_aliased_table_expr_list','parser.py',195),
+  ('strict_aliased_table_expr_list -> strict_aliased_table_expr_list COMMA aliased_table_expr','strict_aliased_table_expr_list',3,'p_strict_aliased_table_expr_list','parser.py',196),
+  ('aliased_table_expr -> table_expr','aliased_table_expr',1,'p_aliased_table_expr','parser.py',207),
+  ('aliased_table_expr -> table_expr ID','aliased_table_expr',2,'p_aliased_table_expr','parser.py',208),
+  ('aliased_table_expr -> table_expr AS ID','aliased_table_expr',3,'p_aliased_table_expr','parser.py',209),
+  ('table_expr -> id_component_list','table_expr',1,'p_table_id','parser.py',227),
+  ('table_expr -> ID LPAREN arg_list RPAREN','table_expr',4,'p_table_function','parser.py',232),
+  ('table_expr -> select','table_expr',1,'p_select_table_expression','parser.py',237),
+  ('table_expr -> LPAREN table_expr RPAREN','table_expr',3,'p_table_expression_parens','parser.py',242),
+  ('select_field_list -> strict_select_field_list','select_field_list',1,'p_select_field_list','parser.py',247),
+  ('select_field_list -> strict_select_field_list COMMA','select_field_list',2,'p_select_field_list','parser.py',248),
+  ('strict_select_field_list -> select_field','strict_select_field_list',1,'p_strict_select_field_list','parser.py',253),
+  ('strict_select_field_list -> strict_select_field_list COMMA select_field','strict_select_field_list',3,'p_strict_select_field_list','parser.py',254),
+  ('select_field -> expression','select_field',1,'p_select_field','parser.py',264),
+  ('select_field -> expression ID','select_field',2,'p_select_field','parser.py',265),
+  ('select_field -> expression AS ID','select_field',3,'p_select_field','parser.py',266),
+  ('select_field -> expression WITHIN RECORD AS ID','select_field',5,'p_select_field','parser.py',267),
+  ('select_field -> expression WITHIN expression AS ID','select_field',5,'p_select_field','parser.py',268),
+  ('select_field -> STAR','select_field',1,'p_select_star','parser.py',286),
+  ('expression -> LPAREN expression RPAREN','expression',3,'p_expression_parens','parser.py',291),
+  ('expression -> expression IS NULL','expression',3,'p_expression_is_null','parser.py',296),
+  ('expression -> expression IS NOT NULL','expression',4,'p_expression_is_not_null','parser.py',301),
+  ('expression -> MINUS expression','expression',2,'p_expression_unary','parser.py',306),
+  ('expression -> NOT expression','expression',2,'p_expression_unary','parser.py',307),
+  ('expression -> expression PLUS expression','expression',3,'p_expression_binary','parser.py',313),
+  ('expression -> expression MINUS expression','expression',3,'p_expression_binary','parser.py',314),
+  ('expression -> expression STAR expression','expression',3,'p_expression_binary','parser.py',315),
+  ('expression -> expression DIVIDED_BY expression','expression',3,'p_expression_binary','parser.py',316),
+  ('expression -> expression MOD expression','expression',3,'p_expression_binary','parser.py',317),
+  ('expression -> expression EQUALS expression','expression',3,'p_expression_binary','parser.py',318),
+  ('expression -> expression NOT_EQUAL expression','expression',3,'p_expression_binary','parser.py',319),
+  ('expression -> expression GREATER_THAN expression','expression',3,'p_expression_binary','parser.py',320),
+  ('expression -> expression LESS_THAN expression','expression',3,'p_expression_binary','parser.py',321),
+  ('expression -> expression GREATER_THAN_OR_EQUAL expression','expression',3,'p_expression_binary','parser.py',322),
+  ('expression -> expression LESS_THAN_OR_EQUAL expression','expression',3,'p_expression_binary','parser.py',323),
+  ('expression -> expression AND expression','expression',3,'p_expression_binary','parser.py',324),
+  ('expression -> expression OR expression','expression',3,'p_expression_binary','parser.py',325),
+  ('expression -> expression CONTAINS expression','expression',3,'p_expression_binary','parser.py',326),
+  ('expression -> ID LPAREN arg_list RPAREN','expression',4,'p_expression_func_call','parser.py',332),
+  ('expression -> LEFT LPAREN arg_list RPAREN','expression',4,'p_expression_func_call','parser.py',333),
+  ('expression -> COUNT LPAREN arg_list RPAREN','expression',4,'p_expression_count','parser.py',341),
+  ('expression -> COUNT LPAREN DISTINCT arg_list RPAREN','expression',5,'p_expression_count_distinct','parser.py',346),
+  ('expression -> COUNT LPAREN parenthesized_star RPAREN','expression',4,'p_expression_count_star','parser.py',351),
+  ('parenthesized_star -> STAR','parenthesized_star',1,'p_parenthesized_star','parser.py',357),
+  ('parenthesized_star -> LPAREN parenthesized_star RPAREN','parenthesized_star',3,'p_parenthesized_star','parser.py',358),
+  ('arg_list -> <empty>','arg_list',0,'p_arg_list','parser.py',362),
+  ('arg_list -> expression','arg_list',1,'p_arg_list','parser.py',363),
+  ('arg_list -> arg_list COMMA expression','arg_list',3,'p_arg_list','parser.py',364),
+  ('expression -> expression IN LPAREN constant_list RPAREN','expression',5,'p_expression_in','parser.py',377),
+  ('constant_list -> strict_constant_list','constant_list',1,'p_constant_list','parser.py',382),
+  ('constant_list -> strict_constant_list COMMA','constant_list',2,'p_constant_list','parser.py',383),
+  ('strict_constant_list -> constant','strict_constant_list',1,'p_strict_constant_list','parser.py',388),
+  ('strict_constant_list -> strict_constant_list COMMA constant','strict_constant_list',3,'p_strict_constant_list','parser.py',389),
+  ('expression -> constant','expression',1,'p_expression_constant','parser.py',398),
+  ('constant -> INTEGER','constant',1,'p_int_literal','parser.py',403),
+  ('constant -> FLOAT','constant',1,'p_float_literal','parser.py',408),
+  ('constant -> STRING','constant',1,'p_string_literal','parser.py',413),
+  ('constant -> TRUE','constant',1,'p_true_literal','parser.py',418),
+  ('constant -> FALSE','constant',1,'p_false_literal','parser.py',423),
+  ('constant -> NULL','constant',1,'p_null_literal','parser.py',428),
+  ('expression -> column_id','expression',1,'p_expr_column_id','parser.py',433),
+  ('column_id -> id_component_list','column_id',1,'p_column_id','parser.py',438),
+  ('column_id -> id_component_list DOT STAR','column_id',3,'p_column_id','parser.py',439),
+  ('id_component_list -> ID','id_component_list',1,'p_id_component_list','parser.py',447),
+  ('id_component_list -> id_component_list DOT ID','id_component_list',3,'p_id_component_list','parser.py',448),
+  ('case_clause_else -> ELSE expression','case_clause_else',2,'p_case_clause_else','parser.py',456),
+  ('case_clause_when -> WHEN expression THEN expression','case_clause_when',4,'p_case_clause_when','parser.py',461),
+  ('case_body -> case_clause_when','case_body',1,'p_case_body','parser.py',466),
+  ('case_body -> case_body case_clause_else','case_body',2,'p_case_body','parser.py',467),
+  ('case_body -> case_clause_when case_body','case_body',2,'p_case_body','parser.py',468),
+  ('expression -> CASE case_body END','expression',3,'p_expression_case','parser.py',481),
 ]
@@ -0,0 +1,54 @@
+"""Helpers for day-partitioned tables and partition decorators.
+
+A partitioned table stores its rows in one partition per day. Each partition
+is identified by a YYYYMMDD string, and a single partition can be referenced
+directly by adding a decorator to the table name, like
+`dataset.table$20160101`. Queries can also filter on the `_PARTITIONTIME`
+pseudo-column, which holds the midnight UTC timestamp of the partition that
+each row lives in.
+"""
+from __future__ import absolute_import
+
+import datetime
+import re
+
+
+PARTITION_TIME_COLUMN = '_PARTITIONTIME'
+
+_PARTITION_ID_RE = re.compile(r'^\d{8}$')
+
+
+def split_table_decorator(table_name):
+    """Split a table name into its base name and partition id.
+
+    For example, 'dataset.table$20160101' becomes
+    ('dataset.table', '20160101') and 'dataset.table' becomes
+    ('dataset.table', None). Raises a ValueError if the decorator isn't a
+    valid date.
+    """
+    if '$' not in table_name:
+        return table_name, None
+    base_name, partition_id = table_name.split('$', 1)
+    try:
+        if not _PARTITION_ID_RE.match(partition_id):
+            raise ValueError()
+        partition_time(partition_id)
+    except ValueError:
+        raise ValueError(
+            'Invalid partition decorator: {}'.format(table_name))
+    return base_name, partition_id
+
+
+def partition_time(partition_id):
+    """Get the _PARTITIONTIME value for the given partition id."""
+    return datetime.datetime.strptime(partition_id, '%Y%m%d')
+
+
+def partition_id_for_time(dt):
+    """Get the id of the partition containing the given datetime."""
+    return dt.strftime('%Y%m%d')
+
+
+def current_partition_id():
+    """Get the id of the partition that newly-ingested rows go into."""
+    return partition_id_for_time(datetime.datetime.utcnow())
@@ -0,0 +1,84 @@
+"""Hooks for profiling the steps of compiling and running queries.
+
+Profiling hooks are added with TinyQuery.add_profiling_hook (or
+TinyQuery.profile), and are called with a ProfileEvent after each step of
+each query: lexing, parsing, compiling, evaluating each table expression and
+each function call, and serializing results in the API client.
+
+When no hooks are added, no Profiler is made, and each step is run directly,
+with nothing but a check that the profiler is None.
+"""
+from __future__ import absolute_import
+
+import collections
+import time
+
+
+# The phases of a query that events are reported for.
+LEX = 'lex'
+PARSE = 'parse'
+COMPILE = 'compile'
+TABLE_EXPR = 'table_expr'
+FUNCTION = 'function'
+AGGREGATE_FUNCTION = 'aggregate_function'
+SERIALIZE = 'serialize'
+
+
+class ProfileEvent(collections.namedtuple(
+        'ProfileEvent',
+        ['phase', 'name', 'start_time', 'duration', 'num_rows'])):
+    """One step of compiling or running a query.
+
+    Fields:
+        phase: The kind of step; one of the phase constants in this module.
+        name: What the step worked on, like the name of a table or function,
+            or None for steps that work on the whole query.
+        start_time: When the step started, in seconds since the epoch.
+        duration: How long the step took, in seconds. This includes any
+            steps nested in it, like evaluating the arguments of a function
+            or the tables of a join.
+        num_rows: The number of rows the step output (or tokens, for
+            lexing), or None for steps that don't output rows.
+    """
+
+
+class Profiler(object):
+    """Reports the steps of a query to some profiling hooks.
+
+    Fields:
+        hooks: The functions to call with each ProfileEvent.
+    """
+    def __init__(self, hooks, clock=time.time):
+        self.hooks = hooks
+        self.clock = clock
+
+    def run(self, phase, name, count_rows, func, *args):
+        """Run a step of a query, reporting it to the hooks.
+
+        Arguments:
+            phase: The kind of step.
+            name: What the step works on, or None.
+            count_rows: A function that gets the number of rows from the
+                step's result, or None if the step doesn't output rows.
+            func: The function that runs the step.
+            args: The arguments to func.
+
+        Returns: The result of func. Steps that raise an exception aren't
+            reported.
+        """
+        start_time = self.clock()
+        result = func(*args)
+        duration = self.clock() - start_time
+        event = ProfileEvent(
+            phase, name, start_time, duration,
+            None if count_rows is None else count_rows(result))
+        for hook in self.hooks:
+            hook(event)
+        return result
+
+
+def run(profiler, phase, name, count_rows, func, *args):
+    """Run a step with a profiler, or directly if the profiler is None."""
+    if profiler is None:
+        return func(*args)
+    return profiler.run(phase, name, count_rows, func, *args)
@@ -0,0 +1,78 @@
+from __future__ import absolute_import
+
+import collections
+import unittest
+
+from tinyquery import api_client
+from tinyquery import context
+from tinyquery import profiling
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+class ProfilingTest(unittest.TestCase):
+    def setUp(self):
+        self.tq = tinyquery.TinyQuery()
+        self.tq.load_table_or_view(tinyquery.Table(
+            'dataset.t', 3, collections.OrderedDict([
+                ('k', context.Column(type=tq_types.STRING,
+                                     mode=tq_modes.NULLABLE,
+                                     values=['x', 'y', 'x'])),
+                ('a', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=[1, 2, 3]))])))
+
+    def test_query_events(self):
+        with self.tq.profile() as events:
+            self.tq.evaluate_query(
+                'SELECT k, SUM(a) FROM dataset.t WHERE a > 1 GROUP BY k')
+        self.assertEqual(
+            [(profiling.LEX, None, 18),
+             (profiling.PARSE, None, None),
+             (profiling.COMPILE, None, None),
+             (profiling.TABLE_EXPR, 'dataset.t', 3),
+             (profiling.FUNCTION, '>', 3),
+             # SUM is evaluated once for each group, with one result.
+             (profiling.AGGREGATE_FUNCTION, 'sum', 1),
+             (profiling.AGGREGATE_FUNCTION, 'sum', 1)],
+            [(event.phase, event.name, event.num_rows) for event in events])
+        for event in events:
+            self.assertGreaterEqual(event.duration, 0)
+
+    def test_serialization_events(self):
+        service = api_client.TinyQueryApiClient(self.tq)
+        with self.tq.profile() as events:
+            service.tabledata().list(
+                projectId='test_project', datasetId='dataset', tableId='t',
+                maxResults=2).execute()
+        self.assertEqual([(profiling.SERIALIZE, 'dataset.t', 2)],
+                         [(event.phase, event.name, event.num_rows)
+                          for event in events])
+
+    def test_hooks(self):
+        self.assertIsNone(self.tq.make_profiler())
+        phases = []
+
+        def hook(event):
+            phases.append(event.phase)
+
+        self.tq.add_profiling_hook(hook)
+        with self.tq.profile() as events:
+            self.tq.dry_run_query('SELECT a FROM dataset.t')
+        self.assertEqual(
+            [profiling.LEX, profiling.PARSE, profiling.COMPILE], phases)
+        self.assertEqual(phases, [event.phase for event in events])
+
+        self.tq.remove_profiling_hook(hook)
+        self.assertIsNone(self.tq.make_profiler())
+        self.tq.evaluate_query('SELECT a FROM dataset.t')
+        self.assertEqual(3, len(phases))
+
+    def test_syntax_errors(self):
+        with self.tq.profile() as events:
+            with self.assertRaises(SyntaxError):
+                self.tq.evaluate_query('SELECT a FROM WHERE')
+        # The query was lexed, but didn't parse.
+        self.assertEqual([profiling.LEX],
+                         [event.phase for event in events])
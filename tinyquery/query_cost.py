@@ -0,0 +1,132 @@
+"""Estimates of the number of bytes a query processes.
+
+Like BigQuery, a query is charged for all of the data in each stored column
+it reads, no matter how many rows it ends up using, and columns that it
+doesn't reference at all are free. Values are sized the way BigQuery sizes
+them; see https://cloud.google.com/bigquery/pricing#data_size_calculation.
+"""
+from __future__ import absolute_import
+
+import itertools
+
+import six
+
+from tinyquery import tq_modes
+from tinyquery import tq_types
+from tinyquery import typed_ast
+
+
+# The size of each non-null value of the fixed-size types. Strings are 2
+# bytes plus their UTF-8 encoded length, and nulls are free.
+FIXED_TYPE_SIZES = {
+    tq_types.INT: 8,
+    tq_types.FLOAT: 8,
+    tq_types.BOOL: 1,
+    tq_types.TIMESTAMP: 8,
+    # The type of NULL literals, which are all null.
+    tq_types.NONETYPE: 0,
+}
+
+
+def _string_size(value):
+    if isinstance(value, six.text_type):
+        return 2 + len(value.encode('utf-8'))
+    return 2 + len(value)
+
+
+def column_num_bytes(column):
+    """Get the number of bytes in a Column's values."""
+    values = column.values
+    if column.mode == tq_modes.REPEATED:
+        values = itertools.chain.from_iterable(
+            value for value in values if value is not None)
+    if column.type == tq_types.STRING:
+        return sum(_string_size(value) for value in values
+                   if value is not None)
+    return FIXED_TYPE_SIZES[column.type] * sum(
+        1 for value in values if value is not None)
+
+
+def referenced_columns(select_ast, tables_by_name):
+    """Find the stored table columns that a compiled query reads.
+
+    Arguments:
+        select_ast: A typed_ast.Select.
+        tables_by_name: The tables that the query was compiled against.
+
+    Returns: A set of (table name, column name) pairs.
+    """
+    result = set()
+    _add_select_columns(select_ast, tables_by_name, result)
+    return result
+
+
+def bytes_processed(select_ast, tables_by_name):
+    """Get the number of bytes BigQuery would process for a query."""
+    return sum(
+        tables_by_name[table_name].column_num_bytes(col_name)
+        for table_name, col_name in referenced_columns(select_ast,
+                                                       tables_by_name))
+
+
+def _add_select_columns(select_ast, tables_by_name, result):
+    keys = set()
+    exprs = [select_field.expr for select_field in select_ast.select_fields]
+    exprs.extend([select_ast.where_expr, select_ast.having_expr])
+    if select_ast.group_set is not None:
+        exprs.extend(select_ast.group_set.field_groups)
+    for expr in exprs:
+        _add_column_refs(expr, keys)
+    # ORDER BY columns are only names; see Evaluator.evaluate_orderings for
+    # how they're matched to columns.
+    for ordering in select_ast.orderings or ():
+        name = ordering.column_id.name
+        keys.update(key for key in select_ast.table.type_ctx.columns
+                    if name in (key[1], '%s.%s' % key))
+    _add_table_expr_columns(select_ast.table, keys, tables_by_name, result)
+
+
+def _add_column_refs(expr, keys):
+    if isinstance(expr, typed_ast.ColumnRef):
+        keys.add((expr.table, expr.column))
+    elif isinstance(expr, (typed_ast.FunctionCall,
+                           typed_ast.AggregateFunctionCall)):
+        for arg in expr.args:
+            _add_column_refs(arg, keys)
+
+
+def _add_table_expr_columns(table_expr, keys, tables_by_name, result):
+    """Add the stored columns a table expression reads to result.
+
+    keys is the set of (table, column) keys of the table expression's type
+    context that are used by whatever reads from it.
+    """
+    if isinstance(table_expr, typed_ast.Table):
+        table = tables_by_name[table_expr.name]
+        for key, col_name in zip(table_expr.type_ctx.columns, table.schema):
+            if key in keys:
+                result.add((table_expr.name, col_name))
+    elif isinstance(table_expr, typed_ast.TableUnion):
+        # Union members are matched to the union's columns by column name.
+        col_names = set(col_name for _, col_name in keys)
+        for member in table_expr.tables:
+            _add_table_expr_columns(
+                member,
+                set(key for key in member.type_ctx.columns
+                    if key[1] in col_names),
+                tables_by_name, result)
+    elif isinstance(table_expr, typed_ast.Join):
+        keys = set(keys)
+        for conditions in table_expr.conditions:
+            for condition in conditions:
+                if condition is None:
+                    # Cross joins have no join keys.
+                    continue
+                _add_column_refs(condition.column1, keys)
+                _add_column_refs(condition.column2, keys)
+        members = [table_expr.base] + [table for table, _ in
+                                       table_expr.tables]
+        for member in members:
+            _add_table_expr_columns(member, keys, tables_by_name, result)
+    elif isinstance(table_expr, typed_ast.Select):
+        _add_select_columns(table_expr, tables_by_name, result)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import collections
+import datetime
+import unittest
+
+from tinyquery import compiler
+from tinyquery import context
+from tinyquery import query_cost
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+class QueryCostTest(unittest.TestCase):
+    def setUp(self):
+        self.tq = tinyquery.TinyQuery()
+        self.tq.load_table_or_view(tinyquery.Table(
+            'dataset.t', 3, collections.OrderedDict([
+                ('a', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=[1, None, 3])),
+                ('b', context.Column(type=tq_types.STRING,
+                                     mode=tq_modes.NULLABLE,
+                                     values=[u'x', u'héllo', None])),
+            ])))
+        self.tq.load_table_or_view(tinyquery.Table(
+            'dataset.u', 2, collections.OrderedDict([
+                ('a', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=[1, 2])),
+                ('c', context.Column(type=tq_types.BOOL,
+                                     mode=tq_modes.NULLABLE,
+                                     values=[True, False])),
+            ])))
+
+    def assert_columns(self, expected, query):
+        select_ast = compiler.compile_text(query, self.tq.tables_by_name)
+        self.assertEqual(
+            set(expected),
+            query_cost.referenced_columns(select_ast,
+                                          self.tq.tables_by_name))
+
+    def test_column_num_bytes(self):
+        def num_bytes(col_type, mode, values):
+            return query_cost.column_num_bytes(
+                context.Column(type=col_type, mode=mode, values=values))
+
+        self.assertEqual(16, num_bytes(tq_types.INT, tq_modes.NULLABLE,
+                                       [1, None, 3]))
+        self.assertEqual(1, num_bytes(tq_types.BOOL, tq_modes.NULLABLE,
+                                      [True]))
+        self.assertEqual(8, num_bytes(
+            tq_types.TIMESTAMP, tq_modes.REQUIRED,
+            [datetime.datetime(2016, 1, 1)]))
+        # Strings are 2 bytes plus their UTF-8 length.
+        self.assertEqual(3 + 8, num_bytes(tq_types.STRING, tq_modes.NULLABLE,
+                                          [u'x', u'héllo', None]))
+        self.assertEqual(24, num_bytes(tq_types.FLOAT, tq_modes.REPEATED,
+                                       [[1.0, 2.0], [], [3.0]]))
+
+    def test_referenced_columns(self):
+        self.assert_columns([('dataset.t', 'a'), ('dataset.t', 'b')],
+                            'SELECT * FROM dataset.t')
+        self.assert_columns([], 'SELECT COUNT(*) FROM dataset.t')
+        self.assert_columns([('dataset.t', 'a')],
+                            'SELECT a FROM dataset.t WHERE a > 1')
+        self.assert_columns([('dataset.t', 'a'), ('dataset.t', 'b')],
+                            'SELECT a FROM dataset.t ORDER BY b')
+
+    def test_join_and_union_columns(self):
+        self.assert_columns(
+            [('dataset.t', 'a'), ('dataset.t', 'b'), ('dataset.u', 'a')],
+            'SELECT x.b FROM dataset.t x JOIN dataset.u y ON x.a = y.a')
+        self.assert_columns(
+            [('dataset.t', 'b'), ('dataset.u', 'c')],
+            'SELECT x.b, y.c FROM dataset.t x CROSS JOIN dataset.u y')
+        self.assert_columns(
+            [('dataset.t', 'a'), ('dataset.u', 'a')],
+            'SELECT a FROM dataset.t, dataset.u')
+        self.assert_columns(
+            [('dataset.u', 'c')],
+            'SELECT n FROM (SELECT c AS n FROM dataset.u)')
+
+    def test_bytes_processed(self):
+        select_ast = compiler.compile_text(
+            'SELECT b FROM dataset.t WHERE a IS NOT NULL',
+            self.tq.tables_by_name)
+        self.assertEqual(16 + 11, query_cost.bytes_processed(
+            select_ast, self.tq.tables_by_name))
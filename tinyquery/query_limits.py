@@ -0,0 +1,85 @@
+"""Limits on running queries: cancellation, timeouts, bytes billed and memory.
+
+Queries are stopped cooperatively: the evaluator calls
+CancellationToken.check at checkpoints in its loops over rows, so a query
+stops soon (but not instantly) after it's cancelled or runs out of time.
+"""
+from __future__ import absolute_import
+
+import time
+
+
+class QueryAbortedError(Exception):
+    """A query was stopped before it finished.
+
+    Fields:
+        reason: The BigQuery error reason to report for the job.
+    """
+    reason = 'stopped'
+
+
+class QueryCancelledError(QueryAbortedError):
+    reason = 'stopped'
+
+    def __init__(self, message='Job execution was cancelled: User requested '
+                               'cancellation'):
+        super(QueryCancelledError, self).__init__(message)
+
+
+class QueryTimeoutError(QueryAbortedError):
+    reason = 'timeout'
+
+
+class BytesBilledLimitExceededError(QueryAbortedError):
+    reason = 'bytesBilledLimitExceeded'
+
+
+class ResourcesExceededError(QueryAbortedError):
+    """A query used more memory than its budget; see memory.MemoryTracker."""
+    reason = 'resourcesExceeded'
+
+
+class CancellationToken(object):
+    """Lets a running query be cancelled or stopped after a timeout.
+
+    Fields:
+        timeout: The number of seconds the query may run for once it's
+            started, or None for no limit.
+        deadline: The time at which the query times out, or None if it
+            hasn't started or has no timeout.
+        cancelled: Whether cancel has been called.
+    """
+    def __init__(self, timeout=None, clock=time.time):
+        self.timeout = timeout
+        self.clock = clock
+        self.deadline = None
+        self.cancelled = False
+
+    def start(self):
+        """Start counting down the timeout."""
+        if self.timeout is not None:
+            self.deadline = self.clock() + self.timeout
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        """Raise a QueryAbortedError if the query should stop."""
+        if self.cancelled:
+            raise QueryCancelledError()
+        if self.deadline is not None and self.clock() > self.deadline:
+            raise QueryTimeoutError(
+                'Job timed out after {:g} sec'.format(self.timeout))
+
+
+def check_bytes_billed(num_bytes, maximum_bytes_billed):
+    """Raise an error if a query would process too many bytes.
+
+    Unlike BigQuery, this doesn't round up to a minimum number of bytes per
+    table, so small limits can be tested with small tables.
+    """
+    if (maximum_bytes_billed is not None and
+            num_bytes > int(maximum_bytes_billed)):
+        raise BytesBilledLimitExceededError(
+            'Query exceeded limit for bytes billed: {}. {} or higher '
+            'required.'.format(maximum_bytes_billed, num_bytes))
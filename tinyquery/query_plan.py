@@ -0,0 +1,386 @@
+"""Query plans, like the queryPlan in BigQuery's job statistics.
+
+A compiled query is described as a tree of operators (reading a table,
+filtering, joining, grouping and so on), one per stage of the plan. To
+explain a query, the plan is built from the compiled query alone. To
+explain-analyze it, a PlanRecorder is also passed to the evaluator, which
+runs each operator through PlanRecorder.run so that its rows, time and
+(optionally) output size are recorded.
+"""
+from __future__ import absolute_import
+
+import collections
+import time
+
+from tinyquery import query_cost
+from tinyquery import runtime
+from tinyquery import tq_ast
+from tinyquery import tq_types
+from tinyquery import typed_ast
+
+
+# Maps each kind of operator to the title of its stage and the kind of the
+# stage's step, as in BigQuery's ExplainQueryStep.
+OPERATORS = {
+    'read': ('Input', 'READ'),
+    'where': ('Filter', 'FILTER'),
+    'join': ('Join', 'JOIN'),
+    'union': ('Union', 'UNION'),
+    'aggregate': ('Aggregate', 'AGGREGATE'),
+    'compute': ('Compute', 'COMPUTE'),
+    'having': ('Filter', 'FILTER'),
+    'sort': ('Sort', 'SORT'),
+    'limit': ('Limit', 'LIMIT'),
+}
+
+# Maps the class name of each table expression to the operator evaluating
+# it. Selects are made up of several operators of their own.
+TABLE_EXPR_OPERATORS = {
+    'Table': 'read',
+    'Join': 'join',
+    'TableUnion': 'union',
+}
+
+_TRUE = typed_ast.Literal(True, tq_types.BOOL)
+
+
+class PlanStage(object):
+    """One operator in a query plan.
+
+    Fields:
+        id: The index of the stage in the plan.
+        operator: The kind of operator; see OPERATORS.
+        node: The typed_ast node the operator evaluates.
+        substeps: A list of strings describing what the operator does.
+        input_stages: The stages whose output this stage reads.
+        records_written: The number of rows the operator output, or None if
+            it hasn't run.
+        start_time: When the operator started, in seconds since the epoch,
+            or None if it hasn't started.
+        end_time: When the operator finished, in seconds since the epoch,
+            or None if it hasn't finished. It's set after the other stats,
+            so they're all there once it is.
+        compute_time: The number of seconds spent in the operator itself,
+            not counting its inputs, or None if it hasn't run.
+        output_bytes: The logical size of the operator's output (see
+            query_cost), which it holds in memory, or None if it wasn't
+            measured.
+    """
+    def __init__(self, stage_id, operator, node, substeps, input_stages):
+        self.id = stage_id
+        self.operator = operator
+        self.node = node
+        self.substeps = substeps
+        self.input_stages = input_stages
+        self.records_written = None
+        self.start_time = None
+        self.end_time = None
+        self.compute_time = None
+        self.output_bytes = None
+
+    @property
+    def name(self):
+        return 'S{:02d}: {}'.format(self.id, OPERATORS[self.operator][0])
+
+    @property
+    def status(self):
+        if self.end_time is not None:
+            return 'COMPLETE'
+        if self.start_time is not None:
+            return 'RUNNING'
+        return 'PENDING'
+
+    @property
+    def records_read(self):
+        if self.operator == 'read':
+            return self.records_written
+        if any(stage.records_written is None for stage in self.input_stages):
+            return None
+        return sum(stage.records_written for stage in self.input_stages)
+
+    def to_json(self):
+        """Describe the stage like BigQuery's ExplainQueryStage."""
+        result = {
+            'name': self.name,
+            'id': str(self.id),
+            'inputStages': [str(stage.id) for stage in self.input_stages],
+            'steps': [{'kind': OPERATORS[self.operator][1],
+                       'substeps': self.substeps}],
+            'status': self.status,
+        }
+        if self.end_time is not None:
+            compute_ms = str(int(self.compute_time * 1000))
+            result.update({
+                'recordsRead': str(self.records_read),
+                'recordsWritten': str(self.records_written),
+                'startMs': str(int(self.start_time * 1000)),
+                'endMs': str(int(self.end_time * 1000)),
+                'computeMsAvg': compute_ms,
+                'computeMsMax': compute_ms,
+                'parallelInputs': '1',
+                'completedParallelInputs': '1',
+            })
+        if self.output_bytes is not None:
+            result['shuffleOutputBytes'] = str(self.output_bytes)
+        return result
+
+
+class QueryPlan(object):
+    """The plan of a compiled query.
+
+    Fields:
+        stages: The PlanStages, in the order they're evaluated, so the last
+            one outputs the query's results.
+        total_bytes_processed: The number of bytes BigQuery would process
+            for the query (see query_cost), or None if the tables weren't
+            given.
+    """
+    def __init__(self, select_ast, tables_by_name=None):
+        self.stages = []
+        self.total_bytes_processed = None
+        if tables_by_name is not None:
+            self.total_bytes_processed = query_cost.bytes_processed(
+                select_ast, tables_by_name)
+        self._add_select(select_ast)
+
+    def to_json(self):
+        """Get the plan in the format of statistics.query.queryPlan."""
+        return [stage.to_json() for stage in self.stages]
+
+    def timeline_sample(self, elapsed_ms):
+        """Describe the progress of the plan like BigQuery's
+        QueryTimelineSample, counting each stage as a unit of work.
+
+        Arguments:
+            elapsed_ms: The milliseconds since the query started.
+        """
+        statuses = [stage.status for stage in self.stages]
+        return {
+            'elapsedMs': str(elapsed_ms),
+            'completedUnits': str(statuses.count('COMPLETE')),
+            'activeUnits': str(statuses.count('RUNNING')),
+            'pendingUnits': str(statuses.count('PENDING')),
+        }
+
+    def __str__(self):
+        """Render the plan as an indented tree, with the output at the top.
+        """
+        lines = []
+
+        def add_stage(stage, depth):
+            line = '  ' * depth + stage.name
+            if stage.end_time is not None:
+                line += ' (rows: {} -> {}, time: {:.1f} ms'.format(
+                    stage.records_read, stage.records_written,
+                    stage.compute_time * 1000)
+                if stage.output_bytes is not None:
+                    line += ', output: {} bytes'.format(stage.output_bytes)
+                line += ')'
+            lines.append(line)
+            for substep in stage.substeps:
+                lines.append('  ' * (depth + 2) + substep)
+            for input_stage in stage.input_stages:
+                add_stage(input_stage, depth + 1)
+
+        if self.stages:
+            add_stage(self.stages[-1], 0)
+        return '\n'.join(lines)
+
+    def _add_stage(self, operator, node, substeps, input_stages):
+        stage = PlanStage(len(self.stages), operator, node, substeps,
+                          [stage for stage in input_stages
+                           if stage is not None])
+        self.stages.append(stage)
+        return stage
+
+    def _add_select(self, select_ast):
+        """Add the stages of a select, in the order they're evaluated.
+
+        Returns: The last stage of the select.
+        """
+        if (isinstance(select_ast.table, typed_ast.TableUnion) and
+                select_ast.where_expr != _TRUE):
+            # Union members are filtered one at a time as they're read.
+            stage = self._add_table_expr(
+                select_ast.table,
+                ['WHERE ' + format_expr(select_ast.where_expr)])
+        else:
+            stage = self._add_table_expr(select_ast.table)
+            if select_ast.where_expr != _TRUE:
+                stage = self._add_stage(
+                    'where', select_ast.where_expr,
+                    ['WHERE ' + format_expr(select_ast.where_expr)], [stage])
+
+        field_substeps = [
+            '{} AS {}'.format(format_expr(field.expr), field.alias)
+            for field in select_ast.select_fields]
+        if select_ast.group_set is not None:
+            group_names = (
+                sorted(select_ast.group_set.alias_groups) +
+                [format_expr(field_group)
+                 for field_group in select_ast.group_set.field_groups])
+            substeps = (['GROUP BY ' + ', '.join(group_names)]
+                        if group_names else [])
+            stage = self._add_stage('aggregate', select_ast,
+                                    substeps + field_substeps, [stage])
+        else:
+            stage = self._add_stage('compute', select_ast, field_substeps,
+                                    [stage])
+        if select_ast.having_expr != _TRUE:
+            stage = self._add_stage(
+                'having', select_ast,
+                ['HAVING ' + format_expr(select_ast.having_expr)], [stage])
+        if select_ast.orderings is not None:
+            stage = self._add_stage(
+                'sort', select_ast,
+                ['ORDER BY ' + ', '.join(str(ordering) for ordering
+                                         in select_ast.orderings)],
+                [stage])
+        if select_ast.limit is not None:
+            stage = self._add_stage(
+                'limit', select_ast, ['LIMIT {}'.format(select_ast.limit)],
+                [stage])
+        return stage
+
+    def _add_table_expr(self, table_expr, extra_substeps=()):
+        if isinstance(table_expr, typed_ast.NoTable):
+            return None
+        if isinstance(table_expr, typed_ast.Select):
+            return self._add_select(table_expr)
+        if isinstance(table_expr, typed_ast.Table):
+            substeps = ['FROM ' + table_expr.name]
+            if table_expr.partition_ids is not None:
+                substeps.append(
+                    'PARTITIONS ' + ', '.join(table_expr.partition_ids))
+            return self._add_stage('read', table_expr, substeps, [])
+        if isinstance(table_expr, typed_ast.TableUnion):
+            input_stages = [self._add_table_expr(member)
+                            for member in table_expr.tables]
+            return self._add_stage(
+                'union', table_expr,
+                ['UNION ALL of {} tables'.format(len(table_expr.tables))] +
+                list(extra_substeps),
+                input_stages)
+        if isinstance(table_expr, typed_ast.Join):
+            input_stages = [self._add_table_expr(table_expr.base)]
+            substeps = []
+            for (member, join_type), conditions in zip(table_expr.tables,
+                                                       table_expr.conditions):
+                input_stages.append(self._add_table_expr(member))
+                if join_type is tq_ast.JoinType.CROSS:
+                    substeps.append(str(join_type))
+                else:
+                    substeps.append('{} (HASH) ON {}'.format(
+                        join_type, ' AND '.join(
+                            '{} = {}'.format(format_expr(condition.column1),
+                                             format_expr(condition.column2))
+                            for condition in conditions)))
+            return self._add_stage('join', table_expr, substeps, input_stages)
+        raise NotImplementedError(
+            'Unknown table expression type {}'.format(type(table_expr)))
+
+
+class PlanRecorder(object):
+    """Records the rows and time of each operator as a query runs.
+
+    Fields:
+        plan: The QueryPlan being recorded, once start has been called.
+        measure_bytes: Whether to measure the size of each operator's output,
+            which takes time proportional to the size of the output.
+    """
+    def __init__(self, measure_bytes=False, clock=time.time):
+        self.plan = None
+        self.measure_bytes = measure_bytes
+        self.clock = clock
+        self._stages_by_operator = None
+        # The time spent in the operators nested in each running operator.
+        self._input_times = []
+
+    def start(self, select_ast, tables_by_name):
+        """Make the plan for a compiled query that's about to run.
+
+        Arguments:
+            select_ast: The compiled query.
+            tables_by_name: The tables the query reads, as from
+                TinyQuery.pin_tables.
+        """
+        self.plan = QueryPlan(select_ast, tables_by_name)
+        # An operator can show up in several stages if a compiled view is
+        # used more than once, but the stages are in the order they're
+        # evaluated in, so they can be matched up in order.
+        self._stages_by_operator = collections.defaultdict(
+            collections.deque)
+        for stage in self.plan.stages:
+            self._stages_by_operator[id(stage.node), stage.operator].append(
+                stage)
+
+    def run(self, node, operator, func, *args):
+        """Run an operator, recording its stats.
+
+        Arguments:
+            node: The typed_ast node of the operator.
+            operator: The kind of operator.
+            func: A function that runs the operator and returns the Context
+                it outputs.
+            args: The arguments to func.
+
+        Returns: The result of func.
+        """
+        stages = self._stages_by_operator.get((id(node), operator))
+        if not stages:
+            # Trivial operators (like a WHERE with no condition) aren't part
+            # of the plan.
+            return func(*args)
+        stage = stages.popleft()
+        self._input_times.append(0)
+        start_time = self.clock()
+        stage.start_time = start_time
+        try:
+            result = func(*args)
+        finally:
+            end_time = self.clock()
+            input_time = self._input_times.pop()
+            if self._input_times:
+                self._input_times[-1] += end_time - start_time
+        stage.compute_time = end_time - start_time - input_time
+        stage.records_written = result.num_rows
+        if self.measure_bytes:
+            stage.output_bytes = sum(
+                query_cost.column_num_bytes(column)
+                for column in result.columns.values())
+        # Other threads can read the plan of a running job, so the stage is
+        # only marked finished once its stats are all set.
+        stage.end_time = end_time
+        return result
+
+
+def format_expr(expr):
+    """Describe a compiled expression as query text."""
+    if isinstance(expr, typed_ast.ColumnRef):
+        if expr.table is None:
+            return expr.column
+        return '{}.{}'.format(expr.table, expr.column)
+    if isinstance(expr, typed_ast.Literal):
+        if expr.value is None:
+            return 'NULL'
+        if isinstance(expr.value, bool):
+            return 'true' if expr.value else 'false'
+        if expr.type == tq_types.STRING:
+            return repr(expr.value).lstrip('u')
+        return str(expr.value)
+    if isinstance(expr, (typed_ast.FunctionCall,
+                         typed_ast.AggregateFunctionCall)):
+        name = runtime.get_func_name(expr.func)
+        args = [format_expr(arg) for arg in expr.args]
+        if name is None:
+            name = type(expr.func).__name__
+        elif name in ('is_null', 'is_not_null'):
+            return '{} {}'.format(args[0], name.replace('_', ' ').upper())
+        elif not name[0].isalpha() and len(args) == 2:
+            return '({} {} {})'.format(args[0], name, args[1])
+        elif not name[0].isalpha() or name in ('and', 'or', 'not'):
+            if len(args) == 2:
+                return '({} {} {})'.format(args[0], name.upper(), args[1])
+            return '{} {}'.format(name.upper(), args[0])
+        return '{}({})'.format(name.upper(), ', '.join(args))
+    return str(expr)
@@ -0,0 +1,99 @@
+from __future__ import absolute_import
+
+import collections
+import unittest
+
+from tinyquery import context
+from tinyquery import query_plan
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+class QueryPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.tq = tinyquery.TinyQuery()
+        self.tq.load_table_or_view(tinyquery.Table(
+            'dataset.events', 4, collections.OrderedDict([
+                ('k', context.Column(type=tq_types.STRING,
+                                     mode=tq_modes.NULLABLE,
+                                     values=['x', 'y', 'x', 'z'])),
+                ('a', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=[1, 2, 3, 4]))])))
+        self.tq.load_table_or_view(tinyquery.Table(
+            'dataset.names', 2, collections.OrderedDict([
+                ('k', context.Column(type=tq_types.STRING,
+                                     mode=tq_modes.NULLABLE,
+                                     values=['x', 'y'])),
+                ('name', context.Column(type=tq_types.STRING,
+                                        mode=tq_modes.NULLABLE,
+                                        values=['ex', 'why']))])))
+
+    def test_explain(self):
+        plan = self.tq.explain(
+            'SELECT n.name, COUNT(*) AS c FROM dataset.events e '
+            'JOIN dataset.names n ON e.k = n.k WHERE e.a > 1 '
+            'GROUP BY n.name HAVING c > 0 LIMIT 10')
+        self.assertEqual(
+            ['S00: Input', 'S01: Input', 'S02: Join', 'S03: Filter',
+             'S04: Aggregate', 'S05: Filter', 'S06: Limit'],
+            [stage.name for stage in plan.stages])
+        stages_json = plan.to_json()
+        self.assertEqual(['0', '1'], stages_json[2]['inputStages'])
+        self.assertEqual(
+            [{'kind': 'JOIN', 'substeps': ['INNER JOIN (HASH) ON e.k = n.k']}],
+            stages_json[2]['steps'])
+        self.assertEqual(['WHERE (e.a > 1)'],
+                         stages_json[3]['steps'][0]['substeps'])
+        self.assertEqual(['HAVING (c > 0)'],
+                         stages_json[5]['steps'][0]['substeps'])
+        # Without analyzing, nothing has run.
+        self.assertEqual('PENDING', stages_json[0]['status'])
+        self.assertNotIn('recordsWritten', stages_json[0])
+        self.assertTrue(str(plan).startswith('S06: Limit\n    LIMIT 10\n'))
+
+    def test_explain_analyze(self):
+        plan = self.tq.explain(
+            'SELECT n.name, COUNT(*) AS c FROM dataset.events e '
+            'JOIN dataset.names n ON e.k = n.k WHERE e.a > 1 '
+            'GROUP BY n.name', analyze=True)
+        self.assertEqual(
+            [('4', '4'), ('2', '2'), ('6', '3'), ('3', '2'), ('2', '2')],
+            [(stage['recordsRead'], stage['recordsWritten'])
+             for stage in plan.to_json()])
+        for stage in plan.stages:
+            self.assertGreaterEqual(stage.compute_time, 0)
+            self.assertLessEqual(stage.start_time, stage.end_time)
+        # Each INTEGER is 8 bytes, and each STRING is 2 bytes plus its
+        # length.
+        self.assertEqual(4 * 3 + 4 * 8, plan.stages[0].output_bytes)
+        # NULLs don't take up any space.
+        plan = self.tq.explain('SELECT NULL AS n, 1 AS i', analyze=True)
+        self.assertEqual(8, plan.stages[0].output_bytes)
+
+    def test_compute_time_excludes_inputs(self):
+        times = iter([0, 1, 3, 10])
+        recorder = query_plan.PlanRecorder(clock=lambda: next(times))
+        plan = self.tq.explain('SELECT a FROM dataset.events')
+        recorder.start(plan.stages[-1].node, self.tq.tables_by_name)
+        read, compute = recorder.plan.stages
+        empty_context = context.Context(0, collections.OrderedDict(), None)
+        recorder.run(compute.node, 'compute', recorder.run, read.node, 'read',
+                     lambda: empty_context)
+        self.assertEqual(2, read.compute_time)
+        self.assertEqual(10 - 2, compute.compute_time)
+
+    def test_unions_and_views(self):
+        self.tq.load_table_or_view(self.tq.make_view(
+            'dataset.big_events', 'SELECT a FROM dataset.events WHERE a > 2'))
+        plan = self.tq.explain(
+            'SELECT a FROM dataset.big_events, dataset.big_events '
+            'WHERE a < 4', analyze=True)
+        self.assertEqual(
+            ['Input', 'Filter', 'Compute', 'Input', 'Filter', 'Compute',
+             'Union', 'Compute'],
+            [stage.name.split(': ')[1] for stage in plan.stages])
+        self.assertEqual('2', plan.to_json()[-2]['recordsWritten'])
+        self.assertEqual(['UNION ALL of 2 tables', 'WHERE (a < 4)'],
+                         plan.stages[-2].substeps)
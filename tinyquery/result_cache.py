@@ -0,0 +1,107 @@
+"""A cache of query results, like BigQuery's.
+
+Results are keyed by the compiled query and the version of each table it
+reads, so a cached result is only used while none of those tables have
+changed (and while any views the query uses are defined the same way,
+since views are expanded into the compiled query). Queries that call
+non-deterministic functions like RAND or NOW are never cached.
+"""
+from __future__ import absolute_import
+
+import collections
+import threading
+
+from tinyquery import typed_ast
+
+
+# The default limit on the total size of the cached results.
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_key(select_ast, tables_by_name):
+    """Get the key to cache a compiled query's results under.
+
+    Arguments:
+        select_ast: A typed_ast.Select.
+        tables_by_name: The tables the query reads, as from
+            TinyQuery.pin_tables.
+
+    Returns: A hashable key, or None if the query's results can't be cached.
+    """
+    if not _is_deterministic(select_ast):
+        return None
+    # The compiled query is made of namedtuples and lists, so its repr
+    # describes it completely. Functions are singletons, so they're told
+    # apart by their reprs too.
+    return (repr(select_ast),
+            tuple(sorted((table_name, table.version)
+                         for table_name, table in tables_by_name.items())))
+
+
+def table_num_bytes(table):
+    """Get the logical size of a Table, as in query_cost."""
+    return sum(table.column_num_bytes(col_name) for col_name in table.columns)
+
+
+def _is_deterministic(node):
+    if isinstance(node, (typed_ast.FunctionCall,
+                         typed_ast.AggregateFunctionCall)):
+        if not node.func.deterministic:
+            return False
+    if isinstance(node, (list, tuple)):
+        return all(_is_deterministic(child) for child in node)
+    return True
+
+
+class ResultCache(object):
+    """A least-recently-used cache of query result Tables.
+
+    Fields:
+        max_bytes: The limit on the total logical size of the cached tables.
+            Results bigger than this are never cached.
+        num_bytes: The total logical size of the cached tables.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        # Maps key to (table, num_bytes), from least to most recently used.
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Get a cached Table, or None if there isn't one.
+
+        The result is a snapshot of the cached table, so the cached copy
+        can't be changed through it.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._entries[key] = entry
+            return entry[0].snapshot()
+
+    def put(self, key, table):
+        """Cache a Table, evicting the least recently used tables to fit."""
+        num_bytes = table_num_bytes(table)
+        if num_bytes > self.max_bytes:
+            return
+        table = table.snapshot()
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self.num_bytes -= old_entry[1]
+            while (self._entries and
+                   self.num_bytes + num_bytes > self.max_bytes):
+                _, (_, evicted_num_bytes) = self._entries.popitem(last=False)
+                self.num_bytes -= evicted_num_bytes
+            self._entries[key] = (table, num_bytes)
+            self.num_bytes += num_bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.num_bytes = 0
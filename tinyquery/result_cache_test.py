@@ -0,0 +1,74 @@
+from __future__ import absolute_import
+
+import collections
+import mock
+import unittest
+
+from tinyquery import compiler
+from tinyquery import context
+from tinyquery import result_cache
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+def make_table(values):
+    return tinyquery.Table('results', len(values), collections.OrderedDict([
+        ('i', context.Column(type=tq_types.INT, mode=tq_modes.NULLABLE,
+                             values=values))]))
+
+
+class ResultCacheTest(unittest.TestCase):
+    def test_lru_eviction(self):
+        # Each INTEGER value is 8 bytes.
+        cache = result_cache.ResultCache(max_bytes=32)
+        cache.put('a', make_table([1, 2]))
+        cache.put('b', make_table([3]))
+        self.assertEqual([1, 2], cache.get('a').columns['i'].values)
+        cache.put('c', make_table([4, 5]))
+        # 'b' was used least recently, so it's evicted to make room.
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual([4, 5], cache.get('c').columns['i'].values)
+        self.assertEqual(32, cache.num_bytes)
+
+        # Results that could never fit aren't cached at all.
+        cache.put('d', make_table([1, 2, 3, 4, 5]))
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(2, len(cache))
+
+    def test_cached_tables_are_unchanged_by_callers(self):
+        cache = result_cache.ResultCache()
+        cache.put('a', make_table([1]))
+        cache.get('a').append_rows(1, [[2]])
+        self.assertEqual([1], cache.get('a').columns['i'].values)
+
+    def test_cache_key(self):
+        tq = tinyquery.TinyQuery()
+        table = make_table([1])
+        table.name = 'dataset.t'
+        tq.load_table_or_view(table)
+
+        key = tq.query_cache_key('SELECT i FROM dataset.t')
+        self.assertEqual(key, tq.query_cache_key('SELECT  i\nFROM dataset.t'))
+        self.assertNotEqual(key, tq.query_cache_key('SELECT i + 1 FROM '
+                                                    'dataset.t'))
+        table.append_rows(1, [[2]])
+        self.assertNotEqual(key, tq.query_cache_key('SELECT i FROM dataset.t'))
+
+        self.assertIsNone(tq.query_cache_key('SELECT RAND() FROM dataset.t'))
+        self.assertIsNone(result_cache.cache_key(
+            compiler.compile_text('SELECT NOW()', tq.tables_by_name), {}))
+
+    def test_query_job_compiles_once(self):
+        tq = tinyquery.TinyQuery()
+        table = make_table([1])
+        table.name = 'dataset.t'
+        tq.load_table_or_view(table)
+
+        with mock.patch.object(compiler, 'compile_text',
+                               wraps=compiler.compile_text) as compile_text:
+            tq.run_query_job('project', 'SELECT i FROM dataset.t', None,
+                             None, 'CREATE_IF_NEEDED', 'WRITE_EMPTY')
+        # The cache key and the results use the same compiled query.
+        self.assertEqual(1, compile_text.call_count)
+        self.assertEqual(1, len(tq.result_cache))
@@ -39,6 +39,10 @@ def pass_through_none(fn):
 class Function(object):
     __metaclass__ = abc.ABCMeta
 
+    # Whether the function always gives the same result for the same
+    # arguments. Queries calling other functions aren't cached.
+    deterministic = True
+
     @abc.abstractmethod
     def check_types(self, *arg_types):
         """Return the type of the result as a function of the arg types.
@@ -441,6 +445,7 @@ class IntegerCastFunction(ScalarFunction):
 
 
 class RandFunction(ScalarFunction):
+    deterministic = False
 
     def check_types(self):
         return tq_types.FLOAT
@@ -589,6 +594,8 @@ class FirstFunction(AggregateFunction):
 
 
 class NoArgFunction(ScalarFunction):
+    # These are all functions of the current time.
+    deterministic = False
 
     def __init__(self, func, return_type=tq_types.INT):
         self.func = func
@@ -653,10 +660,12 @@ class MinMaxFunction(AggregateFunction):
         return arg
 
     def _evaluate(self, num_rows, column):
+        values = [x for x in column.values if x is not None]
         return context.Column(
             type=self.check_types(column.type),
             mode=tq_modes.NULLABLE,
-            values=[self.func([x for x in column.values if x is not None])])
+            # Like other aggregates, the result is null if every value is.
+            values=[self.func(values) if values else None])
 
 
 class SumFunction(AggregateFunction):
@@ -1443,3 +1452,21 @@ def get_func(name):
 
 def is_aggregate_func(name):
     return name in _AGGREGATE_FUNCTIONS
+
+
+def get_func_name(func):
+    """Get the name of a function or operator, for describing queries.
+
+    Returns: The name the function is looked up by (like 'count' or '+'),
+        or None if it isn't one of the named functions.
+    """
+    return _FUNC_NAMES.get(id(func))
+
+
+# Maps the id of each function to its name. Some functions have several
+# names (like '=' and '=='), in which case the first one is used.
+_FUNC_NAMES = {}
+for _funcs in (_UNARY_OPERATORS, _BINARY_OPERATORS, _FUNCTIONS,
+               _AGGREGATE_FUNCTIONS):
+    for _name, _func in sorted(_funcs.items()):
+        _FUNC_NAMES.setdefault(id(_func), _name)
@@ -0,0 +1,324 @@
+"""A binary snapshot format for saving and quickly reloading tables.
+
+A snapshot is a directory with a manifest.json file listing its tables and
+views, and one columnar binary file per stored table (or per partition of a
+partitioned table). Views are stored in the manifest as their query text.
+
+Each table file starts with a magic string, then the length of a JSON header,
+then the header itself, and then the data buffers. The header has the table's
+schema and, for each column, the offsets of the buffers holding its data:
+    validity: A bitmap with a 1 bit for each non-null value. Left out if
+        there are no nulls.
+    data: The values, as little-endian int64s (INTEGER, and TIMESTAMP as
+        microseconds since the epoch), float64s (FLOAT), bytes (BOOLEAN) or
+        int32 codes into the string dictionary (STRING). Null values have an
+        arbitrary placeholder.
+    dictionary_offsets, dictionary_data: For STRING columns, the distinct
+        strings of the column, as int64 end offsets into UTF-8 data.
+Repeated columns also have row_validity and offsets buffers, for which rows
+are null and where each row's values start and end in the buffers above
+(which hold the values of all rows, one after another).
+
+Files are memory-mapped when a snapshot is loaded, and only the header is
+read up front. Column values are decoded the first time a table's columns
+are used, so loading a snapshot doesn't depend on the amount of data, and
+processes loading the same snapshot share the pages of the files.
+"""
+from __future__ import absolute_import
+
+import collections
+import datetime
+import io
+import json
+import mmap
+import os
+import struct
+import threading
+
+import six
+
+from tinyquery import context
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+MAGIC = b'TQSNAP01'
+MANIFEST_FILENAME = 'manifest.json'
+FORMAT_VERSION = 1
+
+_ALIGNMENT = 8
+_HEADER_LENGTH_FORMAT = '<Q'
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+_NUMERIC_FORMATS = {
+    tq_types.INT: 'q',
+    tq_types.FLOAT: 'd',
+    tq_types.BOOL: 'B',
+    tq_types.TIMESTAMP: 'q',
+}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _timestamp_to_micros(value):
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds
+
+
+def _micros_to_timestamp(micros):
+    return _EPOCH + datetime.timedelta(microseconds=micros)
+
+
+class _BufferWriter(object):
+    """Collects the data buffers of a table file, keeping them aligned."""
+    def __init__(self):
+        self.buffers = []
+        self.size = 0
+
+    def add(self, data):
+        """Add a buffer, returning its [offset, length] in the data section."""
+        offset = self.size
+        padding = b'\0' * (-len(data) % _ALIGNMENT)
+        self.buffers.extend([data, padding])
+        self.size += len(data) + len(padding)
+        return [offset, len(data)]
+
+
+def _encode_validity(values):
+    bitmap = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value is not None:
+            bitmap[i >> 3] |= 1 << (i & 7)
+    return bytes(bitmap)
+
+
+def _decode_null_indexes(bitmap, num_values):
+    """Get the indexes of the 0 bits in a validity bitmap."""
+    bitmap = bytearray(bitmap)
+    return [
+        i * 8 + bit
+        for i, byte in enumerate(bitmap) if byte != 0xFF
+        for bit in six.moves.xrange(8)
+        if not (byte >> bit) & 1 and i * 8 + bit < num_values]
+
+
+def _encode_values(writer, column_type, values):
+    """Write a list of non-repeated values, returning their header entry."""
+    null_count = sum(1 for value in values if value is None)
+    result = {'num_values': len(values), 'null_count': null_count}
+    if null_count:
+        result['validity'] = writer.add(_encode_validity(values))
+
+    if column_type == tq_types.STRING:
+        codes_by_string = {}
+        codes = [
+            0 if value is None
+            else codes_by_string.setdefault(value, len(codes_by_string))
+            for value in values]
+        strings = sorted(codes_by_string, key=codes_by_string.get)
+        encoded_strings = [s.encode('utf-8') for s in strings]
+        end_offsets = []
+        total_length = 0
+        for encoded in encoded_strings:
+            total_length += len(encoded)
+            end_offsets.append(total_length)
+        result['data'] = writer.add(
+            struct.pack('<%di' % len(codes), *codes))
+        result['dictionary_offsets'] = writer.add(
+            struct.pack('<%dq' % len(end_offsets), *end_offsets))
+        result['dictionary_data'] = writer.add(b''.join(encoded_strings))
+        return result
+
+    if column_type == tq_types.TIMESTAMP:
+        values = [0 if value is None else _timestamp_to_micros(value)
+                  for value in values]
+    elif null_count:
+        values = [0 if value is None else value for value in values]
+    value_format = _NUMERIC_FORMATS[column_type]
+    try:
+        result['data'] = writer.add(
+            struct.pack('<%d%s' % (len(values), value_format), *values))
+    except struct.error as e:
+        raise SnapshotError(
+            'Cannot store {} values in a snapshot: {}'.format(column_type, e))
+    return result
+
+
+def _decode_values(buf, base, column_type, entry):
+    """Read the list of non-repeated values described by a header entry."""
+    num_values = entry['num_values']
+
+    def read(name, value_format, count):
+        offset, length = entry[name]
+        return struct.unpack_from('<%d%s' % (count, value_format), buf,
+                                  base + offset)
+
+    if column_type == tq_types.STRING:
+        codes = read('data', 'i', num_values)
+        end_offsets = read('dictionary_offsets', 'q',
+                           entry['dictionary_offsets'][1] // 8)
+        data_offset, data_length = entry['dictionary_data']
+        data = buf[base + data_offset:base + data_offset + data_length]
+        dictionary = []
+        start = 0
+        for end in end_offsets:
+            dictionary.append(data[start:end].decode('utf-8'))
+            start = end
+        if dictionary:
+            values = [dictionary[code] for code in codes]
+        else:
+            values = [None] * num_values
+    else:
+        values = list(read('data', _NUMERIC_FORMATS[column_type],
+                           num_values))
+        if column_type == tq_types.TIMESTAMP:
+            values = [_micros_to_timestamp(micros) for micros in values]
+        elif column_type == tq_types.BOOL:
+            values = [bool(value) for value in values]
+
+    if entry['null_count']:
+        offset, length = entry['validity']
+        for index in _decode_null_indexes(
+                buf[base + offset:base + offset + length], num_values):
+            values[index] = None
+    return values
+
+
+def write_table_file(filename, table):
+    """Write the columns of a (non-partitioned) Table to a snapshot file."""
+    writer = _BufferWriter()
+    column_entries = []
+    for col_name, column in table.columns.items():
+        entry = {'name': col_name, 'type': column.type, 'mode': column.mode}
+        if column.mode == tq_modes.REPEATED:
+            end_offsets = [0]
+            for row in column.values:
+                end_offsets.append(end_offsets[-1] + len(row or ()))
+            if any(row is None for row in column.values):
+                entry['row_validity'] = writer.add(
+                    _encode_validity(column.values))
+            entry['offsets'] = writer.add(
+                struct.pack('<%dq' % len(end_offsets), *end_offsets))
+            entry['values'] = _encode_values(
+                writer, column.type,
+                [value for row in column.values if row for value in row])
+        else:
+            entry['values'] = _encode_values(writer, column.type,
+                                             column.values)
+        column_entries.append(entry)
+
+    header = json.dumps({
+        'name': table.name,
+        'num_rows': table.num_rows,
+        'columns': column_entries,
+    }).encode('utf-8')
+    header += b' ' * (-len(header) % _ALIGNMENT)
+    with io.open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack(_HEADER_LENGTH_FORMAT, len(header)))
+        f.write(header)
+        for buf in writer.buffers:
+            f.write(buf)
+
+
+class TableFile(object):
+    """A memory-mapped snapshot file for a single table.
+
+    Fields:
+        name: The name of the table.
+        num_rows: The number of rows in the table.
+        schema: An OrderedDict mapping column name to an empty Column.
+    """
+    def __init__(self, filename):
+        with io.open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise SnapshotError('Empty snapshot file: ' + filename)
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buf[:len(MAGIC)] != MAGIC:
+            raise SnapshotError('Not a snapshot file: ' + filename)
+        header_start = len(MAGIC) + struct.calcsize(_HEADER_LENGTH_FORMAT)
+        header_length, = struct.unpack_from(_HEADER_LENGTH_FORMAT, self._buf,
+                                             len(MAGIC))
+        header = json.loads(
+            self._buf[header_start:header_start + header_length].decode(
+                'utf-8'))
+        self._data_start = header_start + header_length
+        self._column_entries = header['columns']
+        self.name = header['name']
+        self.num_rows = header['num_rows']
+        self.schema = collections.OrderedDict(
+            (entry['name'], context.Column(type=entry['type'],
+                                           mode=entry['mode'], values=[]))
+            for entry in self._column_entries)
+        self._columns = None
+        self._lock = threading.Lock()
+
+    def column_entry(self, col_name):
+        """Get the header entry describing a column's buffers."""
+        return next(entry for entry in self._column_entries
+                    if entry['name'] == col_name)
+
+    def buffer(self, entry, buffer_name):
+        """Get a zero-copy view of one of the buffers in a header entry."""
+        offset, length = entry[buffer_name]
+        start = self._data_start + offset
+        return memoryview(self._buf)[start:start + length]
+
+    def read_column(self, col_name):
+        """Decode a single column, returning a Column."""
+        return self._read_column(self.column_entry(col_name))
+
+    def read_columns(self):
+        """Decode all columns, returning an OrderedDict of name to Column.
+
+        The columns are only decoded once, and every caller gets the same
+        ones, so tables sharing the file (like snapshots of a SnapshotTable)
+        share the decoded values. They mustn't be changed. The file is
+        unmapped once nothing refers to it or its buffers.
+        """
+        with self._lock:
+            if self._columns is None:
+                self._columns = collections.OrderedDict(
+                    (entry['name'], self._read_column(entry))
+                    for entry in self._column_entries)
+            return self._columns
+
+    def _read_column(self, entry):
+        values = _decode_values(self._buf, self._data_start, entry['type'],
+                                entry['values'])
+        if entry['mode'] == tq_modes.REPEATED:
+            end_offsets = struct.unpack_from(
+                '<%dq' % (self.num_rows + 1), self._buf,
+                self._data_start + entry['offsets'][0])
+            values = [values[start:end] for start, end in
+                      zip(end_offsets, end_offsets[1:])]
+            if 'row_validity' in entry:
+                offset, length = entry['row_validity']
+                offset += self._data_start
+                for index in _decode_null_indexes(
+                        self._buf[offset:offset + length], self.num_rows):
+                    values[index] = None
+        return context.Column(type=entry['type'], mode=entry['mode'],
+                              values=values)
+
+
+def write_manifest(path, manifest):
+    with io.open(os.path.join(path, MANIFEST_FILENAME), 'w',
+                 encoding='utf-8') as f:
+        f.write(six.text_type(json.dumps(manifest, indent=2,
+                                         sort_keys=True)))
+
+
+def read_manifest(path):
+    try:
+        with io.open(os.path.join(path, MANIFEST_FILENAME), 'r',
+                     encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        raise SnapshotError('Could not read snapshot {}: {}'.format(path, e))
+    if manifest.get('version') != FORMAT_VERSION:
+        raise SnapshotError('Unsupported snapshot version: {}'.format(
+            manifest.get('version')))
+    return manifest
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import collections
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from tinyquery import context
+from tinyquery import snapshot
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def round_trip(self, columns, num_rows):
+        table = tinyquery.Table('dataset.test', num_rows, columns)
+        filename = os.path.join(self.path, 'test.tqsnap')
+        snapshot.write_table_file(filename, table)
+        table_file = snapshot.TableFile(filename)
+        self.assertEqual('dataset.test', table_file.name)
+        self.assertEqual(num_rows, table_file.num_rows)
+        self.assertEqual(
+            [(name, column.type, column.mode)
+             for name, column in columns.items()],
+            [(name, column.type, column.mode)
+             for name, column in table_file.schema.items()])
+        return table_file.read_columns()
+
+    def test_all_types(self):
+        columns = collections.OrderedDict([
+            ('i', context.Column(type=tq_types.INT, mode=tq_modes.NULLABLE,
+                                 values=[1, None, -(2 ** 40)])),
+            ('f', context.Column(type=tq_types.FLOAT, mode=tq_modes.REQUIRED,
+                                 values=[1.5, 0.0, -2.25])),
+            ('b', context.Column(type=tq_types.BOOL, mode=tq_modes.NULLABLE,
+                                 values=[True, False, None])),
+            ('s', context.Column(type=tq_types.STRING,
+                                 mode=tq_modes.NULLABLE,
+                                 values=[u'héllo', None, u'héllo'])),
+            ('t', context.Column(
+                type=tq_types.TIMESTAMP, mode=tq_modes.NULLABLE,
+                values=[datetime.datetime(2016, 1, 2, 3, 4, 5, 6), None,
+                        datetime.datetime(1969, 12, 31, 23, 59, 59)])),
+        ])
+        self.assertEqual(columns, self.round_trip(columns, 3))
+
+    def test_repeated(self):
+        columns = collections.OrderedDict([
+            ('r', context.Column(type=tq_types.STRING,
+                                 mode=tq_modes.REPEATED,
+                                 values=[['a', 'b'], [], None, ['a'],
+                                         [None, 'c']])),
+            ('n', context.Column(type=tq_types.INT, mode=tq_modes.NULLABLE,
+                                 values=[None] * 5)),
+        ])
+        self.assertEqual(columns, self.round_trip(columns, 5))
+
+    def test_empty(self):
+        columns = collections.OrderedDict([
+            ('s', context.Column(type=tq_types.STRING,
+                                 mode=tq_modes.NULLABLE, values=[])),
+        ])
+        self.assertEqual(columns, self.round_trip(columns, 0))
+
+    def test_bad_file(self):
+        filename = os.path.join(self.path, 'bad.tqsnap')
+        with open(filename, 'wb') as f:
+            f.write(b'not a snapshot')
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.TableFile(filename)
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.read_manifest(self.path)
@@ -0,0 +1,252 @@
+"""Spilling intermediate results to temporary files.
+
+Operators whose working data wouldn't fit in a query's memory budget (see
+the memory module) write it out to temporary files and read it back a piece
+at a time:
+
+- ORDER BY sorts runs of rows that fit, and merges them back from disk.
+- Hash joins and GROUP BY split their rows into partitions by the hash of
+  their keys, and then handle each partition on its own, so only one
+  partition's hash table is in memory at once (a "grace" hash join).
+
+Records are pickled in blocks, so only a block of each run that's being read
+is in memory at once.
+"""
+from __future__ import absolute_import
+
+import heapq
+import tempfile
+
+import six
+from six.moves import cPickle as pickle
+
+from tinyquery import memory
+
+
+# The number of records pickled together.
+BLOCK_NUM_ROWS = 256
+# The fewest rows sorted in memory at a time when sorting externally, so that
+# there aren't too many runs to merge, even when little memory is left.
+MIN_RUN_NUM_ROWS = 1024
+# The most partitions to split rows into, which bounds the number of blocks
+# buffered while partitioning.
+MAX_NUM_PARTITIONS = 256
+
+
+class SpillFile(object):
+    """A temporary file holding blocks of records.
+
+    The file is deleted when it's closed, which is done at the end of a with
+    block using it.
+    """
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def write_block(self, block):
+        """Write a list of picklable records to the end of the file.
+
+        Returns: The offset of the block, for read_block.
+        """
+        self._file.seek(0, 2)
+        offset = self._file.tell()
+        pickle.dump(block, self._file, pickle.HIGHEST_PROTOCOL)
+        return offset
+
+    def read_block(self, offset):
+        """Get the list of records of the block written at an offset."""
+        self._file.seek(offset)
+        return pickle.load(self._file)
+
+    def write_run(self, records):
+        """Write an iterable of picklable records, in blocks.
+
+        Returns: The list of offsets of the blocks, for read_run.
+        """
+        offsets = []
+        block = []
+        for record in records:
+            block.append(record)
+            if len(block) == BLOCK_NUM_ROWS:
+                offsets.append(self.write_block(block))
+                block = []
+        if block:
+            offsets.append(self.write_block(block))
+        return offsets
+
+    def read_run(self, offsets):
+        """Iterate over the records of a run written with write_run.
+
+        Several runs can be read at once, since each block is read on its
+        own.
+        """
+        for offset in offsets:
+            for record in self.read_block(offset):
+                yield record
+
+
+class _Descending(object):
+    """A sort key that sorts in the opposite order of the key it wraps."""
+    __slots__ = ['key']
+
+    def __init__(self, key):
+        self.key = key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __ne__(self, other):
+        return self.key != other.key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __getstate__(self):
+        return self.key
+
+    def __setstate__(self, state):
+        self.key = state
+
+
+def _null_first_key(value):
+    # Like in BigQuery, NULLs come first in ascending order (and last in
+    # descending order), and aren't compared with other values.
+    return value is not None, value
+
+
+def partition_count(num_bytes, available_bytes):
+    """Get how many partitions to split some data into, for each to fit.
+
+    Arguments:
+        num_bytes: The memory that handling all of the data at once would
+            use.
+        available_bytes: The memory that's left, or None for no limit.
+
+    Returns: The number of partitions, which is 1 if the data fits as it is,
+        and at most MAX_NUM_PARTITIONS.
+    """
+    if available_bytes is None or num_bytes <= available_bytes:
+        return 1
+    return min(-(-num_bytes // max(available_bytes, 1)), MAX_NUM_PARTITIONS)
+
+
+def iter_partitions(records, num_partitions):
+    """Split records into partitions by the hash of their keys.
+
+    The records are all written to a SpillFile, split by the hash of their
+    first element, and then read back one partition at a time.
+
+    Arguments:
+        records: An iterable of picklable tuples, each starting with a
+            hashable key.
+        num_partitions: The number of partitions to make.
+
+    Returns: An iterator over the num_partitions lists of records in each
+        partition. The records with equal keys are all in the same
+        partition, in their original order.
+    """
+    with SpillFile() as spill_file:
+        blocks = [[] for _ in six.moves.xrange(num_partitions)]
+        offsets = [[] for _ in six.moves.xrange(num_partitions)]
+        for record in records:
+            partition = hash(record[0]) % num_partitions
+            block = blocks[partition]
+            block.append(record)
+            if len(block) == BLOCK_NUM_ROWS:
+                offsets[partition].append(spill_file.write_block(block))
+                blocks[partition] = []
+        for partition, block in enumerate(blocks):
+            if block:
+                offsets[partition].append(spill_file.write_block(block))
+        del blocks
+        for partition_offsets in offsets:
+            yield list(spill_file.read_run(partition_offsets))
+
+
+def hash_entry_num_bytes(num_keys):
+    """Get the approximate memory used per row of a hash table by some keys.
+
+    Each row has a key tuple of references and an index in a list, and
+    each key has a dict entry.
+    """
+    return (memory.LIST_NUM_BYTES * 2 +
+            memory.REFERENCE_NUM_BYTES * (num_keys + 4))
+
+
+def sort_entry_num_bytes(num_keys):
+    """Get the approximate memory used per row to sort by some keys.
+
+    Each row has an index in the sorted list, and a (flag, value) tuple made
+    for each key while sorting by it.
+    """
+    return (memory.REFERENCE_NUM_BYTES +
+            num_keys * (memory.LIST_NUM_BYTES + memory.REFERENCE_NUM_BYTES))
+
+
+def sorted_row_indexes(key_columns, num_rows, max_run_rows=None,
+                       checkpoint=None):
+    """Get the order of some rows when sorted by some columns.
+
+    The sort is stable. If there are more rows than max_run_rows, the rows
+    are sorted externally: each run of max_run_rows rows is sorted in memory
+    and written to a SpillFile as (key, row index) pairs, and the runs are
+    merged back together.
+
+    Arguments:
+        key_columns: A list of (values, is_ascending) pairs for each column
+            to sort by, most significant first, where values is the list of
+            values of the column.
+        num_rows: The number of rows.
+        max_run_rows: The most rows to sort in memory at once, or None to
+            sort them all in memory.
+        checkpoint: An optional function to call before sorting each run,
+            which can stop a slow sort by raising an exception.
+
+    Returns: A list of the row indexes, in sorted order.
+    """
+    if max_run_rows is None or num_rows <= max_run_rows:
+        return _sorted_run(key_columns, list(six.moves.xrange(num_rows)))
+    return list(_external_sorted_row_indexes(key_columns, num_rows,
+                                             max_run_rows, checkpoint))
+
+
+def _sorted_run(key_columns, row_indexes):
+    # Sorting by each key from the least significant, relying on each sort
+    # being stable, avoids making a combined key for each row.
+    for values, is_ascending in reversed(key_columns):
+        row_indexes.sort(key=lambda index: _null_first_key(values[index]),
+                         reverse=not is_ascending)
+    return row_indexes
+
+
+def _merge_key(key_columns, index):
+    return tuple(
+        _null_first_key(values[index]) if is_ascending
+        else _Descending(_null_first_key(values[index]))
+        for values, is_ascending in key_columns)
+
+
+def _external_sorted_row_indexes(key_columns, num_rows, max_run_rows,
+                                 checkpoint):
+    with SpillFile() as spill_file:
+        run_offsets = []
+        for start in six.moves.xrange(0, num_rows, max_run_rows):
+            if checkpoint is not None:
+                checkpoint()
+            run = _sorted_run(key_columns, list(six.moves.xrange(
+                start, min(start + max_run_rows, num_rows))))
+            run_offsets.append(spill_file.write_run(
+                (_merge_key(key_columns, index), index) for index in run))
+        # Ties between runs are broken by the row index, which keeps the
+        # sort stable.
+        for _, index in heapq.merge(*[spill_file.read_run(offset)
+                                      for offset in run_offsets]):
+            yield index
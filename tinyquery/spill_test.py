@@ -0,0 +1,166 @@
+from __future__ import absolute_import
+
+import collections
+import mock
+import random
+import unittest
+
+from tinyquery import context
+from tinyquery import spill
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+class SpillTest(unittest.TestCase):
+    def test_spill_file(self):
+        with spill.SpillFile() as spill_file:
+            offsets = [spill_file.write_run(('a', i) for i in range(600)),
+                       spill_file.write_run([]),
+                       spill_file.write_run([('b', None)])]
+            # Runs can be read at the same time.
+            readers = [spill_file.read_run(offset) for offset in offsets]
+            self.assertEqual(('a', 0), next(readers[0]))
+            self.assertEqual([('b', None)], list(readers[2]))
+            self.assertEqual([('a', i) for i in range(1, 600)],
+                             list(readers[0]))
+            self.assertEqual([], list(readers[1]))
+
+    def test_iter_partitions(self):
+        records = [(i % 10, i) for i in range(1000)]
+        partitions = list(spill.iter_partitions(iter(records), 3))
+        self.assertEqual(3, len(partitions))
+        self.assertEqual(records, sorted(
+            sum(partitions, []), key=lambda record: record[1]))
+        for partition in partitions:
+            # Equal keys are in the same partition, in order.
+            self.assertEqual(sorted(partition, key=lambda record: record[1]),
+                             partition)
+            for key, _ in partition:
+                self.assertEqual(hash(key) % 3, hash(partition[0][0]) % 3)
+
+    def test_partition_count(self):
+        self.assertEqual(1, spill.partition_count(100, None))
+        self.assertEqual(1, spill.partition_count(100, 100))
+        self.assertEqual(3, spill.partition_count(201, 100))
+        self.assertEqual(spill.MAX_NUM_PARTITIONS,
+                         spill.partition_count(1000, 0))
+
+    def test_sorted_row_indexes(self):
+        rand = random.Random(0)
+        num_rows = 1000
+        key_columns = [
+            ([rand.choice([None, 'x', 'y', 'z']) for _ in range(num_rows)],
+             False),
+            ([rand.choice([None, 1, 2, 3]) for _ in range(num_rows)],
+             True),
+        ]
+        expected = spill.sorted_row_indexes(key_columns, num_rows)
+        # NULLs last when descending, first when ascending, and ties in row
+        # order.
+        self.assertEqual(
+            sorted(range(num_rows),
+                   key=lambda i: (key_columns[0][0][i] is None,
+                                  [-ord(c) for c in key_columns[0][0][i]
+                                   or ''],
+                                  key_columns[1][0][i] is not None,
+                                  key_columns[1][0][i] or 0,
+                                  i)),
+            expected)
+        for max_run_rows in [1, 7, 999, 1000]:
+            self.assertEqual(
+                expected,
+                spill.sorted_row_indexes(key_columns, num_rows,
+                                         max_run_rows))
+
+    def test_order_by_over_budget(self):
+        num_rows = 5000
+        rand = random.Random(0)
+        table = tinyquery.Table(
+            'dataset.nums', num_rows, collections.OrderedDict([
+                ('n', context.Column(
+                    type=tq_types.INT, mode=tq_modes.NULLABLE,
+                    values=[rand.choice([None, rand.randrange(100)])
+                            for _ in range(num_rows)])),
+                ('i', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=list(range(num_rows))))]))
+        # Enough for the table and the sorted result, but not to sort it all
+        # at once.
+        self.assert_spilled_results(
+            [table], 'SELECT n, i FROM dataset.nums ORDER BY n DESC, i',
+            800000, '_external_sorted_row_indexes')
+
+    def assert_spilled_results(self, tables, query, max_query_memory_bytes,
+                               spill_function):
+        """Check that a query spills within a budget, with the same results
+        as without one.
+        """
+        tq = tinyquery.TinyQuery()
+        for table in tables:
+            tq.load_table_or_view(table)
+        expected = tq.evaluate_query(query)
+
+        tq = tinyquery.TinyQuery(
+            max_query_memory_bytes=max_query_memory_bytes)
+        for table in tables:
+            tq.load_table_or_view(table)
+        with mock.patch.object(
+                spill, spill_function,
+                wraps=getattr(spill, spill_function)) as spill_mock:
+            result = tq.evaluate_query(query)
+        self.assertTrue(spill_mock.called)
+        self.assertEqual(expected.columns, result.columns)
+
+    def make_join_tables(self):
+        rand = random.Random(0)
+        events = tinyquery.Table(
+            'dataset.events', 5000, collections.OrderedDict([
+                ('k', context.Column(
+                    type=tq_types.INT, mode=tq_modes.NULLABLE,
+                    values=[rand.choice([None, rand.randrange(500)])
+                            for _ in range(5000)])),
+                ('i', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=list(range(5000))))]))
+        # Few of the keys match, so the hash table is big next to the
+        # result.
+        keys = tinyquery.Table(
+            'dataset.keys', 4000, collections.OrderedDict([
+                ('k', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=[i * 50 for i in range(4000)])),
+                ('j', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=list(range(4000))))]))
+        return [events, keys]
+
+    def test_join_over_budget(self):
+        tables = self.make_join_tables()
+        self.assert_spilled_results(
+            tables,
+            'SELECT e.i, s.j FROM dataset.events e '
+            'JOIN dataset.keys s ON e.k = s.k',
+            600000, 'iter_partitions')
+        # The hash table is built on the smaller side, which is the lhs.
+        self.assert_spilled_results(
+            tables,
+            'SELECT s.j, e.i FROM dataset.keys s '
+            'JOIN dataset.events e ON e.k = s.k',
+            600000, 'iter_partitions')
+        self.assert_spilled_results(
+            tables,
+            'SELECT e.i, s.j FROM dataset.events e '
+            'LEFT JOIN dataset.keys s ON e.k = s.k',
+            800000, 'iter_partitions')
+
+    def test_group_by_over_budget(self):
+        self.assert_spilled_results(
+            self.make_join_tables(),
+            'SELECT k, COUNT(*) AS c, SUM(i) AS s FROM dataset.events '
+            'GROUP BY k',
+            400000, 'iter_partitions')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+"""Buffers for rows streamed into tables with tabledata().insertAll.
+
+Like BigQuery's streaming buffer, rows inserted into a table are first kept
+in a per-table buffer, and are moved into the table in columnar batches
+rather than one row at a time. Rows are flattened and cast when they're
+inserted (so that invalid rows can be reported in the insertAll response),
+and the buffer keeps a list of pending values for each column, so flushing it
+is a single append of each column.
+
+Rows with an insertId are de-duplicated: a row is dropped if a row with the
+same insertId was inserted into the same table within the de-duplication
+window.
+"""
+from __future__ import absolute_import
+
+import collections
+import threading
+import time
+
+from tinyquery import context
+from tinyquery import loaders
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+# BigQuery remembers insertIds for at least a minute.
+DEFAULT_DEDUP_WINDOW_SECONDS = 60
+
+# The number of buffered rows that causes a buffer to be flushed into its
+# table, even if nothing reads the table.
+FLUSH_THRESHOLD_ROWS = 50000
+
+
+class InvalidRowError(ValueError):
+    pass
+
+
+class RowFlattener(object):
+    """Flattens nested insertAll rows into column values for a table schema.
+
+    Tables only know their flattened, .-separated column names, not whether
+    it's a record or the leaf within it that's repeated. So, unlike
+    loaders.SchemaFlattener, this accepts either a record or a list of
+    records at every level, and collects all values found under a repeated
+    column's path.
+    """
+    def __init__(self, schema):
+        """Compile a tree of nested field names for a table schema.
+
+        Arguments:
+            schema: An OrderedDict mapping column name to Column.
+        """
+        self.columns = [
+            loaders.FlattenedColumn(name, column.type, column.mode,
+                                    tq_types.CAST_FUNCTION_MAP[column.type])
+            for name, column in schema.items()]
+        self._repeated_column_indexes = [
+            index for index, column in enumerate(self.columns)
+            if column.mode == tq_modes.REPEATED]
+        # Each node maps a field name to either a column index or a child
+        # node, for records.
+        self._tree = {}
+        for index, column in enumerate(self.columns):
+            node = self._tree
+            parts = column.name.split('.')
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            node[parts[-1]] = index
+
+    def flatten_row(self, row, ignore_unknown_values=False):
+        """Get the raw value of each column for a row, in column order.
+
+        Raises: InvalidRowError if the row has a field that isn't in the
+            schema and ignore_unknown_values is false.
+        """
+        values = [None] * len(self.columns)
+        for index in self._repeated_column_indexes:
+            values[index] = []
+        self._flatten(self._tree, row, values, ignore_unknown_values, '')
+        return values
+
+    def _flatten(self, node, row, values, ignore_unknown_values, prefix):
+        if not isinstance(row, dict):
+            raise InvalidRowError(
+                'Expected a record for field {}, got {!r}'.format(
+                    prefix.rstrip('.'), row))
+        if not ignore_unknown_values:
+            for name in row:
+                if name not in node:
+                    raise InvalidRowError(
+                        'No such field: {}{}'.format(prefix, name))
+        for name, child in node.items():
+            value = row.get(name)
+            if value is None:
+                continue
+            if not isinstance(child, dict):
+                if self.columns[child].mode != tq_modes.REPEATED:
+                    values[child] = value
+                elif isinstance(value, list):
+                    values[child].extend(value)
+                else:
+                    values[child].append(value)
+            elif isinstance(value, list):
+                for element in value:
+                    self._flatten(child, element, values,
+                                  ignore_unknown_values, prefix + name + '.')
+            else:
+                self._flatten(child, value, values, ignore_unknown_values,
+                              prefix + name + '.')
+
+    def cast_rows(self, raw_rows):
+        """Cast a batch of flattened rows into a list of values per column."""
+        if not raw_rows:
+            return [[] for _ in self.columns]
+        try:
+            return [loaders.cast_flattened_values(column, raw_values)
+                    for column, raw_values in zip(self.columns,
+                                                  zip(*raw_rows))]
+        except (ValueError, TypeError) as e:
+            raise InvalidRowError(str(e))
+
+
+class StreamingBuffer(object):
+    """The rows streamed into a single table that aren't in it yet.
+
+    This is safe to use from many threads at once. Rows are validated
+    without holding the buffer's lock, so producers only contend for the
+    lock while their already-cast columns are appended.
+    """
+    def __init__(self, schema, dedup_window=DEFAULT_DEDUP_WINDOW_SECONDS,
+                 clock=time.time):
+        self.schema = schema
+        self.flattener = RowFlattener(schema)
+        self.dedup_window = dedup_window
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.num_rows = 0
+        self._column_values = [[] for _ in self.flattener.columns]
+        # Maps insertId to the time it was inserted, oldest first.
+        self._recent_insert_ids = collections.OrderedDict()
+
+    def insert(self, rows, skip_invalid_rows=False,
+               ignore_unknown_values=False):
+        """Validate rows and add them to the buffer.
+
+        Arguments:
+            rows: A list of insertAll row objects, each a dict with the row
+                in 'json' and an optional 'insertId'.
+            skip_invalid_rows: Whether to insert the valid rows even if some
+                rows are invalid. Otherwise, no rows are inserted if any row
+                is invalid.
+            ignore_unknown_values: Whether to ignore fields that aren't in
+                the schema, rather than treating those rows as invalid.
+
+        Returns: A list of errors in the format of the insertErrors field of
+            the insertAll response. It's empty if all rows were inserted.
+        """
+        flatten_row = self.flattener.flatten_row
+        raw_rows = []
+        insert_ids = []
+        errors_by_index = {}
+        for index, row in enumerate(rows):
+            try:
+                raw_rows.append(flatten_row(row.get('json', {}),
+                                            ignore_unknown_values))
+                insert_ids.append(row.get('insertId'))
+            except InvalidRowError as e:
+                errors_by_index[index] = str(e)
+
+        try:
+            column_values = self.flattener.cast_rows(raw_rows)
+        except InvalidRowError:
+            # Cast one row at a time to find out which rows are bad.
+            valid_raw_rows = []
+            valid_insert_ids = []
+            raw_row_iter = iter(zip(raw_rows, insert_ids))
+            for index in range(len(rows)):
+                if index in errors_by_index:
+                    continue
+                raw_row, insert_id = next(raw_row_iter)
+                try:
+                    self.flattener.cast_rows([raw_row])
+                except InvalidRowError as e:
+                    errors_by_index[index] = str(e)
+                else:
+                    valid_raw_rows.append(raw_row)
+                    valid_insert_ids.append(insert_id)
+            insert_ids = valid_insert_ids
+            column_values = self.flattener.cast_rows(valid_raw_rows)
+
+        if errors_by_index and not skip_invalid_rows:
+            # Like BigQuery, report the other rows as stopped.
+            return [
+                {'index': index, 'errors': [
+                    {'reason': 'invalid', 'message': errors_by_index[index]}
+                    if index in errors_by_index
+                    else {'reason': 'stopped', 'message': ''}]}
+                for index in range(len(rows))]
+
+        with self.lock:
+            keep = self._dedup(insert_ids)
+            if keep is not None:
+                column_values = [
+                    [value for value, kept in zip(values, keep) if kept]
+                    for values in column_values]
+            for buffered, values in zip(self._column_values, column_values):
+                buffered.extend(values)
+            self.num_rows += len(insert_ids) if keep is None else sum(keep)
+        return [
+            {'index': index,
+             'errors': [{'reason': 'invalid', 'message': message}]}
+            for index, message in sorted(errors_by_index.items())]
+
+    def _dedup(self, insert_ids):
+        """Record the insertIds of new rows, and find the duplicate rows.
+
+        This must be called with the lock held.
+
+        Returns: A list saying whether to keep each row, or None if all rows
+            should be kept.
+        """
+        now = self.clock()
+        recent = self._recent_insert_ids
+        expiry = now - self.dedup_window
+        while recent and next(iter(recent.values())) < expiry:
+            recent.popitem(last=False)
+        keep = None
+        for index, insert_id in enumerate(insert_ids):
+            if insert_id is None:
+                continue
+            if insert_id in recent:
+                if keep is None:
+                    keep = [True] * len(insert_ids)
+                keep[index] = False
+            else:
+                recent[insert_id] = now
+        return keep
+
+    def take(self):
+        """Remove all buffered rows, returning them as a Table's columns.
+
+        This must be called with the lock held.
+
+        Returns: A pair (num_rows, columns), where columns is an OrderedDict
+            mapping column name to Column.
+        """
+        num_rows = self.num_rows
+        columns = collections.OrderedDict(
+            (column.name, context.Column(type=column.type, mode=column.mode,
+                                         values=values))
+            for column, values in zip(self.flattener.columns,
+                                      self._column_values))
+        self.num_rows = 0
+        self._column_values = [[] for _ in self.flattener.columns]
+        return num_rows, columns
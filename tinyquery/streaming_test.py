@@ -0,0 +1,151 @@
+from __future__ import absolute_import
+
+import collections
+import shutil
+import tempfile
+import threading
+import unittest
+
+from tinyquery import context
+from tinyquery import partitioning
+from tinyquery import streaming
+from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
+
+
+def make_schema(*columns):
+    return collections.OrderedDict(
+        (name, context.Column(type=col_type, mode=mode, values=[]))
+        for name, col_type, mode in columns)
+
+
+class RowFlattenerTest(unittest.TestCase):
+    def test_nested(self):
+        flattener = streaming.RowFlattener(make_schema(
+            ('i', tq_types.INT, tq_modes.NULLABLE),
+            ('r.s', tq_types.STRING, tq_modes.NULLABLE),
+            ('rr.x', tq_types.INT, tq_modes.REPEATED),
+            ('rr.y.z', tq_types.STRING, tq_modes.REPEATED)))
+        self.assertEqual(
+            [1, 'a', [1, 2, 3], ['p', 'q']],
+            flattener.flatten_row({
+                'i': 1, 'r': {'s': 'a'},
+                'rr': [{'x': 1, 'y': {'z': 'p'}},
+                       {'x': [2, 3], 'y': [{'z': 'q'}]}]}))
+        self.assertEqual([None, None, [], []], flattener.flatten_row({}))
+
+    def test_unknown_fields(self):
+        flattener = streaming.RowFlattener(make_schema(
+            ('r.s', tq_types.STRING, tq_modes.NULLABLE)))
+        with self.assertRaises(streaming.InvalidRowError):
+            flattener.flatten_row({'r': {'t': 'a'}})
+        with self.assertRaises(streaming.InvalidRowError):
+            flattener.flatten_row({'r': 'a'})
+        self.assertEqual(
+            ['a'], flattener.flatten_row({'r': {'s': 'a', 't': 'b'}},
+                                         ignore_unknown_values=True))
+
+
+class StreamingBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        self.buffer = streaming.StreamingBuffer(
+            make_schema(('i', tq_types.INT, tq_modes.REQUIRED)),
+            dedup_window=60, clock=lambda: self.now)
+
+    def test_dedup_window(self):
+        self.buffer.insert([{'insertId': 'a', 'json': {'i': 1}},
+                            {'insertId': 'a', 'json': {'i': 1}}])
+        self.now = 30
+        self.buffer.insert([{'insertId': 'a', 'json': {'i': 1}},
+                            {'insertId': 'b', 'json': {'i': 2}}])
+        self.now = 61
+        # The first 'a' has expired, but 'b' hasn't.
+        self.buffer.insert([{'insertId': 'a', 'json': {'i': 1}},
+                            {'insertId': 'b', 'json': {'i': 2}}])
+        num_rows, columns = self.buffer.take()
+        self.assertEqual(3, num_rows)
+        self.assertEqual([1, 2, 1], columns['i'].values)
+        self.assertEqual(0, self.buffer.num_rows)
+
+    def test_invalid_rows(self):
+        errors = self.buffer.insert([{'json': {'i': 1}}, {'json': {}}],
+                                    skip_invalid_rows=True)
+        self.assertEqual([1], [error['index'] for error in errors])
+        self.assertEqual([1], self.buffer.take()[1]['i'].values)
+
+
+class InsertAllTest(unittest.TestCase):
+    def setUp(self):
+        self.tq = tinyquery.TinyQuery()
+        self.tq.load_table_or_view(self.tq.make_empty_table(
+            'dataset.events',
+            {'fields': [{'name': 'i', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+                        {'name': 'r', 'type': 'RECORD', 'mode': 'REPEATED',
+                         'fields': [{'name': 's', 'type': 'STRING',
+                                     'mode': 'NULLABLE'}]}]}))
+
+    def test_buffered_rows_are_visible(self):
+        self.tq.insert_all('dataset', 'events', [
+            {'json': {'i': 1, 'r': [{'s': 'a'}, {'s': 'b'}]}}])
+        self.assertEqual(
+            0, self.tq.tables_by_name['dataset.events'].num_rows)
+        result = self.tq.evaluate_query(
+            'SELECT i, COUNT(r.s) AS c FROM dataset.events GROUP BY i')
+        self.assertEqual([1], result.columns[(None, 'i')].values)
+        self.assertEqual([2], result.columns[(None, 'c')].values)
+        self.assertEqual(
+            1, self.tq.tables_by_name['dataset.events'].num_rows)
+
+    def test_concurrent_producers(self):
+        def produce(thread_num):
+            for batch_num in range(20):
+                self.tq.insert_all('dataset', 'events', [
+                    {'insertId': '{}-{}-{}'.format(thread_num, batch_num, i),
+                     'json': {'i': i}}
+                    for i in range(50)])
+                if batch_num % 5 == 0:
+                    self.tq.evaluate_query(
+                        'SELECT COUNT(*) FROM dataset.events')
+
+        threads = [threading.Thread(target=produce, args=(thread_num,))
+                   for thread_num in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result = self.tq.evaluate_query(
+            'SELECT COUNT(*) AS c, SUM(i) AS s FROM dataset.events')
+        self.assertEqual([8 * 20 * 50], result.columns[(None, 'c')].values)
+        self.assertEqual([8 * 20 * sum(range(50))],
+                         result.columns[(None, 's')].values)
+
+    def test_flush_into_partitioned_table(self):
+        self.tq.load_table_or_view(self.tq.make_empty_table(
+            'dataset.daily',
+            {'fields': [{'name': 'i', 'type': 'INTEGER',
+                         'mode': 'NULLABLE'}]},
+            partitioned=True))
+        self.tq.insert_all('dataset', 'daily', [{'json': {'i': 1}},
+                                                 {'json': {'i': 2}}])
+        table = self.tq.get_table('dataset', 'daily')
+        partition = table.partitions[partitioning.current_partition_id()]
+        self.assertEqual(2, partition.num_rows)
+        self.assertEqual([1, 2], partition.columns['i'].values)
+
+    def test_snapshot_includes_buffered_rows(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        self.tq.insert_all('dataset', 'events', [{'json': {'i': 1}}])
+        self.tq.save_snapshot(path)
+        loaded = tinyquery.TinyQuery()
+        loaded.load_snapshot(path)
+        self.assertEqual(
+            [1], loaded.get_table('dataset', 'events').columns['i'].values)
+
+    def test_delete_drops_buffered_rows(self):
+        self.tq.insert_all('dataset', 'events', [{'json': {'i': 1}}])
+        self.tq.delete_table('dataset', 'events')
+        self.tq.flush_streaming_buffers()
+        self.assertNotIn('dataset.events', self.tq.tables_by_name)
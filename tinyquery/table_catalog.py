@@ -0,0 +1,96 @@
+"""An index of all tables and views, searchable by name prefix.
+
+Sharded tables are named like `dataset.events_20160101`, and wildcard table
+functions need to find all the shards with a given prefix. Rather than
+scanning every table name, we keep the names sorted so that a prefix or
+range of names can be found with a binary search.
+"""
+from __future__ import absolute_import
+
+import bisect
+import itertools
+
+
+class TableCatalog(dict):
+    """A dict from full table name to Table or View that indexes its keys.
+
+    This behaves exactly like a regular dict, but also keeps a sorted list of
+    its keys up to date.
+
+    Fields:
+        version: A number that changes whenever a table or view is added,
+            replaced or removed. Compiled views are cached until it changes.
+    """
+    def __init__(self, *args, **kwargs):
+        super(TableCatalog, self).__init__(*args, **kwargs)
+        self._sorted_names = sorted(self.keys())
+        self._versions = itertools.count()
+        self.version = next(self._versions)
+
+    def __setitem__(self, name, table):
+        if name not in self:
+            bisect.insort(self._sorted_names, name)
+        super(TableCatalog, self).__setitem__(name, table)
+        self.version = next(self._versions)
+
+    def __delitem__(self, name):
+        super(TableCatalog, self).__delitem__(name)
+        del self._sorted_names[bisect.bisect_left(self._sorted_names, name)]
+        self.version = next(self._versions)
+
+    def pop(self, name, *default):
+        if name not in self:
+            return super(TableCatalog, self).pop(name, *default)
+        del self._sorted_names[bisect.bisect_left(self._sorted_names, name)]
+        table = super(TableCatalog, self).pop(name)
+        self.version = next(self._versions)
+        return table
+
+    def popitem(self):
+        name, table = super(TableCatalog, self).popitem()
+        del self._sorted_names[bisect.bisect_left(self._sorted_names, name)]
+        self.version = next(self._versions)
+        return name, table
+
+    def setdefault(self, name, default=None):
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def update(self, *args, **kwargs):
+        for name, table in dict(*args, **kwargs).items():
+            self[name] = table
+
+    def clear(self):
+        super(TableCatalog, self).clear()
+        self._sorted_names = []
+        self.version = next(self._versions)
+
+    def names_in_range(self, start, end):
+        """Get the sorted table names n with start <= n <= end."""
+        return self._sorted_names[
+            bisect.bisect_left(self._sorted_names, start):
+            bisect.bisect_right(self._sorted_names, end)]
+
+    def names_with_prefix(self, prefix):
+        """Get the sorted table names starting with the given prefix."""
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        end = start
+        while (end < len(self._sorted_names) and
+               self._sorted_names[end].startswith(prefix)):
+            end += 1
+        return self._sorted_names[start:end]
+
+
+def names_in_range(tables_by_name, start, end):
+    """Like TableCatalog.names_in_range, but for any dict of tables."""
+    if isinstance(tables_by_name, TableCatalog):
+        return tables_by_name.names_in_range(start, end)
+    return sorted(name for name in tables_by_name if start <= name <= end)
+
+
+def names_with_prefix(tables_by_name, prefix):
+    """Like TableCatalog.names_with_prefix, but for any dict of tables."""
+    if isinstance(tables_by_name, TableCatalog):
+        return tables_by_name.names_with_prefix(prefix)
+    return sorted(name for name in tables_by_name if name.startswith(prefix))
@@ -0,0 +1,44 @@
+from __future__ import absolute_import
+
+import unittest
+
+from tinyquery import table_catalog
+
+
+class TableCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = table_catalog.TableCatalog({
+            'ds.events_20160102': 2,
+            'ds.events_20160101': 1,
+            'ds.other': 3,
+        })
+
+    def test_names_with_prefix(self):
+        self.catalog['ds.events_20160103'] = 3
+        self.catalog['ds.eventsx'] = 4
+        self.assertEqual(
+            ['ds.events_20160101', 'ds.events_20160102', 'ds.events_20160103'],
+            self.catalog.names_with_prefix('ds.events_'))
+        self.assertEqual([], self.catalog.names_with_prefix('ds.z'))
+
+    def test_names_in_range(self):
+        self.assertEqual(
+            ['ds.events_20160102', 'ds.other'],
+            self.catalog.names_in_range('ds.events_20160102', 'ds.other'))
+
+    def test_index_follows_deletes(self):
+        del self.catalog['ds.events_20160101']
+        self.catalog.pop('ds.other')
+        self.catalog['ds.events_20160102'] = 5
+        self.assertEqual(['ds.events_20160102'],
+                         self.catalog.names_with_prefix('ds.'))
+        self.catalog.clear()
+        self.assertEqual([], self.catalog.names_with_prefix('ds.'))
+
+    def test_plain_dict(self):
+        tables = {'ds.a_1': 1, 'ds.a_2': 2, 'ds.b': 3}
+        self.assertEqual(['ds.a_1', 'ds.a_2'],
+                         table_catalog.names_with_prefix(tables, 'ds.a_'))
+        self.assertEqual(
+            ['ds.a_2', 'ds.b'],
+            table_catalog.names_in_range(tables, 'ds.a_2', 'ds.c'))
@@ -2,13 +2,43 @@
 from __future__ import absolute_import
 
 import collections
+import contextlib
+import copy
+import itertools
 import json
+import multiprocessing.pool
+import os
+import threading
+import time
 
+from tinyquery import api_client
+from tinyquery import arrow_io
+from tinyquery import column_stats
 from tinyquery import compiler
 from tinyquery import context
 from tinyquery import evaluator
+from tinyquery import exceptions
+from tinyquery import loaders
+from tinyquery import materialized_views
+from tinyquery import memory
+from tinyquery import parser
+from tinyquery import partitioning
+from tinyquery import profiling
+from tinyquery import query_cost
+from tinyquery import query_limits
+from tinyquery import query_plan
+from tinyquery import result_cache
+from tinyquery import snapshot
+from tinyquery import streaming
+from tinyquery import table_catalog
 from tinyquery import tq_modes
 from tinyquery import tq_types
+from tinyquery import typed_ast
+
+
+# Table versions are unique across all tables, so a table that's deleted and
+# recreated doesn't reuse any versions of the old table.
+_table_versions = itertools.count()
 
 
 class TinyQueryError(Exception):
@@ -17,41 +47,255 @@ class TinyQueryError(Exception):
 
 
 class TinyQuery(object):
-    def __init__(self):
-        self.tables_by_name = {}
+    def __init__(self, job_workers=None,
+                 result_cache_bytes=result_cache.DEFAULT_MAX_BYTES,
+                 max_query_memory_bytes=None):
+        """Create an empty TinyQuery service.
+
+        Arguments:
+            job_workers: The number of threads to run query jobs in. If it's
+                given, inserting a query job just queues it, like in
+                BigQuery, and the job is PENDING or RUNNING until a worker
+                thread has run it. Otherwise, query jobs run synchronously
+                and are DONE as soon as they're inserted.
+            result_cache_bytes: The limit on the total size of the query
+                results that query jobs cache, in the logical bytes of
+                query_cost. 0 turns off the cache.
+            max_query_memory_bytes: The limit on the approximate memory
+                (see the memory module) each query may use while it runs.
+                Queries that would use more fail with a
+                query_limits.ResourcesExceededError. None means no limit.
+        """
+        self.tables_by_name = table_catalog.TableCatalog()
         self.next_job_num = 0
         self.job_map = {}
+        self.job_workers = job_workers
+        self._job_pool = None
+        self._job_lock = threading.Lock()
+        # Maps full table name (with any partition decorator) to the
+        # StreamingBuffer of rows inserted with insert_all.
+        self.streaming_buffers = {}
+        self._streaming_lock = threading.RLock()
+        self.result_cache = result_cache.ResultCache(result_cache_bytes)
+        self.max_query_memory_bytes = max_query_memory_bytes
+        # Replaced rather than modified, so queries running in other threads
+        # can read it without a lock.
+        self._profiling_hooks = ()
+
+    def add_profiling_hook(self, hook):
+        """Call a function with a profiling.ProfileEvent for each step of
+        each query from now on.
+        """
+        self._profiling_hooks += (hook,)
+
+    def remove_profiling_hook(self, hook):
+        hooks = list(self._profiling_hooks)
+        hooks.remove(hook)
+        self._profiling_hooks = tuple(hooks)
+
+    @contextlib.contextmanager
+    def profile(self):
+        """Collect the profiling.ProfileEvents of queries in a block.
+
+        Usage:
+            with tq.profile() as events:
+                tq.evaluate_query(...)
+            # events is a list of ProfileEvents.
+        """
+        events = []
+        hook = events.append
+        self.add_profiling_hook(hook)
+        try:
+            yield events
+        finally:
+            self.remove_profiling_hook(hook)
+
+    def make_profiler(self):
+        """Get a profiling.Profiler for a query, or None if there are no
+        profiling hooks.
+        """
+        if not self._profiling_hooks:
+            return None
+        return profiling.Profiler(self._profiling_hooks)
 
     def load_table_or_view(self, table):
-        """Create a table."""
-        self.tables_by_name[table.name] = table
+        """Create a table.
 
-    def load_table_from_csv(self, table_name, raw_schema, filename):
+        If the table's name has a partition decorator, like
+        `dataset.table$20160101`, its rows are instead appended to that
+        partition of the partitioned table, which is created if necessary.
+        """
+        base_name, partition_id = partitioning.split_table_decorator(
+            table.name)
+        if partition_id is None:
+            self.tables_by_name[table.name] = table
+            return
+        if base_name not in self.tables_by_name:
+            self.load_empty_table_from_template(base_name, table,
+                                                partitioned=True)
+        partitioned_table = self.get_partitioned_table(base_name)
+        self.append_to_table(
+            table, partitioned_table.get_or_create_partition(partition_id))
+
+    def load_table_from_csv(self, table_name, raw_schema, filename,
+                            skip_leading_rows=0, field_delimiter=',',
+                            quote='"', max_bad_records=0):
+        """Load a table from a CSV file.
+
+        The options match those of BigQuery CSV load jobs; see
+        loaders.read_csv_batches.
+        """
         result_table = self.make_empty_table(table_name, raw_schema)
-        with open(filename, 'r') as f:
-            for line in f:
-                if line[-1] == '\n':
-                    line = line[:-1]
-                tokens = line.split(',')
-                assert len(tokens) == len(result_table.columns), (
-                    'Expected {} tokens on line {}, but got {}'.format(
-                        len(result_table.columns), line, len(tokens)))
-                for token, column in zip(tokens,
-                                         result_table.columns.values()):
-                    # Run a casting function over the value we are given.
-                    # CSV doesn't have a null value, so the string 'null' is
-                    # used as the null value.
-                    if token != 'null' or column.mode != tq_modes.NULLABLE:
-                        token = tq_types.CAST_FUNCTION_MAP[column.type](token)
-                    else:
-                        token = None
-                    if not tq_modes.check_mode(token, column.mode):
-                        raise ValueError("Bad token for mode %s, got %s" %
-                                         (column.mode, token))
-                    column.values.append(token)
-                result_table.num_rows += 1
+        with loaders.open_csv(filename) as f:
+            self.load_table_from_batches(
+                result_table, loaders.read_csv_batches(
+                    f, list(result_table.columns.values()),
+                    field_delimiter=field_delimiter, quote=quote,
+                    skip_leading_rows=skip_leading_rows,
+                    max_bad_records=max_bad_records))
+
+    def load_table_from_arrow(self, table_name, arrow_table):
+        """Load a table from a pyarrow.Table.
+
+        Struct and list fields are flattened into RECORD and REPEATED
+        columns; see the arrow_io module.
+        """
+        self.load_table_from_record_batches(
+            table_name, arrow_table.schema, arrow_table.to_batches())
+
+    def load_table_from_arrow_file(self, table_name, filename):
+        """Load a table from an Arrow IPC file."""
+        self.load_table_from_record_batches(
+            table_name, *arrow_io.open_arrow_file(filename))
+
+    def load_table_from_parquet(self, table_name, filename):
+        """Load a table from a Parquet file, one record batch at a time."""
+        self.load_table_from_record_batches(
+            table_name, *arrow_io.open_parquet(filename))
+
+    def load_table_from_record_batches(self, table_name, arrow_schema,
+                                       record_batches):
+        result_table = self.make_empty_table(
+            table_name, arrow_io.raw_schema_from_arrow_schema(arrow_schema))
+        self.load_table_from_batches(
+            result_table,
+            arrow_io.read_arrow_batches(arrow_schema, record_batches))
+
+    def load_table_from_batches(self, result_table, batches):
+        """Append batches of column values to an empty table, then load it.
+
+        Arguments:
+            result_table: A new, empty Table.
+            batches: An iterable of (num_rows, column_values) pairs, where
+                column_values has a list of values for each column of the
+                table, in order.
+        """
+        columns = list(result_table.columns.values())
+        for num_rows, column_values in batches:
+            for column, values in zip(columns, column_values):
+                column.values.extend(values)
+            result_table.num_rows += num_rows
+        result_table.refresh_stats()
         self.load_table_or_view(result_table)
 
+    def export_table_to_parquet(self, full_table_name, filename):
+        """Write a table, including any streamed rows, to a Parquet file."""
+        arrow_io.write_parquet(
+            self.get_table_by_full_name(full_table_name).snapshot(), filename)
+
+    def export_table_to_arrow_file(self, full_table_name, filename):
+        """Write a table, including any streamed rows, to an Arrow IPC file."""
+        arrow_io.write_arrow_file(
+            self.get_table_by_full_name(full_table_name).snapshot(), filename)
+
+    def save_snapshot(self, path):
+        """Save all tables and views to a snapshot directory.
+
+        The directory is created if necessary, and rows still in streaming
+        buffers are saved too. See the snapshot module for the format.
+        """
+        self.flush_streaming_buffers()
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        file_nums = itertools.count()
+
+        def write_table_file(table):
+            filename = 'table{}.tqsnap'.format(next(file_nums))
+            snapshot.write_table_file(os.path.join(path, filename), table)
+            return filename
+
+        tables = []
+        views = []
+        for name, table in sorted(self.tables_by_name.items()):
+            if isinstance(table, View):
+                views.append({'name': name, 'query': table.query})
+                continue
+            if isinstance(table, MaterializedView):
+                # The results are computed again when the view is next read.
+                views.append({'name': name, 'query': table.query,
+                              'materialized': True})
+                continue
+            # Save a consistent version of each table, even if it's being
+            # written to.
+            table = table.snapshot()
+            if isinstance(table, PartitionedTable):
+                tables.append({
+                    'name': name,
+                    'schema': [
+                        {'name': col_name, 'type': column.type,
+                         'mode': column.mode}
+                        for col_name, column in table.schema.items()],
+                    'partitions': {
+                        partition_id: write_table_file(partition)
+                        for partition_id, partition
+                        in table.partitions.items()},
+                })
+            else:
+                tables.append({'name': name,
+                               'file': write_table_file(table)})
+        snapshot.write_manifest(path, {
+            'version': snapshot.FORMAT_VERSION,
+            'tables': tables,
+            'views': views,
+        })
+
+    def load_snapshot(self, path):
+        """Load the tables and views from a snapshot made by save_snapshot.
+
+        Only the headers of the table files are read here; the data is read
+        when each table is first used (see SnapshotTable).
+        """
+        manifest = snapshot.read_manifest(path)
+        for entry in manifest['tables']:
+            if 'partitions' in entry:
+                table = PartitionedTable(
+                    entry['name'], collections.OrderedDict(
+                        (column['name'],
+                         context.Column(type=column['type'],
+                                        mode=column['mode'], values=[]))
+                        for column in entry['schema']))
+                for partition_id, filename in entry['partitions'].items():
+                    table.partitions[partition_id] = SnapshotTable(
+                        snapshot.TableFile(os.path.join(path, filename)),
+                        chunk_size=table.chunk_size)
+            else:
+                table = SnapshotTable(
+                    snapshot.TableFile(os.path.join(path, entry['file'])))
+            self.load_table_or_view(table)
+        views = []
+        for entry in manifest['views']:
+            if entry.get('materialized'):
+                view = MaterializedView(entry['name'], entry['query'],
+                                        self.tables_by_name)
+            else:
+                view = View(entry['name'], entry['query'])
+                views.append(view)
+            self.load_table_or_view(view)
+        # Views can read other views, so their schemas can only be worked
+        # out once they're all loaded.
+        for view in views:
+            view.schema = self.view_schema(view.query)
+
     def make_raw_schema(self, schema):
         """Construct a fake schema in the manner that `make_empty_table`
         expects. Omits any fields that are not required.
@@ -66,13 +310,21 @@ class TinyQuery(object):
         return self.make_raw_schema(schema)
 
     def load_table_from_newline_delimited_json_files(
-            self, table_name, schema_filename, table_filename):
+            self, table_name, schema_filename, table_filename,
+            num_workers=None):
+        """Loads a table from a file of Newline Delimited JSON.
+
+        Large files are split into ranges that are parsed in parallel by
+        num_workers processes (by default, one per CPU).
+        """
         with open(schema_filename, 'r') as f:
             schema = f.read()
-        with open(table_filename, 'r') as f:
-            table_lines = [line for line in f]
-        return self.load_table_from_newline_delimited_json(
-            table_name, schema, table_lines)
+        fake_raw_schema = self.make_raw_schema(schema)
+        result_table = self.make_empty_table(table_name, fake_raw_schema)
+        self.load_table_from_batches(
+            result_table, loaders.read_json_file_batches(
+                table_filename, loaders.SchemaFlattener(fake_raw_schema),
+                num_workers=num_workers))
 
     def load_table_from_newline_delimited_json(self, table_name,
                                                schema,
@@ -81,89 +333,18 @@ class TinyQuery(object):
         Delimited JSON. Requires a schema file in the same format that
         BigQuery accepts. For an example, see
         <https://cloud.google.com/bigquery/docs/personsDataSchema.json>.
+
+        table_lines can be any iterable of lines, like a file or a
+        generator; only one batch of lines is kept in memory at a time.
         """
         fake_raw_schema = self.make_raw_schema(schema)
         result_table = self.make_empty_table(table_name, fake_raw_schema)
-
-        def run_cast_function(key, mode, value):
-            cast_function = (
-                tq_types.CAST_FUNCTION_MAP[result_table.columns[key].type])
-            if value is None:
-                return None
-            elif mode == tq_modes.REPEATED:
-                return [cast_function(x) for x in value]
-            else:
-                if isinstance(value, tq_types.BINARY_TYPE):
-                    return cast_function(value.decode('utf-8'))
-                else:
-                    return cast_function(value)
-
-        def flatten_row(output, row, schema, prefix='', ever_repeated=False):
-            # Tinyquery treats record fields as a set of toplevel leaf
-            # fields with a .-separated prefix.  In the input data, they're
-            # nested.  It's a lot easier if we flatten them all first.
-            for field in schema['fields']:
-                if field['type'] == 'RECORD':
-                    # We want to be able to treat nested fields uniformly
-                    # (via the recursive call below) regardless of whether
-                    # their parent was repeated (except for correctly setting
-                    # the `ever_repeated` flag.
-                    # To do this we need to ensure that:
-                    # - we always pass something non-null to the recursive call
-                    # - we have at least one recursive call no matter what.
-                    if field['mode'] == 'REPEATED':
-                        # Since we're repeated already, the value will either
-                        # already be a list, or it will be None, in which case
-                        # we need to provide an empty value wrapped in a list
-                        # for the recursive call.
-                        next_values = row.get(field['name']) or [{}]
-                    else:
-                        # In the non-repeated case, we need to wrap in a list
-                        # so that we can iterate over it in the next step.
-                        next_values = [row.get(field['name']) or {}]
-
-                    for value in next_values:
-                        flatten_row(
-                            output,
-                            value,
-                            field,
-                            prefix='%s%s.' % (prefix, field['name']),
-                            ever_repeated=(
-                                ever_repeated or field['mode'] == 'REPEATED'))
-                else:
-                    full_name = prefix + field['name']
-                    if ever_repeated or field['mode'] == 'REPEATED':
-                        output.setdefault(full_name, [])
-                        if field['mode'] == 'REPEATED':
-                            output[full_name].extend(
-                                row.get(field['name'], []))
-                        elif (field['name'] in row and
-                              row[field['name']] is not None):
-                            output[full_name].append(row[field['name']])
-                    else:
-                        output[full_name] = row.get(field['name'], None)
-            return output
-
-        def process_row(row):
-            for (key, value) in row.items():
-                mode = result_table.columns[key].mode
-                token = run_cast_function(key, mode, value)
-                if not tq_modes.check_mode(token, mode):
-                    raise ValueError(
-                        "Bad token for mode %s, got %s" % (
-                            mode, token))
-                result_table.columns[key].values.append(
-                    token)
-
-        for line in table_lines:
-            row = json.loads(line)
-            flattened_row = flatten_row({}, row, fake_raw_schema)
-            process_row(flattened_row)
-
-        self.load_table_or_view(result_table)
+        self.load_table_from_batches(
+            result_table, loaders.read_json_batches(
+                table_lines, loaders.SchemaFlattener(fake_raw_schema)))
 
     @staticmethod
-    def make_empty_table(table_name, raw_schema):
+    def make_empty_table(table_name, raw_schema, partitioned=False):
         columns = collections.OrderedDict()
 
         def make_columns(schema, name_prefix='', ever_repeated=False):
@@ -184,16 +365,43 @@ class TinyQuery(object):
                     columns[prefixed_name] = context.Column(
                         type=value_type, mode=final_mode, values=[])
         make_columns(raw_schema)
+        if partitioned:
+            return PartitionedTable(table_name, columns)
         return Table(table_name, 0, columns)
 
     def make_view(self, view_name, query):
-        # TODO: Figure out the schema by compiling the query, and refactor the
-        # code so that the compiler can use the schema instead of expecting
-        # every TableId to have actual Columns. For now, we just validate that
-        # the view works, and things will break later if the view is actually
-        # used.
-        compiler.compile_text(query, self.tables_by_name)
-        return View(view_name, query)
+        """Make a View, checking that its query compiles.
+
+        Like BigQuery, the view's schema is worked out now, and isn't
+        updated if the tables it reads change later.
+        """
+        return View(view_name, query, self.view_schema(query))
+
+    def view_schema(self, query):
+        """Get the schema of a view's query, in the format of Table.schema."""
+        return self.select_schema(
+            compiler.compile_text(query, self.tables_by_name))
+
+    @staticmethod
+    def select_schema(select_ast):
+        """Get the schema of a compiled query's results."""
+        return collections.OrderedDict(
+            # TODO: Use the modes of the columns, which aren't known at
+            # compile time. For now, everything is NULLABLE, like in the
+            # evaluator.
+            (col_name, context.Column(type=col_type,
+                                      mode=tq_modes.NULLABLE, values=[]))
+            for (_, col_name), col_type in select_ast.type_ctx.columns.items())
+
+    def make_materialized_view(self, view_name, query):
+        """Make a MaterializedView, computing its results right away.
+
+        Like make_view, the result still needs to be loaded with
+        load_table_or_view.
+        """
+        view = MaterializedView(view_name, query, self.tables_by_name)
+        view.refresh()
+        return view
 
     def get_all_tables(self):
         return self.tables_by_name
@@ -226,70 +434,403 @@ class TinyQuery(object):
         # TODO(alan): Don't just ignore the project parameter.
         # Will throw KeyError if the table doesn't exist.
         table = self.tables_by_name[dataset + '.' + table_name]
-        schema_fields = []
-        # TODO(colin): record fields should appear grouped.
-        for col_name, column in table.columns.items():
-            schema_fields.append({
-                'name': col_name,
-                'type': column.type,
-                'mode': 'NULLABLE'
-            })
-
-        return {
-            'schema': {
-                'fields': schema_fields
-            },
+        result = {
+            'schema': api_client.schema_from_table(table),
             'tableReference': {
                 'projectId': project,
                 'datasetId': dataset,
                 'tableId': table_name
             }
         }
+        if isinstance(table, PartitionedTable):
+            result['timePartitioning'] = {'type': 'DAY'}
+        if isinstance(table, MaterializedView):
+            result['materializedView'] = {'query': table.query}
+        if isinstance(table, View):
+            result['view'] = {'query': table.query}
+        return result
 
     def get_table(self, dataset, table_name):
-        """Returns the tinyquery.Table with the given dataset and name."""
-        return self.tables_by_name[dataset + '.' + table_name]
+        """Returns the tinyquery.Table with the given dataset and name.
+
+        The name may have a partition decorator, in which case just that
+        partition is returned.
+        """
+        return self.get_table_by_full_name(dataset + '.' + table_name)
+
+    def get_table_by_full_name(self, full_table_name):
+        self.flush_streaming_buffers()
+        return self._get_stored_table(full_table_name)
+
+    def _get_stored_table(self, full_table_name):
+        base_name, partition_id = partitioning.split_table_decorator(
+            full_table_name)
+        if partition_id is None:
+            return self.tables_by_name[base_name]
+        partitioned_table = self.get_partitioned_table(base_name)
+        return partitioned_table.get_or_create_partition(partition_id)
+
+    def get_partitioned_table(self, full_table_name):
+        table = self.tables_by_name[full_table_name]
+        if not isinstance(table, PartitionedTable):
+            raise TinyQueryError(
+                'Cannot use a partition decorator on table {}, since it is '
+                'not partitioned.'.format(full_table_name))
+        return table
+
+    def insert_all(self, dataset, table_name, rows, skip_invalid_rows=False,
+                   ignore_unknown_values=False):
+        """Stream rows into a table, like tabledata().insertAll.
+
+        Rows go into the table's streaming buffer, which is flushed into the
+        table once it's big enough or when anything reads from a table. This
+        can be called from many threads at once. See
+        streaming.StreamingBuffer.insert for the arguments.
+
+        Returns: A list of errors for rows that weren't inserted.
+
+        Raises: KeyError if the table doesn't exist.
+        """
+        full_table_name = dataset + '.' + table_name
+        with self._streaming_lock:
+            table = self._get_stored_table(full_table_name)
+            buf = self.streaming_buffers.get(full_table_name)
+            if buf is None or buf.schema != table.schema:
+                self.flush_streaming_buffers()
+                buf = streaming.StreamingBuffer(table.schema)
+                self.streaming_buffers[full_table_name] = buf
+        errors = buf.insert(rows, skip_invalid_rows=skip_invalid_rows,
+                            ignore_unknown_values=ignore_unknown_values)
+        if buf.num_rows >= streaming.FLUSH_THRESHOLD_ROWS:
+            self.flush_streaming_buffers()
+        return errors
+
+    def flush_streaming_buffers(self):
+        """Move any rows in streaming buffers into their tables.
+
+        Anything that reads tables calls this first, so that buffered rows
+        are visible to it. The buffered values are appended straight onto the
+        table's columns, and chunk stats are only recomputed when next used,
+        so this is cheap when little has been inserted since the last flush.
+        """
+        if not self.streaming_buffers:
+            return
+        with self._streaming_lock:
+            for full_table_name, buf in list(self.streaming_buffers.items()):
+                with buf.lock:
+                    if not buf.num_rows:
+                        continue
+                    num_rows, columns = buf.take()
+                dest_table = self._get_stored_table(full_table_name)
+                # The buffer has the same schema as the table. Like other
+                # appends, rows streamed into a partitioned table go into
+                # the current day's partition.
+                dest_table.append_rows(
+                    num_rows, [columns[col_name].values
+                               for col_name in dest_table.schema])
 
     def delete_table(self, dataset, table_name):
-        del self.tables_by_name[dataset + '.' + table_name]
+        base_name, partition_id = partitioning.split_table_decorator(
+            dataset + '.' + table_name)
+        with self._streaming_lock:
+            # Rows still in the streaming buffer are deleted too.
+            for buffered_name in list(self.streaming_buffers):
+                buffered_base_name, buffered_partition_id = (
+                    partitioning.split_table_decorator(buffered_name))
+                if buffered_base_name == base_name and (
+                        partition_id in (None, buffered_partition_id)):
+                    del self.streaming_buffers[buffered_name]
+        if partition_id is None:
+            del self.tables_by_name[base_name]
+        else:
+            self.get_partitioned_table(base_name).delete_partition(
+                partition_id)
+
+    def evaluate_query(self, query, cancellation=None,
+                       maximum_bytes_billed=None, plan_recorder=None,
+                       memory_tracker=None, compiled_query=None):
+        """Run a query and return a Context with the results.
 
-    def evaluate_query(self, query):
-        select_ast = compiler.compile_text(query, self.tables_by_name)
-        select_evaluator = evaluator.Evaluator(self.tables_by_name)
+        Arguments:
+            query: The query text.
+            cancellation: An optional query_limits.CancellationToken for
+                stopping the query early.
+            maximum_bytes_billed: If given, the query fails without running
+                if it would process more than this many bytes.
+            plan_recorder: An optional query_plan.PlanRecorder to record the
+                query's plan and the stats of each of its operators.
+            memory_tracker: An optional memory.MemoryTracker to count the
+                memory the query uses. By default, one is only made if there's
+                a max_query_memory_bytes limit.
+            compiled_query: The (select_ast, pinned_tables) pair from
+                compile_query, if the query has already been compiled.
+        """
+        profiler = self.make_profiler()
+        if compiled_query is None:
+            compiled_query = self.compile_query(query, profiler)
+        select_ast, pinned_tables = compiled_query
+        if maximum_bytes_billed is not None:
+            query_limits.check_bytes_billed(
+                query_cost.bytes_processed(select_ast, pinned_tables),
+                maximum_bytes_billed)
+        if plan_recorder is not None:
+            plan_recorder.start(select_ast, pinned_tables)
+        if memory_tracker is None and self.max_query_memory_bytes is not None:
+            memory_tracker = memory.MemoryTracker(self.max_query_memory_bytes)
+        select_evaluator = evaluator.Evaluator(pinned_tables, cancellation,
+                                               plan_recorder, profiler,
+                                               memory_tracker)
         return select_evaluator.evaluate_select(select_ast)
 
-    def create_job(self, project_id, job_object):
-        """Create a job with the given status and return the info for it."""
-        job_id = 'job:%s' % self.next_job_num
-        self.next_job_num += 1
-        job_object.job_info['jobReference'] = {
-            'projectId': project_id,
-            'jobId': job_id
-        }
-        self.job_map[job_id] = job_object
+    def explain(self, query, analyze=False):
+        """Get the plan of a query, like EXPLAIN.
+
+        Arguments:
+            query: The query text.
+            analyze: If True, the query is run, and the plan includes the
+                number of rows, time and output size of each operator, like
+                EXPLAIN ANALYZE. Otherwise the query is only compiled.
+
+        Returns: A query_plan.QueryPlan. Use to_json for the format of
+            queryPlan in job statistics, or str for a readable tree.
+        """
+        if analyze:
+            plan_recorder = query_plan.PlanRecorder(measure_bytes=True)
+            self.evaluate_query(query, plan_recorder=plan_recorder)
+            return plan_recorder.plan
+        return query_plan.QueryPlan(*self.compile_query(query))
+
+    def dry_run_query(self, query):
+        """Compile a query without running it, like a dry run in BigQuery.
+
+        Returns: A pair of the number of bytes the query would process and
+            the schema of its results, in the format of Table.schema.
+        """
+        select_ast, pinned_tables = self.compile_query(query,
+                                                       self.make_profiler())
+        return (query_cost.bytes_processed(select_ast, pinned_tables),
+                self.select_schema(select_ast))
+
+    def compile_query(self, query, profiler=None):
+        """Compile a query and pin the tables it reads.
+
+        The query reads the versions of its tables from when it's compiled,
+        so concurrent writes don't affect it (and aren't blocked by it).
+
+        Returns: A pair of the compiled select and the dict of pinned tables
+            from pin_tables.
+        """
+        self.flush_streaming_buffers()
+        select_ast = compiler.compile_text(query, self.tables_by_name,
+                                           profiler)
+        return select_ast, self.pin_tables(select_ast)
+
+    def query_cache_key(self, query, compiled_query=None):
+        """Get the key that a query's results are cached under.
+
+        Arguments:
+            query: The query text.
+            compiled_query: The (select_ast, pinned_tables) pair from
+                compile_query, if the query has already been compiled.
+
+        Returns: The key, or None if the query's results can't be cached. See
+            result_cache.cache_key.
+        """
+        if compiled_query is None:
+            compiled_query = self.compile_query(query)
+        return result_cache.cache_key(*compiled_query)
+
+    def pin_tables(self, select_ast):
+        """Get a snapshot of each of the tables a compiled query reads.
+
+        Returns: A dict mapping table name to a snapshot of the table; see
+            Table.snapshot.
+        """
+        return {
+            table_expr.name: self.tables_by_name[table_expr.name].snapshot()
+            for table_expr in typed_ast.iter_tables(select_ast)}
+
+    def create_job(self, project_id, job_object, job_id=None):
+        """Create a job with the given status and return the info for it.
+
+        Like BigQuery, the caller can choose the job id, which lets it refer
+        to the job (to cancel it, say) before inserting it has returned.
+        """
+        with self._job_lock:
+            if job_id is None:
+                job_id = 'job:%s' % self.next_job_num
+                self.next_job_num += 1
+            elif job_id in self.job_map:
+                raise TinyQueryError(
+                    'Already Exists: Job {}'.format(job_id))
+            job_object.job_info['jobReference'] = {
+                'projectId': project_id,
+                'jobId': job_id
+            }
+            self.job_map[job_id] = job_object
         return job_object.job_info
 
     def run_query_job(self, project_id, query, dest_dataset, dest_table_name,
-                      create_disposition, write_disposition):
-        query_result_context = self.evaluate_query(query)
+                      create_disposition, write_disposition, timeout=None,
+                      maximum_bytes_billed=None, job_id=None,
+                      use_query_cache=True, dry_run=False):
+        """Run a query job, or queue it if job_workers was given.
+
+        Like in BigQuery, the results of jobs without a destination table
+        are cached until any of the tables they read change, and identical
+        queries get the cached results (and report a cacheHit) instead of
+        running again.
+
+        Dry runs only compile the query. They finish right away, with the
+        number of bytes the query would process and the schema of its
+        results in their statistics, and aren't kept as jobs.
+
+        Arguments:
+            timeout: The number of seconds the job can run for before it's
+                stopped, or None for no limit.
+            maximum_bytes_billed: The maximum number of bytes the query may
+                process, or None for no limit.
+            job_id: The id to give the job, or None to generate one.
+            use_query_cache: Whether to look for the results in the cache.
+            dry_run: Whether to only estimate the cost of the query.
+
+        Returns: The job info. For queued jobs, this is the info from when the
+            job was queued, so it needs to be polled with get_job_info.
+        """
+        if dry_run:
+            bytes_processed, schema = self.dry_run_query(query)
+            return {
+                'jobReference': {'projectId': project_id},
+                'configuration': {'dryRun': True},
+                'status': {'state': 'DONE'},
+                'statistics': {
+                    'creationTime': _now_millis(),
+                    'totalBytesProcessed': str(bytes_processed),
+                    'query': {
+                        'totalBytesProcessed': str(bytes_processed),
+                        'cacheHit': False,
+                        'schema': api_client.schema_from_table(
+                            Table('query_results', 0, schema),
+                            nest_records=False),
+                    },
+                },
+            }
+        job_args = (query, dest_dataset, dest_table_name, create_disposition,
+                    write_disposition, maximum_bytes_billed, use_query_cache)
+        job = QueryJob(query_limits.CancellationToken(timeout))
+        job_info = self.create_job(project_id, job, job_id)
+        if self.job_workers is None:
+            self._run_query_job(job, *job_args)
+            if job.error is not None:
+                # Synchronous jobs raise errors right away, but the failed
+                # job is still recorded.
+                raise job.error
+            return job.job_info
+        self._get_job_pool().apply_async(self._run_query_job,
+                                         (job,) + job_args)
+        return job_info
+
+    def _get_job_pool(self):
+        with self._job_lock:
+            if self._job_pool is None:
+                self._job_pool = multiprocessing.pool.ThreadPool(
+                    self.job_workers)
+            return self._job_pool
+
+    def _run_query_job(self, job, *job_args):
+        plan_recorder = query_plan.PlanRecorder()
+        if not job.start(plan_recorder):
+            # The job was cancelled while it was queued.
+            return
+        memory_tracker = memory.MemoryTracker(self.max_query_memory_bytes)
+        try:
+            query_results, cache_hit = self._evaluate_query_job(
+                job.cancellation, plan_recorder, memory_tracker, *job_args)
+        except Exception as e:
+            # Like in BigQuery, a failed job is DONE, with an errorResult.
+            job.fail(e)
+        else:
+            job.finish(query_results, cache_hit, plan_recorder.plan,
+                       memory_tracker.peak_bytes)
+
+    def _evaluate_query_job(self, cancellation, plan_recorder,
+                            memory_tracker, query,
+                            dest_dataset, dest_table_name, create_disposition,
+                            write_disposition, maximum_bytes_billed,
+                            use_query_cache):
+        """Run the query of a query job.
+
+        The query's plan is recorded with plan_recorder, and its memory is
+        counted with memory_tracker, unless the results came from the cache.
+
+        Returns: A pair of the Table of results and whether it came from the
+            result cache.
+        """
+        has_dest = dest_dataset is not None and dest_table_name is not None
+        # The cache key and the results come from the same compiled query,
+        # and so the same versions of its tables.
+        compiled_query = self.compile_query(query, self.make_profiler())
+        # Like in BigQuery, queries with a destination table don't use the
+        # cache.
+        cache_key = (None if has_dest
+                     else self.query_cache_key(query, compiled_query))
+        if use_query_cache and cache_key is not None:
+            cached_table = self.result_cache.get(cache_key)
+            if cached_table is not None:
+                return cached_table, True
+
+        query_result_context = self.evaluate_query(
+            query, cancellation, maximum_bytes_billed, plan_recorder,
+            memory_tracker, compiled_query)
         query_result_table = self.table_from_context('query_results',
                                                      query_result_context)
+        if cache_key is not None:
+            self.result_cache.put(cache_key, query_result_table)
 
-        if dest_dataset is not None and dest_table_name is not None:
+        if has_dest:
+            # This is the last chance to stop before the destination table
+            # changes.
+            cancellation.check()
             dest_full_table_name = dest_dataset + '.' + dest_table_name
             self.copy_table(query_result_table, dest_full_table_name,
                             create_disposition, write_disposition)
+        return query_result_table, False
 
-        return self.create_job(project_id, QueryJob({
-            'status': {
-                'state': 'DONE'
-            },
-            'statistics': {
-                'query': {
-                    'totalBytesProcessed': '0'
-                }
-            }
-        }, query_result_table))
+    def cancel_job(self, job_id):
+        """Request that a query job be cancelled, like jobs().cancel.
+
+        Queued jobs are cancelled right away, and running jobs stop at the
+        next checkpoint in the evaluator. Jobs that are already done are
+        left alone.
+
+        Returns: The job info.
+
+        Raises: KeyError if there's no such job.
+        """
+        job = self.job_map[job_id]
+        if isinstance(job, QueryJob):
+            job.cancel()
+        return self.get_job_info(job_id)
+
+    def wait_for_job(self, job_id, timeout=None):
+        """Wait for a query job to be done.
+
+        Arguments:
+            job_id: The id of a query job.
+            timeout: The maximum number of seconds to wait, or None to wait
+                for as long as the job takes.
+
+        Returns: Whether the job is done.
+        """
+        return self.job_map[job_id].done.wait(timeout)
+
+    def shutdown(self):
+        """Wait for any queued query jobs, then stop the worker threads."""
+        with self._job_lock:
+            job_pool, self._job_pool = self._job_pool, None
+        if job_pool is not None:
+            job_pool.close()
+            job_pool.join()
 
     @staticmethod
     def table_from_context(table_name, ctx):
@@ -304,7 +845,8 @@ class TinyQuery(object):
         # TODO: Handle errors in the same way as BigQuery.
         src_full_table_name = src_dataset + '.' + src_table_name
         dest_full_table_name = dest_dataset + '.' + dest_table_name
-        src_table = self.tables_by_name[src_full_table_name]
+        src_table = self.get_table_by_full_name(
+            src_full_table_name).snapshot()
         self.copy_table(src_table, dest_full_table_name, create_disposition,
                         write_disposition)
         return self.create_job(project_id, CopyJob({
@@ -315,59 +857,99 @@ class TinyQuery(object):
 
     def copy_table(self, src_table, dest_table_name, create_disposition,
                    write_disposition):
-        """Write the given Table object to the destination table name."""
-        if dest_table_name not in self.tables_by_name:
+        """Write the given Table object to the destination table name.
+
+        If the destination has a partition decorator, only that partition is
+        written to (or truncated).
+        """
+        base_name, partition_id = partitioning.split_table_decorator(
+            dest_table_name)
+        if base_name not in self.tables_by_name:
             if create_disposition == 'CREATE_NEVER':
                 raise TinyQueryError('CREATE_NEVER specified, but table did '
                                      'not exist: {}'.format(dest_table_name))
-            self.load_empty_table_from_template(dest_table_name, src_table)
+            self.load_empty_table_from_template(
+                base_name, src_table, partitioned=partition_id is not None)
 
         # TODO: Handle schema differences and raise errors with illegal schema
         # updates.
-        dest_table = self.tables_by_name[dest_table_name]
-        if dest_table.num_rows > 0:
-            if write_disposition == 'WRITE_EMPTY':
-                raise TinyQueryError(
-                    'WRITE_EMPTY was specified, but the table {} was not '
-                    'empty.'.format(dest_table_name))
-            if write_disposition == 'WRITE_TRUNCATE':
-                self.clear_table(dest_table)
-        self.append_to_table(src_table, dest_table)
+        dest_table = self.get_table_by_full_name(dest_table_name)
+        if dest_table.num_rows > 0 and write_disposition == 'WRITE_EMPTY':
+            raise TinyQueryError(
+                'WRITE_EMPTY was specified, but the table {} was not '
+                'empty.'.format(dest_table_name))
+        # Truncating and appending happen as a single write, so queries see
+        # either the old rows or the new ones.
+        self.append_to_table(src_table, dest_table,
+                             truncate=write_disposition == 'WRITE_TRUNCATE')
 
-    def load_empty_table_from_template(self, table_name, template_table):
+    def load_empty_table_from_template(self, table_name, template_table,
+                                       partitioned=False):
         columns = collections.OrderedDict(
             # TODO(Samantha): This shouldn't just be nullable.
             (col_name, context.Column(type=col.type, mode=tq_modes.NULLABLE,
                                       values=[]))
-            for col_name, col in template_table.columns.items()
+            for col_name, col in template_table.schema.items()
         )
-        table = Table(table_name, 0, columns)
+        if partitioned or isinstance(template_table, PartitionedTable):
+            table = PartitionedTable(table_name, columns)
+        else:
+            table = Table(table_name, 0, columns)
         self.load_table_or_view(table)
 
     @staticmethod
     def clear_table(table):
-        table.num_rows = 0
-        for column in table.columns.values():
-            column.values[:] = []
+        table.append_rows(0, [[] for _ in table.schema], truncate=True)
 
     @staticmethod
-    def append_to_table(src_table, dest_table):
-        dest_table.num_rows += src_table.num_rows
-        for col_name, column in dest_table.columns.items():
-            if col_name in src_table.columns:
-                column.values.extend(src_table.columns[col_name].values)
+    def append_to_table(src_table, dest_table, truncate=False):
+        """Append the rows of one table to another.
+
+        If truncate is true, the rows replace the rows of dest_table
+        instead. Either way, the destination changes in a single step.
+
+        The tables may end up sharing column lists (see Table.append_rows),
+        so the source is marked as shared, like a snapshot, and a later
+        write to either table copies the lists first.
+        """
+        src_table = src_table.snapshot()
+        if isinstance(dest_table, PartitionedTable):
+            # Rows keep their partition when copied between partitioned
+            # tables, and otherwise go into the current day's partition.
+            if isinstance(src_table, PartitionedTable):
+                src_partitions = sorted(src_table.partitions.items())
             else:
-                column.values.extend([None] * src_table.num_rows)
+                src_partitions = [
+                    (partitioning.current_partition_id(), src_table)]
+            dest_table.append_partitions(src_partitions, truncate)
+            return
+        dest_table.append_rows(
+            src_table.num_rows, column_values_for_schema(src_table,
+                                                         dest_table.schema),
+            truncate)
 
     def get_job_info(self, job_id):
         # Raise a KeyError if the table doesn't exist.
-        return self.job_map[job_id].job_info
+        job = self.job_map[job_id]
+        if isinstance(job, QueryJob):
+            return job.get_job_info()
+        return job.job_info
 
     def get_query_result_table(self, job_id):
         # TODO: Return an appropriate error if not a query job.
         return self.job_map[job_id].query_results
 
 
+def column_values_for_schema(src_table, schema):
+    """Get a table's values for each column of a schema, in order.
+
+    Columns that the table doesn't have are all null.
+    """
+    return [src_table.columns[col_name].values if col_name in src_table.columns
+            else [None] * src_table.num_rows
+            for col_name in schema]
+
+
 class Table(object):
     """Information containing metadata and contents of a table.
 
@@ -377,8 +959,16 @@ class Table(object):
         columns: An OrderedDict mapping column name to Column. Note that unlike
             in Context objects, the column name is just a string and does not
             include a table component.
+        chunk_size: The number of rows in each chunk that we keep column
+            stats for.
+        version: A number that changes whenever the rows of the table
+            change. No two tables have the same version.
+        truncation_count: The number of times all of the table's rows have
+            been replaced. While this stays the same, rows are only added to
+            the end of the table.
     """
-    def __init__(self, name, num_rows, columns):
+    def __init__(self, name, num_rows, columns,
+                 chunk_size=column_stats.DEFAULT_CHUNK_SIZE):
         assert isinstance(columns, collections.OrderedDict)
         for col_name, column in columns.items():
             assert isinstance(col_name, tq_types.STRING_TYPE)
@@ -388,27 +978,689 @@ class Table(object):
         self.name = name
         self.num_rows = num_rows
         self.columns = columns
+        self.chunk_size = chunk_size
+        self.version = next(_table_versions)
+        self.truncation_count = 0
+        self._chunks = []
+        self._num_bytes_by_column = {}
+        self._lock = threading.RLock()
+        self._shared = False
+        # The table this is a snapshot of, if any.
+        self._live_table = None
+
+    def snapshot(self):
+        """Get an unchanging copy of the current version of the table.
+
+        The copy shares the table's column values. Writes through
+        append_rows after this publish new column lists rather than changing
+        the shared ones, so a query reading the copy never sees a partial
+        write, and doesn't block writers. Chunk stats computed on the copy
+        are handed back to the table while it's still the same version, so
+        they're only ever computed once per version.
+        """
+        with self._lock:
+            self._shared = True
+            pinned = copy.copy(self)
+            pinned._lock = threading.RLock()
+            pinned._live_table = self
+            return pinned
+
+    def append_rows(self, num_rows, column_values, truncate=False):
+        """Append rows to the table in a single step.
+
+        Column lists are copy-on-write: if the table was empty (or is
+        truncated), it takes the given lists as its columns rather than
+        copying them, and only copies them once it's appended to again. So
+        copying a table (or a query result) into an empty table is cheap,
+        and the lists must not be changed after they're passed in.
+
+        Arguments:
+            num_rows: The number of rows to append.
+            column_values: A list of the new values for each column, in
+                order.
+            truncate: Whether the new rows should replace the table's rows,
+                rather than being added to them.
+        """
+        with self._lock:
+            if truncate or self.num_rows == 0:
+                if truncate:
+                    self.truncation_count += 1
+                    # None of the old stats describe the new rows, even if
+                    # there are more of them than before.
+                    self._chunks = []
+                self._set_column_values(column_values)
+                # Whoever passed in the lists may still be using them.
+                self._shared = True
+            elif self._shared:
+                # A snapshot or another table may be reading the current
+                # column lists, so publish new ones.
+                self._set_column_values(
+                    [column.values + values for column, values in zip(
+                        self.columns.values(), column_values)])
+                self._shared = False
+            else:
+                for column, values in zip(self.columns.values(),
+                                          column_values):
+                    column.values.extend(values)
+            self.num_rows = num_rows if truncate else self.num_rows + num_rows
+            # Only the last chunk and any new chunks need their stats
+            # recomputed.
+            self.refresh_stats()
+
+    def _set_column_values(self, column_values):
+        self.columns = collections.OrderedDict(
+            (col_name, context.Column(type=column.type, mode=column.mode,
+                                      values=values))
+            for (col_name, column), values in zip(self.columns.items(),
+                                                  column_values))
+
+    @property
+    def chunks(self):
+        """A list of column_stats.TableChunk covering the table's rows.
+
+        Stats are computed the first time they're needed, and after that
+        only for rows appended since, so tables that are never filtered
+        (like query results) never pay for them.
+        """
+        chunks = self._chunks
+        stats_num_rows = chunks[-1].end if chunks else 0
+        if stats_num_rows != self.num_rows:
+            if stats_num_rows > self.num_rows:
+                # The table shrank, so none of the old stats can be trusted.
+                chunks = []
+            if chunks and chunks[-1].num_rows < self.chunk_size:
+                chunks = chunks[:-1]
+            start = chunks[-1].end if chunks else 0
+            self._chunks = chunks + column_stats.build_chunks(
+                self.columns, start, self.num_rows, self.chunk_size)
+            if self._live_table is not None:
+                self._live_table._share_chunks(self.version, self._chunks)
+        return self._chunks
+
+    def _share_chunks(self, version, chunks):
+        # The lists of chunks are never changed, only replaced, so they can
+        # be shared between a table and its snapshots.
+        with self._lock:
+            if self.version == version:
+                self._chunks = chunks
+                if self._live_table is not None:
+                    self._live_table._share_chunks(version, chunks)
+
+    def refresh_stats(self):
+        """Mark the chunk stats as out of date with the column values.
+
+        Tables are only ever appended to (or cleared), so only the last chunk
+        and any chunks after it need to be recomputed, which happens the next
+        time the stats are used. Anything that modifies the rows of a table
+        calls this, so it also bumps the table version.
+        """
+        self.version = next(_table_versions)
+        if self._chunks and self._chunks[-1].end >= self.num_rows:
+            # Clearing a table (or replacing all of its rows) leaves the row
+            # count the same or smaller, so the stats can't be reused.
+            self._chunks = []
+
+    def column_stats(self, col_name):
+        """Get the ColumnStats for a column over the whole table."""
+        return column_stats.merge_column_stats(
+            chunk.column_stats[col_name] for chunk in self.chunks)
+
+    def column_num_bytes(self, col_name):
+        """Get the number of bytes a query reading a column processes.
+
+        The size is cached until the table version changes.
+        """
+        version, num_bytes = self._num_bytes_by_column.get(col_name,
+                                                           (None, None))
+        if version != self.version:
+            num_bytes = query_cost.column_num_bytes(
+                self._column_for_size(col_name))
+            self._num_bytes_by_column[col_name] = (self.version, num_bytes)
+        return num_bytes
+
+    def _column_for_size(self, col_name):
+        return self.columns[col_name]
+
+    @property
+    def schema(self):
+        """An OrderedDict mapping column name to an empty Column.
+
+        This gives the type and mode of each column without needing to
+        look at any data.
+        """
+        return collections.OrderedDict(
+            (col_name, context.empty_column_from_template(column))
+            for col_name, column in self.columns.items())
 
     def __repr__(self):
         return 'Table({}, {}, {})'.format(self.name, self.num_rows,
                                           self.columns)
 
 
+class PartitionedTable(Table):
+    """A table whose rows are stored in separate partitions, one per day.
+
+    Each partition is a regular Table. For reading, the columns of a
+    partitioned table are all of its partitions concatenated in partition id
+    order, but writes should go to the individual partitions.
+
+    Fields:
+        name: The name of the table.
+        schema: An OrderedDict mapping column name to an empty Column.
+        partitions: A dict mapping partition id (a YYYYMMDD string) to the
+            Table holding the rows in that partition.
+        chunk_size: The chunk size to use for new partitions.
+    """
+    def __init__(self, name, columns,
+                 chunk_size=column_stats.DEFAULT_CHUNK_SIZE):
+        assert isinstance(columns, collections.OrderedDict)
+        self.name = name
+        self.chunk_size = chunk_size
+        self._schema = collections.OrderedDict(
+            (col_name, context.empty_column_from_template(column))
+            for col_name, column in columns.items())
+        self.partitions = {}
+        self._concatenated_columns = None
+        self._lock = threading.RLock()
+        self._live_table = None
+
+    @property
+    def schema(self):
+        return self._schema
+
+    def snapshot(self):
+        with self._lock:
+            pinned = copy.copy(self)
+            pinned.partitions = {
+                partition_id: partition.snapshot()
+                for partition_id, partition in self.partitions.items()}
+            pinned._lock = threading.RLock()
+            pinned._live_table = self
+            return pinned
+
+    def get_or_create_partition(self, partition_id):
+        with self._lock:
+            partition = self.partitions.get(partition_id)
+            if partition is None:
+                partition = Table(
+                    '{}${}'.format(self.name, partition_id), 0,
+                    collections.OrderedDict(
+                        (col_name, context.empty_column_from_template(column))
+                        for col_name, column in self.schema.items()),
+                    chunk_size=self.chunk_size)
+                self.partitions[partition_id] = partition
+            return partition
+
+    def delete_partition(self, partition_id):
+        with self._lock:
+            del self.partitions[partition_id]
+
+    def append_rows(self, num_rows, column_values, truncate=False):
+        """Append rows to the current day's partition.
+
+        If truncate is true, all other partitions are dropped too.
+        """
+        src_partitions = []
+        if num_rows:
+            src_partitions.append((
+                partitioning.current_partition_id(),
+                Table(self.name, num_rows, collections.OrderedDict(
+                    (col_name, context.Column(type=column.type,
+                                              mode=column.mode,
+                                              values=values))
+                    for (col_name, column), values in zip(
+                        self.schema.items(), column_values)))))
+        self.append_partitions(src_partitions, truncate)
+
+    def append_partitions(self, src_partitions, truncate=False):
+        """Append rows to partitions of the table, all in a single step.
+
+        Arguments:
+            src_partitions: A list of (partition id, Table) pairs, with the
+                rows to append to each partition.
+            truncate: Whether the new rows should replace all of the rows in
+                the table.
+        """
+        with self._lock:
+            if truncate:
+                # Snapshots have their own dicts of partitions, so this
+                # doesn't affect them.
+                self.partitions = {}
+            for partition_id, src_partition in src_partitions:
+                self.get_or_create_partition(partition_id).append_rows(
+                    src_partition.num_rows,
+                    column_values_for_schema(src_partition, self.schema))
+
+    def partition_ids(self):
+        with self._lock:
+            return sorted(self.partitions)
+
+    @property
+    def num_rows(self):
+        with self._lock:
+            return sum(partition.num_rows
+                       for partition in self.partitions.values())
+
+    @property
+    def version(self):
+        """Changes whenever the rows of the table change."""
+        with self._lock:
+            return tuple((partition_id, partition.version)
+                         for partition_id, partition in sorted(
+                             self.partitions.items()))
+
+    @property
+    def columns(self):
+        # Concatenating is expensive, so we cache the result until any of the
+        # partitions change. Partition versions are unique, and shared with
+        # snapshots of the partitions, so snapshots of the table can share
+        # the cache with it.
+        with self._lock:
+            partitions = sorted(self.partitions.items())
+        cache_key = [(partition_id, partition.version)
+                     for partition_id, partition in partitions]
+        if (self._concatenated_columns is None or
+                self._concatenated_columns[0] != cache_key):
+            columns = collections.OrderedDict()
+            for col_name, column in self.schema.items():
+                values = []
+                for _, partition in partitions:
+                    values.extend(partition.columns[col_name].values)
+                columns[col_name] = context.Column(
+                    type=column.type, mode=column.mode, values=values)
+            self._concatenated_columns = (cache_key, columns)
+            if self._live_table is not None:
+                # The key makes sure the table only uses the columns while
+                # it's the same version.
+                self._live_table._concatenated_columns = (
+                    self._concatenated_columns)
+        return self._concatenated_columns[1]
+
+    @property
+    def chunks(self):
+        result = []
+        offset = 0
+        for partition_id in self.partition_ids():
+            partition = self.partitions[partition_id]
+            result.extend(
+                column_stats.TableChunk(chunk.start + offset,
+                                        chunk.end + offset,
+                                        chunk.column_stats)
+                for chunk in partition.chunks)
+            offset += partition.num_rows
+        return result
+
+    def refresh_stats(self):
+        with self._lock:
+            for partition in self.partitions.values():
+                partition.refresh_stats()
+
+    def column_num_bytes(self, col_name):
+        with self._lock:
+            partitions = list(self.partitions.values())
+        return sum(partition.column_num_bytes(col_name)
+                   for partition in partitions)
+
+    def __repr__(self):
+        return 'PartitionedTable({}, {})'.format(
+            self.name, sorted(self.partitions.items()))
+
+
+class SnapshotTable(Table):
+    """A table loaded from a snapshot file.
+
+    The column values are only decoded from the (memory-mapped) file the first
+    time they're used, so loading a snapshot is cheap no matter how much data
+    it has. Snapshots of the table share the file (and the values, once
+    they're decoded), so pinning the table for a query or an export doesn't
+    decode it either. After that, this behaves just like a regular Table.
+    """
+    def __init__(self, table_file,
+                 chunk_size=column_stats.DEFAULT_CHUNK_SIZE):
+        self.name = table_file.name
+        self.num_rows = table_file.num_rows
+        self.chunk_size = chunk_size
+        self.version = next(_table_versions)
+        self.truncation_count = 0
+        self._chunks = []
+        self._num_bytes_by_column = {}
+        self._lock = threading.RLock()
+        self._shared = False
+        self._live_table = None
+        self._table_file = table_file
+        self._columns = None
+
+    @property
+    def columns(self):
+        with self._lock:
+            if self._columns is None:
+                self._columns = self._table_file.read_columns()
+                self._table_file = None
+                # Other snapshots of the file share the decoded values.
+                self._shared = True
+            return self._columns
+
+    @columns.setter
+    def columns(self, columns):
+        self._columns = columns
+        self._table_file = None
+
+    @property
+    def table_file(self):
+        """The snapshot.TableFile, or None once the columns are decoded."""
+        return self._table_file
+
+    def _column_for_size(self, col_name):
+        # Sizing a column shouldn't decode the whole table.
+        if self._columns is None:
+            return self._table_file.read_column(col_name)
+        return self._columns[col_name]
+
+    @property
+    def schema(self):
+        if self._columns is None:
+            return collections.OrderedDict(
+                (col_name, context.empty_column_from_template(column))
+                for col_name, column in self._table_file.schema.items())
+        return super(SnapshotTable, self).schema
+
+    def __repr__(self):
+        if self._columns is None:
+            return 'SnapshotTable({}, {}, <not loaded>)'.format(
+                self.name, self.num_rows)
+        return 'SnapshotTable({}, {}, {})'.format(self.name, self.num_rows,
+                                                  self._columns)
+
+
 class View(object):
     """Information about a view (a virtual table defined by a query).
 
     Fields:
         name: The name of the view.
         query: The query string for the view.
+        schema: An OrderedDict mapping the name of each column of the view
+            to an empty Column, or None if it isn't known.
+        compiled_select: A tuple of the table catalog the query was last
+            compiled against, the catalog's version, and the compiled
+            typed_ast.Select, or None. See Compiler.compile_view.
     """
-    def __init__(self, name, query):
+    def __init__(self, name, query, schema=None):
         self.name = name
         self.query = query
+        self.schema = schema
+        self.compiled_select = None
+        self._parsed_query = None
 
+    @property
+    def parsed_query(self):
+        """The parsed query, which only depends on the query text."""
+        if self._parsed_query is None:
+            self._parsed_query = parser.parse_text(self.query)
+        return self._parsed_query
 
-class QueryJob(collections.namedtuple('QueryJob', ['job_info',
-                                                   'query_results'])):
-    pass
+
+class MaterializedView(object):
+    """A view whose results are stored, like a BigQuery materialized view.
+
+    The results are brought up to date whenever the view is read (with
+    snapshot, like a Table), and only if the tables it reads have changed
+    since. If the view aggregates a single table that has only had rows
+    appended since then, just the new rows are aggregated and merged into
+    the stored results (see the materialized_views module). Otherwise, the
+    view's query is run again.
+
+    Fields:
+        name: The name of the view.
+        query: The query string for the view.
+    """
+    def __init__(self, name, query, tables_by_name):
+        self.name = name
+        self.query = query
+        self._tables_by_name = tables_by_name
+        self._lock = threading.RLock()
+        # The stored results, or None if the view hasn't been read yet.
+        self._table = None
+        # The repr of the compiled query and the versions of the tables it
+        # read when the results were last brought up to date.
+        self._plan_key = None
+        self._table_versions = None
+        # For views that are maintained incrementally, the
+        # IncrementalAggregation and the states of the groups, and the name
+        # of the table the view reads, that Table (so that replacing it can be
+        # noticed), and its truncation_count and num_rows when last read.
+        self._aggregation = None
+        self._groups = None
+        self._base_table_name = None
+        self._base_table = None
+        self._base_truncation_count = None
+        self._base_num_rows = None
+
+    def snapshot(self):
+        """Get an unchanging Table of the view's current results."""
+        with self._lock:
+            self.refresh()
+            return self._table.snapshot()
+
+    @property
+    def schema(self):
+        return self.snapshot().schema
+
+    @property
+    def columns(self):
+        return self.snapshot().columns
+
+    @property
+    def num_rows(self):
+        return self.snapshot().num_rows
+
+    def refresh(self):
+        """Bring the stored results up to date with the tables they read."""
+        with self._lock:
+            select_ast = compiler.compile_text(self.query,
+                                               self._tables_by_name)
+            plan_key = repr(select_ast)
+            tables = {
+                table_expr.name: self._tables_by_name[table_expr.name]
+                for table_expr in typed_ast.iter_tables(select_ast)}
+            pinned_tables = {table_name: table.snapshot()
+                             for table_name, table in tables.items()}
+            table_versions = {table_name: table.version
+                              for table_name, table in pinned_tables.items()}
+            if (self._table is not None and plan_key == self._plan_key and
+                    table_versions == self._table_versions):
+                return
+
+            if (plan_key == self._plan_key and
+                    self._was_appended_to(tables, pinned_tables)):
+                self._append_base_rows(pinned_tables[self._base_table_name])
+            else:
+                self._recompute(select_ast, tables, pinned_tables)
+            self._plan_key = plan_key
+            self._table_versions = table_versions
+
+    def _was_appended_to(self, tables, pinned_tables):
+        """Check if an incremental view's table only had rows appended."""
+        if self._aggregation is None or list(tables) != [
+                self._base_table_name]:
+            return False
+        base_table = pinned_tables[self._base_table_name]
+        return (tables[self._base_table_name] is self._base_table and
+                base_table.truncation_count == self._base_truncation_count and
+                base_table.num_rows >= self._base_num_rows)
+
+    def _append_base_rows(self, base_table):
+        new_rows_table = Table(
+            base_table.name, base_table.num_rows - self._base_num_rows,
+            collections.OrderedDict(
+                (col_name, context.Column(
+                    type=column.type, mode=column.mode,
+                    values=column.values[self._base_num_rows:]))
+                for col_name, column in base_table.columns.items()))
+        self._base_num_rows = base_table.num_rows
+        if new_rows_table.num_rows:
+            self._aggregation.merge_states(
+                self._groups,
+                evaluator.Evaluator({self._base_table_name: new_rows_table})
+                .evaluate_select(self._aggregation.state_select))
+            self._store_groups()
+
+    def _recompute(self, select_ast, tables, pinned_tables):
+        self._aggregation = None
+        if len(tables) == 1:
+            (base_table_name, base_table), = tables.items()
+            if not isinstance(base_table, PartitionedTable):
+                self._aggregation = (
+                    materialized_views.IncrementalAggregation.from_select(
+                        select_ast))
+        select_evaluator = evaluator.Evaluator(pinned_tables)
+        if self._aggregation is None:
+            self._table = TinyQuery.table_from_context(
+                self.name, select_evaluator.evaluate_select(select_ast))
+            return
+        self._base_table_name = base_table_name
+        self._base_table = base_table
+        self._base_truncation_count = (
+            pinned_tables[base_table_name].truncation_count)
+        self._base_num_rows = pinned_tables[base_table_name].num_rows
+        self._groups = collections.OrderedDict()
+        self._aggregation.merge_states(
+            self._groups,
+            select_evaluator.evaluate_select(self._aggregation.state_select))
+        self._store_groups()
+
+    def _store_groups(self):
+        columns = self._aggregation.result_columns(self._groups)
+        self._table = Table(self.name, len(self._groups), columns)
+
+
+def _now_millis():
+    """The current time in the format of BigQuery job statistics."""
+    return str(int(time.time() * 1000))
+
+
+class QueryJob(object):
+    """A query job, which is PENDING, then RUNNING, then DONE.
+
+    Fields:
+        job_info: The job resource, without the progress of a running
+            query; see get_job_info. As the job runs, it's replaced rather
+            than modified, so other threads can safely read it.
+        cancellation: The query_limits.CancellationToken for the query.
+        query_results: The Table of query results, or None if the job isn't
+            done or failed.
+        error: The exception the job failed with, or None.
+        done: A threading.Event that's set once the job is DONE.
+    """
+    def __init__(self, cancellation):
+        self.job_info = {
+            'status': {'state': 'PENDING'},
+            'statistics': {'creationTime': _now_millis()},
+        }
+        self.cancellation = cancellation
+        self.query_results = None
+        self.error = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._plan_recorder = None
+
+    def get_job_info(self):
+        """Get the job resource returned by jobs().get.
+
+        While the query runs, its statistics include the plan recorded so
+        far, with the status of each stage, and a timeline sample counting
+        the stages done.
+        """
+        job_info = self.job_info
+        plan_recorder = self._plan_recorder
+        if (job_info['status']['state'] != 'RUNNING' or
+                plan_recorder is None or plan_recorder.plan is None):
+            return job_info
+        plan = plan_recorder.plan
+        statistics = job_info['statistics']
+        elapsed_ms = int(_now_millis()) - int(statistics['startTime'])
+        return dict(job_info, statistics=dict(statistics, query={
+            'queryPlan': plan.to_json(),
+            'timeline': [plan.timeline_sample(elapsed_ms)],
+        }))
+
+    def _update(self, status, **statistics):
+        job_info = dict(self.job_info)
+        job_info['status'] = status
+        job_info['statistics'] = dict(job_info['statistics'], **statistics)
+        self.job_info = job_info
+
+    def start(self, plan_recorder=None):
+        """Mark the job RUNNING, unless it's already DONE.
+
+        Arguments:
+            plan_recorder: An optional query_plan.PlanRecorder the query
+                will be run with, to report its progress from.
+
+        Returns: Whether the job should run.
+        """
+        with self._lock:
+            if self.done.is_set():
+                return False
+            self._plan_recorder = plan_recorder
+            self._update({'state': 'RUNNING'}, startTime=_now_millis())
+            self.cancellation.start()
+            return True
+
+    def finish(self, query_results, cache_hit=False, plan=None,
+               peak_memory_bytes=None):
+        """Mark the job DONE with its results.
+
+        Arguments:
+            query_results: The Table of results.
+            cache_hit: Whether the results came from the result cache.
+            plan: The query_plan.QueryPlan the results were computed with,
+                or None if they weren't computed (like for a cache hit), in
+                which case no bytes were processed.
+            peak_memory_bytes: The most memory the query used at once, which
+                is only reported if the results were computed. This isn't in
+                BigQuery's job statistics.
+        """
+        total_bytes_processed = '0'
+        query_statistics = {'cacheHit': cache_hit}
+        if plan is not None:
+            total_bytes_processed = str(plan.total_bytes_processed)
+            query_statistics['queryPlan'] = plan.to_json()
+            if peak_memory_bytes is not None:
+                query_statistics['peakMemoryBytes'] = str(peak_memory_bytes)
+        query_statistics['totalBytesProcessed'] = total_bytes_processed
+        with self._lock:
+            self.query_results = query_results
+            self._update({'state': 'DONE'}, endTime=_now_millis(),
+                         totalBytesProcessed=total_bytes_processed,
+                         query=query_statistics)
+            self.done.set()
+
+    def fail(self, error):
+        with self._lock:
+            self._fail(error)
+
+    def _fail(self, error):
+        if isinstance(error, query_limits.QueryAbortedError):
+            error_result = {'reason': error.reason, 'message': str(error)}
+        elif isinstance(error, exceptions.CompileError):
+            error_result = {'reason': 'invalidQuery', 'message': str(error)}
+        elif isinstance(error, KeyError):
+            # Tables are looked up by name in dicts.
+            error_result = {'reason': 'notFound',
+                            'message': 'Not found: {}'.format(error.args[0])}
+        else:
+            error_result = {'reason': 'invalid', 'message': str(error)}
+        self.error = error
+        self._update({'state': 'DONE', 'errorResult': error_result,
+                      'errors': [error_result]},
+                     endTime=_now_millis())
+        self.done.set()
+
+    def cancel(self):
+        with self._lock:
+            self.cancellation.cancel()
+            if self.job_info['status']['state'] == 'PENDING':
+                self._fail(query_limits.QueryCancelledError())
 
 
 class CopyJob(collections.namedtuple('CopyJob', ['job_info'])):
@@ -1,9 +1,24 @@
 from __future__ import absolute_import
 
+import collections
+import datetime
 import json
+import os
+import shutil
+import tempfile
+import threading
 import unittest
 
+import mock
+
+from tinyquery import column_stats
+from tinyquery import compiler
+from tinyquery import context
+from tinyquery import evaluator
+from tinyquery import exceptions
 from tinyquery import tinyquery
+from tinyquery import tq_modes
+from tinyquery import tq_types
 
 
 class TinyQueryTest(unittest.TestCase):
@@ -137,3 +152,401 @@ class TinyQueryTest(unittest.TestCase):
                          ['a', 'b', 'c', 'd', 'e'])
         self.assertEqual(table.columns['r.inner_repeated'].values[0],
                          ['l', 'm', 'n'])
+
+    def test_load_table_from_csv(self):
+        fd, filename = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, filename)
+        with os.fdopen(fd, 'w') as f:
+            f.write('id,name\n1,"Smith, J"\n2,null\nthree,x\n')
+        tq = tinyquery.TinyQuery()
+        tq.load_table_from_csv(
+            'dataset.people',
+            {'fields': [{'name': 'id', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+                        {'name': 'name', 'type': 'STRING',
+                         'mode': 'NULLABLE'}]},
+            filename, skip_leading_rows=1, max_bad_records=1)
+        table = tq.tables_by_name['dataset.people']
+        self.assertEqual(2, table.num_rows)
+        self.assertEqual([1, 2], table.columns['id'].values)
+        self.assertEqual(['Smith, J', None], table.columns['name'].values)
+        self.assertEqual(2, table.column_stats('id').max_value)
+
+    def test_load_table_from_newline_delimited_json_files(self):
+        schema_fd, schema_filename = tempfile.mkstemp(suffix='.json')
+        self.addCleanup(os.remove, schema_filename)
+        with os.fdopen(schema_fd, 'w') as f:
+            json.dump([{'name': 'i', 'type': 'INTEGER', 'mode': 'NULLABLE'}],
+                      f)
+        table_fd, table_filename = tempfile.mkstemp(suffix='.json')
+        self.addCleanup(os.remove, table_filename)
+        with os.fdopen(table_fd, 'w') as f:
+            f.write('{"i": 1}\n{"i": null}\n\n{"i": 3}\n')
+        tq = tinyquery.TinyQuery()
+        tq.load_table_from_newline_delimited_json_files(
+            'dataset.numbers', schema_filename, table_filename)
+        table = tq.tables_by_name['dataset.numbers']
+        self.assertEqual(3, table.num_rows)
+        self.assertEqual([1, None, 3], table.columns['i'].values)
+
+    def test_load_json_keeps_stats(self):
+        tq = tinyquery.TinyQuery()
+        tq.load_table_from_newline_delimited_json(
+            'test_table',
+            json.dumps(self.record_schema['fields']),
+            [json.dumps({'i': i}) for i in range(3)])
+        table = tq.tables_by_name['test_table']
+        self.assertEqual(3, table.num_rows)
+        self.assertEqual(2, table.column_stats('i').max_value)
+        self.assertEqual(3, table.column_stats('r.s').null_count)
+
+    def make_partitioned_table(self, tq):
+        tq.load_table_or_view(tinyquery.TinyQuery.make_empty_table(
+            'dataset.events',
+            {'fields': [{'name': 'i', 'type': 'INTEGER',
+                         'mode': 'NULLABLE'}]},
+            partitioned=True))
+        for partition_id, values in [('20160102', [3]),
+                                     ('20160101', [1, 2])]:
+            tq.load_table_from_newline_delimited_json(
+                'dataset.events$' + partition_id,
+                json.dumps([{'name': 'i', 'type': 'INTEGER',
+                             'mode': 'NULLABLE'}]),
+                [json.dumps({'i': i}) for i in values])
+        return tq.tables_by_name['dataset.events']
+
+    def test_load_into_partition(self):
+        tq = tinyquery.TinyQuery()
+        table = self.make_partitioned_table(tq)
+        self.assertEqual(['20160101', '20160102'], table.partition_ids())
+        self.assertEqual(3, table.num_rows)
+        self.assertEqual([1, 2, 3], table.columns['i'].values)
+        self.assertEqual(
+            [2], tq.get_table('dataset', 'events$20160101').columns[
+                'i'].values[1:])
+
+        # Loading into a partition again appends to just that partition.
+        tq.load_table_from_newline_delimited_json(
+            'dataset.events$20160101',
+            json.dumps([{'name': 'i', 'type': 'INTEGER', 'mode': 'NULLABLE'}]),
+            [json.dumps({'i': 7})])
+        self.assertEqual([1, 2, 7, 3], table.columns['i'].values)
+        self.assertEqual(
+            [3], table.partitions['20160102'].columns['i'].values)
+
+    def test_copy_into_partition(self):
+        tq = tinyquery.TinyQuery()
+        table = self.make_partitioned_table(tq)
+        src_table = tq.get_table('dataset', 'events$20160102')
+        tq.copy_table(src_table, 'dataset.events$20160101',
+                      'CREATE_IF_NEEDED', 'WRITE_TRUNCATE')
+        self.assertEqual([3, 3], table.columns['i'].values)
+        tq.copy_table(src_table, 'dataset.events$20160105',
+                      'CREATE_IF_NEEDED', 'WRITE_EMPTY')
+        self.assertEqual(['20160101', '20160102', '20160105'],
+                         table.partition_ids())
+
+        # Copying a whole partitioned table keeps the partitions.
+        tq.copy_table(table, 'dataset.events_copy',
+                      'CREATE_IF_NEEDED', 'WRITE_EMPTY')
+        copied = tq.tables_by_name['dataset.events_copy']
+        self.assertIsInstance(copied, tinyquery.PartitionedTable)
+        self.assertEqual(['20160101', '20160102', '20160105'],
+                         copied.partition_ids())
+
+    def test_partition_decorator_on_unpartitioned_table(self):
+        tq = tinyquery.TinyQuery()
+        tq.load_table_or_view(tinyquery.TinyQuery.make_empty_table(
+            'dataset.plain', self.record_schema))
+        with self.assertRaises(tinyquery.TinyQueryError):
+            tq.get_table('dataset', 'plain$20160101')
+
+    def test_query_partitions(self):
+        tq = tinyquery.TinyQuery()
+        self.make_partitioned_table(tq)
+        result = tq.evaluate_query(
+            'SELECT i FROM dataset.events$20160102')
+        self.assertEqual([3], result.columns[(None, 'i')].values)
+
+        result = tq.evaluate_query(
+            'SELECT i, _PARTITIONTIME AS pt FROM dataset.events '
+            'WHERE _PARTITIONTIME < TIMESTAMP("2016-01-02")')
+        self.assertEqual([1, 2], result.columns[(None, 'i')].values)
+        self.assertEqual([datetime.datetime(2016, 1, 1)] * 2,
+                         result.columns[(None, 'pt')].values)
+
+        # The pseudo-column isn't included in SELECT *.
+        result = tq.evaluate_query(
+            'SELECT * FROM dataset.events WHERE _PARTITIONTIME = "2016-01-02"')
+        self.assertEqual([(None, 'i')], list(result.columns))
+        self.assertEqual([3], result.columns[(None, 'i')].values)
+
+    def test_partition_pruning(self):
+        tq = tinyquery.TinyQuery()
+        table = self.make_partitioned_table(tq)
+        # Comparing these values to an int would fail, so this checks that the
+        # partition isn't read at all.
+        table.partitions['20160101'].columns['i'].values[:] = ['x', 'y']
+        result = tq.evaluate_query(
+            'SELECT i FROM dataset.events '
+            'WHERE _PARTITIONTIME >= "2016-01-02" AND i > 0')
+        self.assertEqual([3], result.columns[(None, 'i')].values)
+
+    def make_sharded_table(self, tq, shard_values):
+        for suffix, values in shard_values:
+            tq.load_table_from_newline_delimited_json(
+                'dataset.events_' + suffix,
+                json.dumps([{'name': 'i', 'type': 'INTEGER',
+                             'mode': 'NULLABLE'}]),
+                [json.dumps({'i': i}) for i in values])
+
+    def test_table_date_range(self):
+        tq = tinyquery.TinyQuery()
+        self.make_sharded_table(tq, [
+            ('20151231', [0]), ('20160101', [1, 2]), ('20160103', [3]),
+            ('20160104', [4]), ('20160102_backup', [100])])
+        result = tq.evaluate_query(
+            'SELECT i FROM TABLE_DATE_RANGE(dataset.events_, '
+            'TIMESTAMP("2016-01-01"), TIMESTAMP("2016-01-03 12:00:00"))')
+        self.assertEqual([1, 2, 3], result.columns[(None, 'i')].values)
+
+        result = tq.evaluate_query(
+            'SELECT t.i FROM TABLE_DATE_RANGE(dataset.events_, '
+            '"2016-01-03", "2016-01-10") t WHERE t.i > 3')
+        self.assertEqual([4], result.columns[(None, 't.i')].values)
+
+        with self.assertRaises(exceptions.CompileError):
+            tq.evaluate_query(
+                'SELECT i FROM TABLE_DATE_RANGE(dataset.events_, '
+                'TIMESTAMP("2017-01-01"), TIMESTAMP("2017-01-03"))')
+
+    def test_table_date_range_strict(self):
+        tq = tinyquery.TinyQuery()
+        self.make_sharded_table(tq, [('20160101', [1]), ('20160103', [3])])
+        result = tq.evaluate_query(
+            'SELECT i FROM TABLE_DATE_RANGE_STRICT(dataset.events_, '
+            'TIMESTAMP("2016-01-03"), TIMESTAMP("2016-01-03"))')
+        self.assertEqual([3], result.columns[(None, 'i')].values)
+        with self.assertRaises(exceptions.CompileError):
+            tq.evaluate_query(
+                'SELECT i FROM TABLE_DATE_RANGE_STRICT(dataset.events_, '
+                'TIMESTAMP("2016-01-01"), TIMESTAMP("2016-01-03"))')
+
+    def test_table_query(self):
+        tq = tinyquery.TinyQuery()
+        self.make_sharded_table(tq, [
+            ('a', [1]), ('b', [2, 3]), ('c_backup', [4])])
+        result = tq.evaluate_query(
+            'SELECT i FROM TABLE_QUERY(dataset, '
+            '\'table_id CONTAINS "events" AND '
+            'NOT table_id CONTAINS "backup"\')')
+        self.assertEqual([1, 2, 3], result.columns[(None, 'i')].values)
+
+        result = tq.evaluate_query(
+            'SELECT i FROM TABLE_QUERY(dataset, "row_count > 1")')
+        self.assertEqual([2, 3], result.columns[(None, 'i')].values)
+
+    def test_shards_share_type_context(self):
+        tq = tinyquery.TinyQuery()
+        self.make_sharded_table(tq, [
+            ('2016010' + str(day), [day]) for day in range(1, 8)])
+        select = compiler.compile_text(
+            'SELECT i FROM TABLE_DATE_RANGE(dataset.events_, '
+            'TIMESTAMP("2016-01-01"), TIMESTAMP("2016-01-07")) '
+            'WHERE i % 2 = 0',
+            tq.tables_by_name)
+        self.assertEqual(7, len(select.table.tables))
+        self.assertEqual(1, len(set(
+            id(table.type_ctx) for table in select.table.tables)))
+
+        # Each shard is filtered on its own before being added to the result.
+        with mock.patch('tinyquery.context.append_context_to_context',
+                        wraps=context.append_context_to_context) as append:
+            result = evaluator.Evaluator(tq.tables_by_name).evaluate_select(
+                select)
+        self.assertEqual([2, 4, 6], result.columns[(None, 'i')].values)
+        self.assertEqual(
+            [0, 1, 0, 1, 0, 1, 0],
+            [call[0][0].num_rows for call in append.call_args_list])
+
+    def test_snapshot(self):
+        tq = tinyquery.TinyQuery()
+        tq.load_table_from_newline_delimited_json(
+            'dataset.records', json.dumps(self.record_schema['fields']),
+            [json.dumps({'i': 1, 'rr': [{'inner_non_repeated': 'a',
+                                         'inner_repeated': ['x', 'y']}],
+                         'r': {'s': 'b', 'r2': {'d2': 5}}}),
+             json.dumps({'i': None})])
+        self.make_partitioned_table(tq)
+        tq.load_table_or_view(tq.make_view(
+            'dataset.view', 'SELECT i FROM dataset.records WHERE i > 0'))
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        tq.save_snapshot(path)
+        loaded_tq = tinyquery.TinyQuery()
+        loaded_tq.load_snapshot(path)
+
+        records = loaded_tq.tables_by_name['dataset.records']
+        self.assertIsInstance(records, tinyquery.SnapshotTable)
+        # Nothing is decoded until the columns are used.
+        self.assertIsNone(records._columns)
+        self.assertEqual(list(tq.tables_by_name['dataset.records'].schema),
+                         list(records.schema))
+        self.assertIsNone(records._columns)
+        self.assertEqual(tq.tables_by_name['dataset.records'].columns,
+                         records.columns)
+
+        events = loaded_tq.tables_by_name['dataset.events']
+        self.assertEqual(['20160101', '20160102'], events.partition_ids())
+        self.assertEqual([1, 2, 3], events.columns['i'].values)
+        for query in ['SELECT i FROM dataset.view',
+                      'SELECT i FROM dataset.events$20160101',
+                      'SELECT r.s, rr.inner_repeated FROM dataset.records']:
+            self.assertEqual(tq.evaluate_query(query),
+                             loaded_tq.evaluate_query(query))
+
+
+    def make_counter_table(self, tq):
+        tq.load_table_or_view(tinyquery.TinyQuery.make_empty_table(
+            'dataset.counter',
+            {'fields': [{'name': 'one', 'type': 'INTEGER',
+                         'mode': 'NULLABLE'}]}))
+        return tq.tables_by_name['dataset.counter']
+
+    def test_snapshot_isolation(self):
+        tq = tinyquery.TinyQuery()
+        table = self.make_counter_table(tq)
+        table.append_rows(2, [[1, 1]])
+        pinned = table.snapshot()
+        table.append_rows(1, [[1]])
+        self.assertEqual((2, [1, 1]),
+                         (pinned.num_rows, pinned.columns['one'].values))
+        self.assertEqual((3, [1, 1, 1]),
+                         (table.num_rows, table.columns['one'].values))
+
+        # Truncating publishes new columns too.
+        pinned = table.snapshot()
+        tq.copy_table(tinyquery.Table('src', 1, collections.OrderedDict([
+            ('one', context.Column(type=tq_types.INT,
+                                   mode=tq_modes.NULLABLE, values=[1]))])),
+            'dataset.counter', 'CREATE_NEVER', 'WRITE_TRUNCATE')
+        self.assertEqual([1, 1, 1], pinned.columns['one'].values)
+        self.assertEqual([1], table.columns['one'].values)
+
+    def test_truncate_resets_stats(self):
+        tq = tinyquery.TinyQuery()
+        tq.load_table_or_view(tinyquery.Table(
+            'dataset.nums', 8, collections.OrderedDict([
+                ('i', context.Column(type=tq_types.INT,
+                                     mode=tq_modes.NULLABLE,
+                                     values=list(range(8))))]),
+            chunk_size=4))
+        table = tq.tables_by_name['dataset.nums']
+        self.assertEqual(2, len(table.chunks))
+        # Replacing the rows with more rows than before mustn't keep the
+        # stats of the old chunks, or the new rows would be pruned.
+        table.append_rows(16, [[10] * 16], truncate=True)
+        self.assertEqual(
+            16, tq.evaluate_query(
+                'SELECT i FROM dataset.nums WHERE i = 10').num_rows)
+
+    def test_snapshots_share_stats(self):
+        tq = tinyquery.TinyQuery()
+        self.make_counter_table(tq).append_rows(2, [[1, 2]])
+        table = self.make_partitioned_table(tq)
+        num_builds = []
+        with mock.patch.object(column_stats, 'build_chunks',
+                               wraps=column_stats.build_chunks) as build:
+            for _ in range(2):
+                tq.evaluate_query('SELECT one FROM dataset.counter '
+                                  'WHERE one > 1')
+                tq.evaluate_query('SELECT i FROM dataset.events WHERE i > 1')
+                num_builds.append(build.call_count)
+        # The stats are only built by the first queries.
+        self.assertEqual(num_builds[0], num_builds[1])
+        self.assertEqual(2, tq.tables_by_name['dataset.counter'].chunks[0].end)
+        columns = table.columns
+        self.assertIs(columns, table.snapshot().columns)
+
+        # Stats of an older version aren't shared.
+        pinned = tq.tables_by_name['dataset.counter'].snapshot()
+        tq.tables_by_name['dataset.counter'].append_rows(1, [[3]])
+        self.assertEqual(2, pinned.chunks[0].end)
+        self.assertEqual(
+            3, tq.tables_by_name['dataset.counter'].chunks[0].end)
+
+    def test_partitioned_snapshot_isolation(self):
+        tq = tinyquery.TinyQuery()
+        table = self.make_partitioned_table(tq)
+        pinned = table.snapshot()
+        tq.clear_table(table)
+        tq.copy_table(tq.get_table('dataset', 'events'),
+                      'dataset.events_copy', 'CREATE_IF_NEEDED',
+                      'WRITE_EMPTY')
+        self.assertEqual([], table.partition_ids())
+        self.assertEqual(['20160101', '20160102'], pinned.partition_ids())
+        self.assertEqual([1, 2, 3], pinned.columns['i'].values)
+
+    def test_copies_share_columns_until_written(self):
+        tq = tinyquery.TinyQuery()
+        src = self.make_counter_table(tq)
+        src.append_rows(2, [[1, 2]])
+        tq.copy_table(src, 'dataset.copy', 'CREATE_IF_NEEDED', 'WRITE_EMPTY')
+        dest = tq.tables_by_name['dataset.copy']
+        self.assertIs(src.columns['one'].values, dest.columns['one'].values)
+
+        dest.append_rows(1, [[3]])
+        src.append_rows(1, [[4]])
+        self.assertEqual([1, 2, 4], src.columns['one'].values)
+        self.assertEqual([1, 2, 3], dest.columns['one'].values)
+
+    def test_query_destination_shares_results(self):
+        tq = tinyquery.TinyQuery()
+        self.make_counter_table(tq).append_rows(2, [[1, 2]])
+        job_info = tq.run_query_job(
+            'project', 'SELECT one FROM dataset.counter',
+            'dataset', 'dest', 'CREATE_IF_NEEDED', 'WRITE_EMPTY')
+        results = tq.get_query_result_table(
+            job_info['jobReference']['jobId'])
+        dest = tq.tables_by_name['dataset.dest']
+        self.assertIs(results.columns['one'].values,
+                      dest.columns['one'].values)
+
+        dest.append_rows(1, [[3]])
+        self.assertEqual([1, 2], results.columns['one'].values)
+        self.assertEqual([1, 2, 3], dest.columns['one'].values)
+
+    def test_queries_see_whole_writes(self):
+        tq = tinyquery.TinyQuery()
+        table = self.make_counter_table(tq)
+        stop = threading.Event()
+        results = []
+
+        def write():
+            while not stop.is_set():
+                table.append_rows(10, [[1] * 10])
+                if table.num_rows >= 2000:
+                    tq.clear_table(table)
+
+        def read():
+            for _ in range(50):
+                result = tq.evaluate_query(
+                    'SELECT COUNT(*) AS c, SUM(one) AS s '
+                    'FROM dataset.counter')
+                results.append((result.columns[(None, 'c')].values[0],
+                                result.columns[(None, 's')].values[0]))
+
+        writer = threading.Thread(target=write)
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        writer.start()
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        stop.set()
+        writer.join()
+        self.assertEqual(200, len(results))
+        for count, total in results:
+            # SUM is null for an empty table.
+            self.assertEqual(count, total or 0)
+            self.assertEqual(0, count % 10)
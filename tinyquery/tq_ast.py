@@ -115,6 +115,25 @@ class TableId(collections.namedtuple('TableId', ['name', 'alias'])):
         return self.name
 
 
+class TableFunction(collections.namedtuple('TableFunction',
+                                           ['name', 'args', 'alias'])):
+    """Table expression calling a table wildcard function.
+
+    This represents something like
+    `TABLE_DATE_RANGE(dataset.events_, TIMESTAMP('2016-01-01'), NOW())`,
+    which selects from a union of all tables matching some condition.
+
+    Fields:
+        name: The lowercase name of the table function.
+        args: A list of argument expressions.
+        alias: An alias to assign to use for this table, or None if no alias
+            was specified.
+    """
+    def __str__(self):
+        return '{}({})'.format(
+            self.name.upper(), ', '.join(str(arg) for arg in self.args))
+
+
 class TableUnion(collections.namedtuple('TableUnion', ['tables'])):
     """Table expression for a union of tables (the comma operator).
 
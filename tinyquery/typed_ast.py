@@ -82,15 +82,28 @@ class NoTable(collections.namedtuple('NoTable', []), TableExpression):
             collections.OrderedDict())
 
 
-class Table(collections.namedtuple('Table', ['name', 'type_ctx']),
+class Table(collections.namedtuple('Table', ['name', 'type_ctx',
+                                             'partition_ids']),
             TableExpression):
+    """Table expression for reading a stored table.
+
+    Fields:
+        name: The name of the table, without any partition decorator.
+        type_ctx: The type context for the table's columns.
+        partition_ids: For partitioned tables, either None to read all
+            partitions, or a list of the ids of the partitions to read.
+    """
     def with_type_ctx(self, type_ctx):
-        return Table(self.name, type_ctx)
+        return Table(self.name, type_ctx, self.partition_ids)
+
+
+Table.__new__.__defaults__ = (None,)
 
 
 class TableUnion(collections.namedtuple('TableUnion', ['tables', 'type_ctx']),
                  TableExpression):
-    pass
+    def with_type_ctx(self, type_ctx):
+        return TableUnion(self.tables, type_ctx)
 
 
 class Join(collections.namedtuple('Join', ['base', 'tables', 'conditions',
@@ -159,3 +172,26 @@ class ColumnRef(collections.namedtuple(
 
 
 ColumnRef.__new__.__defaults__ = (tq_modes.NULLABLE,)
+
+
+def iter_tables(table_expr):
+    """Yield each stored Table read by a table expression or Select.
+
+    This includes the tables read by subqueries, and a table may be yielded
+    more than once.
+    """
+    if isinstance(table_expr, Table):
+        yield table_expr
+    elif isinstance(table_expr, Select):
+        for table in iter_tables(table_expr.table):
+            yield table
+    elif isinstance(table_expr, TableUnion):
+        for member in table_expr.tables:
+            for table in iter_tables(member):
+                yield table
+    elif isinstance(table_expr, Join):
+        for table in iter_tables(table_expr.base):
+            yield table
+        for member, _ in table_expr.tables:
+            for table in iter_tables(member):
+                yield table